@@ -72,6 +72,8 @@ extras_require = {'crate': ['crate==0.27.1'],
                   'mongo': ['pymongo==4.5.0'],
                   'mysql': ['mysql-connector-python==8.0.30'],
                   'pandas': ['numpy==1.23.1', 'pandas==1.4.3'],
+                  # Optional fast JSON backends and the MessagePack VIP frame codec.
+                  'performance': ['orjson==3.8.3', 'msgpack==1.0.5'],
                   'postgres': ['psycopg2-binary==2.9.7'],
                   # This is installed in bootstrap.py itself so we don't
                   # include here, though we include the version number here
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Actuator schedule requests per second with a growing number of booked
+Tasks, for the linear and the indexed schedule managers.  Every request
+is followed by the schedule state and next event time updates the
+Actuator Agent does after a change.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '../../services/core/ActuatorAgent/actuator'))
+
+from scheduler import (IndexedScheduleManager, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_LOW_PREEMPT,
+                       ScheduleManager)
+
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_LOW_PREEMPT)
+
+
+def run(manager_class, tasks, devices, seed):
+    rand = random.Random(seed)
+    saved = []
+    now = datetime(2023, 1, 1)
+    manager = manager_class(60, now=now, save_state_callback=saved.append)
+    horizon = max(60, tasks * 2 // devices) * 60
+    start = time.perf_counter()
+    for number in range(tasks):
+        device = 'campus/building/device{}'.format(rand.randrange(devices))
+        begin = now + timedelta(seconds=rand.randrange(60, horizon))
+        requests = [[device, begin, begin + timedelta(minutes=rand.randint(1, 30))]]
+        manager.request_slots('Agent{}'.format(number % 10), 'Task{}'.format(number), requests,
+                              rand.choice(PRIORITIES), now)
+        manager.get_schedule_state(now)
+        manager.get_next_event_time(now)
+    elapsed = time.perf_counter() - start
+    return tasks / elapsed, len(manager.tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, nargs='+', default=[100, 1000, 5000], help='requests per run')
+    parser.add_argument('--devices', type=int, default=500, help='number of devices')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print('{:>8} {:>8} {:>14} {:>14}'.format('requests', 'booked', 'linear req/s', 'indexed req/s'))
+    for tasks in args.tasks:
+        linear, booked = run(ScheduleManager, tasks, args.devices, args.seed)
+        indexed, indexed_booked = run(IndexedScheduleManager, tasks, args.devices, args.seed)
+        assert booked == indexed_booked
+        print('{:>8} {:>8} {:>14.0f} {:>14.0f}'.format(tasks, booked, linear, indexed))
+
+
+if __name__ == '__main__':
+    main()
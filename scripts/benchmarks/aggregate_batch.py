@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Time and queries taken by the aggregate historian to collect an hour of 1m
+aggregates for many points of SQLite historian data: one collect_aggregate
+query and insert per point compared with one grouped summary query and one
+bulk insert per time slice.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform.agent.base_aggregate_historian import combine_summaries, summary_value
+from volttron.platform.dbutils.sqlitefuncts import SqlLiteFuncts
+
+AGG_TYPES = ('avg', 'min', 'max')
+START = datetime(2023, 1, 1, tzinfo=pytz.utc)
+
+
+def create_db(path, topics, interval):
+    table_names = {'data_table': 'data', 'topics_table': 'topics', 'meta_table': 'meta',
+                   'agg_topics_table': 'aggregate_topics', 'agg_meta_table': 'aggregate_meta'}
+    functs = SqlLiteFuncts({'database': path}, table_names)
+    functs.setup_historian_tables()
+    functs.setup_aggregate_historian_tables()
+    for agg_type in AGG_TYPES:
+        functs.create_aggregate_store(agg_type, '1m')
+    rows = []
+    for second in range(0, 3600, interval):
+        ts = START + timedelta(seconds=second)
+        for topic_id in range(1, topics + 1):
+            rows.append((ts, topic_id, str(float(second % 97))))
+    functs.execute_many(functs.insert_data_query(), rows, commit=True)
+    return functs
+
+
+def slices():
+    for minute in range(60):
+        yield START + timedelta(minutes=minute), START + timedelta(minutes=minute + 1)
+
+
+def points(topics):
+    """One aggregation per topic and type; agg topic ids are unique per point."""
+    agg_topic_id = 0
+    for agg_type in AGG_TYPES:
+        for topic_id in range(1, topics + 1):
+            agg_topic_id += 1
+            yield agg_topic_id, agg_type, [topic_id]
+
+
+def per_point_mode(functs, topics):
+    queries = 0
+    for start, end in slices():
+        for agg_topic_id, agg_type, topic_ids in points(topics):
+            value, count = functs.collect_aggregate(topic_ids, agg_type, start, end)
+            functs.insert_aggregate(agg_topic_id, agg_type, '1m', end, value, topic_ids)
+            queries += 2
+    return queries
+
+
+def batch_mode(functs, topics):
+    queries = 0
+    all_points = list(points(topics))
+    topic_ids = sorted(set(topic_id for _, _, ids in all_points for topic_id in ids))
+    for start, end in slices():
+        summaries = functs.collect_aggregate_summaries(topic_ids, start, end)
+        rows = []
+        for agg_topic_id, agg_type, ids in all_points:
+            summary = combine_summaries(summaries[topic_id] for topic_id in ids if topic_id in summaries)
+            rows.append((agg_topic_id, agg_type, '1m', end, summary_value(summary, agg_type), ids))
+        functs.insert_aggregates(rows)
+        queries += 2
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--topics', type=int, default=200)
+    parser.add_argument('--interval', type=int, default=10, help='seconds between raw values')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    for name, func in (('per point', per_point_mode), ('batch', batch_mode)):
+        with tempfile.TemporaryDirectory() as tmp:
+            functs = create_db(os.path.join(tmp, 'historian.sqlite'), args.topics, args.interval)
+            start = time.perf_counter()
+            queries = func(functs, args.topics)
+            elapsed = time.perf_counter() - start
+            print('{:<10} {:>5} topics x {} types: {:>8.2f} s, {:>7} statements'.format(
+                name, args.topics, len(AGG_TYPES), elapsed, queries))
+
+
+if __name__ == '__main__':
+    main()
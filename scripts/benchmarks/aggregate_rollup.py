@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Time and raw rows read by the aggregate historian to compute 1m, 15m, 1h and
+1d averages of a day of SQLite historian data: querying the raw data for
+every period compared with rolling coarser periods up from cached summaries
+of finer ones (incremental_aggregation).
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform.agent.base_aggregate_historian import (
+    AggregateHistorian, AggregateSummaryCache, summary_value)
+from volttron.platform.dbutils.sqlitefuncts import SqlLiteFuncts
+
+PERIODS = ('1m', '15m', '1h', '1d')
+START = datetime(2023, 1, 1, tzinfo=pytz.utc)
+
+
+def create_db(path, topics, interval):
+    table_names = {'data_table': 'data', 'topics_table': 'topics', 'meta_table': 'meta',
+                   'agg_topics_table': 'aggregate_topics', 'agg_meta_table': 'aggregate_meta'}
+    functs = SqlLiteFuncts({'database': path}, table_names)
+    functs.setup_historian_tables()
+    rows = []
+    for second in range(0, 24 * 3600, interval):
+        ts = START + timedelta(seconds=second)
+        for topic_id in range(1, topics + 1):
+            rows.append((ts, topic_id, str(float(second % 97))))
+    functs.execute_many(functs.insert_data_query(), rows, commit=True)
+    return functs
+
+
+def collections():
+    """Yields (start, end, period) for every aggregation of the day in collection order."""
+    end_of_day = START + timedelta(days=1)
+    minute = START
+    while minute < end_of_day:
+        minute += timedelta(minutes=1)
+        for period in PERIODS:
+            length = AggregateHistorian.aggregation_period_to_timedelta(period)
+            if (minute - START) % length == timedelta(0):
+                yield minute - length, minute, period
+
+
+def query_mode(functs, topics):
+    rows = 0
+    for start, end, period in collections():
+        for topic_id in range(1, topics + 1):
+            value, count = functs.collect_aggregate([topic_id], 'avg', start, end)
+            rows += count
+    return rows
+
+
+def incremental_mode(functs, topics):
+    rows = [0]
+
+    def fetch(topic_ids, start, end):
+        summary = functs.collect_aggregate_summary(topic_ids, start, end)
+        rows[0] += summary[0]
+        return summary
+
+    cache = AggregateSummaryCache(fetch, timedelta(days=2))
+    for start, end, period in collections():
+        for topic_id in range(1, topics + 1):
+            summary_value(cache.summarize([topic_id], start, end), 'avg')
+    return rows[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--topics', type=int, default=20)
+    parser.add_argument('--interval', type=int, default=10, help='seconds between raw values')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        functs = create_db(os.path.join(tmp, 'historian.sqlite'), args.topics, args.interval)
+        for name, func in (('query', query_mode), ('incremental', incremental_mode)):
+            start = time.perf_counter()
+            rows = func(functs, args.topics)
+            elapsed = time.perf_counter() - start
+            print('{:<12} {:>4} topics: {:>8.2f} s, {:>10} raw rows read'.format(name, args.topics, elapsed, rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Time and bytes written to import device configurations and registries one
+at a time into a configuration store file, the way `vctl config store`
+does: rewriting the whole file after every change compared with the
+journaled store.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from copy import deepcopy
+
+from volttron.platform import jsonapi
+from volttron.utils.persistance import JournaledPersistentDict, PersistentDict
+
+
+def configs(devices, registry_bytes):
+    modified = "2023-01-01T00:00:00.000000+00:00"
+    registry = "Point Name,Volttron Point Name,Units\n" + "x" * registry_bytes
+    for device in range(devices):
+        yield ("devices/campus/building/device{}".format(device),
+               {"type": "json", "modified": modified,
+                "data": jsonapi.dumps({"driver_type": "bacnet", "registry_config": "config://registry{}.csv".format(
+                    device)})})
+        yield ("registry{}.csv".format(device), {"type": "csv", "modified": modified, "data": registry})
+
+
+def rewrite(path, items):
+    """Each change deep copies the store and rewrites the file, the work of PersistentDict.async_sync."""
+    store = PersistentDict(filename=path, flag='c', format='json')
+    for name, value in items:
+        store[name] = value
+        PersistentDict._update_file(path, deepcopy(store), 'json', None)
+
+
+def journaled(path, items):
+    store = JournaledPersistentDict(filename=path, flag='c')
+    for name, value in items:
+        store[name] = value
+        store.async_sync()
+
+
+def written_bytes():
+    with open('/proc/self/io') as f:
+        for line in f:
+            if line.startswith('wchar'):
+                return int(line.split()[1])
+    return 0
+
+
+def run(name, func, devices, registry_bytes):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'platform.driver.store')
+        items = list(configs(devices, registry_bytes))
+        before = written_bytes()
+        start = time.perf_counter()
+        func(path, items)
+        elapsed = time.perf_counter() - start
+        written = written_bytes() - before
+    print('{:<10} {:>6} devices: {:>8.2f} s, {:>8.1f} configs/s, {:>10.1f} MB written'.format(
+        name, devices, elapsed, len(items) / elapsed, written / 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, nargs='+', default=[250, 1000])
+    parser.add_argument('--registry-bytes', type=int, default=2000)
+    args = parser.parse_args()
+    for devices in args.devices:
+        run('rewrite', rewrite, devices, args.registry_bytes)
+        run('journaled', journaled, devices, args.registry_bytes)
+
+
+if __name__ == '__main__':
+    main()
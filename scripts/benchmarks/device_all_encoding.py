@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Size and encode/decode time of a device all message as JSON and in the
+compact encoding, for devices with increasing numbers of points.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from volttron.platform import jsonapi
+from volttron.platform.messaging.compact import CompactDecoder, CompactEncoder
+
+
+def device(points, seed):
+    rand = random.Random(seed)
+    results = {}
+    meta = {}
+    for number in range(points):
+        name = 'Zone{:03d}DischargeAirTemperatureSetPoint'.format(number)
+        results[name] = round(rand.uniform(50.0, 80.0), 2)
+        meta[name] = {'units': 'degreesFahrenheit', 'type': 'float', 'tz': 'US/Pacific'}
+    return results, meta
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, nargs='+', default=[10, 100, 400])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>14} {:>10} {:>14} {:>10}'.format('points', 'json bytes', 'compact bytes', 'json us',
+                                                             'compact us', 'ratio'))
+    for points in args.points:
+        results, meta = device(points, args.seed)
+        encoder = CompactEncoder()
+        decoder = CompactDecoder()
+        decoder.decode(encoder.encode(results, meta))
+
+        json_bytes = len(jsonapi.dumpb([results, meta]))
+        compact_bytes = len(jsonapi.dumpb(encoder.encode(results, meta)))
+        json_us = timed(lambda: jsonapi.loads(jsonapi.dumps([results, meta])), args.repeat)
+        compact_us = timed(lambda: decoder.decode(jsonapi.loads(jsonapi.dumps(encoder.encode(results, meta)))),
+                           args.repeat)
+        print('{:>8} {:>12} {:>14} {:>10.1f} {:>14.1f} {:>10.1f}'.format(points, json_bytes, compact_bytes, json_us,
+                                                                         compact_us, json_bytes / compact_bytes))
+
+
+if __name__ == '__main__':
+    main()
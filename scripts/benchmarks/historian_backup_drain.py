@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Time to drain a backlog from the historian backup cache with the "ordered"
+and "stream" drain modes of BackupDatabase, publishing every batch.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform.agent.base_historian import BACKUP_DRAIN_MODES, BackupDatabase
+
+
+class Owner:
+    pass
+
+
+def fill(db, backlog, points_per_device):
+    timestamp = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+    headers = {'Date': timestamp.isoformat(), 'TimeStamp': timestamp.isoformat()}
+    items = []
+    for i in range(backlog):
+        if i % points_per_device == 0:
+            timestamp += timedelta(seconds=1)
+        items.append({'source': 'scrape',
+                      'topic': 'devices/campus/building/device/point{}'.format(i % points_per_device),
+                      'meta': {},
+                      'readings': [(timestamp, float(i))],
+                      'headers': headers})
+        if len(items) == 50000:
+            db.backup_new_data(items)
+            items = []
+    db.backup_new_data(items)
+
+
+def run(mode, backlog, submit_size, points_per_device, directory):
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db = BackupDatabase(Owner(), None, 0.9, drain_mode=mode)
+            fill(db, backlog, points_per_device)
+            drained = 0
+            start = time.perf_counter()
+            while True:
+                records = db.get_outstanding_to_publish(submit_size)
+                if not records:
+                    break
+                drained += len(records)
+                db.remove_successfully_published({None}, submit_size)
+            elapsed = time.perf_counter() - start
+            db.close()
+        finally:
+            os.chdir(cwd)
+    print('{:<8} {:>9} backlog: {:>7.2f} s {:>10.0f} records/s'.format(mode, backlog, elapsed, drained / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backlog', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--submit-size', type=int, default=1000)
+    parser.add_argument('--points-per-device', type=int, default=100)
+    parser.add_argument('--dir', help='Directory on the storage to test, defaults to the system temp directory.')
+    args = parser.parse_args()
+    for backlog in args.backlog:
+        for mode in BACKUP_DRAIN_MODES:
+            run(mode, backlog, args.submit_size, args.points_per_device, args.dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Records per second written to the historian backup cache by
+BackupDatabase.backup_new_data compared with the previous row by row
+implementation.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pytz
+
+from volttron.platform.agent.base_historian import BackupDatabase
+from volttron.platform.jsonapi import dumps
+
+
+class Owner:
+    pass
+
+
+def row_by_row(db, new_publish_list):
+    """The insert loop of backup_new_data before it used executemany."""
+    c = db._connection.cursor()
+    for item in new_publish_list:
+        source = item['source']
+        topic = item['topic']
+        topic_id = db._backup_cache.get(topic)
+        if topic_id is None:
+            c.execute('''INSERT INTO topics values (?,?)''', (None, topic))
+            c.execute('''SELECT last_insert_rowid()''')
+            topic_id = c.fetchone()[0]
+            db._backup_cache[topic_id] = topic
+            db._backup_cache[topic] = topic_id
+        meta_dict = db._meta_data[(source, topic_id)]
+        for name, value in item['meta'].items():
+            if meta_dict.get(name) != value:
+                c.execute('''INSERT OR REPLACE INTO metadata values(?, ?, ?, ?)''',
+                          (source, topic_id, name, value))
+                meta_dict[name] = value
+        for timestamp, value in item['readings']:
+            c.execute('''INSERT INTO outstanding values(NULL, ?, ?, ?, ?, ?)''',
+                      (timestamp, source, topic_id, dumps(value), dumps(item['headers'])))
+    db._connection.commit()
+
+
+def bulk(db, new_publish_list):
+    db.backup_new_data(new_publish_list)
+
+
+def publish_list(readings, points_per_device, offset):
+    timestamp = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+    headers = {'Date': timestamp.isoformat(), 'TimeStamp': timestamp.isoformat()}
+    items = []
+    for i in range(readings):
+        device = (i + offset) // points_per_device
+        items.append({'source': 'scrape',
+                      'topic': 'devices/campus/building/device{}/point{}'.format(device, i % points_per_device),
+                      'meta': {'type': 'float', 'tz': 'US/Pacific', 'units': 'degreesFahrenheit'},
+                      'readings': [(timestamp, float(i))],
+                      'headers': headers})
+    return items
+
+
+def run(name, func, readings, points_per_device):
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db = BackupDatabase(Owner(), None, 0.9)
+            # First batch creates the topics, the second one is the steady state.
+            for label, offset in (('new topics', 0), ('known topics', 0)):
+                items = publish_list(readings, points_per_device, offset)
+                start = time.perf_counter()
+                func(db, items)
+                elapsed = time.perf_counter() - start
+                print('{:<12} {:>7} readings, {:<12}: {:>10.0f} records/s'.format(
+                    name, readings, label, readings / elapsed))
+            db.close()
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readings', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--points-per-device', type=int, default=400)
+    args = parser.parse_args()
+    for readings in args.readings:
+        run('row by row', row_by_row, readings, args.points_per_device)
+        run('bulk', bulk, readings, args.points_per_device)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Historian process loop cycles per second against the backup cache for each
+storage profile.  A cycle caches one device publish, reads the oldest
+records and removes them again, committing twice like the process loop.
+
+Run it on the storage the cache lives on, the difference between the
+profiles is mostly the cost of fsync.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform.agent.base_historian import BACKUP_CACHE_PROFILES, BackupDatabase
+
+
+class Owner:
+    pass
+
+
+def device_publish(timestamp, points):
+    headers = {'Date': timestamp.isoformat(), 'TimeStamp': timestamp.isoformat()}
+    return [{'source': 'scrape',
+             'topic': 'devices/campus/building/device/point{}'.format(i),
+             'meta': {'type': 'float', 'tz': 'US/Pacific', 'units': 'degreesFahrenheit'},
+             'readings': [(timestamp, float(i))],
+             'headers': headers} for i in range(points)]
+
+
+def run(profile, cycles, points, directory):
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db = BackupDatabase(Owner(), None, 0.9, cache_profile=profile)
+            timestamp = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+            start = time.perf_counter()
+            for _ in range(cycles):
+                db.backup_new_data(device_publish(timestamp, points))
+                records = db.get_outstanding_to_publish(points)
+                db.remove_successfully_published({record['_id'] for record in records}, points)
+                timestamp += timedelta(seconds=1)
+            elapsed = time.perf_counter() - start
+            db.close()
+        finally:
+            os.chdir(cwd)
+    print('{:<10} {:>8.0f} cycles/s {:>10.0f} records/s'.format(profile, cycles / elapsed,
+                                                               cycles * points / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cycles', type=int, default=500)
+    parser.add_argument('--points', type=int, default=50)
+    parser.add_argument('--dir', help='Directory on the storage to test, defaults to the system temp directory.')
+    parser.add_argument('--profiles', nargs='+', default=sorted(BACKUP_CACHE_PROFILES))
+    args = parser.parse_args()
+    for profile in args.profiles:
+        run(profile, args.cycles, args.points, args.dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Points per second through the historian capture path of device all
+messages, from the pubsub callback to the backup cache: one queued record
+per point as before compared with one batch per message.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from volttron.platform.agent import utils
+from volttron.platform.agent.base_historian import BackupDatabase, BaseHistorianAgent
+from volttron.platform.messaging import headers as headers_mod
+
+
+def per_point_capture(agent, topic, headers, message):
+    """The device capture loop before batching: the topic is renamed and
+    the timestamp parsed without caches and every point is queued on its own."""
+    topic = agent._rename_topic(topic)
+    device = '/'.join(topic.split('/')[1:-1])
+    timestamp, _ = utils.process_timestamp(headers[headers_mod.TIMESTAMP], topic)
+    headers['time_error'] = agent.does_time_exceed_tolerance(topic, timestamp)
+    values, meta = message
+    for key, value in values.items():
+        agent._event_queue.put({'source': 'scrape',
+                                'topic': device + '/' + key,
+                                'readings': [(timestamp, value)],
+                                'meta': meta.get(key, {}),
+                                'headers': headers})
+
+
+def batch_capture(agent, topic, headers, message):
+    agent._capture_device_data('pubsub', 'platform.driver', '', topic, headers, message)
+
+
+def messages(devices, points):
+    now = utils.format_timestamp(utils.get_aware_utc_now())
+    meta = {'type': 'float', 'tz': 'US/Pacific', 'units': 'degreesFahrenheit'}
+    for device in range(devices):
+        values = {'point{}'.format(point): float(point) for point in range(points)}
+        yield ('devices/campus/building/device{}/all'.format(device),
+               {headers_mod.DATE: now, headers_mod.TIMESTAMP: now},
+               [values, {name: meta for name in values}])
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def run(name, capture, devices, points, rounds):
+    agent = BaseHistorianAgent(topic_replace_list=[{'from': 'campus', 'to': 'site'}])
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db = BackupDatabase(agent, None, 0.9)
+            capture_time = backup_time = 0.0
+            for _ in range(rounds):
+                batch = list(messages(devices, points))
+                start = time.perf_counter()
+                for topic, headers, message in batch:
+                    capture(agent, topic, headers, message)
+                items = drain(agent._event_queue)
+                capture_time += time.perf_counter() - start
+                start = time.perf_counter()
+                db.backup_new_data(items)
+                backup_time += time.perf_counter() - start
+            db.close()
+        finally:
+            os.chdir(cwd)
+    total = devices * points * rounds
+    print('{:<10} {:>6} points/message: capture {:>9.0f} points/s, backup {:>9.0f} points/s'.format(
+        name, points, total / capture_time, total / backup_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=125)
+    parser.add_argument('--points', type=int, nargs='+', default=[40, 400])
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    for points in args.points:
+        run('per point', per_point_capture, args.devices, points, args.rounds)
+        run('batch', batch_capture, args.devices, points, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Modbus read requests per scrape of a sparse register map planned with
+increasing max_register_gap, with the registers read and the time taken
+to plan the map.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '../../services/core/PlatformDriverAgent'))
+
+from platform_driver.modbus_blocks import BlockPlanner
+
+
+def sparse_map(points, seed):
+    """Two register points with 0 to 6 unused registers between them."""
+    rand = random.Random(seed)
+    spans = []
+    address = 0
+    for number in range(points):
+        spans.append((address, 2, number))
+        address += 2 + rand.choice((0, 0, 2, 4, 6))
+    return spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=1000, help='points in the register map')
+    parser.add_argument('--gaps', type=int, nargs='+', default=[0, 2, 4, 8])
+    parser.add_argument('--max-count', type=int, default=100, help='registers per request')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    spans = sparse_map(args.points, args.seed)
+    print('{:>8} {:>10} {:>10} {:>10}'.format('max gap', 'requests', 'registers', 'plan ms'))
+    for max_gap in args.gaps:
+        start = time.perf_counter()
+        blocks = BlockPlanner(args.max_count, max_gap).plan(spans)
+        elapsed = (time.perf_counter() - start) * 1000
+        print('{:>8} {:>10} {:>10} {:>10.2f}'.format(max_gap, len(blocks), sum(block.count for block in blocks),
+                                                     elapsed))
+
+
+if __name__ == '__main__':
+    main()
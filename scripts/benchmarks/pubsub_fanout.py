@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Measure PubSubService fan-out of a device 'all' publish: serializing the
+frames again for every subscriber against serializing the shared frames
+once and swapping only the recipient frame.
+"""
+
+import argparse
+import time
+
+from volttron.platform.vip.pubsubservice import PubSubService
+
+
+class CountingSocket:
+    """Stand-in for the router socket that counts the bytes of new frames."""
+
+    def __init__(self):
+        # Keep the frames alive so their ids are not reused within a publish.
+        self.seen = {}
+        self.bytes_copied = 0
+        self.messages = 0
+
+    def send_multipart(self, frames, flags=0, copy=True):
+        self.messages += 1
+        for frame in frames:
+            if id(frame) not in self.seen:
+                self.seen[id(frame)] = frame
+                self.bytes_copied += len(frame.bytes)
+
+    def reset(self):
+        self.seen.clear()
+
+
+def device_frames(points):
+    results = {'Point{}'.format(i): float(i) for i in range(points)}
+    meta = {'Point{}'.format(i): {'type': 'float', 'tz': 'US/Pacific', 'units': 'degreesFahrenheit'}
+            for i in range(points)}
+    message = dict(sender='platform.driver', bus='', headers={'Date': '2023-01-01T00:00:00+00:00'},
+                   message=[results, meta])
+    return ['', 'platform.driver', 'VIP1', '', 'msg1', 'pubsub', 'publish', 'devices/campus/building/all', message]
+
+
+def per_subscriber(service, frames, subscribers):
+    for subscriber in subscribers:
+        frames[0] = subscriber
+        service._send(frames, 'platform.driver')
+
+
+def shared(service, frames, subscribers):
+    service._distribute_internal(frames)
+
+
+def run(name, func, points, subscriber_count, publishes):
+    socket = CountingSocket()
+    service = PubSubService(socket=socket, protected_topics={}, routing_service=None)
+    subscribers = ['historian{}'.format(i) for i in range(subscriber_count)]
+    for subscriber in subscribers:
+        service._add_peer_subscription(subscriber, '', 'devices')
+
+    start = time.perf_counter()
+    for _ in range(publishes):
+        socket.reset()
+        func(service, device_frames(points), subscribers)
+    elapsed = time.perf_counter() - start
+    print('{:<16} {:>4} points x {:>3} subscribers: {:>9.1f} publishes/s, {:>10.0f} bytes copied/publish'.format(
+        name, points, subscriber_count, publishes / elapsed, socket.bytes_copied / publishes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=500, help='points in the device all message')
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--publishes', type=int, default=200)
+    args = parser.parse_args()
+    for count in args.subscribers:
+        run('per subscriber', per_subscriber, args.points, count, args.publishes)
+        run('serialize once', shared, args.points, count, args.publishes)
+
+
+if __name__ == '__main__':
+    main()
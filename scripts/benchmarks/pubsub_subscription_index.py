@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Compare the subscriber lookup done by PubSubService for every publish: the
+previous linear ``topic.startswith(prefix)`` scan against the PrefixTrie
+index.
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from volttron.utils.prefix_trie import PrefixTrie
+
+
+def build_subscriptions(count, agents):
+    subscriptions = defaultdict(set)
+    for i in range(count):
+        prefix = 'devices/campus{}/building{}/device{}'.format(i % 10, i % 100, i)
+        subscriptions[prefix].add('agent{}'.format(i % agents))
+    # A few broad subscriptions as used by historians and listeners.
+    for i in range(agents):
+        subscriptions['devices'].add('agent{}'.format(i))
+    return subscriptions
+
+
+def linear_scan(subscriptions, topic):
+    subscribers = set()
+    for prefix, subscription in subscriptions.items():
+        if subscription and topic.startswith(prefix):
+            subscribers |= subscription
+    return subscribers
+
+
+def run(count, agents, publishes):
+    subscriptions = build_subscriptions(count, agents)
+
+    start = time.perf_counter()
+    trie = PrefixTrie()
+    for prefix, peers in subscriptions.items():
+        for peer in peers:
+            trie.add(prefix, peer)
+    build_time = time.perf_counter() - start
+
+    rng = random.Random(0)
+    topics = []
+    for _ in range(publishes):
+        i = rng.randrange(count)
+        topics.append('devices/campus{}/building{}/device{}/all'.format(i % 10, i % 100, i))
+
+    for topic in topics[:10]:
+        assert linear_scan(subscriptions, topic) == trie.match(topic)
+
+    start = time.perf_counter()
+    for topic in topics:
+        linear_scan(subscriptions, topic)
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for topic in topics:
+        trie.match(topic)
+    trie_time = time.perf_counter() - start
+
+    print('{:>8} subscriptions: scan {:>10.1f} pub/s, trie {:>10.1f} pub/s, '
+          'speedup {:>7.1f}x (index built in {:.3f}s)'.format(
+              count, publishes / scan_time, publishes / trie_time,
+              scan_time / trie_time, build_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--subscriptions', type=int, nargs='+', default=[10000, 100000],
+                        help='number of subscription prefixes to benchmark')
+    parser.add_argument('--agents', type=int, default=200,
+                        help='number of distinct subscribing agents')
+    parser.add_argument('--publishes', type=int, default=200,
+                        help='number of topics looked up per run')
+    args = parser.parse_args()
+    for count in args.subscriptions:
+        run(count, args.agents, args.publishes)
+
+
+if __name__ == '__main__':
+    main()
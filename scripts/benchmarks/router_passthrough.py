@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Messages per second and CPU time per message of the VIP router when
+routing RPC calls between two peers over inproc sockets, with every frame
+decoded and encoded again against opaque routing of the payload frames.
+"""
+
+import argparse
+import time
+
+import zmq
+
+from volttron.platform.vip.router import BaseRouter
+from volttron.platform.vip.tracking import RouterStatistics
+from volttron.utils.frame_serialization import serialize_frames
+
+BATCH = 500
+
+
+class BenchmarkRouter(BaseRouter):
+
+    def setup(self):
+        self.socket.bind('inproc://benchmark')
+
+
+def rpc_call(size):
+    """An RPC call with a parameter list of roughly size bytes."""
+    params = [{'point': 'Point{}'.format(i), 'value': i * 0.5} for i in range(max(1, size // 32))]
+    return ['recipient', 'VIP1', '', '1', 'RPC',
+            {'jsonrpc': '2.0', 'method': 'set_multiple_points', 'params': params, 'id': '1'}]
+
+
+def run(opaque, size, count, sample_interval=None):
+    context = zmq.Context()
+    statistics = RouterStatistics(sample_interval) if sample_interval else None
+    router = BenchmarkRouter(context=context, service_notifier=None, opaque_routing=opaque, statistics=statistics)
+    router.start()
+    sender = context.socket(zmq.DEALER)
+    sender.identity = b'sender'
+    sender.connect('inproc://benchmark')
+    recipient = context.socket(zmq.DEALER)
+    recipient.identity = b'recipient'
+    recipient.connect('inproc://benchmark')
+    # Register both peers with a router probe.
+    for sock in (sender, recipient):
+        sock.send(b'')
+        router.route(router.decode_frames(router.socket.recv_multipart(copy=False)))
+    while recipient.poll(0):
+        recipient.recv_multipart()
+
+    message = [frame.bytes for frame in serialize_frames(rpc_call(size))]
+    start, cpu_start = time.perf_counter(), time.process_time()
+    sent = 0
+    while sent < count:
+        batch = min(BATCH, count - sent)
+        for _ in range(batch):
+            sender.send_multipart(message, copy=False)
+        for _ in range(batch):
+            router.route(router.decode_frames(router.socket.recv_multipart(copy=False)))
+        for _ in range(batch):
+            recipient.recv_multipart(copy=False)
+        sent += batch
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+
+    for sock in (sender, recipient):
+        sock.close(0)
+    router.stop(0)
+    context.term()
+    return count / elapsed, cpu / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='approximate payload sizes in bytes')
+    parser.add_argument('--count', type=int, default=20000, help='messages routed per measurement')
+    parser.add_argument('--statistics', type=int, metavar='SAMPLE_INTERVAL',
+                        help='collect router statistics with the given sample interval')
+    args = parser.parse_args()
+
+    print('{:>10} {:>14} {:>12} {:>14} {:>12}'.format(
+        'payload', 'decoded msg/s', 'us CPU/msg', 'opaque msg/s', 'us CPU/msg'))
+    for size in args.sizes:
+        decoded_rate, decoded_cpu = run(False, size, args.count, args.statistics)
+        opaque_rate, opaque_cpu = run(True, size, args.count, args.statistics)
+        print('{:>10} {:>14.0f} {:>12.1f} {:>14.0f} {:>12.1f}'.format(
+            size, decoded_rate, decoded_cpu, opaque_rate, opaque_cpu))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Calls per second of an RPC method protected by a capability, with the
+authorization check that rebuilt the decision on every call against the
+cached decision with precompiled argument matchers.
+"""
+
+import argparse
+import inspect
+import logging
+import re
+import time
+from types import SimpleNamespace
+
+from mock import MagicMock, Mock
+
+from volttron.platform import jsonrpc
+from volttron.platform.agent.known_identities import AUTH
+from volttron.platform.vip.agent.subsystems.auth import Auth
+from volttron.platform.vip.agent.subsystems.rpc import RPC, _isregex
+
+_log = logging.getLogger(__name__)
+
+
+def set_point(requester_id, topic, value, point=None, **kwargs):
+    return value
+
+
+def legacy_auth_check(self, method, required_caps):
+    """The check of RPC._add_auth_check before decisions were cached."""
+
+    def checked_method(*args, **kwargs):
+        user = str(self.context.vip_message.user)
+        user_capabilites = self._owner.vip.auth.get_capabilities(user)
+        _log.debug("**user caps is: {}".format(user_capabilites))
+        if user_capabilites:
+            user_capabilities_names = set(user_capabilites.keys())
+        else:
+            user_capabilities_names = set()
+        if required_caps == {""}:
+            pass
+        elif not required_caps.issubset(user_capabilities_names):
+            raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, "unauthorized")
+        else:
+            for cap_name, param_dict in user_capabilites.items():
+                if param_dict and required_caps and cap_name in required_caps:
+                    _log.debug("args = {} kwargs= {}".format(args, kwargs))
+                    args_dict = inspect.getcallargs(method, *args, **kwargs)
+                    _log.debug("dict = {}".format(args_dict))
+                    _log.debug("name= %r parameters allowed=%r", cap_name, param_dict)
+                    for name, value in param_dict.items():
+                        _log.debug("name= {} value={}".format(name, value))
+                        if name not in args_dict:
+                            raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, "undefined")
+                        if _isregex(value):
+                            regex = re.compile("^" + value[1:-1] + "$")
+                            if not regex.match(args_dict[name]):
+                                raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, "mismatch")
+                        elif args_dict[name] != value:
+                            raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, "mismatch")
+        return method(*args, **kwargs)
+
+    return checked_method
+
+
+def rpc_subsystem(user_to_capabilities):
+    auth = Auth(owner=Mock(), core=MagicMock(), rpc=MagicMock())
+    auth._user_to_capabilities = user_to_capabilities
+    auth._dirty = False
+    return SimpleNamespace(context=SimpleNamespace(vip_message=SimpleNamespace(user='controller', peer=AUTH)),
+                           _message_bus='zmq',
+                           _owner=SimpleNamespace(vip=SimpleNamespace(auth=auth)))
+
+
+def calls_per_second(checked, count):
+    start = time.perf_counter()
+    for i in range(count):
+        checked('controller', 'campus/building/ahu1/SupplyAirTemperatureSetPoint', 55.0 + i % 10)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100000, help='calls per measurement')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    capabilities = {
+        'unrestricted': {'controller': {'can_set_point': None}},
+        'restricted': {'controller': {'can_set_point': {'topic': '/campus/building/.*/',
+                                                        'requester_id': 'controller'}}},
+    }
+    print('{:>14} {:>14} {:>14}'.format('capability', 'legacy call/s', 'cached call/s'))
+    for name, user_to_capabilities in capabilities.items():
+        rpc = rpc_subsystem(user_to_capabilities)
+        legacy = calls_per_second(legacy_auth_check(rpc, set_point, {'can_set_point'}), args.count)
+        cached = calls_per_second(RPC._add_auth_check(rpc, set_point, {'can_set_point'}), args.count)
+        print('{:>14} {:>14.0f} {:>14.0f}'.format(name, legacy, cached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Multi-topic query time of SqlLiteFuncts.query compared with the previous
+implementation that ran one SELECT per topic.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform import jsonapi
+from volttron.platform.agent import utils
+from volttron.platform.dbutils.sqlitefuncts import SqlLiteFuncts
+
+TABLES = {'data_table': 'data', 'topics_table': 'topics', 'meta_table': 'meta',
+          'agg_topics_table': 'aggregate_topics', 'agg_meta_table': 'aggregate_meta'}
+
+
+def per_topic(funcs, topic_ids, id_name_map, start, end):
+    """The query loop of SqlLiteFuncts.query before it used a single statement."""
+    query = '''SELECT topic_id, ts, value_string FROM data
+               WHERE topic_id = ? AND ts >= ? AND ts < ?
+               ORDER BY topic_id ASC, ts ASC LIMIT ?'''
+    values = defaultdict(list)
+    for topic_id in topic_ids:
+        cursor = funcs.select(query, [topic_id, start, end, -1], fetch_all=False)
+        for _id, ts, value in cursor:
+            values[id_name_map[topic_id]].append((utils.format_timestamp(ts), jsonapi.loads(value)))
+        cursor.close()
+    return values
+
+
+def single_statement(funcs, topic_ids, id_name_map, start, end, timestamp_format='iso'):
+    return funcs.query(topic_ids, id_name_map, start=start, end=end, timestamp_format=timestamp_format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--topics', type=int, default=200)
+    parser.add_argument('--hours', type=int, default=24)
+    parser.add_argument('--interval', type=int, default=60, help='Seconds between values of a topic.')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        funcs = SqlLiteFuncts({'database': os.path.join(tmp, 'historian.sqlite')}, TABLES)
+        funcs.setup_historian_tables()
+        start = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=args.hours)
+        rows = []
+        ts = start
+        while ts < end:
+            rows.extend((ts, topic_id, jsonapi.dumps(float(topic_id))) for topic_id in range(1, args.topics + 1))
+            ts += timedelta(seconds=args.interval)
+        funcs.execute_many('INSERT INTO data VALUES (?, ?, ?)', rows, commit=True)
+
+        topic_ids = list(range(1, args.topics + 1))
+        id_name_map = {topic_id: 'campus/building/device/point{}'.format(topic_id) for topic_id in topic_ids}
+        print('{} topics, {} rows'.format(args.topics, len(rows)))
+        for name, func, kwargs in (('per topic', per_topic, {}),
+                                   ('single statement', single_statement, {}),
+                                   ('single statement, epoch', single_statement, {'timestamp_format': 'epoch'})):
+            begin = time.perf_counter()
+            func(funcs, topic_ids, id_name_map, start, end, **kwargs)
+            elapsed = time.perf_counter() - begin
+            print('{:<24}: {:>6.3f} s {:>10.0f} rows/s'.format(name, elapsed, len(rows) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -53,6 +53,11 @@ ActuatorAgent Configuration
     "heartbeat_interval"
         How often to send a heartbeat signal to all devices in seconds.
         Defaults to 60.
+    "schedule_manager"
+        How Task requests are checked for conflicts. "linear" compares a
+        request with every Task. "indexed" indexes Tasks by device and time
+        and is faster with many Tasks or devices. Defaults to "linear".
+        Changing this requires restarting the agent.
 
 
 Sample configuration file
@@ -437,7 +442,7 @@ import sys
 
 import gevent
 
-from actuator.scheduler import ScheduleManager
+from actuator.scheduler import ScheduleManager, IndexedScheduleManager
 
 from tzlocal import get_localzone
 from volttron.platform.agent import utils
@@ -464,6 +469,9 @@ SCHEDULE_CANCEL_PREEMPTED = 'PREEMPTED'
 
 ACTUATOR_COLLECTION = 'actuators'
 
+SCHEDULE_MANAGERS = {'linear': ScheduleManager,
+                     'indexed': IndexedScheduleManager}
+
 _log = logging.getLogger(__name__)
 utils.setup_logging()
 __version__ = "1.0"
@@ -500,12 +508,14 @@ def actuator_agent(config_path, **kwargs):
     driver_vip_identity = config.get('driver_vip_identity', PLATFORM_DRIVER)
 
     allow_no_lock_write = bool(config.get('allow_no_lock_write', True))
+    schedule_manager = config.get('schedule_manager', 'linear')
 
     return ActuatorAgent(heartbeat_interval,
                          schedule_publish_interval,
                          preempt_grace_time,
                          driver_vip_identity,
                          allow_no_lock_write,
+                         schedule_manager,
                          **kwargs)
 
 
@@ -527,11 +537,14 @@ class ActuatorAgent(Agent):
     :param preempt_grace_time: Time in seconds after a schedule is preemted
         before it is actually cancelled.
     :param driver_vip_identity: VIP identity of the Platform Driver Agent.
+    :param schedule_manager: "linear" or "indexed", how Task requests are
+        checked for conflicts.
 
     :type heartbeat_interval: float
     :type schedule_publish_interval: float
     :type preempt_grace_time: float
     :type driver_vip_identity: str
+    :type schedule_manager: str
     """
 
     def __init__(self, heartbeat_interval=60,
@@ -539,6 +552,7 @@ class ActuatorAgent(Agent):
                  preempt_grace_time=60,
                  driver_vip_identity=PLATFORM_DRIVER,
                  allow_no_lock_write=True,
+                 schedule_manager='linear',
                  **kwargs):
 
         super(ActuatorAgent, self).__init__(**kwargs)
@@ -551,6 +565,7 @@ class ActuatorAgent(Agent):
         self.heartbeat_greenlet = None
         self.heartbeat_interval = heartbeat_interval
         self._schedule_manager = None
+        self._schedule_manager_kind = None
         self.schedule_publish_interval = schedule_publish_interval
         self.subscriptions_setup = False
         #Only turn this on once we have confirmation from the config store.
@@ -561,7 +576,8 @@ class ActuatorAgent(Agent):
                               "schedule_publish_interval": schedule_publish_interval,
                               "preempt_grace_time": preempt_grace_time,
                               "driver_vip_identity": driver_vip_identity,
-                               "allow_no_lock_write": allow_no_lock_write}
+                               "allow_no_lock_write": allow_no_lock_write,
+                               "schedule_manager": schedule_manager}
 
 
         self.vip.config.set_default("config", self.default_config)
@@ -580,6 +596,10 @@ class ActuatorAgent(Agent):
             heartbeat_interval = float(config["heartbeat_interval"])
             preempt_grace_time = float(config["preempt_grace_time"])
             allow_no_lock_write = bool(config["allow_no_lock_write"])
+            schedule_manager = str(config["schedule_manager"])
+            if schedule_manager not in SCHEDULE_MANAGERS:
+                raise ValueError("Invalid schedule_manager {}, expected one of {}".format(
+                    schedule_manager, sorted(SCHEDULE_MANAGERS)))
         except ValueError as e:
             _log.error("ERROR PROCESSING CONFIGURATION: {}".format(e))
             #TODO: set a health status for the agent
@@ -611,9 +631,13 @@ class ActuatorAgent(Agent):
                 state_string = self.vip.config.get(self.schedule_state_file)
             except KeyError:
                 state_string = None
+            self._schedule_manager_kind = schedule_manager
             self._setup_schedule(preempt_grace_time, state_string)
         else:
             self._schedule_manager.set_grace_period(preempt_grace_time)
+            if schedule_manager != self._schedule_manager_kind:
+                _log.warning("The schedule_manager change to {} takes effect when the agent "
+                             "restarts".format(schedule_manager))
 
 
         if not self.subscriptions_setup and self._schedule_manager is not None:
@@ -659,7 +683,7 @@ class ActuatorAgent(Agent):
 
     def _setup_schedule(self, preempt_grace_time, initial_state=None):
         now = utils.get_aware_utc_now()
-        self._schedule_manager = ScheduleManager(
+        self._schedule_manager = SCHEDULE_MANAGERS[self._schedule_manager_kind](
             preempt_grace_time,
             now=now,
             save_state_callback=self._schedule_save_callback,
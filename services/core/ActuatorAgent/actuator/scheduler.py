@@ -22,9 +22,12 @@
 # ===----------------------------------------------------------------------===
 # }}}
 import bisect
+import heapq
+import itertools
 import logging
+import random
 
-from base64 import b64encode
+from base64 import b64decode, b64encode
 from collections import defaultdict, namedtuple
 from copy import deepcopy
 from datetime import timedelta
@@ -309,6 +312,23 @@ class Schedule:
         pass
 
 
+def _round_up_to_second(next_time):
+    # Round to the next second to fix timer goofyness in agent timers.
+    if next_time.microsecond:
+        next_time = next_time.replace(microsecond=0) + timedelta(seconds=1)
+    return next_time
+
+
+def _loads_tasks(state_string):
+    """Return the tasks of a saved scheduler state."""
+    if isinstance(state_string, str):
+        state_string = b64decode(state_string)
+    tasks = loads(state_string)
+    # The IndexedScheduleManager pickles every task on its own.
+    return {task_id: loads(task) if isinstance(task, bytes) else task
+            for task_id, task in tasks.items()}
+
+
 class ScheduleManager:
     def __init__(self, grace_time, now=None, save_state_callback=None, initial_state_string=None):
         self.tasks = {}
@@ -328,10 +348,10 @@ class ScheduleManager:
             return
 
         try:
-            self.tasks = loads(initial_state_string)
+            self._set_tasks(_loads_tasks(initial_state_string))
             self._cleanup(now)
         except Exception:
-            self.tasks = {}
+            self._set_tasks({})
             _log.error ('Scheduler state file corrupted!')
 
     def save_state(self, now):
@@ -340,10 +360,29 @@ class ScheduleManager:
 
         try:
             self._cleanup(now)
-            self.save_state_callback(b64encode(dumps(self.tasks)).decode("utf-8"))
+            self.save_state_callback(b64encode(self._dumps_state()).decode("utf-8"))
         except Exception:
             _log.error('Failed to save scheduler state!')
 
+    def _dumps_state(self):
+        return dumps(self.tasks)
+
+    def _set_tasks(self, tasks):
+        self.tasks = tasks
+
+    def _conflict_candidates(self, new_task):
+        """Return (task_id, task) of the tasks that may conflict with new_task, in the order they were added."""
+        return self.tasks.items()
+
+    def _task_added(self, task_id, task):
+        pass
+
+    def _task_changed(self, task_id, task):
+        pass
+
+    def _task_removed(self, task_id):
+        pass
+
     def request_slots(self, agent_id, id_, requests, priority, now=None):
         if now is None:
             now = utils.get_aware_utc_now()
@@ -387,7 +426,7 @@ class ScheduleManager:
         conflicts = defaultdict(dict)
         preempted_tasks = set()
 
-        for task_id, task in self.tasks.items():
+        for task_id, task in self._conflict_candidates(new_task):
             conflict_list = new_task.get_conflicts(task)
             agent_id = task.agent_id
             if conflict_list:
@@ -404,10 +443,12 @@ class ScheduleManager:
             # preempted
         # and the request will succeed.
         self.tasks[id_] = new_task
+        self._task_added(id_, new_task)
 
         for _, task_id in preempted_tasks:
             task = self.tasks[task_id]
             task.preempt(self.grace_time, now)
+            self._task_changed(task_id, task)
 
         self.save_state(now)
 
@@ -426,6 +467,7 @@ class ScheduleManager:
             return RequestResult(False, {}, 'AGENT_ID_TASK_ID_MISMATCH')
 
         del self.tasks[task_id]
+        self._task_removed(task_id)
 
         self.save_state(now)
 
@@ -493,3 +535,247 @@ class ScheduleManager:
 
     def __repr__(self):
         pass
+
+
+class _IntervalNode:
+    __slots__ = ('key', 'task_id', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, key, task_id):
+        self.key = key
+        self.task_id = task_id
+        self.priority = random.random()
+        self.max_end = key[1]
+        self.left = None
+        self.right = None
+
+    def update(self):
+        max_end = self.key[1]
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _split(node, key):
+    """Split a treap into the nodes with keys before key and the others."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, key)
+    node.update()
+    return left, node
+
+
+def _merge(left, right):
+    """Join two treaps, all keys of left come before those of right."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _remove(node, key):
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    node.update()
+    return node
+
+
+class _IntervalIndex:
+    """Time slots booked on one device by any task.
+
+    The slots are kept in a treap ordered by start, every node holding
+    the latest end in its subtree, so adding or removing a slot takes a
+    logarithmic number of steps and finding the slots overlapping a
+    time slice skips every subtree that ends before it. The slots of
+    different tasks may overlap while a preempted task finishes its
+    grace period."""
+
+    def __init__(self):
+        self._root = None
+        self._keys = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, time_slice, task_id):
+        # The counter orders slots with the same times without comparing task ids.
+        key = (time_slice.start, time_slice.end, next(self._counter))
+        self._keys[(time_slice.start, time_slice.end, task_id)] = key
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _IntervalNode(key, task_id)), right)
+
+    def remove(self, time_slice, task_id):
+        key = self._keys.pop((time_slice.start, time_slice.end, task_id), None)
+        if key is not None:
+            self._root = _remove(self._root, key)
+
+    def overlapping(self, time_slice):
+        """Return the ids of the tasks with a slot overlapping time_slice, touching slots do not overlap."""
+        start, end = time_slice.start, time_slice.end
+        task_ids = set()
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node is None or node.max_end <= start:
+                continue
+            nodes.append(node.left)
+            if node.key[0] < end:
+                if node.key[1] > start:
+                    task_ids.add(node.task_id)
+                nodes.append(node.right)
+        return task_ids
+
+
+def _task_version(task):
+    """Changes whenever make_current changes the task."""
+    return task.state, len(task.devices), sum(len(schedule) for schedule in task.devices.values())
+
+
+class IndexedScheduleManager(ScheduleManager):
+    """ScheduleManager for large numbers of tasks and devices.
+
+    The slots of every device are indexed so that a request is only
+    compared with the tasks booked on the same devices at the same time.
+    A heap of slot boundaries gives the next event time, and only tasks
+    that have started are brought up to date when the state is cleaned
+    up. Tasks are pickled once when they are added or preempted and the
+    saved state reuses the pickles of unchanged tasks.
+
+    Results and preemption are the same as those of the ScheduleManager.
+    """
+
+    def __init__(self, grace_time, now=None, save_state_callback=None, initial_state_string=None):
+        self._devices = defaultdict(_IntervalIndex)
+        self._task_slots = {}
+        self._sequence = {}
+        self._generation = {}
+        self._counter = itertools.count()
+        # (time, generation, task_id) of every slot boundary and of the start of every task.
+        self._events = []
+        self._starts = []
+        self._started = set()
+        self._pickled = {}
+        super().__init__(grace_time, now=now, save_state_callback=save_state_callback,
+                         initial_state_string=initial_state_string)
+
+    def _index_task(self, task_id, task):
+        generation = next(self._counter)
+        self._generation[task_id] = generation
+        slots = []
+        for device, schedule in task.devices.items():
+            for time_slice in schedule.time_slots:
+                self._devices[device].add(time_slice, task_id)
+                slots.append((device, time_slice))
+                heapq.heappush(self._events, (time_slice.start, generation, task_id))
+                heapq.heappush(self._events, (time_slice.end, generation, task_id))
+        self._task_slots[task_id] = slots
+        if task.time_slice.start is not None:
+            heapq.heappush(self._starts, (task.time_slice.start, generation, task_id))
+
+    def _unindex_task(self, task_id):
+        for device, time_slice in self._task_slots.pop(task_id, ()):
+            index = self._devices[device]
+            index.remove(time_slice, task_id)
+            if not index:
+                del self._devices[device]
+        # Heap entries of the previous generation are skipped.
+        self._generation.pop(task_id, None)
+        self._started.discard(task_id)
+        self._pickled.pop(task_id, None)
+
+    def _set_tasks(self, tasks):
+        self.tasks = tasks
+        self._devices.clear()
+        self._task_slots.clear()
+        self._sequence.clear()
+        self._generation.clear()
+        self._events = []
+        self._starts = []
+        self._started.clear()
+        self._pickled.clear()
+        for task_id, task in tasks.items():
+            self._task_added(task_id, task)
+
+    def _task_added(self, task_id, task):
+        self._sequence[task_id] = next(self._counter)
+        self._index_task(task_id, task)
+
+    def _task_changed(self, task_id, task):
+        self._unindex_task(task_id)
+        self._index_task(task_id, task)
+        # A preempted task is either running out its grace period or finished.
+        self._started.add(task_id)
+
+    def _task_removed(self, task_id):
+        self._unindex_task(task_id)
+        self._sequence.pop(task_id, None)
+
+    def _conflict_candidates(self, new_task):
+        candidates = set()
+        for device, schedule in new_task.devices.items():
+            index = self._devices.get(device)
+            if index:
+                for time_slice in schedule.time_slots:
+                    candidates |= index.overlapping(time_slice)
+        return [(task_id, self.tasks[task_id]) for task_id in sorted(candidates, key=self._sequence.__getitem__)]
+
+    def _dumps_state(self):
+        pickled = self._pickled
+        for task_id, task in self.tasks.items():
+            if task_id not in pickled:
+                pickled[task_id] = dumps(task)
+        return dumps({task_id: pickled[task_id] for task_id in self.tasks})
+
+    def get_next_event_time(self, now):
+        events = self._events
+        while events:
+            time, generation, task_id = events[0]
+            if time > now and self._generation.get(task_id) == generation:
+                return _round_up_to_second(time)
+            heapq.heappop(events)
+        return None
+
+    def _cleanup(self, now):
+        self.running_tasks = set()
+        self.preempted_tasks = set()
+
+        starts = self._starts
+        while starts and starts[0][0] <= now:
+            _, generation, task_id = heapq.heappop(starts)
+            if self._generation.get(task_id) == generation:
+                self._started.add(task_id)
+
+        # Tasks that have not started yet are not affected by the time.
+        for task_id in list(self._started):
+            task = self.tasks[task_id]
+            version = _task_version(task)
+            task.make_current(now)
+            if _task_version(task) != version:
+                # Past slots were dropped or the state changed, the pickle is out of date.
+                self._pickled.pop(task_id, None)
+            if task.state == Task.STATE_FINISHED:
+                del self.tasks[task_id]
+                self._task_removed(task_id)
+
+            elif task.state == Task.STATE_RUNNING:
+                self.running_tasks.add(task_id)
+
+            elif task.state == Task.STATE_PREEMPTED:
+                self.preempted_tasks.add(task_id)
@@ -23,14 +23,17 @@
 # }}}
 
 import os
+import random
 import sys
 from datetime import datetime, timedelta
 from dateutil.parser import parse
 
+import pytest
+
 test_dir = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(test_dir + '/../actuator')
 
-from scheduler import ScheduleManager, DeviceState, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_LOW_PREEMPT
+from scheduler import ScheduleManager, IndexedScheduleManager, DeviceState, _loads_tasks, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_LOW_PREEMPT
 
 test_dir = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(test_dir + '/../actuator')
@@ -48,9 +51,14 @@ def verify_add_task(schedule_manager, agent_id, task_id, requests, priority, now
 now = datetime(year=2013, month=11, day=27, hour=11, minute=30)
 
 
-def test_basic():
+@pytest.fixture(params=[ScheduleManager, IndexedScheduleManager])
+def schedule_manager_class(request):
+    return request.param
+
+
+def test_basic(schedule_manager_class):
     print('Basic Test', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],),
           PRIORITY_HIGH,
@@ -65,9 +73,9 @@ def test_basic():
     assert state == {'campus/building/rtu1': DeviceState('Agent1', 'Task1', 1800.0)}
 
 
-def test_two_devices():
+def test_two_devices(schedule_manager_class):
     print('Basic Test: Two devices', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],
            ['campus/building/rtu2', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')]),
@@ -87,9 +95,9 @@ def test_two_devices():
         'campus/building/rtu2': DeviceState('Agent1', 'Task1', 1800.0)}
 
 
-def test_two_agents_two_devices():
+def test_two_agents_two_devices(schedule_manager_class):
     print('Test requests: Two agents different devices', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:30:00')],),
            PRIORITY_HIGH,
@@ -114,9 +122,9 @@ def test_two_agents_two_devices():
         'campus/building/rtu2': DeviceState('Agent2', 'Task2', 1800.0)}
 
 
-def test_touching_requests():
+def test_touching_requests(schedule_manager_class):
     print('Test touching requests: Two agents', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:30:00')],),
            PRIORITY_HIGH,
@@ -138,9 +146,9 @@ def test_touching_requests():
     assert state == {'campus/building/rtu1': DeviceState('Agent2', 'Task2', 1800.0)}
 
 
-def test_schedule_self_conflict():
+def test_schedule_self_conflict(schedule_manager_class):
     print('Testing self conflicting schedule', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:45:00')],
            ['campus/building/rtu1', parse('2013-11-27 12:30:00'), parse('2013-11-27 13:00:00')]),
@@ -155,9 +163,9 @@ def test_schedule_self_conflict():
     assert all((not success1, data1 == {}, info_string1.startswith('REQUEST_CONFLICTS_WITH_SELF')))
 
 
-def test_malformed_schedule():
+def test_malformed_schedule(schedule_manager_class):
     print('Testing malformed schedule: Empty', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           (),
           PRIORITY_HIGH,
@@ -168,9 +176,9 @@ def test_malformed_schedule():
     assert all((not success1, data1 == {}, info_string1.startswith('MALFORMED_REQUEST')))
 
 
-def test_malformed_schdeule_bad_timestr():
+def test_malformed_schdeule_bad_timestr(schedule_manager_class):
     print('Testing malformed schedule: Bad time strings', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           (['campus/building/rtu1', 'fdhkdfyug', 'Twinkle, twinkle, little bat...'],),
           PRIORITY_HIGH,
@@ -181,9 +189,9 @@ def test_malformed_schdeule_bad_timestr():
     assert all((not success1, data1 == {}, info_string1.startswith('MALFORMED_REQUEST')))
 
 
-def test_malformed_bad_device():
+def test_malformed_bad_device(schedule_manager_class):
     print('Testing malformed schedule: Bad device', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag = ('Agent1', 'Task1',
           ([1, parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
           PRIORITY_HIGH,
@@ -193,9 +201,9 @@ def test_malformed_bad_device():
     assert all((not success1, data1 == {}, info_string1.startswith('MALFORMED_REQUEST')))
 
 
-def test_schedule_conflict():
+def test_schedule_conflict(schedule_manager_class):
     print('Test conflicting requests: Two agents', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
            PRIORITY_HIGH,
@@ -216,9 +224,9 @@ def test_schedule_conflict():
         ['campus/building/rtu1', '2013-11-27 12:00:00', '2013-11-27 12:35:00']]}}
 
 
-def test_conflict_override():
+def test_conflict_override(schedule_manager_class):
     print('Test conflicting requests: Agent2 overrides Agent1', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
            PRIORITY_LOW,
@@ -233,14 +241,14 @@ def test_conflict_override():
     result2, event_time2 = verify_add_task(sch_man, *ag2)
     success2, data2, info_string2 = result2
     assert success2
-    assert data2 == {('Agent1', 'Task1')}
-    assert not info_string2
+    assert set(data2) == {('Agent1', 'Task1')}
+    assert info_string2 == 'TASK_WERE_PREEMPTED'
     assert event_time2 == parse('2013-11-27 12:30:00')
 
 
-def test_conflict_override_fail_on_running_agent():
+def test_conflict_override_fail_on_running_agent(schedule_manager_class):
     print('Test conflicting requests: Agent2 fails to override running Agent1', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
            PRIORITY_LOW,
@@ -261,9 +269,9 @@ def test_conflict_override_fail_on_running_agent():
         ['campus/building/rtu1', '2013-11-27 12:00:00', '2013-11-27 12:35:00']]}}
 
 
-def test_conflict_override_success_running_agent():
+def test_conflict_override_success_running_agent(schedule_manager_class):
     print('Test conflicting requests: Agent2 overrides running Agent1', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
            PRIORITY_LOW_PREEMPT,
@@ -279,8 +287,8 @@ def test_conflict_override_success_running_agent():
     result2, event_time2 = verify_add_task(sch_man, *ag2)
     success2, data2, info_string2 = result2
     assert success2
-    assert data2 == {('Agent1', 'Task1')}
-    assert info_string2 == ''
+    assert set(data2) == {('Agent1', 'Task1')}
+    assert info_string2 == 'TASK_WERE_PREEMPTED'
     assert event_time2 == parse('2013-11-27 12:16:00')
 
     state = sch_man.get_schedule_state(now2 + timedelta(seconds=30))
@@ -289,9 +297,9 @@ def test_conflict_override_success_running_agent():
     assert state == {'campus/building/rtu1': DeviceState('Agent2', 'Task2', 2640.0)}
 
 
-def test_conflict_override_error():
+def test_conflict_override_error(schedule_manager_class):
     print('Test conflicting requests: Agent2 fails to override running Agent1 because of non high priority.', now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:35:00')],),
            PRIORITY_LOW_PREEMPT,
@@ -311,11 +319,11 @@ def test_conflict_override_error():
         ['campus/building/rtu1', '2013-11-27 12:00:00', '2013-11-27 12:35:00']]}}
 
 
-def test_non_conflict_schedule():
+def test_non_conflict_schedule(schedule_manager_class):
     print(
         'Test non-conflicting requests: Agent2 and Agent1 live in harmony',
         now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:15:00')],
             ['campus/building/rtu2', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],
@@ -338,11 +346,11 @@ def test_non_conflict_schedule():
     assert event_time2 == parse('2013-11-27 12:30:00')
 
 
-def test_conflict_override_success_running_agent2():
+def test_conflict_override_success_running_agent2(schedule_manager_class):
     print('Test conflicting requests: '
           'Agent2 overrides running Agent1 which has more than one device',
           now)
-    sch_man = ScheduleManager(60, now=now)
+    sch_man = schedule_manager_class(60, now=now)
     ag1 = ('Agent1', 'Task1',
            (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:15:00')],
             ['campus/building/rtu2', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],
@@ -360,6 +368,87 @@ def test_conflict_override_success_running_agent2():
     result2, event_time2 = verify_add_task(sch_man, *ag2)
     success2, data2, info_string2 = result2
     assert success2
-    assert data2 == {('Agent1', 'Task1')}
-    assert info_string2 == ''
+    assert set(data2) == {('Agent1', 'Task1')}
+    assert info_string2 == 'TASK_WERE_PREEMPTED'
     assert event_time2 == parse('2013-11-27 12:26:00')
+
+
+def test_indexed_matches_linear():
+    print('Test the indexed schedule manager against the linear one', now)
+    rand = random.Random(42)
+    linear = ScheduleManager(60, now=now)
+    indexed = IndexedScheduleManager(60, now=now)
+    devices = ['campus/building/rtu{}'.format(i) for i in range(5)]
+    priorities = [PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_LOW_PREEMPT]
+    current = now
+    for i in range(300):
+        current += timedelta(minutes=rand.randint(0, 5))
+        if i % 7 == 6 and linear.tasks:
+            task_id = rand.choice(sorted(linear.tasks))
+            agent_id = linear.tasks[task_id].agent_id
+            assert linear.cancel_task(agent_id, task_id, current) == indexed.cancel_task(agent_id, task_id, current)
+        else:
+            requests = []
+            for device in rand.sample(devices, rand.randint(1, 2)):
+                start = current + timedelta(minutes=rand.randint(-10, 60))
+                requests.append([device, start, start + timedelta(minutes=rand.randint(1, 30))])
+            args = ('Agent{}'.format(i % 4), 'Task{}'.format(i), requests, rand.choice(priorities), current)
+            linear_result = linear.request_slots(*args)
+            indexed_result = indexed.request_slots(*args)
+            assert linear_result.success == indexed_result.success
+            assert linear_result.info_string == indexed_result.info_string
+            if linear_result.info_string == 'TASK_WERE_PREEMPTED':
+                assert set(linear_result.data) == set(indexed_result.data)
+            else:
+                assert linear_result.data == indexed_result.data
+        assert linear.get_schedule_state(current) == indexed.get_schedule_state(current)
+        assert linear.get_next_event_time(current) == indexed.get_next_event_time(current)
+        assert sorted(linear.tasks) == sorted(indexed.tasks)
+
+
+def test_indexed_save_state(schedule_manager_class):
+    print('Test saving and loading the state of the indexed schedule manager', now)
+    saved = []
+    sch_man = IndexedScheduleManager(60, now=now, save_state_callback=saved.append)
+    sch_man.request_slots('Agent1', 'Task1',
+                          (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],),
+                          PRIORITY_LOW_PREEMPT, now)
+    sch_man.request_slots('Agent2', 'Task2',
+                          (['campus/building/rtu2', parse('2013-11-27 12:00:00'), parse('2013-11-27 13:00:00')],),
+                          PRIORITY_LOW, now)
+    now2 = now + timedelta(minutes=40)
+    sch_man.request_slots('Agent3', 'Task3',
+                          (['campus/building/rtu1', parse('2013-11-27 12:30:00'), parse('2013-11-27 13:00:00')],),
+                          PRIORITY_HIGH, now2)
+    state = sch_man.get_schedule_state(now2)
+
+    # The state saved by the indexed schedule manager is read by either manager.
+    loaded = schedule_manager_class(60, now=now2, initial_state_string=saved[-1])
+    assert sorted(loaded.tasks) == ['Task1', 'Task2', 'Task3']
+    assert loaded.get_schedule_state(now2) == state
+    assert loaded.get_next_event_time(now2) == sch_man.get_next_event_time(now2)
+    result = loaded.request_slots('Agent4', 'Task4',
+                                  (['campus/building/rtu2', parse('2013-11-27 12:40:00'), parse('2013-11-27 12:50:00')],),
+                                  PRIORITY_HIGH, now2)
+    assert result == (False, {'Agent2': {'Task2': [['campus/building/rtu2', '2013-11-27 12:00:00',
+                                                    '2013-11-27 13:00:00']]}},
+                      'CONFLICTS_WITH_EXISTING_SCHEDULES')
+
+
+def test_indexed_save_state_drops_past_slots():
+    print('Test the saved state of the indexed schedule manager follows tasks brought up to date', now)
+    saved = []
+    sch_man = IndexedScheduleManager(60, now=now, save_state_callback=saved.append)
+    sch_man.request_slots('Agent1', 'Task1',
+                          (['campus/building/rtu1', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:30:00')],
+                           ['campus/building/rtu1', parse('2013-11-27 12:30:00'), parse('2013-11-27 13:00:00')],
+                           ['campus/building/rtu2', parse('2013-11-27 12:00:00'), parse('2013-11-27 12:20:00')]),
+                          PRIORITY_LOW, now)
+    now2 = now + timedelta(minutes=70)
+    sch_man.save_state(now2)
+
+    # The saved tasks are read as they were saved, without bringing them up to date.
+    task = _loads_tasks(saved[-1])['Task1']
+    assert list(task.devices) == ['campus/building/rtu1']
+    assert len(task.devices['campus/building/rtu1']) == 1
+    assert task.state == sch_man.tasks['Task1'].state
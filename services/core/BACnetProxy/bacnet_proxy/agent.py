@@ -26,6 +26,9 @@ import logging
 import sys
 import datetime
 
+import gevent
+from gevent.lock import BoundedSemaphore, DummySemaphore
+
 from volttron.platform.vip.agent import Agent, RPC
 from volttron.platform.async_ import AsyncCall
 from volttron.platform.agent import utils
@@ -82,6 +85,8 @@ from gevent.event import AsyncResult
 
 from volttron.platform.agent.known_identities import PLATFORM_DRIVER
 
+from .read_pipeline import DeviceLimits, ReadPipeline
+
 # Make sure the TaskManager singleton exists...
 task_manager = TaskManager()
 
@@ -407,6 +412,9 @@ class BACnetApplication(BIPSimpleApplication, RecurringTask):
 write_debug_str = "Writing: {target} {type} {instance} {property} (Priority: {priority}, Index: {index}): {value}"
 
 
+DEVICE_LIMITS_CONFIG = "device_limits"
+
+
 def bacnet_proxy_agent(config_path, **kwargs):
     config = utils.load_config(config_path)
     device_address = config["device_address"]
@@ -417,9 +425,14 @@ def bacnet_proxy_agent(config_path, **kwargs):
     ven_id = config.get("vendor_id", 15)
     max_per_request = config.get("default_max_per_request", 1000000)
     request_check_interval = config.get("request_check_interval", 100)
+    max_outstanding_per_device = config.get("max_outstanding_per_device", 1)
+    max_outstanding_requests = config.get("max_outstanding_requests", 0)
 
     return BACnetProxyAgent(device_address, max_apdu_len, seg_supported, obj_id, obj_name, ven_id, max_per_request,
-                            request_check_interval=request_check_interval, heartbeat_autostart=True, **kwargs)
+                            request_check_interval=request_check_interval,
+                            max_outstanding_per_device=max_outstanding_per_device,
+                            max_outstanding_requests=max_outstanding_requests,
+                            heartbeat_autostart=True, **kwargs)
 
 
 class BACnetProxyAgent(Agent):
@@ -427,7 +440,7 @@ class BACnetProxyAgent(Agent):
     This agent creates a virtual bacnet device that is used by the bacnet driver interface to communicate with devices.
     """
     def __init__(self, device_address, max_apdu_len, seg_supported, obj_id, obj_name, ven_id, max_per_request,
-                 request_check_interval=100, **kwargs):
+                 request_check_interval=100, max_outstanding_per_device=1, max_outstanding_requests=0, **kwargs):
         super(BACnetProxyAgent, self).__init__(**kwargs)
 
         async_call = AsyncCall()
@@ -449,6 +462,18 @@ class BACnetProxyAgent(Agent):
         self.iocb_class = IOCB
         self._max_per_request = max_per_request
 
+        # ReadPropertyMultiple requests waiting for a response, per device and across the proxy.
+        max_outstanding_per_device = max(int(max_outstanding_per_device), 1)
+        self._device_windows = defaultdict(lambda: BoundedSemaphore(max_outstanding_per_device))
+        max_outstanding_requests = int(max_outstanding_requests)
+        self._proxy_window = BoundedSemaphore(max_outstanding_requests) if max_outstanding_requests > 0 \
+            else DummySemaphore()
+
+        # Limits learned from device errors, kept in the config store across restarts.
+        self._device_limits = DeviceLimits(self._save_device_limits)
+        self._read_pipeline = ReadPipeline(self._read_multiple, self._device_limits, max_outstanding_per_device)
+        self.vip.config.subscribe(self._load_device_limits, actions=["NEW", "UPDATE"], pattern=DEVICE_LIMITS_CONFIG)
+
         self.setup_device(async_call, device_address, max_apdu_len, seg_supported, obj_id, obj_name, ven_id,
                           request_check_interval)
 
@@ -711,13 +736,43 @@ class BACnetProxyAgent(Agent):
 
         return object_property_map, reverse_point_map
 
+    def _load_device_limits(self, config_name, action, contents):
+        self._device_limits.load(contents)
+
+    def _save_device_limits(self, limits):
+        self.vip.config.set(DEVICE_LIMITS_CONFIG, limits, send_update=False)
+
+    @RPC.export
+    def get_device_limits(self, target_address=None):
+        """
+        Return the max_per_request and use_read_multiple settings learned from device errors, for one device or all
+        devices.
+        """
+        return self._device_limits.get(target_address)
+
+    @RPC.export
+    def clear_device_limits(self, target_address=None):
+        """
+        Forget the learned limits of one device or all devices, for example after a firmware update.
+        """
+        self._device_limits.clear(target_address)
+
+    def _read_multiple(self, target_address, read_access_spec_list):
+        """Send one ReadPropertyMultiple request once the windows of the device and the proxy allow it."""
+        with self._device_windows[target_address], self._proxy_window:
+            request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=read_access_spec_list)
+            request.pduDestination = Address(target_address)
+
+            iocb = self.iocb_class(request)
+            self.bacnet_application.submit_request(iocb)
+            return iocb.ioResult.get(10)
+
     @RPC.export
     def read_properties(self, target_address, point_map, max_per_request=None, use_read_multiple=True):
         """
         Read a set of points and return the results
         """
-
-        if not use_read_multiple:
+        if not use_read_multiple or not self._device_limits.use_read_multiple(target_address):
             return self.read_using_single_request(target_address, point_map)
 
         # Set max_per_request really high if not set.
@@ -730,37 +785,18 @@ class BACnetProxyAgent(Agent):
         # reverse_point_map
         (object_property_map, reverse_point_map) = self._get_object_properties(point_map, target_address)
 
+        read_access_spec_list = [self._get_access_spec(obj_data, properties)[0]
+                                 for obj_data, properties in object_property_map.items()]
+
+        bacnet_results = self._read_pipeline.read(target_address, read_access_spec_list, max_per_request)
+        if bacnet_results is None:
+            # The device does not support ReadPropertyMultiple.
+            return self.read_using_single_request(target_address, point_map)
+
         result_dict = {}
-        finished = False
-
-        while not finished:
-            read_access_spec_list = []
-            count = 0
-            for _ in range(max_per_request):
-                try:
-                    obj_data, properties = object_property_map.popitem()
-                except KeyError:
-                    finished = True
-                    break
-                (spec_list, spec_count) = self._get_access_spec(obj_data, properties)
-                count += spec_count
-                read_access_spec_list.append(spec_list)
-
-            if read_access_spec_list:
-                _log.debug("Requesting {count} properties from {target}".format(count=count, target=target_address))
-                request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=read_access_spec_list)
-                request.pduDestination = Address(target_address)
-
-                iocb = self.iocb_class(request)
-                self.bacnet_application.submit_request(iocb)
-                bacnet_results = iocb.ioResult.get(10)
-
-                _log.debug("Received read response from {target} count: {count}".format(
-                    count=count, target=target_address))
-
-                for prop_tuple, value in bacnet_results.items():
-                    name = reverse_point_map[prop_tuple]
-                    result_dict[name] = value
+        for prop_tuple, value in bacnet_results.items():
+            name = reverse_point_map[prop_tuple]
+            result_dict[name] = value
 
         return result_dict
 
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+ReadPropertyMultiple request planning of the BACnet proxy, kept free of
+bacpypes: splitting a read into chunks, keeping several chunks in flight,
+backing off on device errors and the limits learned from them.
+"""
+
+import logging
+
+import gevent
+
+_log = logging.getLogger(__name__)
+
+
+def is_segmentation_error(error):
+    """The response did not fit in one segment and the device cannot segment it."""
+    return "segmentationNotSupported" in str(error)
+
+
+def is_unrecognized_service(error):
+    """The device rejected ReadPropertyMultiple with the unrecognized-service reason (9)."""
+    return str(error).endswith("rejected the request: 9")
+
+
+class DeviceLimits:
+    """
+    max_per_request and use_read_multiple settings learned from device errors, by device address. save is called
+    with all limits whenever they change so they can be kept across restarts.
+    """
+
+    def __init__(self, save=None):
+        self.limits = {}
+        self._save = save
+
+    def load(self, contents):
+        self.limits = dict(contents) if isinstance(contents, dict) else {}
+
+    def get(self, target_address=None):
+        if target_address is not None:
+            return dict(self.limits.get(target_address, {}))
+        return {address: dict(limits) for address, limits in self.limits.items()}
+
+    def learn(self, target_address, name, value):
+        limits = self.limits.setdefault(target_address, {})
+        if limits.get(name) == value:
+            return
+        limits[name] = value
+        _log.info("Learned {name} of {value} for device at {target}".format(name=name, value=value,
+                                                                           target=target_address))
+        self._store()
+
+    def clear(self, target_address=None):
+        if target_address is None:
+            self.limits.clear()
+        else:
+            self.limits.pop(target_address, None)
+        self._store()
+
+    def max_per_request(self, target_address, max_per_request):
+        """The requested max_per_request, lowered to what the device is known to handle."""
+        learned = self.limits.get(target_address, {}).get("max_per_request", max_per_request)
+        return max(min(max_per_request, learned), 1)
+
+    def use_read_multiple(self, target_address):
+        return self.limits.get(target_address, {}).get("use_read_multiple", True)
+
+    def _store(self):
+        if self._save is None:
+            return
+        try:
+            self._save(self.limits)
+        except Exception as e:
+            _log.warning("Unable to save the learned device limits: {}".format(e))
+
+
+class ReadPipeline:
+    """
+    Reads lists of read access specifications with ReadPropertyMultiple.
+
+    read_multiple(target_address, specs) sends one request and returns its results. Responses that do not fit in
+    one segment halve the request size and a device rejecting the service is marked to be read with single
+    requests, both are remembered in limits.
+    """
+
+    def __init__(self, read_multiple, limits, max_outstanding_per_device=1):
+        self._read_multiple = read_multiple
+        self.limits = limits
+        self.max_outstanding_per_device = max(int(max_outstanding_per_device), 1)
+
+    def read(self, target_address, specs, max_per_request):
+        """
+        Returns the merged results of all specs, or None if the device does not support ReadPropertyMultiple and
+        has to be read with single requests.
+        """
+        max_per_request = self.limits.max_per_request(target_address, max_per_request)
+        chunks = [specs[i:i + max_per_request] for i in range(0, len(specs), max_per_request)]
+
+        results = {}
+        while chunks:
+            _log.debug("Requesting {count} objects from {target} in {requests} requests".format(
+                count=sum(len(chunk) for chunk in chunks), target=target_address, requests=len(chunks)))
+            chunk_results, failures = self.read_chunks(target_address, chunks)
+            _log.debug("Received read response from {target} count: {count}".format(
+                count=len(chunk_results), target=target_address))
+            results.update(chunk_results)
+
+            chunks = []
+            for chunk, error in failures:
+                if error is None:
+                    chunks.append(chunk)
+                elif is_segmentation_error(error) and len(chunk) > 1:
+                    # The response did not fit in one segment, split the request and remember the size.
+                    max_per_request = max(len(chunk) // 2, 1)
+                    self.limits.learn(target_address, "max_per_request", max_per_request)
+                    chunks.extend(chunk[i:i + max_per_request] for i in range(0, len(chunk), max_per_request))
+                elif is_unrecognized_service(error):
+                    self.limits.learn(target_address, "use_read_multiple", False)
+                    return None
+                else:
+                    raise error
+
+        return results
+
+    def read_chunks(self, target_address, chunks):
+        """
+        Read every chunk, keeping up to max_outstanding_per_device requests to the device in flight. Returns the
+        merged results and a list of (chunk, exception) of the failed chunks. Chunks not sent because another one
+        failed are listed with None after the failed ones.
+        """
+        if len(chunks) == 1 or self.max_outstanding_per_device == 1:
+            # Send in order, stopping at the first failure like a single request would.
+            results = {}
+            for index, chunk in enumerate(chunks):
+                try:
+                    results.update(self._read_multiple(target_address, chunk))
+                except (Exception, gevent.Timeout) as e:
+                    return results, [(chunk, e)] + [(remaining, None) for remaining in chunks[index + 1:]]
+            return results, []
+
+        results = {}
+        failures = []
+
+        def read(chunk):
+            if failures:
+                failures.append((chunk, None))
+                return
+            try:
+                results.update(self._read_multiple(target_address, chunk))
+            except (Exception, gevent.Timeout) as e:
+                failures.append((chunk, e))
+
+        gevent.joinall([gevent.spawn(read, chunk) for chunk in chunks])
+        # Chunks skipped after a failure are retried with the failed ones.
+        failures.sort(key=lambda failure: failure[1] is None)
+        return results, failures
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gevent
+import pytest
+from gevent.lock import BoundedSemaphore
+
+from bacnet_proxy.read_pipeline import DeviceLimits, ReadPipeline
+
+ADDRESS = "10.0.0.1"
+
+
+class FakeDevice(object):
+    """Answers ReadPropertyMultiple requests for integer specs like a device with a limited response size."""
+
+    def __init__(self, max_per_response=None, window=1, fail=None):
+        self.max_per_response = max_per_response
+        self.window = BoundedSemaphore(window)
+        self.fail = fail
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def read_multiple(self, target_address, specs):
+        with self.window:
+            self.requests.append(list(specs))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                gevent.sleep(0.01 if self.fail is None or self.fail not in specs else 0.001)
+                if self.fail in specs:
+                    raise RuntimeError("Device at {} rejected the request: 0".format(target_address))
+                if self.max_per_response is not None and len(specs) > self.max_per_response:
+                    raise RuntimeError("Segmentation error: segmentationNotSupported")
+                return {spec: spec * 10 for spec in specs}
+            finally:
+                self.in_flight -= 1
+
+
+def test_chunks_are_pipelined_up_to_the_window():
+    device = FakeDevice(window=3)
+    pipeline = ReadPipeline(device.read_multiple, DeviceLimits(), max_outstanding_per_device=3)
+
+    results = pipeline.read(ADDRESS, list(range(10)), max_per_request=2)
+
+    assert results == {spec: spec * 10 for spec in range(10)}
+    assert len(device.requests) == 5
+    assert device.max_in_flight == 3
+
+
+def test_failed_chunk_keeps_results_of_chunks_in_flight():
+    device = FakeDevice(window=2, fail=0)
+    pipeline = ReadPipeline(device.read_multiple, DeviceLimits(), max_outstanding_per_device=2)
+
+    results, failures = pipeline.read_chunks(ADDRESS, [[0, 1], [2, 3], [4, 5]])
+
+    # The first chunk failed while the second was in flight, both others were still read.
+    assert results == {spec: spec * 10 for spec in range(2, 6)}
+    assert [(chunk, str(error)) for chunk, error in failures] == [
+        ([0, 1], "Device at 10.0.0.1 rejected the request: 0")]
+
+    with pytest.raises(RuntimeError):
+        pipeline.read(ADDRESS, list(range(6)), max_per_request=2)
+
+
+def test_segmentation_error_halves_chunk_and_learned_limit_is_used_next_time():
+    saved = []
+    limits = DeviceLimits(saved.append)
+    device = FakeDevice(max_per_response=3, window=2)
+    pipeline = ReadPipeline(device.read_multiple, limits, max_outstanding_per_device=2)
+
+    results = pipeline.read(ADDRESS, list(range(16)), max_per_request=8)
+
+    assert results == {spec: spec * 10 for spec in range(16)}
+    assert limits.get(ADDRESS) == {"max_per_request": 2}
+    assert saved[-1] == {ADDRESS: {"max_per_request": 2}}
+
+    # The next read starts with the learned size and needs no retries.
+    del device.requests[:]
+    pipeline.read(ADDRESS, list(range(16)), max_per_request=8)
+    assert [len(request) for request in device.requests] == [2] * 8
+
+    # So does a proxy restarted with the saved limits.
+    restored = DeviceLimits()
+    restored.load(saved[-1])
+    del device.requests[:]
+    ReadPipeline(device.read_multiple, restored, 2).read(ADDRESS, list(range(16)), max_per_request=8)
+    assert [len(request) for request in device.requests] == [2] * 8
+
+
+def test_unrecognized_service_falls_back_to_single_requests():
+    saved = []
+    limits = DeviceLimits(saved.append)
+
+    def read_multiple(target_address, specs):
+        raise RuntimeError("Device at {} rejected the request: 9".format(target_address))
+
+    pipeline = ReadPipeline(read_multiple, limits)
+
+    assert pipeline.read(ADDRESS, [1, 2, 3], max_per_request=2) is None
+    assert not limits.use_read_multiple(ADDRESS)
+    assert saved[-1] == {ADDRESS: {"use_read_multiple": False}}
+
+    limits.clear(ADDRESS)
+    assert limits.use_read_multiple(ADDRESS)
+    assert saved[-1] == {}
@@ -30,14 +30,17 @@ from volttron.platform.vip.agent import Agent, RPC
 from volttron.platform.agent import utils
 from volttron.platform.agent import math_utils
 from volttron.platform.agent.known_identities import PLATFORM_DRIVER
+from volttron.platform.messaging.health import STATUS_BAD, Status
 from .driver import DriverAgent
+from .publish_pipeline import PublishPipeline
+from .connection_pool import configure_connection_pools, connection_pool_status
 import resource
 from datetime import datetime, timedelta
 import bisect
 import fnmatch
 from volttron.platform import jsonapi
 from .interfaces import DriverInterfaceError
-from .driver_locks import configure_socket_lock, configure_publish_lock
+from .driver_locks import configure_socket_lock, configure_publish_lock, configure_scrape_pools, scrape_pool_status
 
 utils.setup_logging()
 _log = logging.getLogger(__name__)
@@ -84,6 +87,15 @@ def platform_driver_agent(config_path, **kwargs):
     # TODO: update the default after scalability testing.
     max_concurrent_publishes = get_config('max_concurrent_publishes', 10000)
 
+    scrape_pool_sizes = get_config('scrape_pool_sizes', {})
+    default_scrape_pool_size = get_config('default_scrape_pool_size', 0)
+
+    publish_mode = get_config('publish_mode', 'acknowledged')
+    max_publishes_in_flight = get_config('max_publishes_in_flight', 1000)
+    publish_statistics_interval = get_config('publish_statistics_interval', 60)
+
+    connection_idle_timeout = get_config('connection_idle_timeout', 120)
+
     driver_config_list = get_config('driver_config_list')
 
     scalability_test = get_config('scalability_test', False)
@@ -113,6 +125,12 @@ def platform_driver_agent(config_path, **kwargs):
                              publish_breadth_first_all,
                              publish_depth_first,
                              publish_breadth_first,
+                             scrape_pool_sizes=scrape_pool_sizes,
+                             default_scrape_pool_size=default_scrape_pool_size,
+                             publish_mode=publish_mode,
+                             max_publishes_in_flight=max_publishes_in_flight,
+                             publish_statistics_interval=publish_statistics_interval,
+                             connection_idle_timeout=connection_idle_timeout,
                              heartbeat_autostart=True, **kwargs)
 
 
@@ -128,6 +146,12 @@ class PlatformDriverAgent(Agent):
                  publish_breadth_first_all=False,
                  publish_depth_first=False,
                  publish_breadth_first=False,
+                 scrape_pool_sizes=None,
+                 default_scrape_pool_size=0,
+                 publish_mode='acknowledged',
+                 max_publishes_in_flight=1000,
+                 publish_statistics_interval=60,
+                 connection_idle_timeout=120,
                  **kwargs):
         super(PlatformDriverAgent, self).__init__(**kwargs)
         self.instances = {}
@@ -146,6 +170,7 @@ class PlatformDriverAgent(Agent):
             self.group_offset_interval = 0.0
 
         self.system_socket_limit = system_socket_limit
+        self.publish_pipeline = None
         self.freed_time_slots = defaultdict(list)
         self.group_counts = defaultdict(int)
         self._name_map = {}
@@ -168,6 +193,12 @@ class PlatformDriverAgent(Agent):
                                "scalability_test_iterations": scalability_test_iterations,
                                "max_open_sockets": max_open_sockets,
                                "max_concurrent_publishes": max_concurrent_publishes,
+                               "scrape_pool_sizes": scrape_pool_sizes or {},
+                               "default_scrape_pool_size": default_scrape_pool_size,
+                               "publish_mode": publish_mode,
+                               "max_publishes_in_flight": max_publishes_in_flight,
+                               "publish_statistics_interval": publish_statistics_interval,
+                               "connection_idle_timeout": connection_idle_timeout,
                                "driver_scrape_interval": self.driver_scrape_interval,
                                "group_offset_interval": self.group_offset_interval,
                                "publish_depth_first_all": self.publish_depth_first_all,
@@ -175,6 +206,9 @@ class PlatformDriverAgent(Agent):
                                "publish_depth_first": self.publish_depth_first,
                                "publish_breadth_first": self.publish_breadth_first}
 
+        # Device and registry configurations can add up to a very large store,
+        # fetch them in pages and keep a cache between restarts.
+        self.vip.config.set_lazy_load()
         self.vip.config.set_default("config", self.default_config)
         self.vip.config.subscribe(self.configure_main, actions=["NEW", "UPDATE"], pattern="config")
         self.vip.config.subscribe(self.update_driver, actions=["NEW", "UPDATE"], pattern="devices/*")
@@ -197,6 +231,7 @@ class PlatformDriverAgent(Agent):
                               " (derived from system limits)")
                     configure_socket_lock(max_open_sockets)
                 else:
+                    max_open_sockets = 0
                     configure_socket_lock()
                     _log.warning("No limit set on the maximum number of concurrently open sockets. "
                                  "Consider setting max_open_sockets if you plan to work with 800+ modbus devices.")
@@ -210,6 +245,32 @@ class PlatformDriverAgent(Agent):
                     _log.info("maximum concurrent driver publishes limited to " + str(max_concurrent_publishes))
                 configure_publish_lock(max_concurrent_publishes)
 
+                self.scrape_pool_sizes = config["scrape_pool_sizes"]
+                self.default_scrape_pool_size = config["default_scrape_pool_size"]
+                configure_scrape_pools(self.scrape_pool_sizes, self.default_scrape_pool_size)
+                _log.info("concurrent scrapes per interface type limited to {} (default {})".format(
+                    self.scrape_pool_sizes, self.default_scrape_pool_size))
+
+                self.publish_mode = config["publish_mode"]
+                self.max_publishes_in_flight = config["max_publishes_in_flight"]
+                self.publish_statistics_interval = config["publish_statistics_interval"]
+                if self.publish_mode == "pipelined":
+                    self.publish_pipeline = PublishPipeline(int(self.max_publishes_in_flight))
+                    _log.info("pipelined driver publishes with up to {} publishes in flight".format(
+                        self.max_publishes_in_flight))
+                elif self.publish_mode != "acknowledged":
+                    raise ValueError("publish_mode must be acknowledged or pipelined, got {}".format(
+                        self.publish_mode))
+
+                self.connection_idle_timeout = config["connection_idle_timeout"]
+                # Pooled connections count against the same socket limit as requests in progress.
+                configure_connection_pools(float(self.connection_idle_timeout), max_open_sockets)
+                _log.info("idle device connections closed after {} seconds".format(self.connection_idle_timeout))
+
+                statistics_interval = float(self.publish_statistics_interval)
+                if self.publish_pipeline is not None and statistics_interval > 0:
+                    self.core.periodic(statistics_interval, self._report_statistics, wait=statistics_interval)
+
                 self.scalability_test = bool(config["scalability_test"])
                 self.scalability_test_iterations = int(config["scalability_test_iterations"])
 
@@ -233,6 +294,21 @@ class PlatformDriverAgent(Agent):
                 _log.info("The platform driver must be restarted for changes to the max_concurrent_publishes setting to "
                           "take effect")
 
+            if (self.publish_mode != config["publish_mode"] or
+                    self.max_publishes_in_flight != config["max_publishes_in_flight"] or
+                    self.publish_statistics_interval != config["publish_statistics_interval"]):
+                _log.info("The platform driver must be restarted for changes to the publish pipeline settings to "
+                          "take effect")
+
+            if self.connection_idle_timeout != config["connection_idle_timeout"]:
+                _log.info("The platform driver must be restarted for changes to the connection_idle_timeout setting "
+                          "to take effect")
+
+            if (self.scrape_pool_sizes != config["scrape_pool_sizes"] or
+                    self.default_scrape_pool_size != config["default_scrape_pool_size"]):
+                _log.info("The platform driver must be restarted for changes to the scrape pool settings to take "
+                          "effect")
+
             if self.scalability_test != bool(config["scalability_test"]):
                 if not self.scalability_test:
                     _log.info(
@@ -457,6 +533,64 @@ class PlatformDriverAgent(Agent):
     def scrape_all(self, path):
         return self.instances[path].scrape_all()
 
+    def _report_statistics(self):
+        """Add the publish pipeline counters and rates and the device connection pools to the context of the
+        health status, the status itself is left as it is. An alert is sent if publishes were dropped, failed or
+        timed out since the previous report."""
+        statistics = self.publish_pipeline.get_statistics()
+        health = self.vip.health.get_status()
+        context = health["context"]
+        # A message set as the context elsewhere is left as it is.
+        if context is None or isinstance(context, dict):
+            context = dict(context or {})
+            context["publish_statistics"] = statistics
+            context["connection_pools"] = connection_pool_status()
+            self.vip.health.set_status(health["status"], context)
+        if statistics["dropped_since_last_report"]:
+            alert_status = Status.build(STATUS_BAD, context={"publish_statistics": statistics})
+            self.vip.health.send_alert("driver_publishes_dropped", alert_status)
+
+    @RPC.export
+    def get_publish_statistics(self):
+        """RPC method
+
+        Return the counters and rates of the publish pipeline, None when publish_mode is acknowledged.
+        """
+        if self.publish_pipeline is None:
+            return None
+        return self.publish_pipeline.get_statistics(reset=False)
+
+    @RPC.export
+    def get_scrape_statistics(self, path=None):
+        """RPC method
+
+        Return scrape counts and latencies of the devices and the usage of the scrape pools.
+        :param path: device path, defaults to all devices
+        :type path: str
+        :return: {"devices": {path: statistics}, "pools": {driver_type: {"size": size, "in_use": count}},
+                  "connection_pools": {name: statistics}}
+        """
+        if path is None:
+            devices = {device: driver.get_scrape_statistics() for device, driver in self.instances.items()}
+        else:
+            devices = {path: self.instances[path].get_scrape_statistics()}
+        return {"devices": devices, "pools": scrape_pool_status(), "connection_pools": connection_pool_status()}
+
+    @RPC.export
+    def get_compact_schema(self, schema_id):
+        """RPC method
+
+        Return the schema of compact encoded all publishes, used by subscribers that missed the publish carrying it.
+        :param schema_id: schema id of a compact message
+        :type schema_id: str
+        :return: {"points": [point names], "meta": [metadata of each point]} or None if no device uses the schema
+        """
+        for driver in self.instances.values():
+            schema = driver.get_compact_schema(schema_id)
+            if schema is not None:
+                return schema
+        return None
+
     @RPC.export
     def get_multiple_points(self, path, point_names, **kwargs):
         return self.instances[path].get_multiple_points(point_names, **kwargs)
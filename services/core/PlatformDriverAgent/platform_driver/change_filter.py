@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+_MISSING = object()
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ChangeFilter(object):
+    """Selects the points of a scrape that are published when a device publishes on change.
+
+    A point is published when its value moved by more than its deadband from the last
+    published value, or when it was not published for max_silence seconds. Every
+    snapshot_interval seconds all points are published regardless. Metadata of a point
+    is only included when it differs from the last metadata published for it, or in a
+    snapshot.
+
+    points limits change of value publishing to the given point names, the other
+    points of the device are published on every scrape. A max_silence or
+    snapshot_interval of 0 disables the heartbeat and the snapshots."""
+
+    def __init__(self, points=None, deadband=0.0, deadbands=None, max_silence=900.0, snapshot_interval=3600.0):
+        self.points = None if points is None else frozenset(points)
+        self.deadband = float(deadband)
+        self.deadbands = {point: float(value) for point, value in (deadbands or {}).items()}
+        self.max_silence = float(max_silence)
+        self.snapshot_interval = float(snapshot_interval)
+        if self.deadband < 0.0 or any(value < 0.0 for value in self.deadbands.values()):
+            raise ValueError("Deadbands must not be negative.")
+
+        self._values = {}
+        self._published_at = {}
+        self._meta = {}
+        self._last_snapshot = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a filter from a device configuration, None if the device publishes every scrape."""
+        publish_on_change = config.get("publish_on_change", False)
+        if not publish_on_change:
+            return None
+        points = None if publish_on_change is True else publish_on_change
+        return cls(points=points,
+                   deadband=config.get("change_deadband", 0.0),
+                   deadbands=config.get("change_deadbands"),
+                   max_silence=config.get("max_publish_silence", 900.0),
+                   snapshot_interval=config.get("snapshot_interval", 3600.0))
+
+    def snapshot_due(self, now):
+        if self._last_snapshot is None:
+            return True
+        return 0.0 < self.snapshot_interval <= now - self._last_snapshot
+
+    def filter(self, results, meta_data, now):
+        """Return the values and metadata to publish for the scrape results and whether
+        this is a full snapshot. now is a monotonic time in seconds."""
+        snapshot = self.snapshot_due(now)
+        if snapshot:
+            self._last_snapshot = now
+            values = dict(results)
+        else:
+            values = {point: value for point, value in results.items() if self._publish_point(point, value, now)}
+
+        meta = {}
+        for point, value in values.items():
+            self._values[point] = value
+            self._published_at[point] = now
+            point_meta = meta_data.get(point)
+            if snapshot or self._meta.get(point, _MISSING) != point_meta:
+                self._meta[point] = point_meta
+                meta[point] = point_meta
+        return values, meta, snapshot
+
+    def _publish_point(self, point, value, now):
+        if self.points is not None and point not in self.points:
+            return True
+        last = self._values.get(point, _MISSING)
+        if last is _MISSING:
+            return True
+        if 0.0 < self.max_silence <= now - self._published_at[point]:
+            return True
+        deadband = self.deadbands.get(point, self.deadband)
+        if deadband and _is_number(value) and _is_number(last):
+            return abs(value - last) > deadband
+        return value != last
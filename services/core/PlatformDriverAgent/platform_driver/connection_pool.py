@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import time
+from contextlib import contextmanager
+
+from gevent.lock import Semaphore
+
+_log = logging.getLogger(__name__)
+
+
+class _Connection(object):
+    __slots__ = ('lock', 'client', 'last_used')
+
+    def __init__(self):
+        self.lock = Semaphore()
+        self.client = None
+        self.last_used = 0.0
+
+
+class ConnectionPool(object):
+    """Open clients kept by (host, port) and reused between requests.
+
+    Devices behind the same gateway, for example Modbus slaves with
+    different slave ids, share one client and take turns using it. A
+    client is closed when it has been idle for idle_timeout seconds, when
+    is_open reports that its socket was closed, or when a request using it
+    raises. An idle_timeout below or equal to 0 closes every client after
+    use.
+
+    With max_open above 0, opening a client while max_open clients are open
+    first closes the least recently used idle ones. Clients in use are not
+    closed, callers bound them by limiting concurrent requests, e.g. with
+    the socket lock.
+
+    :param factory: called with host and port to create a client.
+    :param is_open: called with a client before it is reused, False closes it.
+    :param max_open: number of open clients the pool keeps, 0 for no limit.
+    """
+
+    def __init__(self, factory, idle_timeout=120.0, is_open=None, max_open=0):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.is_open = is_open
+        self.max_open = max_open
+        self._connections = {}
+        self._next_sweep = 0.0
+        self.counters = {"opened": 0,
+                         "reused": 0,
+                         "closed_idle": 0,
+                         "closed_error": 0,
+                         "closed_limit": 0,
+                         "waits": 0}
+
+    @contextmanager
+    def connection(self, host, port):
+        """Hold the client of host and port for the duration of the block."""
+        key = (host, port)
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = self._connections[key] = _Connection()
+        if connection.lock.locked():
+            self.counters["waits"] += 1
+        with connection.lock:
+            now = time.monotonic()
+            client = connection.client
+            if client is not None:
+                if now - connection.last_used > self.idle_timeout:
+                    self._close(connection, "closed_idle")
+                elif self.is_open is not None and not self.is_open(client):
+                    self._close(connection, "closed_error")
+            if connection.client is None:
+                if self.max_open > 0:
+                    self._make_room()
+                connection.client = self.factory(host, port)
+                self.counters["opened"] += 1
+            else:
+                self.counters["reused"] += 1
+
+            try:
+                yield connection.client
+            except Exception:
+                self._close(connection, "closed_error")
+                raise
+            finally:
+                connection.last_used = now = time.monotonic()
+                if self.idle_timeout <= 0:
+                    self._close(connection, None)
+
+        if now >= self._next_sweep:
+            self.close_idle(now)
+
+    def _close(self, connection, reason):
+        client, connection.client = connection.client, None
+        if client is None:
+            return
+        if reason is not None:
+            self.counters[reason] += 1
+        try:
+            client.close()
+        except Exception as e:
+            _log.debug("error closing connection: {}".format(e))
+
+    def _make_room(self):
+        """Close the least recently used idle clients until fewer than max_open are open."""
+        open_connections = [connection for connection in self._connections.values() if connection.client is not None]
+        excess = len(open_connections) - self.max_open + 1
+        if excess <= 0:
+            return
+        idle = sorted((connection for connection in open_connections if not connection.lock.locked()),
+                      key=lambda connection: connection.last_used)
+        for connection in idle[:excess]:
+            self._close(connection, "closed_limit")
+
+    def close_idle(self, now=None):
+        """Close the clients that have been idle longer than idle_timeout."""
+        if now is None:
+            now = time.monotonic()
+        self._next_sweep = now + max(self.idle_timeout, 1.0)
+        for key, connection in list(self._connections.items()):
+            if connection.lock.locked():
+                continue
+            if connection.client is not None and now - connection.last_used > self.idle_timeout:
+                self._close(connection, "closed_idle")
+            if connection.client is None:
+                del self._connections[key]
+
+    def close_all(self):
+        for connection in self._connections.values():
+            self._close(connection, None)
+        self._connections.clear()
+
+    def get_statistics(self):
+        """Counters of the pool and the number of gateways with an open client."""
+        statistics = dict(self.counters)
+        statistics["open"] = sum(1 for connection in self._connections.values() if connection.client is not None)
+        statistics["in_use"] = sum(1 for connection in self._connections.values() if connection.lock.locked())
+        return statistics
+
+
+_idle_timeout = 120.0
+_max_open = 0
+_connection_pools = {}
+
+def configure_connection_pools(idle_timeout=120.0, max_open=0):
+    """Set the idle timeout and the open client limit of the connection pools created after this call."""
+    global _idle_timeout, _max_open
+    _idle_timeout = float(idle_timeout)
+    _max_open = int(max_open or 0)
+
+def get_connection_pool(name, factory, is_open=None):
+    """Return the connection pool called name, creating it with factory the first time."""
+    try:
+        return _connection_pools[name]
+    except KeyError:
+        pool = _connection_pools[name] = ConnectionPool(factory, _idle_timeout, is_open=is_open, max_open=_max_open)
+        return pool
+
+def connection_pool_status():
+    """Statistics of every connection pool that has been created."""
+    return {name: pool.get_statistics() for name, pool in _connection_pools.items()}
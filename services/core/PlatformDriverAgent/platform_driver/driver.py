@@ -26,16 +26,19 @@ from volttron.platform.vip.agent import BasicAgent, Core
 from volttron.platform.agent import utils
 import logging
 import random
+import time
 import gevent
 import traceback
 from volttron.platform.messaging import headers as headers_mod
+from volttron.platform.messaging.compact import COMPACT_CONTENT_TYPE, CompactEncoder
 from volttron.platform.messaging.topics import (DRIVER_TOPIC_BASE,
                                                 DRIVER_TOPIC_ALL,
                                                 DEVICES_VALUE,
                                                 DEVICES_PATH)
 
 from volttron.platform.vip.agent.errors import VIPError, Again
-from .driver_locks import publish_lock
+from .driver_locks import publish_lock, scrape_lock
+from .change_filter import ChangeFilter
 import datetime
 
 utils.setup_logging()
@@ -75,6 +78,30 @@ class DriverAgent(BasicAgent):
 
         self.interval = interval
         self.periodic_read_event = None
+        self.driver_type = config.get("driver_type")
+        self._scrape_in_progress = False
+        self.scrape_statistics = {"scrapes": 0,
+                                  "failures": 0,
+                                  "overruns": 0,
+                                  "last_latency": None,
+                                  "average_latency": None,
+                                  "max_latency": None,
+                                  "last_pool_wait": None,
+                                  "last_scrape": None,
+                                  "unchanged_points": 0}
+
+        try:
+            self.change_filter = ChangeFilter.from_config(config)
+        except (ValueError, TypeError) as ex:
+            _log.error("Invalid change of value settings for {}, publishing every scrape: {}".format(device_path, ex))
+            self.change_filter = None
+
+        all_publish_encoding = config.get("all_publish_encoding", "json")
+        if all_publish_encoding not in ("json", "compact"):
+            _log.warning("Invalid all_publish_encoding {} for {}. Defaulting to json.".format(all_publish_encoding,
+                                                                                            device_path))
+            all_publish_encoding = "json"
+        self.compact_encoder = CompactEncoder() if all_publish_encoding == "compact" else None
 
         self.update_scrape_schedule(time_slot, driver_scrape_interval, group, group_offset_interval)
 
@@ -224,20 +251,38 @@ class DriverAgent(BasicAgent):
 
         self.periodic_read_event = self.core.schedule(next_scrape_time, self.periodic_read, next_scrape_time)
 
+        # A device that is slower than its interval must not pile up scrapes.
+        if self._scrape_in_progress:
+            self.scrape_statistics["overruns"] += 1
+            _log.warning("Skipping scrape of {}, the previous scrape is still running.".format(self.device_name))
+            return
+
         _log.debug("scraping device: " + self.device_name)
 
         self.parent.scrape_starting(self.device_name)
 
+        # Only the device I/O holds a slot of the interface type's scrape pool, publishing happens after it is
+        # released so that slow publishes do not hold up scrapes of other devices.
+        self._scrape_in_progress = True
         try:
-            results = self.interface.scrape_all()
+            requested = time.monotonic()
+            with scrape_lock(self.driver_type):
+                started = time.monotonic()
+                try:
+                    results = self.interface.scrape_all()
+                finally:
+                    self._record_scrape(started - requested, time.monotonic() - started)
             register_names = self.interface.get_register_names_view()
             for point in (register_names - results.keys()):
                 depth_first_topic = self.base_topic(point=point)
                 _log.error("Failed to scrape point: "+depth_first_topic)
         except (Exception, gevent.Timeout) as ex:
+            self.scrape_statistics["failures"] += 1
             tb = traceback.format_exc()
             _log.error('Failed to scrape ' + self.device_name + ':\n' + tb)
             return
+        finally:
+            self._scrape_in_progress = False
 
         # XXX: Does a warning need to be printed?
         if not results:
@@ -253,10 +298,20 @@ class DriverAgent(BasicAgent):
             headers_mod.SYNC_TIMESTAMP: sync_timestamp
         }
 
+        meta_data = self.meta_data
+        snapshot = False
+        if self.change_filter is not None:
+            scraped = len(results)
+            results, meta_data, snapshot = self.change_filter.filter(results, self.meta_data, time.monotonic())
+            self.scrape_statistics["unchanged_points"] += scraped - len(results)
+            if not results:
+                self.parent.scrape_ending(self.device_name)
+                return
+
         if self.publish_depth_first or self.publish_breadth_first:
             for point, value in results.items():
                 depth_first_topic, breadth_first_topic = self.get_paths_for_point(point)
-                message = [value, self.meta_data[point]]
+                message = [value, meta_data.get(point, {})]
 
                 if self.publish_depth_first:
                     self._publish_wrapper(depth_first_topic,
@@ -268,7 +323,9 @@ class DriverAgent(BasicAgent):
                                           headers=headers,
                                           message=message)
 
-        message = [results, self.meta_data]
+        if self.publish_depth_first_all or self.publish_breadth_first_all:
+            headers, message = self._all_message(headers, results, meta_data, snapshot)
+
         if self.publish_depth_first_all:
             self._publish_wrapper(self.all_path_depth,
                                   headers=headers,
@@ -281,7 +338,44 @@ class DriverAgent(BasicAgent):
 
         self.parent.scrape_ending(self.device_name)
 
+    def _all_message(self, headers, results, meta_data, include_schema=False):
+        """Headers and message of an all publish, compact encoded if configured for the device."""
+        if self.compact_encoder is None:
+            return headers, [results, meta_data]
+        headers = dict(headers)
+        headers[headers_mod.CONTENT_TYPE] = COMPACT_CONTENT_TYPE
+        return headers, self.compact_encoder.encode(results, self.meta_data, include_schema=include_schema)
+
+    def get_compact_schema(self, schema_id):
+        """Point names and metadata of the compact encoding schema, None if schema_id is not the current one."""
+        if self.compact_encoder is None or self.compact_encoder.schema_id != schema_id:
+            return None
+        return self.compact_encoder.schema
+
+    def _record_scrape(self, pool_wait, latency):
+        stats = self.scrape_statistics
+        stats["scrapes"] += 1
+        stats["last_pool_wait"] = pool_wait
+        stats["last_latency"] = latency
+        if stats["average_latency"] is None:
+            stats["average_latency"] = latency
+            stats["max_latency"] = latency
+        else:
+            stats["average_latency"] += (latency - stats["average_latency"]) / stats["scrapes"]
+            stats["max_latency"] = max(stats["max_latency"], latency)
+        stats["last_scrape"] = utils.format_timestamp(utils.get_aware_utc_now())
+
+    def get_scrape_statistics(self):
+        """Scrape counts and latencies in seconds of this device. The latency is the
+        time spent in the interface's scrape_all, pool wait is the time spent waiting
+        for a slot in the scrape pool of the interface type."""
+        return dict(self.scrape_statistics, driver_type=self.driver_type)
+
     def _publish_wrapper(self, topic, headers, message):
+        pipeline = getattr(self.parent, "publish_pipeline", None)
+        if pipeline is not None:
+            pipeline.publish(self.vip.pubsub, topic, headers, message)
+            return
         while True:
             try:
                 with publish_lock():
@@ -383,7 +477,7 @@ class DriverAgent(BasicAgent):
         for point, value in point_values.items():
             results = {point_name: value}
             meta = {point_name: self.meta_data[point_name]}
-            all_message = [results, meta]
+            all_headers, all_message = self._all_message(headers, results, meta)
             individual_point_message = [value, self.meta_data[point_name]]
 
             depth_first_topic, breadth_first_topic = self.get_paths_for_point(
@@ -401,10 +495,10 @@ class DriverAgent(BasicAgent):
 
             if self.publish_depth_first_all:
                 self._publish_wrapper(self.all_path_depth,
-                                      headers=headers,
+                                      headers=all_headers,
                                       message=all_message)
 
             if self.publish_breadth_first_all:
                 self._publish_wrapper(self.all_path_breadth,
-                                      headers=headers,
+                                      headers=all_headers,
                                       message=all_message)
@@ -68,3 +68,51 @@ def publish_lock():
         yield
     finally:
         _publish_lock.release()
+
+_scrape_pool_sizes = None
+_default_scrape_pool_size = 0
+_scrape_pools = {}
+
+def configure_scrape_pools(pool_sizes=None, default_pool_size=0):
+    """Limit the number of concurrent scrapes per interface type.
+
+    pool_sizes maps a driver_type to the number of devices of that type
+    that may be scraped at the same time. Types that are not listed use
+    default_pool_size. A size below 1 does not limit scrapes."""
+    global _scrape_pool_sizes, _default_scrape_pool_size
+    if _scrape_pool_sizes is not None:
+        raise RuntimeError("scrape pools already configured!")
+    _scrape_pool_sizes = {driver_type: int(size) for driver_type, size in (pool_sizes or {}).items()}
+    _default_scrape_pool_size = int(default_pool_size or 0)
+
+def _get_scrape_pool(driver_type):
+    try:
+        return _scrape_pools[driver_type]
+    except KeyError:
+        size = (_scrape_pool_sizes or {}).get(driver_type, _default_scrape_pool_size)
+        if size < 1:
+            pool = (None, DummySemaphore())
+        else:
+            pool = (size, BoundedSemaphore(size))
+        _scrape_pools[driver_type] = pool
+        return pool
+
+@contextmanager
+def scrape_lock(driver_type):
+    """Hold one of the scrape slots of driver_type. Scrapes are not limited
+    until configure_scrape_pools is called."""
+    _, semaphore = _get_scrape_pool(driver_type)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+def scrape_pool_status():
+    """Size and number of slots in use of every scrape pool that has been used.
+    Unlimited pools have a size of None."""
+    status = {}
+    for driver_type, (size, semaphore) in _scrape_pools.items():
+        status[driver_type] = {"size": size,
+                               "in_use": None if size is None else size - semaphore.counter}
+    return status
@@ -30,19 +30,26 @@ monkey.patch_socket()
 
 from pymodbus.client.sync import ModbusTcpClient as SyncModbusClient
 from pymodbus.exceptions import ConnectionException, ModbusIOException, ModbusException
-from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
 from pymodbus.constants import Defaults
 
-from contextlib import contextmanager, closing
+from contextlib import contextmanager
 
+from platform_driver.connection_pool import get_connection_pool
 from platform_driver.driver_locks import socket_lock
+from platform_driver.modbus_blocks import BlockPlanner
 from platform_driver.interfaces import BaseInterface, BaseRegister, BasicRevert, DriverInterfaceError
 from volttron.platform.agent import utils
 
 @contextmanager
 def modbus_client(address, port):
+    """Use the pooled connection to the gateway at address and port. Requests of
+    all slave ids behind the gateway share the connection one at a time, and the
+    connection is closed if a request raises. The socket lock is taken first so
+    the pool never has more clients in use than max_open_sockets allows."""
+    pool = get_connection_pool("modbus", SyncModbusClient, is_open=SyncModbusClient.is_socket_open)
     with socket_lock():
-        with closing(SyncModbusClient(address, port)) as client:
+        with pool.connection(address, port) as client:
             yield client
 
 
@@ -61,6 +68,13 @@ class ModbusInterfaceException(ModbusException):
     pass
 
 
+class ModbusIllegalAddressException(ModbusInterfaceException):
+    """The device refused to read the addresses of block."""
+    def __init__(self, block, response):
+        super(ModbusIllegalAddressException, self).__init__(str(response))
+        self.block = block
+
+
 class ModbusRegisterBase(BaseRegister):
     def __init__(self, address, register_type, read_only, pointName, units, description='', slave_id=0):
         super(ModbusRegisterBase, self).__init__(register_type, read_only, pointName, units, description=description)
@@ -184,6 +198,9 @@ class Interface(BasicRevert, BaseInterface):
         self.slave_id = config_dict.get("slave_id", 0)
         self.ip_address = config_dict["device_address"]
         self.port = config_dict.get("port", Defaults.Port)
+        self.configure_planners(max_gap=int(config_dict.get("max_register_gap", 0)),
+                                max_registers=int(config_dict.get("max_read_registers", MODBUS_READ_MAX)),
+                                max_bits=int(config_dict.get("max_read_bits", MODBUS_READ_MAX)))
         self.parse_config(registry_config_str)
 
     def build_ranges_map(self):
@@ -191,6 +208,14 @@ class Interface(BasicRevert, BaseInterface):
                                 ('byte', False): [],
                                 ('bit', True): [],
                                 ('bit', False): []}
+        self.register_blocks = {key: [] for key in self.register_ranges}
+        self.configure_planners()
+
+    def configure_planners(self, max_gap=0, max_registers=MODBUS_READ_MAX, max_bits=MODBUS_READ_MAX):
+        self.planners = {('byte', True): BlockPlanner(max_registers, max_gap),
+                         ('byte', False): BlockPlanner(max_registers, max_gap),
+                         ('bit', True): BlockPlanner(max_bits, max_gap),
+                         ('bit', False): BlockPlanner(max_bits, max_gap)}
 
     def insert_register(self, register):
         super(Interface, self).insert_register(register)
@@ -201,39 +226,22 @@ class Interface(BasicRevert, BaseInterface):
         register_count = register.get_register_count()
 
         # Store the range of registers for each point.
-        start, end = register.address, register.address + register_count - 1
-        register_range.append([start, end, [register]])
+        register_range.append((register.address, register_count, register))
 
     def merge_register_ranges(self):
         """
-        Merges any adjacent registers for more efficient scraping. May only be called after all registers have been
-        inserted."""
-        for key, register_ranges in self.register_ranges.items():
-            if not register_ranges:
-                continue
-            register_ranges.sort()
-            result = []
-            current = register_ranges[0]
-            for register_range in register_ranges[1:]:
-                if register_range[0] > current[1] + 1:
-                    result.append(current)
-                    current = register_range
-                    continue
-
-                current[1] = register_range[1]
-                current[2].extend(register_range[2])
-
-            result.append(current)
-
-            self.register_ranges[key] = result
+        Plans the blocks read by a scrape, joining registers that are adjacent or separated by at most
+        max_register_gap addresses. May only be called after all registers have been inserted."""
+        for key, planner in self.planners.items():
+            self.register_blocks[key] = planner.plan(self.register_ranges[key])
 
     def get_point(self, point_name):
         register = self.get_register_by_name(point_name)
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
+        try:
+            with modbus_client(self.ip_address, self.port) as client:
                 result = register.get_state(client)
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException):
-                result = None
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException):
+            result = None
         return result
 
     def _set_point(self, point_name, value):
@@ -241,82 +249,83 @@ class Interface(BasicRevert, BaseInterface):
         if register.read_only:
             raise  IOError("Trying to write to a point configured read only: "+point_name)
 
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
+        try:
+            with modbus_client(self.ip_address, self.port) as client:
                 result = register.set_state(client, value)
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException) as ex:
-                raise IOError("Error encountered trying to write to point {}: {}".format(point_name, ex))
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException) as ex:
+            raise IOError("Error encountered trying to write to point {}: {}".format(point_name, ex))
         return result
 
-    def scrape_byte_registers(self, client, read_only):
-        result_dict = {}
-        register_ranges = self.register_ranges[('byte', read_only)]
-
-        read_func = client.read_input_registers if read_only else client.read_holding_registers
-
-        for register_range in register_ranges:
-            start, end, registers = register_range
-            result = b''
-
-            for group in range(start, end + 1, MODBUS_READ_MAX):
-                count = min(end - group + 1, MODBUS_READ_MAX)
-                response = read_func(group, count, unit=self.slave_id)
-                if response is None:
-                    raise ModbusInterfaceException("pymodbus returned None")
-                if isinstance(response, ModbusException):
-                    raise response
-                response_bytes = response.encode()
-                # Trim off length byte.
-                result += response_bytes[1:]
-
-            for register in registers:
-                point = register.point_name
-                value = register.parse_value(start, result)
-                result_dict[point] = value
-
-        return result_dict
-
-    def scrape_bit_registers(self, client, read_only):
-        result_dict = {}
-        register_ranges = self.register_ranges[('bit', read_only)]
+    def check_response(self, response, block):
+        if response is None:
+            raise ModbusInterfaceException("pymodbus returned None")
+        if isinstance(response, ModbusException):
+            raise response
+        if isinstance(response, ExceptionResponse):
+            if response.exception_code == ModbusExceptions.IllegalAddress:
+                raise ModbusIllegalAddressException(block, response)
+            raise ModbusInterfaceException(str(response))
+
+    def read_byte_block(self, read_func, block, max_count):
+        # Responses are copied into one buffer instead of concatenating bytes.
+        buffer = bytearray(block.count * MODBUS_REGISTER_SIZE)
+        for offset in range(0, block.count, max_count):
+            count = min(block.count - offset, max_count)
+            response = read_func(block.start + offset, count, unit=self.slave_id)
+            self.check_response(response, block)
+            struct.pack_into('>{}H'.format(count), buffer, offset * MODBUS_REGISTER_SIZE, *response.registers[:count])
+        return memoryview(buffer)
+
+    def read_bit_block(self, read_func, block, max_count):
+        result = [False] * block.count
+        for offset in range(0, block.count, max_count):
+            count = min(block.count - offset, max_count)
+            response = read_func(block.start + offset, count, unit=self.slave_id)
+            self.check_response(response, block)
+            result[offset:offset + count] = response.bits[:count]
+        return result
 
-        for register_range in register_ranges:
-            start, end, registers = register_range
-            if not registers:
+    def scrape_blocks(self, key, read_block):
+        """Read every block of key with read_block. Blocks refused by the device because they bridge unimplemented
+        addresses are planned again without those addresses."""
+        planner = self.planners[key]
+        while True:
+            result_dict = {}
+            try:
+                for block in self.register_blocks[key]:
+                    data = read_block(block, planner.max_count)
+                    for register in block.items:
+                        result_dict[register.point_name] = register.parse_value(block.start, data)
                 return result_dict
+            except ModbusIllegalAddressException as e:
+                if not planner.learn_holes(e.block):
+                    raise
+                _log.info("Device at {}:{} ID: {} refused to read {}, no longer reading addresses {}".format(
+                    self.ip_address, self.port, self.slave_id, e.block, e.block.gaps))
+                self.register_blocks[key] = planner.plan(self.register_ranges[key])
 
-            result = []
-
-            for group in range(start, end + 1, MODBUS_READ_MAX):
-                count = min(end - group + 1, MODBUS_READ_MAX)
-                response = client.read_discrete_inputs(group, count, unit=self.slave_id) if read_only else \
-                    client.read_coils(group, count, unit=self.slave_id)
-                if response is None:
-                    raise ModbusInterfaceException("pymodbus returned None")
-                if isinstance(response, ModbusException):
-                    raise response
-                result += response.bits
-
-            for register in registers:
-                point = register.point_name
-                value = register.parse_value(start, result)
-                result_dict[point] = value
+    def scrape_byte_registers(self, client, read_only):
+        read_func = client.read_input_registers if read_only else client.read_holding_registers
+        return self.scrape_blocks(('byte', read_only),
+                                  lambda block, max_count: self.read_byte_block(read_func, block, max_count))
 
-        return result_dict
+    def scrape_bit_registers(self, client, read_only):
+        read_func = client.read_discrete_inputs if read_only else client.read_coils
+        return self.scrape_blocks(('bit', read_only),
+                                  lambda block, max_count: self.read_bit_block(read_func, block, max_count))
 
     def _scrape_all(self):
         result_dict = {}
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
-
+        try:
+            with modbus_client(self.ip_address, self.port) as client:
                 result_dict.update(self.scrape_byte_registers(client, True))
                 result_dict.update(self.scrape_byte_registers(client, False))
 
                 result_dict.update(self.scrape_bit_registers(client, True))
                 result_dict.update(self.scrape_bit_registers(client, False))
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException) as e:
-                raise DriverInterfaceError("Failed to scrape device at " + self.ip_address + ":" + str(self.port) +
-                                           " ID: " + str(self.slave_id) + str(e))
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException) as e:
+            raise DriverInterfaceError("Failed to scrape device at " + self.ip_address + ":" + str(self.port) +
+                                       " ID: " + str(self.slave_id) + str(e))
 
         return result_dict
 
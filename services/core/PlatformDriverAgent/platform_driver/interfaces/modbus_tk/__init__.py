@@ -26,6 +26,7 @@ from gevent import monkey
 from volttron.platform.agent import utils
 from platform_driver.interfaces import BaseRegister, BaseInterface, BasicRevert
 from platform_driver.interfaces.modbus_tk import helpers
+from platform_driver.interfaces.modbus_tk.client import MAX_REQUEST_COUNT
 from platform_driver.interfaces.modbus_tk.maps import Map
 
 import logging
@@ -50,7 +51,8 @@ parity_map = dict(
 )
 
 config_keys = ["name", "device_type", "device_address", "port", "slave_id", "baudrate", "bytesize", "parity",
-               "stopbits", "xonxoff", "addressing", "endian", "write_multiple_registers", "register_map"]
+               "stopbits", "xonxoff", "addressing", "endian", "write_multiple_registers", "register_map",
+               "max_register_gap", "max_read_registers"]
 
 register_map_columns = ["register name", "address", "type", "units", "writable", "default value", "transform", "table",
                         "mixed endian", "description"]
@@ -251,6 +253,8 @@ class Interface(BasicRevert, BaseInterface):
         addressing = config_dict.get('addressing', helpers.OFFSET).lower()
         endian = config_dict.get('endian', 'big')
         write_single_values = not helpers.str2bool(str(config_dict.get('write_multiple_registers', "True")))
+        max_register_gap = int(config_dict.get('max_register_gap', 0))
+        max_read_registers = int(config_dict.get('max_read_registers', MAX_REQUEST_COUNT))
 
         # Convert original modbus csv config format to the new modbus_tk registry_config_lst
         if registry_config_lst and 'point address' in registry_config_lst[0]:
@@ -301,7 +305,9 @@ class Interface(BasicRevert, BaseInterface):
         self.modbus_client = modbus_client_class(device_address=device_address,
                                                  port=port,
                                                  slave_address=slave_address,
-                                                 write_single_values=write_single_values)
+                                                 write_single_values=write_single_values,
+                                                 max_register_gap=max_register_gap,
+                                                 max_read_registers=max_read_registers)
 
         # Set modbus client transport based on device configure
         if port:
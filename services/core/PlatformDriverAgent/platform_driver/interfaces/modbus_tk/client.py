@@ -56,12 +56,17 @@ import math
 import modbus_tk.defines as modbus_constants
 import modbus_tk.modbus_tcp as modbus_tcp
 import modbus_tk.modbus_rtu as modbus_rtu
+
+from platform_driver.modbus_blocks import BlockPlanner
 from modbus_tk.exceptions import ModbusError
 
 from . import helpers
 
 logger = logging.getLogger(__name__)
 
+# Registers read by one request at most.
+MAX_REQUEST_COUNT = 123
+
 # In cache representation of modbus field.
 Datum = collections.namedtuple('Datum', ('value', 'timestamp'))
 
@@ -332,6 +337,7 @@ class Request:
         self._count = 0
         self._data_format = first_field.byte_order or data_format
         self._fields = list()
+        self._gaps = list()
 
         self.add_field(first_field)
 
@@ -378,6 +384,11 @@ class Request:
     def table(self):
         return self._table
 
+    @property
+    def gaps(self):
+        """(start, end) address ranges read only to join the fields around them."""
+        return self._gaps
+
     @property
     def read_function_code(self):
         """Returns a modbus read function code appropriate for the table."""
@@ -428,6 +439,19 @@ class Request:
            field.length == 1 and not field.byte_order and \
            not field.is_struct_format
 
+    @staticmethod
+    def field_count(field):
+        """Number of registers or coils of field"""
+        return math.ceil(struct.calcsize(field.format_string) / 2.0)
+
+    def add_gap(self, count):
+        """Read count unused registers or coils before the next field"""
+        self._gaps.append((self._next_address, self._next_address + count))
+        if self._table not in (helpers.COIL_READ_ONLY, helpers.COIL_READ_WRITE):
+            self._data_format += '{}x'.format(count * 2)
+        self._count += count
+        self._next_address += count
+
     def add_field(self, field):
         """Add field to request if it is compatible and contiguous
         otherwise raise
@@ -467,6 +491,9 @@ class Request:
                 if type(results) is list or type(results) is tuple:
                     if len(results) > 1:
                         results = (results,)
+            # Coils are not formatted, skip the coils of the gaps.
+            elif self._gaps and self._table in (helpers.COIL_READ_ONLY, helpers.COIL_READ_WRITE):
+                results = [results[field.address - self._address] for field in self.fields]
             # Everything else))
             field_values = collections.OrderedDict(
                 [(field, Datum(value, now)) for field, value in six.moves.zip(self.fields, results)]
@@ -474,7 +501,7 @@ class Request:
         return field_values
 
     @classmethod
-    def compile_requests(cls, fields, byte_order):
+    def compile_requests(cls, fields, byte_order, planners=None):
         """
 
         Creates a set of Modbus requests for the fields provided.  The fields
@@ -485,6 +512,8 @@ class Request:
 
         :param fields: List of fields sorted by address.
         :param byte_order: Byte order of the modbus slave.
+        :param planners: Dictionary of the BlockPlanner of each table. Tables
+            without a planner join adjacent fields only, which writes require.
         :return: List of Requests
         """
         requests = list()
@@ -494,20 +523,33 @@ class Request:
 
         fields.sort(key=lambda f: f.table * 100000 + f.address)
 
-        # Set up the initial request before starting the loop
-        current_request = None
-
+        tables = collections.OrderedDict()
         for f in fields:
-            # Decide if we need to start a new request
+            tables.setdefault(f.table, list()).append(f)
 
-            if current_request is None or not current_request.able_to_add(f):
-                current_request = Request(f, data_format=byte_order)
-                requests.append(current_request)
-                if f.is_struct_format or f.is_array_field:
-                    current_request = None
-            else:
-                current_request.add_field(f)
+        for table, table_fields in tables.items():
+            planner = planners[table] if planners is not None else BlockPlanner(MAX_REQUEST_COUNT)
 
+            # Arrays, structs and fields with their own byte order are requested on their own.
+            spans = list()
+            for f in table_fields:
+                if f.length == 1 and not f.byte_order and not f.is_struct_format:
+                    spans.append((f.address, cls.field_count(f), f))
+                else:
+                    requests.append(Request(f, data_format=byte_order))
+
+            for block in planner.plan(spans):
+                current_request = None
+                for f in block.items:
+                    if current_request is None or f.address < current_request._next_address:
+                        current_request = Request(f, data_format=byte_order)
+                        requests.append(current_request)
+                        continue
+                    if f.address > current_request._next_address:
+                        current_request.add_gap(f.address - current_request._next_address)
+                    current_request.add_field(f)
+
+        requests.sort(key=lambda r: r.table * 100000 + r.address)
         return requests
 
 
@@ -581,6 +623,17 @@ class Client:
         # Some modbus clients do not support the WRITE_MULTIPLE_REGISTERS function call.
         self._write_single_values = kwargs.pop('write_single_values', False)
 
+        # Reads may join fields across unused registers or coils, learning which of them the slave refuses.
+        max_register_gap = int(kwargs.pop('max_register_gap', 0))
+        max_read_registers = int(kwargs.pop('max_read_registers', MAX_REQUEST_COUNT))
+        if max_register_gap or max_read_registers != MAX_REQUEST_COUNT:
+            self._planners = collections.defaultdict(lambda: BlockPlanner(max_read_registers, max_register_gap))
+            self._compile_read_requests()
+        else:
+            self._planners = None
+            self._requests = self.__meta[helpers.META_REQUESTS]
+            self._request_map = self.__meta[helpers.META_REQUEST_MAP]
+
         baud = kwargs.pop('baudrate', 19200)
         bytesize = kwargs.pop('bytesize', 8)
         parity = kwargs.pop('parity', 'N')
@@ -634,7 +687,30 @@ class Client:
         return bool(self._pending_writes)
 
     def requests(self):
-        return self.__meta[helpers.META_REQUESTS]
+        return self._requests
+
+    def _compile_read_requests(self):
+        self._requests = Request.compile_requests(list(self.__meta[helpers.META_FIELDS]), self.byte_order,
+                                                  self._planners)
+        self._request_map = {field: request for request in self._requests for field in request.fields}
+
+    def _split_request(self, request):
+        """Read the fields of a request refused by the slave without the unused addresses it bridged.
+
+        :return: False if the request did not bridge unused addresses.
+        """
+        if self._planners is None or not self._planners[request.table].learn_holes(request):
+            return False
+        logger.info("Slave refused request %s, no longer reading addresses %s", request, request.gaps)
+        self._compile_read_requests()
+        replacements = list()
+        for field in request.fields:
+            replacement = self._request_map[field]
+            if replacement not in replacements:
+                replacements.append(replacement)
+        for replacement in replacements:
+            self.read_request(replacement)
+        return True
 
     def fields(self):
         return self.__meta[helpers.META_FIELDS]
@@ -654,7 +730,7 @@ class Client:
         return self._write_single_values
 
     def get_request(self, field):
-        return self.__meta[helpers.META_REQUEST_MAP].get(field, None)
+        return self._request_map.get(field, None)
 
     def read_request(self, request):
         logger.debug("Requesting: %s", request)
@@ -671,12 +747,14 @@ class Client:
         except (AttributeError, ModbusError) as err:
             if isinstance(err, ModbusError):
                 code = err.get_exception_code()
+                if code == modbus_constants.ILLEGAL_DATA_ADDRESS and self._split_request(request):
+                    return
                 raise Exception(f'{err.args[0]}, {helpers.TABLE_EXCEPTION_CODE.get(code, "UNDEFINED")}')
 
             logger.warning("modbus read_all() failure on request: %s\tError: %s", request, err)
 
     def read_all(self):
-        requests = self.__meta[helpers.META_REQUESTS]
+        requests = self._requests
         self._data.clear()
         for r in requests:
             self.read_request(r)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+from operator import itemgetter
+
+
+class ReadBlock(object):
+    """Addresses read from a Modbus table with one request.
+
+    :ivar start: first address of the block.
+    :ivar count: number of registers or coils in the block.
+    :ivar items: items of the spans covered by the block, by address.
+    :ivar gaps: (start, end) address ranges read only to avoid a request.
+    """
+    __slots__ = ('start', 'count', 'items', 'gaps')
+
+    def __init__(self, start, count, item):
+        self.start = start
+        self.count = count
+        self.items = [item]
+        self.gaps = []
+
+    @property
+    def end(self):
+        return self.start + self.count
+
+    def __repr__(self):
+        return 'ReadBlock({}, {}, gaps={})'.format(self.start, self.count, self.gaps)
+
+
+class BlockPlanner(object):
+    """Groups the registers or coils of one Modbus table into read requests.
+
+    Spans closer than max_gap addresses are read together, which reads the
+    addresses between them and throws them away, as long as the block is
+    not longer than max_count. A device may refuse to read addresses it
+    does not implement; learn_holes records the gaps of a refused block so
+    that they are never bridged again.
+
+    :param max_count: registers or coils read by one request at most.
+    :param max_gap: unused addresses read to join two spans at most.
+    """
+
+    def __init__(self, max_count, max_gap=0):
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        self.max_count = int(max_count)
+        self.max_gap = max(int(max_gap), 0)
+        self.holes = []
+
+    def _is_hole(self, start, end):
+        return any(hole_start < end and start < hole_end for hole_start, hole_end in self.holes)
+
+    def plan(self, spans):
+        """
+        Return the blocks to read to cover spans, ordered by address.
+
+        :param spans: (start, count, item) of every register or coil. Spans
+            may overlap.
+        :returns: list of ReadBlock.
+        """
+        blocks = []
+        current = None
+        current_end = 0
+        for start, count, item in sorted(spans, key=itemgetter(0, 1)):
+            end = start + count
+            if current is not None:
+                gap = start - current_end
+                block_end = max(current_end, end)
+                if (block_end - current.start <= self.max_count and
+                        (gap <= 0 or (gap <= self.max_gap and not self._is_hole(current_end, start)))):
+                    if gap > 0:
+                        current.gaps.append((current_end, start))
+                    current.items.append(item)
+                    current.count = block_end - current.start
+                    current_end = block_end
+                    continue
+            current = ReadBlock(start, count, item)
+            current_end = end
+            blocks.append(current)
+        return blocks
+
+    def learn_holes(self, block):
+        """
+        Record that the device refused to read block.
+
+        :returns: True if block bridged gaps that are now avoided and the
+            spans should be planned again, False if the refused addresses
+            are the spans themselves.
+        """
+        if not block.gaps:
+            return False
+        self.holes.extend(block.gaps)
+        return True
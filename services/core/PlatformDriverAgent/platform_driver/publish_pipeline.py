@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import time
+from collections import OrderedDict
+
+import gevent
+from gevent.lock import BoundedSemaphore
+
+from volttron.platform.agent import utils
+from volttron.platform.vip.agent.errors import Again
+
+utils.setup_logging()
+_log = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """Rate limiter that only engages once the message bus pushed back.
+
+    The bucket starts unlimited. Every EAGAIN halves the rate, starting from
+    the measured publish rate, and every acknowledged publish raises it
+    again slowly. After recovery_period seconds without an EAGAIN the limit
+    is lifted."""
+
+    def __init__(self, min_rate=10.0, increase=1.001, recovery_period=10.0):
+        self.min_rate = float(min_rate)
+        self.increase = float(increase)
+        self.recovery_period = float(recovery_period)
+        self.rate = None
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._last_again = None
+
+    def take(self):
+        if self.rate is None:
+            return
+        now = time.monotonic()
+        if now - self._last_again > self.recovery_period:
+            _log.info("Publish rate limit lifted.")
+            self.rate = None
+            return
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens < 1.0:
+            gevent.sleep((1.0 - self._tokens) / self.rate)
+            self._last = time.monotonic()
+            self._tokens = 1.0
+        self._tokens -= 1.0
+
+    def again(self, current_rate):
+        self._last_again = time.monotonic()
+        if self.rate is None:
+            self._last = self._last_again
+            self._tokens = 0.0
+            self.rate = max(self.min_rate, current_rate)
+        self.rate = max(self.min_rate, self.rate / 2.0)
+        _log.warning("Message bus is busy, limiting driver publishes to {:.1f}/s".format(self.rate))
+
+    def acknowledged(self):
+        if self.rate is not None:
+            self.rate *= self.increase
+
+
+class PublishPipeline(object):
+    """Publishes without waiting for each acknowledgement.
+
+    Up to max_in_flight publishes may be unacknowledged at a time, a publish
+    beyond that waits for a free slot. Acknowledgements are collected as they
+    arrive. A publish rejected with Again is retried through the token bucket
+    up to max_retries times and then dropped. A publish that is not
+    acknowledged within ack_timeout seconds frees its slot and is counted as
+    timed out."""
+
+    def __init__(self, max_in_flight=1000, ack_timeout=10.0, max_retries=5, min_rate=10.0):
+        if int(max_in_flight) < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = int(max_in_flight)
+        self.ack_timeout = float(ack_timeout)
+        self.max_retries = int(max_retries)
+        self.bucket = TokenBucket(min_rate)
+        self._window = BoundedSemaphore(self.max_in_flight)
+        self._in_flight = OrderedDict()
+        self.counters = {"published": 0,
+                         "acknowledged": 0,
+                         "retried": 0,
+                         "dropped": 0,
+                         "failed": 0,
+                         "timed_out": 0}
+        self._rate_start = time.monotonic()
+        self._rate_count = 0
+        self._ack_rate = 0.0
+        self._report_time = time.monotonic()
+        self._report_counters = dict(self.counters)
+
+    def publish(self, pubsub, topic, headers, message, attempt=0):
+        self.bucket.take()
+        while not self._window.acquire(timeout=self._time_to_expiry()):
+            self._expire()
+        try:
+            result = pubsub.publish('pubsub', topic, headers=headers, message=message)
+        except Again:
+            self._window.release()
+            self._busy(pubsub, topic, headers, message, attempt)
+            return
+        self._in_flight[result] = (time.monotonic() + self.ack_timeout, pubsub, topic, headers, message, attempt)
+        self.counters["published"] += 1
+        result.rawlink(self._acknowledged)
+
+    def _time_to_expiry(self):
+        for deadline, *_ in self._in_flight.values():
+            return max(0.0, deadline - time.monotonic())
+        return None
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._in_flight:
+            result, entry = next(iter(self._in_flight.items()))
+            if entry[0] > now:
+                break
+            del self._in_flight[result]
+            self._window.release()
+            self.counters["timed_out"] += 1
+            _log.warning("Did not receive confirmation of publish to " + entry[2])
+
+    def _acknowledged(self, result):
+        entry = self._in_flight.pop(result, None)
+        if entry is None:
+            # Already counted as timed out.
+            return
+        self._window.release()
+        _, pubsub, topic, headers, message, attempt = entry
+        if result.successful():
+            self.counters["acknowledged"] += 1
+            self._count_ack()
+            self.bucket.acknowledged()
+        elif isinstance(result.exception, Again):
+            self._busy(pubsub, topic, headers, message, attempt)
+        else:
+            self.counters["failed"] += 1
+            _log.warning("driver failed to publish " + topic + ": " + str(result.exception))
+
+    def _busy(self, pubsub, topic, headers, message, attempt):
+        self.bucket.again(self._ack_rate)
+        if attempt < self.max_retries:
+            self.counters["retried"] += 1
+            gevent.spawn(self.publish, pubsub, topic, headers, message, attempt + 1)
+        else:
+            self.counters["dropped"] += 1
+            _log.warning("Dropped publish to {} after {} retries, pubsub is busy".format(topic, attempt))
+
+    def _count_ack(self):
+        self._rate_count += 1
+        now = time.monotonic()
+        if now - self._rate_start >= 1.0:
+            self._ack_rate = self._rate_count / (now - self._rate_start)
+            self._rate_start = now
+            self._rate_count = 0
+
+    def get_statistics(self, reset=True):
+        """Counters since start, the publish rates since the previous report and the current state.
+        The report window only restarts when reset is True."""
+        self._expire()
+        now = time.monotonic()
+        elapsed = max(now - self._report_time, 1e-9)
+        statistics = dict(self.counters)
+        statistics["in_flight"] = len(self._in_flight)
+        statistics["max_in_flight"] = self.max_in_flight
+        statistics["rate_limit"] = self.bucket.rate
+        statistics["published_per_second"] = \
+            (self.counters["published"] - self._report_counters["published"]) / elapsed
+        statistics["acknowledged_per_second"] = \
+            (self.counters["acknowledged"] - self._report_counters["acknowledged"]) / elapsed
+        statistics["dropped_since_last_report"] = \
+            sum(self.counters[key] - self._report_counters[key] for key in ("dropped", "failed", "timed_out"))
+        if reset:
+            self._report_time = now
+            self._report_counters = dict(self.counters)
+        return statistics
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import pytest
+
+from platform_driver.change_filter import ChangeFilter
+
+META = {"temp": {"units": "degF", "type": "float", "tz": ""},
+        "fan": {"units": "On/Off", "type": "boolean", "tz": ""}}
+
+
+@pytest.mark.driver_unit
+def test_first_scrape_is_a_full_snapshot():
+    change_filter = ChangeFilter(snapshot_interval=0)
+
+    values, meta, snapshot = change_filter.filter({"temp": 70.0, "fan": True}, META, 0.0)
+
+    assert snapshot
+    assert values == {"temp": 70.0, "fan": True}
+    assert meta == META
+
+
+@pytest.mark.driver_unit
+def test_only_changes_outside_deadband_are_published():
+    change_filter = ChangeFilter(deadband=0.5, max_silence=0, snapshot_interval=0)
+    change_filter.filter({"temp": 70.0, "fan": True}, META, 0.0)
+
+    assert change_filter.filter({"temp": 70.4, "fan": True}, META, 60.0) == ({}, {}, False)
+    # The deadband is measured from the last published value, slow drift is still reported.
+    assert change_filter.filter({"temp": 70.6, "fan": True}, META, 120.0) == ({"temp": 70.6}, {}, False)
+    assert change_filter.filter({"temp": 70.6, "fan": False}, META, 180.0) == ({"fan": False}, {}, False)
+
+
+@pytest.mark.driver_unit
+def test_per_point_deadbands_and_points():
+    change_filter = ChangeFilter(points=["temp"], deadbands={"temp": 2.0}, max_silence=0, snapshot_interval=0)
+    change_filter.filter({"temp": 70.0, "fan": True}, META, 0.0)
+
+    values, _, _ = change_filter.filter({"temp": 71.0, "fan": True}, META, 60.0)
+
+    assert values == {"fan": True}
+
+
+@pytest.mark.driver_unit
+def test_heartbeat_and_snapshot():
+    change_filter = ChangeFilter(max_silence=300, snapshot_interval=900)
+    change_filter.filter({"temp": 70.0, "fan": True}, META, 0.0)
+    change_filter.filter({"temp": 71.0, "fan": True}, META, 120.0)
+
+    # Only fan was silent for max_silence.
+    assert change_filter.filter({"temp": 71.0, "fan": True}, META, 300.0) == ({"fan": True}, {}, False)
+
+    values, meta, snapshot = change_filter.filter({"temp": 71.0, "fan": True}, META, 900.0)
+    assert snapshot
+    assert values == {"temp": 71.0, "fan": True}
+    assert meta == META
+
+
+@pytest.mark.driver_unit
+def test_changed_metadata_is_published():
+    change_filter = ChangeFilter(snapshot_interval=0)
+    change_filter.filter({"temp": 70.0}, META, 0.0)
+    new_meta = dict(META, temp=dict(META["temp"], units="degC"))
+
+    values, meta, _ = change_filter.filter({"temp": 21.0}, new_meta, 60.0)
+
+    assert values == {"temp": 21.0}
+    assert meta == {"temp": new_meta["temp"]}
+
+
+@pytest.mark.driver_unit
+def test_from_config():
+    assert ChangeFilter.from_config({}) is None
+
+    change_filter = ChangeFilter.from_config({"publish_on_change": ["temp"],
+                                              "change_deadband": 0.1,
+                                              "max_publish_silence": 600})
+    assert change_filter.points == frozenset(["temp"])
+    assert change_filter.deadband == 0.1
+    assert change_filter.max_silence == 600.0
+
+    with pytest.raises(ValueError):
+        ChangeFilter.from_config({"publish_on_change": True, "change_deadband": -1})
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gevent
+import pytest
+
+from platform_driver.connection_pool import ConnectionPool
+
+
+class FakeClient(object):
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.open = True
+
+    def close(self):
+        self.open = False
+
+
+@pytest.mark.driver_unit
+def test_connection_reused_per_gateway():
+    pool = ConnectionPool(FakeClient, idle_timeout=60)
+
+    with pool.connection("10.0.0.1", 502) as first:
+        pass
+    with pool.connection("10.0.0.1", 502) as second:
+        pass
+    with pool.connection("10.0.0.2", 502) as other:
+        pass
+
+    assert first is second
+    assert first.open
+    assert other is not first
+    statistics = pool.get_statistics()
+    assert statistics["opened"] == 2
+    assert statistics["reused"] == 1
+    assert statistics["open"] == 2
+
+
+@pytest.mark.driver_unit
+def test_connection_closed_on_error():
+    pool = ConnectionPool(FakeClient, idle_timeout=60)
+
+    with pytest.raises(IOError):
+        with pool.connection("10.0.0.1", 502) as client:
+            raise IOError("connection reset")
+
+    assert not client.open
+    with pool.connection("10.0.0.1", 502) as replacement:
+        pass
+    assert replacement is not client
+    assert pool.get_statistics()["closed_error"] == 1
+
+
+@pytest.mark.driver_unit
+def test_connection_health_check_and_idle_timeout():
+    pool = ConnectionPool(FakeClient, idle_timeout=60, is_open=lambda client: client.open)
+
+    with pool.connection("10.0.0.1", 502) as client:
+        pass
+    client.open = False
+    with pool.connection("10.0.0.1", 502) as reopened:
+        pass
+    assert reopened is not client
+
+    pool.idle_timeout = 0.01
+    gevent.sleep(0.02)
+    pool.close_idle()
+    assert not reopened.open
+    statistics = pool.get_statistics()
+    assert statistics["closed_idle"] == 1
+    assert statistics["open"] == 0
+
+
+@pytest.mark.driver_unit
+def test_gateway_access_serialized():
+    pool = ConnectionPool(FakeClient, idle_timeout=60)
+    active = []
+    overlaps = []
+
+    def request(slave_id):
+        with pool.connection("10.0.0.1", 502):
+            if active:
+                overlaps.append(slave_id)
+            active.append(slave_id)
+            gevent.sleep(0.01)
+            active.remove(slave_id)
+
+    gevent.joinall([gevent.spawn(request, slave_id) for slave_id in range(5)])
+
+    assert not overlaps
+    statistics = pool.get_statistics()
+    assert statistics["opened"] == 1
+    assert statistics["reused"] == 4
+    assert statistics["waits"] == 4
+    assert statistics["in_use"] == 0
+
+
+@pytest.mark.driver_unit
+def test_open_connections_bounded_by_max_open():
+    pool = ConnectionPool(FakeClient, idle_timeout=60, max_open=2)
+    clients = []
+    for gateway in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        with pool.connection(gateway, 502) as client:
+            clients.append(client)
+        gevent.sleep(0.001)
+
+    # The least recently used idle client made room for the third gateway.
+    assert [client.open for client in clients] == [False, True, True]
+
+    # Clients in use are never closed to make room.
+    with pool.connection("10.0.0.2", 502):
+        with pool.connection("10.0.0.1", 502) as reopened:
+            pass
+    assert clients[1].open
+    assert not clients[2].open
+    assert reopened.open
+    statistics = pool.get_statistics()
+    assert statistics["closed_limit"] == 2
+    assert statistics["open"] == 2
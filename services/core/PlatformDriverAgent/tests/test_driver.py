@@ -27,11 +27,15 @@ import contextlib
 from datetime import datetime, date, time
 from mock import create_autospec
 
+import gevent
 import pytest
 import pytz
 
-from platform_driver import agent
+from platform_driver import agent, driver_locks
 from platform_driver.agent import DriverAgent
+from platform_driver.change_filter import ChangeFilter
+from volttron.platform.messaging import headers as headers_mod
+from volttron.platform.messaging.compact import COMPACT_CONTENT_TYPE, CompactEncoder
 from platform_driver.interfaces import BaseInterface
 from platform_driver.interfaces.fakedriver import Interface as FakeInterface
 from volttrontesting.utils.utils import AgentMock
@@ -191,6 +195,98 @@ def test_periodic_read_should_return_none_on_scrape_response(scrape_all_response
         assert isinstance(driver_agent.periodic_read_event, ScheduledEvent)
 
 
+@pytest.mark.driver_unit
+def test_periodic_read_should_record_scrape_statistics():
+    now = pytz.UTC.localize(datetime.utcnow())
+
+    with get_driver_agent(has_core_schedule=True, meta_data={"foo": "bar"},
+                          has_base_topic=True, mock_publish_wrapper=True,
+                          interface_scrape_all={"foo": "bar"}) as driver_agent:
+        driver_agent.periodic_read(now)
+        driver_agent.periodic_read(now)
+
+        statistics = driver_agent.get_scrape_statistics()
+        assert statistics["driver_type"] == "fakedriver"
+        assert statistics["scrapes"] == 2
+        assert statistics["failures"] == 0
+        assert statistics["max_latency"] >= statistics["average_latency"] >= 0
+
+
+@pytest.mark.driver_unit
+def test_periodic_read_should_only_publish_changes_when_publishing_on_change():
+    now = pytz.UTC.localize(datetime.utcnow())
+
+    with get_driver_agent(has_core_schedule=True, meta_data={"foo": "bar"},
+                          has_base_topic=True, mock_publish_wrapper=True,
+                          interface_scrape_all={"foo": "bar"}) as driver_agent:
+        driver_agent.change_filter = ChangeFilter(snapshot_interval=0)
+        driver_agent.periodic_read(now)
+        driver_agent.periodic_read(now)
+
+        driver_agent._publish_wrapper.assert_called_once()
+        assert driver_agent.parent.scrape_ending.call_count == 2
+        assert driver_agent.scrape_statistics["unchanged_points"] == 1
+
+
+@pytest.mark.driver_unit
+def test_periodic_read_should_publish_compact_all_message():
+    now = pytz.UTC.localize(datetime.utcnow())
+
+    with get_driver_agent(has_core_schedule=True, meta_data={"foo": {"units": "bar"}},
+                          has_base_topic=True, mock_publish_wrapper=True,
+                          interface_scrape_all={"foo": 42}) as driver_agent:
+        driver_agent.publish_depth_first = False
+        driver_agent.publish_depth_first_all = True
+        driver_agent.all_path_depth = "devices/path/to/my/device/all"
+        driver_agent.compact_encoder = CompactEncoder()
+        driver_agent.periodic_read(now)
+
+        _, kwargs = driver_agent._publish_wrapper.call_args
+        assert kwargs["headers"][headers_mod.CONTENT_TYPE] == COMPACT_CONTENT_TYPE
+        assert kwargs["message"]["values"] == [42]
+        assert driver_agent.get_compact_schema(kwargs["message"]["schema"]) == {"points": ["foo"],
+                                                                               "meta": [{"units": "bar"}]}
+
+
+@pytest.mark.driver_unit
+def test_periodic_read_should_skip_scrape_while_previous_scrape_runs():
+    now = pytz.UTC.localize(datetime.utcnow())
+
+    with get_driver_agent(has_core_schedule=True, meta_data={"foo": "bar"},
+                          mock_publish_wrapper=True, interface_scrape_all={"foo": "bar"}) as driver_agent:
+        driver_agent._scrape_in_progress = True
+        driver_agent.periodic_read(now)
+
+        assert driver_agent.scrape_statistics["overruns"] == 1
+        driver_agent.parent.scrape_starting.assert_not_called()
+        driver_agent.interface.scrape_all.assert_not_called()
+        assert isinstance(driver_agent.periodic_read_event, ScheduledEvent)
+
+
+@pytest.mark.driver_unit
+def test_scrape_lock_should_limit_concurrent_scrapes_per_driver_type(monkeypatch):
+    monkeypatch.setattr(driver_locks, "_scrape_pool_sizes", None)
+    monkeypatch.setattr(driver_locks, "_scrape_pools", {})
+    driver_locks.configure_scrape_pools({"modbus": 2}, default_pool_size=0)
+
+    running = []
+    peak = []
+
+    def scrape(driver_type):
+        with driver_locks.scrape_lock(driver_type):
+            running.append(driver_type)
+            peak.append(running.count("modbus"))
+            gevent.sleep(0.01)
+            running.remove(driver_type)
+
+    gevent.joinall([gevent.spawn(scrape, "modbus") for _ in range(5)] +
+                   [gevent.spawn(scrape, "bacnet") for _ in range(5)])
+
+    assert max(peak) == 2
+    assert driver_locks.scrape_pool_status() == {"modbus": {"size": 2, "in_use": 0},
+                                                 "bacnet": {"size": None, "in_use": None}}
+
+
 @pytest.mark.driver_unit
 def test_heart_beat_should_return_none_on_no_heart_beat_point():
     with get_driver_agent() as driver_agent:
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import pytest
+
+from platform_driver.modbus_blocks import BlockPlanner
+
+
+def plan(planner, spans):
+    return [(block.start, block.count, block.items, block.gaps) for block in planner.plan(spans)]
+
+
+@pytest.mark.driver_unit
+def test_adjacent_spans_joined():
+    planner = BlockPlanner(max_count=100)
+    spans = [(4, 2, "c"), (0, 2, "a"), (2, 2, "b"), (10, 1, "d")]
+
+    assert plan(planner, spans) == [(0, 6, ["a", "b", "c"], []),
+                                    (10, 1, ["d"], [])]
+
+
+@pytest.mark.driver_unit
+def test_gaps_joined_up_to_max_gap():
+    planner = BlockPlanner(max_count=100, max_gap=5)
+    spans = [(0, 2, "a"), (6, 2, "b"), (14, 1, "c"), (15, 1, "d")]
+
+    assert plan(planner, spans) == [(0, 8, ["a", "b"], [(2, 6)]),
+                                    (14, 2, ["c", "d"], [])]
+
+
+@pytest.mark.driver_unit
+def test_blocks_limited_to_max_count():
+    planner = BlockPlanner(max_count=4, max_gap=10)
+    spans = [(address, 2, address) for address in range(0, 12, 2)]
+
+    assert [(start, count) for start, count, _, _ in plan(planner, spans)] == [(0, 4), (4, 4), (8, 4)]
+
+
+@pytest.mark.driver_unit
+def test_overlapping_spans_share_block():
+    planner = BlockPlanner(max_count=100)
+
+    assert plan(planner, [(0, 4, "a"), (2, 1, "b")]) == [(0, 4, ["a", "b"], [])]
+
+
+@pytest.mark.driver_unit
+def test_refused_gaps_not_bridged_again():
+    planner = BlockPlanner(max_count=100, max_gap=10)
+    spans = [(0, 1, "a"), (5, 1, "b"), (8, 1, "c")]
+    block, = planner.plan(spans)
+    assert block.gaps == [(1, 5), (6, 8)]
+
+    assert planner.learn_holes(block)
+    assert plan(planner, spans) == [(0, 1, ["a"], []), (5, 1, ["b"], []), (8, 1, ["c"], [])]
+
+    # A refused block without gaps is an error of the spans themselves.
+    assert not planner.learn_holes(planner.plan(spans)[0])
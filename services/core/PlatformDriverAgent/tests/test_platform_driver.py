@@ -25,6 +25,7 @@
 import contextlib
 import logging
 import os
+from unittest import mock
 
 from datetime import datetime
 
@@ -34,7 +35,7 @@ import gevent
 import pytest
 
 from volttron.platform import get_services_core
-from volttron.platform.messaging.health import STATUS_GOOD
+from volttron.platform.messaging.health import STATUS_BAD, STATUS_GOOD
 from platform_driver import agent
 from platform_driver.agent import PlatformDriverAgent, OverrideError
 from volttrontesting.utils.utils import AgentMock
@@ -175,6 +176,39 @@ def test_clear_overrides():
         assert len(platform_driver_agent._override_patterns) == 0
 
 
+@pytest.mark.driver_unit
+def test_report_statistics_should_keep_status_and_context():
+    with get_platform_driver_agent() as platform_driver_agent:
+        platform_driver_agent.publish_pipeline = mock.Mock()
+        platform_driver_agent.publish_pipeline.get_statistics.return_value = {"dropped_since_last_report": 0}
+        platform_driver_agent.vip.health.get_status.return_value = {"status": STATUS_BAD,
+                                                                    "context": {"reason": "set elsewhere"}}
+
+        platform_driver_agent._report_statistics()
+
+        status, context = platform_driver_agent.vip.health.set_status.call_args[0]
+        assert status == STATUS_BAD
+        assert context["reason"] == "set elsewhere"
+        assert context["publish_statistics"] == {"dropped_since_last_report": 0}
+        assert "connection_pools" in context
+        platform_driver_agent.vip.health.send_alert.assert_not_called()
+
+
+@pytest.mark.driver_unit
+def test_report_statistics_should_alert_on_dropped_publishes():
+    with get_platform_driver_agent() as platform_driver_agent:
+        platform_driver_agent.publish_pipeline = mock.Mock()
+        platform_driver_agent.publish_pipeline.get_statistics.return_value = {"dropped_since_last_report": 3}
+        platform_driver_agent.vip.health.get_status.return_value = {"status": STATUS_GOOD, "context": None}
+
+        platform_driver_agent._report_statistics()
+
+        assert platform_driver_agent.vip.health.set_status.call_args[0][0] == STATUS_GOOD
+        alert_key, alert_status = platform_driver_agent.vip.health.send_alert.call_args[0]
+        assert alert_key == "driver_publishes_dropped"
+        assert alert_status.status == STATUS_BAD
+
+
 class MockedInstance:
     def revert_all(self):
         pass
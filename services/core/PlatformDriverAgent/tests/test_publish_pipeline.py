@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import errno
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from platform_driver.publish_pipeline import PublishPipeline
+from volttron.platform.vip.agent.errors import Again
+
+
+def busy():
+    return Again(errno.EAGAIN, "resource temporarily unavailable", "pubsub", "pubsub")
+
+
+class FakePubSub(object):
+    def __init__(self):
+        self.results = []
+
+    def publish(self, peer, topic, headers=None, message=None):
+        result = AsyncResult()
+        self.results.append((topic, result))
+        return result
+
+
+@pytest.mark.driver_unit
+def test_publish_does_not_wait_for_acknowledgement():
+    pubsub = FakePubSub()
+    pipeline = PublishPipeline(max_in_flight=10)
+
+    for i in range(5):
+        pipeline.publish(pubsub, "devices/device{}/all".format(i), {}, {})
+
+    statistics = pipeline.get_statistics()
+    assert statistics["published"] == 5
+    assert statistics["in_flight"] == 5
+
+    for _, result in pubsub.results:
+        result.set(None)
+    gevent.sleep(0)
+
+    statistics = pipeline.get_statistics()
+    assert statistics["acknowledged"] == 5
+    assert statistics["in_flight"] == 0
+    assert statistics["dropped_since_last_report"] == 0
+
+
+@pytest.mark.driver_unit
+def test_publish_retries_when_bus_is_busy():
+    pubsub = FakePubSub()
+    pipeline = PublishPipeline(max_in_flight=10, min_rate=1000.0)
+
+    pipeline.publish(pubsub, "devices/device/all", {}, {})
+    pubsub.results[0][1].set_exception(busy())
+    gevent.sleep(0.01)
+
+    assert [topic for topic, _ in pubsub.results] == ["devices/device/all"] * 2
+    assert pipeline.counters["retried"] == 1
+    assert pipeline.bucket.rate is not None
+
+    pubsub.results[1][1].set(None)
+    gevent.sleep(0)
+    assert pipeline.counters["acknowledged"] == 1
+
+
+@pytest.mark.driver_unit
+def test_publish_dropped_after_max_retries():
+    pubsub = FakePubSub()
+    pipeline = PublishPipeline(max_in_flight=10, max_retries=2, min_rate=1000.0)
+
+    pipeline.publish(pubsub, "devices/device/all", {}, {})
+    for attempt in range(3):
+        pubsub.results[attempt][1].set_exception(busy())
+        gevent.sleep(0.01)
+
+    assert len(pubsub.results) == 3
+    statistics = pipeline.get_statistics()
+    assert statistics["retried"] == 2
+    assert statistics["dropped"] == 1
+    assert statistics["dropped_since_last_report"] == 1
+    assert statistics["in_flight"] == 0
+    assert pipeline.get_statistics()["dropped_since_last_report"] == 0
+
+
+@pytest.mark.driver_unit
+def test_unacknowledged_publish_times_out_and_frees_window():
+    pubsub = FakePubSub()
+    pipeline = PublishPipeline(max_in_flight=1, ack_timeout=0.05)
+
+    pipeline.publish(pubsub, "devices/device1/all", {}, {})
+    # Blocks until the first publish times out.
+    pipeline.publish(pubsub, "devices/device2/all", {}, {})
+
+    assert len(pubsub.results) == 2
+    assert pipeline.counters["timed_out"] == 1
+
+    # A late acknowledgement of the expired publish is ignored.
+    pubsub.results[0][1].set(None)
+    pubsub.results[1][1].set(None)
+    gevent.sleep(0)
+    assert pipeline.counters["acknowledged"] == 1
+    assert pipeline.get_statistics()["in_flight"] == 0
@@ -116,6 +116,21 @@ class SQLAggregateHistorian(AggregateHistorian):
             start_time,
             end_time)
 
+    def collect_aggregate_summary(self, topic_ids, start_time, end_time):
+        return self.dbfuncts_class.collect_aggregate_summary(
+            topic_ids,
+            start_time,
+            end_time)
+
+    def collect_aggregate_summaries(self, topic_ids, start_time, end_time):
+        return self.dbfuncts_class.collect_aggregate_summaries(
+            topic_ids,
+            start_time,
+            end_time)
+
+    def insert_aggregates(self, rows):
+        self.dbfuncts_class.insert_aggregates(rows)
+
     def insert_aggregate(self, topic_id, agg_type, period, end_time,
                          value, topic_ids):
         self.dbfuncts_class.insert_aggregate(topic_id,
@@ -89,6 +89,8 @@ class SQLHistorian(BaseHistorian):
      - :py:mod:`volttron.platform.dbutils.sqlitefuncts`
     """
 
+    native_timestamp_formats = ("iso", "epoch")
+
     def __init__(self, connection, tables_def=None, **kwargs):
         """Initialise the historian.
 
@@ -260,7 +262,7 @@ class SQLHistorian(BaseHistorian):
 
     @doc_inherit
     def query_historian(self, topic, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-                        order="FIRST_TO_LAST"):
+                        order="FIRST_TO_LAST", timestamp_format="iso"):
         _log.debug("query_historian Thread is: {}".format(threading.currentThread().getName()))
         results = dict()
         topics_list = []
@@ -298,7 +300,8 @@ class SQLHistorian(BaseHistorian):
         _log.debug("Querying db reader with topic_ids {} ".format(topic_ids))
 
         values = self.main_thread_dbutils.query(topic_ids, id_name_map, start=start, end=end, agg_type=agg_type,
-                                                agg_period=agg_period, skip=skip, count=count, order=order)
+                                                agg_period=agg_period, skip=skip, count=count, order=order,
+                                                timestamp_format=timestamp_format)
         meta_tid = None
         if len(values) > 0:
             # If there are results add metadata if it is a query on a single topic
@@ -938,7 +938,11 @@ class VolttronCentralPlatform(Agent):
         found_a_platform_driver = False
         for platform_driver_id in self._platform_driver_ids:
             fname = os.path.join(os.environ['VOLTTRON_HOME'], "configuration_store/{}.store".format(platform_driver_id))
-            stat_time = os.stat(fname).st_mtime if os.path.exists(fname) else None
+            # Changes to the store are appended to its journal until they are compacted into the store file.
+            stat_time = tuple(os.stat(f).st_mtime if os.path.exists(f) else None
+                              for f in (fname, fname + ".journal"))
+            if stat_time == (None, None):
+                stat_time = None
             if self._platform_driver_stat_times.get(platform_driver_id, None) != stat_time:
                 config_changed = True
             found_a_platform_driver = found_a_platform_driver or stat_time
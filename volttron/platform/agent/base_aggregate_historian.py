@@ -24,8 +24,11 @@
 
 
 
+import bisect
 import copy
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 import pytz
@@ -39,6 +42,174 @@ from volttron.platform.vip.agent.subsystems import RPC
 _log = logging.getLogger(__name__)
 __version__ = '1.0'
 
+# Aggregation types that can be computed from the count, sum, min and max of
+# the raw data and so can be combined from summaries of shorter time slices.
+INCREMENTAL_AGGREGATION_TYPES = ('avg', 'sum', 'total', 'count', 'min', 'max')
+
+# Seconds to reuse the topics matched by a topic_name_pattern.
+DEFAULT_TOPIC_PATTERN_CACHE_TIME = 300
+
+# Seconds raw data may arrive after its timestamp and still be included in
+# incrementally aggregated periods.
+DEFAULT_INCREMENTAL_AGGREGATION_WATERMARK = 300
+
+
+def combine_summaries(summaries):
+    """
+    Combines (count, sum, min, max) summaries of adjacent time slices into
+    the summary of the whole time slice.
+    """
+    count = 0
+    total = 0
+    minimum = None
+    maximum = None
+    for s_count, s_total, s_min, s_max in summaries:
+        if not s_count:
+            continue
+        count += s_count
+        total += s_total
+        if minimum is None or s_min < minimum:
+            minimum = s_min
+        if maximum is None or s_max > maximum:
+            maximum = s_max
+    if not count:
+        return 0, None, None, None
+    return count, total, minimum, maximum
+
+
+def summary_value(summary, agg_type):
+    """
+    Returns the value of an aggregation computed from a (count, sum, min,
+    max) summary.
+    """
+    count, total, minimum, maximum = summary
+    agg_type = agg_type.lower()
+    if agg_type == 'count':
+        return count
+    if not count:
+        return None
+    if agg_type in ('sum', 'total'):
+        return total
+    if agg_type == 'avg':
+        return float(total) / count
+    if agg_type == 'min':
+        return minimum
+    if agg_type == 'max':
+        return maximum
+    raise ValueError("Aggregation type {} cannot be computed from a "
+                     "summary".format(agg_type))
+
+
+class AggregateSummaryCache(object):
+    """
+    Keeps the (count, sum, min, max) summary of raw data over the time slices
+    that were aggregated for each set of topics. A time slice is summarized
+    from cached summaries of shorter slices that tile it and only the gaps
+    between them are read from the data store. As every aggregation period
+    caches its slices, coarser periods are rolled up from finer ones (for
+    example 1m -> 15m -> 1h -> 1d) instead of rereading the raw data.
+
+    Raw data may be written up to watermark after its timestamp. A slice
+    read before its end was watermark in the past is unsettled: it is used
+    for the period that read it, but periods computed later read it again
+    instead of reusing it. Only the unsettled tail of a period, at most
+    watermark long, is read twice.
+
+    Summaries are kept for retention past the end of the latest slice of a
+    set of topics.
+    """
+
+    def __init__(self, fetch, retention, watermark=timedelta(0), now=None):
+        """
+        :param fetch: function(topic_ids, start, end) returning the summary
+                      of the raw data in [start, end)
+        :param retention: timedelta to keep summaries for
+        :param watermark: timedelta raw data may arrive late
+        :param now: function returning the current time, aware UTC
+                    datetime.utcnow by default
+        """
+        self._fetch = fetch
+        self._retention = retention
+        self._watermark = watermark
+        self._now = now or (lambda: datetime.utcnow().replace(tzinfo=pytz.utc))
+        # {topic ids: {slice start: {slice end: (summary, settled)}}}
+        self._slices = defaultdict(dict)
+        # {topic ids: sorted slice starts}
+        self._starts = defaultdict(list)
+
+    def summarize(self, topic_ids, start, end):
+        """
+        Returns the summary of the raw data of topic_ids in [start, end).
+        """
+        key = tuple(sorted(topic_ids))
+        settled_before = self._now() - self._watermark
+
+        parts = []
+        settled = True
+        current = start
+        while current < end:
+            best = self._settled_end(key, current, end)
+            if best is not None:
+                parts.append(self._slices[key][current][best][0])
+                current = best
+                continue
+            # Read the gap up to the next settled slice from the data store,
+            # split where the data may still be incomplete.
+            gap_end = self._next_settled_start(key, current, end)
+            if current < settled_before < gap_end:
+                gap_end = settled_before
+            gap_settled = gap_end <= settled_before
+            summary = self._fetch(list(key), current, gap_end)
+            self._add(key, current, gap_end, summary, gap_settled)
+            parts.append(summary)
+            settled = settled and gap_settled
+            current = gap_end
+
+        summary = combine_summaries(parts)
+        if len(parts) > 1:
+            self._add(key, start, end, summary, settled)
+        self._expire(key, end - self._retention)
+        return summary
+
+    def clear(self):
+        self._slices.clear()
+        self._starts.clear()
+
+    def _settled_end(self, key, start, end):
+        """Returns the latest end up to end of the settled slices starting at start."""
+        ends = self._slices[key].get(start)
+        if not ends:
+            return None
+        return max((e for e, (_, settled) in ends.items() if settled and e <= end), default=None)
+
+    def _next_settled_start(self, key, current, end):
+        """Returns the start of the next settled slice after current, or end."""
+        starts = self._starts[key]
+        for i in range(bisect.bisect_right(starts, current), len(starts)):
+            if starts[i] >= end:
+                break
+            if self._settled_end(key, starts[i], end) is not None:
+                return starts[i]
+        return end
+
+    def _add(self, key, start, end, summary, settled):
+        ends = self._slices[key].get(start)
+        if ends is None:
+            ends = self._slices[key][start] = {}
+            bisect.insort(self._starts[key], start)
+        ends[end] = (summary, settled)
+
+    def _expire(self, key, before):
+        slices = self._slices[key]
+        starts = self._starts[key]
+        while starts and starts[0] < before:
+            ends = slices[starts[0]]
+            for end in [e for e in ends if e <= before]:
+                del ends[end]
+            if ends:
+                break
+            del slices[starts.pop(0)]
+
 
 class AggregateHistorian(Agent):
     """
@@ -69,6 +240,9 @@ class AggregateHistorian(Agent):
         config = utils.load_config(config_path)
         self.topic_id_map = None
         self.aggregate_topic_id_map = None
+        self._summary_cache = None
+        self._topic_pattern_cache = {}
+        self._topic_pattern_cache_time = DEFAULT_TOPIC_PATTERN_CACHE_TIME
 
         self.vip.config.set_default("config", config)
         self.vip.config.subscribe(self.configure, actions=["NEW", "UPDATE"],
@@ -106,11 +280,33 @@ class AggregateHistorian(Agent):
         _log.debug("In start of aggregate historian. "
                    "After loading topic and aggregate topic maps")
 
+        self._topic_pattern_cache = {}
+        self._topic_pattern_cache_time = config.get(
+            'topic_pattern_cache_time', DEFAULT_TOPIC_PATTERN_CACHE_TIME)
+
         if not config.get("aggregations"):
             _log.debug("End of onstart method - current time{}".format(
                 datetime.utcnow()))
             return
 
+        self._summary_cache = None
+        if config.get('incremental_aggregation', False):
+            longest = max(
+                AggregateHistorian.aggregation_period_to_timedelta(
+                    AggregateHistorian.normalize_aggregation_time_period(
+                        agg_group['aggregation_period']))
+                for agg_group in config['aggregations'])
+            watermark = timedelta(seconds=config.get(
+                'incremental_aggregation_watermark',
+                DEFAULT_INCREMENTAL_AGGREGATION_WATERMARK))
+            self._summary_cache = AggregateSummaryCache(
+                self.collect_aggregate_summary, 2 * longest + watermark,
+                watermark)
+
+        # Start every group at the same time so that the time slices of
+        # different aggregation periods line up.
+        now = datetime.utcnow().replace(tzinfo=pytz.utc)
+
         for agg_group in config['aggregations']:
             # 1. Validate and normalize aggregation period and
             # initialize use_calendar_periods flag
@@ -131,8 +327,7 @@ class AggregateHistorian(Agent):
                     agg_group.get('utc_collection_start_time'),
                     '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=pytz.utc)
             else:
-                utc_collection_start_time = datetime.utcnow().replace(
-                    tzinfo=pytz.utc)
+                utc_collection_start_time = now
             self.collect_aggregate_data(
                 utc_collection_start_time,
                 agg_time_period,
@@ -206,10 +401,7 @@ class AggregateHistorian(Agent):
             else:
                 # Find if the topic_name patterns result in any topics
                 # at all. If it does log them as info
-                topic_map = self.vip.rpc.call(
-                    PLATFORM_HISTORIAN,
-                    "get_topics_by_pattern",
-                    topic_pattern=topic_pattern).get()
+                topic_map = self.get_topics_by_pattern(topic_pattern)
                 if topic_map is None or len(topic_map) == 0:
                     raise ValueError(
                         "Please provide a valid topic_name or "
@@ -332,6 +524,9 @@ class AggregateHistorian(Agent):
                 "After  compute agg_time_period = {} start_time {} end_time "
                 "{} ".format(agg_time_period, start_time, end_time))
             schedule_next = True
+            # Resolve the topics of every point first so that all of them
+            # can be collected together.
+            resolved = []
             for data in points:
                 _log.debug("data in loop {}".format(data))
                 topic_ids = data.get('topic_ids', None)
@@ -356,10 +551,7 @@ class AggregateHistorian(Agent):
 
                 if topic_pattern:
                     # Find topic ids that match the pattern at runtime
-                    topic_map = self.vip.rpc.call(
-                        PLATFORM_HISTORIAN,
-                        "get_topics_by_pattern",
-                        topic_pattern=topic_pattern).get()
+                    topic_map = self.get_topics_by_pattern(topic_pattern)
                     _log.debug("Found topics for pattern {}".format(topic_map))
                     if topic_map:
                         topic_ids = list(topic_map.values())
@@ -370,13 +562,16 @@ class AggregateHistorian(Agent):
                                         topic=topic_pattern,
                                         start_time=start_time,
                                         end_time=end_time))
-                        return
+                        break
 
-                agg_value, count = self.collect_aggregate(
-                    topic_ids,
-                    data['aggregation_type'],
-                    start_time,
-                    end_time)
+                resolved.append((data, aggregate_topic_id, topic_ids))
+
+            results = self._collect_aggregates(resolved, start_time, end_time)
+
+            rows = []
+            for (data, aggregate_topic_id, topic_ids), (agg_value, count) in \
+                    zip(resolved, results):
+                topic_pattern = data.get('topic_name_pattern', None)
                 if count == 0:
                     _log.warning("No records found for topic {topic} between {start_time} and {end_time}".format(
                         topic=topic_pattern if topic_pattern else
@@ -393,12 +588,14 @@ class AggregateHistorian(Agent):
                 else:
                     _log.debug("data is {} aggg_time_period is {}".format(data, agg_time_period))
                     _log.debug(" topic id map {}".format(self.agg_topic_id_map))
-                    self.insert_aggregate(aggregate_topic_id,
-                                          data['aggregation_type'],
-                                          agg_time_period,
-                                          end_time,
-                                          agg_value,
-                                          topic_ids)
+                    rows.append((aggregate_topic_id,
+                                 data['aggregation_type'],
+                                 agg_time_period,
+                                 end_time,
+                                 agg_value,
+                                 topic_ids))
+            if rows:
+                self.insert_aggregates(rows)
 
         finally:
             if schedule_next:
@@ -414,6 +611,128 @@ class AggregateHistorian(Agent):
                                            points)
                 _log.debug("After Scheduling next collection.{}".format(event))
 
+    def get_topics_by_pattern(self, topic_pattern):
+        """
+        Returns the {topic name: topic id} map of topics matching
+        topic_pattern from the platform historian. Results are reused for
+        topic_pattern_cache_time seconds.
+        """
+        now = time.time()
+        cached = self._topic_pattern_cache.get(topic_pattern)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        topic_map = self.vip.rpc.call(
+            PLATFORM_HISTORIAN,
+            "get_topics_by_pattern",
+            topic_pattern=topic_pattern).get()
+        if topic_map:
+            self._topic_pattern_cache[topic_pattern] = \
+                (now + self._topic_pattern_cache_time, topic_map)
+        return topic_map
+
+    def _collect_aggregates(self, resolved, start_time, end_time):
+        """
+        Computes the aggregates of a list of (point, aggregate topic id,
+        topic ids) for one time slice. Aggregations that can be computed from
+        summaries are collected with a single collect_aggregate_summaries
+        call covering the topics of all of them. The rest are collected one
+        at a time.
+
+        :return: list of (aggregated value, count) in the order of resolved
+        """
+        results = [None] * len(resolved)
+        batched = []
+        if self._summary_cache is None:
+            batched = [i for i, (data, _, _) in enumerate(resolved)
+                       if data['aggregation_type'].lower() in
+                       INCREMENTAL_AGGREGATION_TYPES]
+        if batched:
+            topic_ids = sorted(set(topic_id for i in batched
+                                   for topic_id in resolved[i][2]))
+            summaries = self.collect_aggregate_summaries(topic_ids,
+                                                         start_time, end_time)
+            if summaries is not None:
+                for i in batched:
+                    data, _, point_topic_ids = resolved[i]
+                    summary = combine_summaries(
+                        summaries[topic_id] for topic_id in point_topic_ids
+                        if topic_id in summaries)
+                    results[i] = (summary_value(summary,
+                                                data['aggregation_type']),
+                                  summary[0])
+
+        for i, (data, _, topic_ids) in enumerate(resolved):
+            if results[i] is None:
+                results[i] = self._collect_aggregate(
+                    topic_ids, data['aggregation_type'], start_time, end_time)
+        return results
+
+    def _collect_aggregate(self, topic_ids, agg_type, start_time, end_time):
+        """
+        Computes an aggregate from cached summaries when incremental
+        aggregation is enabled and the aggregation type allows it, otherwise
+        queries the data store with collect_aggregate.
+        """
+        if self._summary_cache is not None and \
+                agg_type.lower() in INCREMENTAL_AGGREGATION_TYPES:
+            summary = self._summary_cache.summarize(topic_ids, start_time,
+                                                    end_time)
+            return summary_value(summary, agg_type), summary[0]
+        return self.collect_aggregate(topic_ids, agg_type, start_time,
+                                      end_time)
+
+    def collect_aggregate_summary(self, topic_ids, start_time, end_time):
+        """
+        Collect the count, sum, minimum and maximum of the raw data in a
+        time slice. Used by incremental aggregation. Subclasses should
+        override this with a single query where the data store allows it.
+
+        :param topic_ids: list of topic ids for which the summary should be
+                          computed.
+        :param start_time: start time for query (inclusive)
+        :param end_time:  end time for query (exclusive)
+        :return: a tuple of (count, sum, min, max). sum, min and max are None
+                 when count is 0
+        """
+        total, count = self.collect_aggregate(topic_ids, 'sum', start_time,
+                                              end_time)
+        if not count:
+            return 0, None, None, None
+        minimum, _ = self.collect_aggregate(topic_ids, 'min', start_time,
+                                            end_time)
+        maximum, _ = self.collect_aggregate(topic_ids, 'max', start_time,
+                                            end_time)
+        return count, total, minimum, maximum
+
+    def collect_aggregate_summaries(self, topic_ids, start_time, end_time):
+        """
+        Collect the (count, sum, min, max) summary of the raw data of each
+        topic in a time slice, ideally in a single pass over the data store.
+        Subclasses should override this where the data store allows it.
+
+        :param topic_ids: list of topic ids for which summaries should be
+                          computed.
+        :param start_time: start time for query (inclusive)
+        :param end_time:  end time for query (exclusive)
+        :return: dictionary of topic id to (count, sum, min, max). Topics
+                 without records may be left out. None if not supported, in
+                 which case every aggregation is collected with
+                 collect_aggregate
+        """
+        return None
+
+    def insert_aggregates(self, rows):
+        """
+        Insert the aggregates collected for a time slice. Subclasses should
+        override this to insert them in bulk.
+
+        :param rows: list of (agg_topic_id, agg_type, agg_time_period,
+                     end_time, value, topic_ids) with the same meaning as the
+                     arguments of insert_aggregate
+        """
+        for row in rows:
+            self.insert_aggregate(*row)
+
     @abstractmethod
     def get_topic_map(self):
         """
@@ -580,6 +899,31 @@ class AggregateHistorian(Agent):
 
         return str(period) + unit
 
+    @staticmethod
+    def aggregation_period_to_timedelta(agg_period):
+        """
+        Returns the length of a normalized aggregation period as a
+        timedelta. Months are counted as 31 days.
+
+        :param agg_period: normalized aggregation period
+        :return: length of the aggregation period
+        """
+        period_int = int(agg_period[:-1])
+        unit = agg_period[-1:]
+        if unit == 'm':
+            return timedelta(minutes=period_int)
+        elif unit == 'h':
+            return timedelta(hours=period_int)
+        elif unit == 'd':
+            return timedelta(days=period_int)
+        elif unit == 'w':
+            return timedelta(weeks=period_int)
+        elif unit == 'M':
+            return timedelta(days=31 * period_int)
+        raise ValueError(
+            "Invalid unit {} provided for aggregation_period. "
+            "Unit should be m/h/d/w/M".format(unit))
+
     @staticmethod
     def compute_next_collection_time(collection_time, agg_period,
                                      use_calendar_periods):
@@ -203,7 +203,7 @@ the same date over again.
 from abc import abstractmethod
 from collections import defaultdict
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
 import logging
 from queue import Queue, Empty
 import os
@@ -211,6 +211,7 @@ import re
 import sqlite3
 import threading
 from threading import Thread
+import time
 import weakref
 
 from dateutil.parser import parse
@@ -223,6 +224,7 @@ from volttron.platform.agent.utils import process_timestamp, \
     fix_sqlite3_datetime, get_aware_utc_now, parse_timestamp_string
 from volttron.platform.async_ import AsyncCall
 from volttron.platform.messaging import topics, headers as headers_mod
+from volttron.platform.messaging.compact import CompactDecoder, UnknownSchemaError, is_compact
 from volttron.platform.messaging.health import (STATUS_BAD,
                                                 STATUS_UNKNOWN,
                                                 STATUS_GOOD,
@@ -234,23 +236,8 @@ from volttron.platform.vip.agent.subsystems import RPC
 from volttron.platform.vip.agent.subsystems.query import Query
 
 
-try:
-    import ujson
-    from volttron.platform.jsonapi import dumps as _dumps, loads as _loads
-
-    def dumps(data):
-        try:
-            return ujson.dumps(data)
-        except Exception:
-            return _dumps(data)
-
-    def loads(data_string):
-        try:
-            return ujson.loads(data_string, precise_float=True)
-        except Exception:
-            return _loads(data_string)
-except ImportError:
-    from volttron.platform.jsonapi import dumps, loads
+# jsonapi picks the fastest installed JSON backend.
+from volttron.platform.jsonapi import dumps, loads
 
 from volttron.platform.agent import utils
 
@@ -263,6 +250,14 @@ time_parser = None
 ACTUATOR_TOPIC_PREFIX_PARTS = len(topics.ACTUATOR_VALUE.split('/'))
 ALL_REX = re.compile('.*/all$')
 
+# Number of renamed topics and parsed message timestamps remembered by the capture path.
+RENAMED_TOPIC_CACHE_SIZE = 10000
+TIMESTAMP_CACHE_SIZE = 64
+# Compact messages held per unknown schema while it is requested from the publisher.
+COMPACT_PENDING_LIMIT = 1000
+# Seconds before a schema the publisher could not provide is requested again.
+COMPACT_SCHEMA_RETRY = 60.0
+
 # Register a better datetime parser in sqlite3.
 fix_sqlite3_datetime()
 
@@ -301,6 +296,89 @@ STATUS_KEY_CACHE_ONLY = "cache_only_enabled"
 STATUS_KEY_ERROR_MANAGE_DB_SIZE = "error_managing_db_size"
 
 
+# Storage profiles for the backup cache.  Every profile sets the complete list of PRAGMAs so that switching profiles
+# on an existing cache file takes effect (journal_mode is persisted in the database file itself).
+#
+# "safe"      Rollback journal with synchronous=FULL, the SQLite defaults.  Every commit is fsync'ed, a committed batch
+#             survives both an agent crash and a power loss.  Slowest on flash storage such as SD cards.
+# "balanced"  Write-ahead log with synchronous=NORMAL.  Commits only append to the WAL and fsync happens at
+#             checkpoints.  An agent crash loses nothing, a power loss or OS crash may roll back the most recent
+#             commits but never corrupts the cache.  Readers no longer block the writer.
+# "fast"      Write-ahead log with synchronous=OFF and larger caches.  SQLite never waits for the disk.  An agent crash
+#             loses nothing, but a power loss or OS crash may lose recent commits and can corrupt the cache file.
+#             Only use where the data is not critical or the power supply is protected.
+BACKUP_CACHE_PROFILES = {
+    "safe": {"journal_mode": "DELETE",
+             "synchronous": "FULL",
+             "cache_size": -2000,
+             "mmap_size": 0,
+             "journal_size_limit": -1},
+    "balanced": {"journal_mode": "WAL",
+                 "synchronous": "NORMAL",
+                 "cache_size": -8000,
+                 "mmap_size": 64 * 1024 ** 2,
+                 "journal_size_limit": 64 * 1024 ** 2},
+    "fast": {"journal_mode": "WAL",
+             "synchronous": "OFF",
+             "cache_size": -32000,
+             "mmap_size": 256 * 1024 ** 2,
+             "journal_size_limit": 64 * 1024 ** 2}
+}
+DEFAULT_BACKUP_CACHE_PROFILE = "safe"
+
+# Order in which the backlog of the backup cache is handed to the concrete historian.
+# "ordered" Oldest timestamp first, the legacy behavior.
+# "stream"  Insertion order.  Batches are read with a keyset cursor on the primary key and published rows are deleted
+#           by id range, so draining a large backlog takes linear time overall.  Data that arrives late or out of
+#           order is published in the order it was received.
+BACKUP_DRAIN_ORDERED = "ordered"
+BACKUP_DRAIN_STREAM = "stream"
+BACKUP_DRAIN_MODES = (BACKUP_DRAIN_ORDERED, BACKUP_DRAIN_STREAM)
+
+_BACKUP_CACHE_PRAGMA_VALUES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "WAL"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "cache_size": int,
+    "mmap_size": int,
+    "journal_size_limit": int
+}
+
+
+def resolve_backup_cache_pragmas(profile=None, overrides=None):
+    """
+    Resolve the PRAGMA settings for a backup cache storage profile.
+
+    :param profile: Name of an entry in :py:data:`BACKUP_CACHE_PROFILES`.
+                    Defaults to :py:data:`DEFAULT_BACKUP_CACHE_PROFILE`.
+    :param overrides: Optional dictionary of individual PRAGMAs that replace
+                      the values of the profile.
+    :returns: Dictionary of PRAGMA name to value.
+    :raises ValueError: On an unknown profile, PRAGMA or value.
+    """
+    if profile is None:
+        profile = DEFAULT_BACKUP_CACHE_PROFILE
+    if profile not in BACKUP_CACHE_PROFILES:
+        raise ValueError(f"Unknown backup cache profile {profile}. "
+                         f"Valid profiles are {sorted(BACKUP_CACHE_PROFILES)}")
+    pragmas = dict(BACKUP_CACHE_PROFILES[profile])
+    for name, value in (overrides or {}).items():
+        valid = _BACKUP_CACHE_PRAGMA_VALUES.get(name)
+        if valid is None:
+            raise ValueError(f"Unsupported backup cache pragma {name}. "
+                             f"Valid pragmas are {sorted(_BACKUP_CACHE_PRAGMA_VALUES)}")
+        # PRAGMA values cannot be bound as parameters, only allow known words and integers.
+        if valid is int:
+            if isinstance(value, bool):
+                raise ValueError(f"Backup cache pragma {name} must be an integer. Got {value}")
+            value = int(value)
+        else:
+            value = str(value).upper()
+            if value not in valid:
+                raise ValueError(f"Backup cache pragma {name} must be one of {valid}. Got {value}")
+        pragmas[name] = value
+    return pragmas
+
+
 class BaseHistorianAgent(Agent):
     """
     This is the base agent for historian Agents.
@@ -354,6 +432,9 @@ class BaseHistorianAgent(Agent):
                  time_tolerance=None,
                  time_tolerance_topics=None,
                  cache_only_enabled=False,
+                 backup_cache_profile=DEFAULT_BACKUP_CACHE_PROFILE,
+                 backup_cache_pragmas=None,
+                 backup_drain_mode=BACKUP_DRAIN_ORDERED,
                  **kwargs):
 
         super(BaseHistorianAgent, self).__init__(**kwargs)
@@ -372,6 +453,13 @@ class BaseHistorianAgent(Agent):
 
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        self._backup_cache_profile = backup_cache_profile
+        self._backup_cache_pragmas = backup_cache_pragmas or {}
+        # Fail early on a bad profile.
+        resolve_backup_cache_pragmas(self._backup_cache_profile, self._backup_cache_pragmas)
+        if backup_drain_mode not in BACKUP_DRAIN_MODES:
+            raise ValueError(f"backup_drain_mode should be one of {BACKUP_DRAIN_MODES}. Got {backup_drain_mode}")
+        self._backup_drain_mode = backup_drain_mode
         self._retry_period = float(retry_period)
         self._submit_size_limit = int(submit_size_limit)
         self._max_time_publishing = float(max_time_publishing)
@@ -381,7 +469,15 @@ class BaseHistorianAgent(Agent):
         # Remove the need to reset subscriptions to eliminate possible data
         # loss at config change.
         self._current_subscriptions = set()
-        self._topic_replace_map = {}
+        self._renamed_topics = lru_cache(maxsize=RENAMED_TOPIC_CACHE_SIZE)(self._rename_topic)
+        self._parse_timestamp = lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)(process_timestamp)
+        # Last metadata seen per point topic. Drivers publishing on change
+        # only send the metadata of a point when it changes.
+        self._point_meta = {}
+        self._compact_decoder = CompactDecoder()
+        # Messages waiting for a requested schema and retry times of failed requests, by (sender, schema id).
+        self._compact_pending = {}
+        self._compact_failures = {}
         self._event_queue = gevent.queue.Queue() if self._process_loop_in_greenlet else Queue()
         self._readonly = bool(readonly)
         self._stop_process_loop = False
@@ -424,6 +520,9 @@ class BaseHistorianAgent(Agent):
                                 "max_time_publishing": self._max_time_publishing,
                                 "backup_storage_limit_gb": self._backup_storage_limit_gb,
                                 "backup_storage_report": self._backup_storage_report,
+                                "backup_cache_profile": self._backup_cache_profile,
+                                "backup_cache_pragmas": self._backup_cache_pragmas,
+                                "backup_drain_mode": self._backup_drain_mode,
                                 "topic_replace_list": self._topic_replace_list,
                                 "gather_timing_data": self.gather_timing_data,
                                 "readonly": self._readonly,
@@ -519,6 +618,16 @@ class BaseHistorianAgent(Agent):
             else:
                 backup_storage_report = 0.9
 
+            backup_cache_profile = config.get("backup_cache_profile") or DEFAULT_BACKUP_CACHE_PROFILE
+            backup_cache_pragmas = dict(config.get("backup_cache_pragmas") or {})
+            # Validate now so that a bad setting does not break the process loop.
+            resolve_backup_cache_pragmas(backup_cache_profile, backup_cache_pragmas)
+
+            backup_drain_mode = config.get("backup_drain_mode") or BACKUP_DRAIN_ORDERED
+            if backup_drain_mode not in BACKUP_DRAIN_MODES:
+                raise ValueError(f"backup_drain_mode should be one of {BACKUP_DRAIN_MODES}. "
+                                 f"Got {backup_drain_mode}")
+
             retry_period = float(config.get("retry_period", 300.0))
 
             storage_limit_gb = config.get("storage_limit_gb")
@@ -566,10 +675,9 @@ class BaseHistorianAgent(Agent):
         query = Query(self.core)
         self.instance_name = query.query('instance-name').get()
 
-        # Reset replace map.
-        self._topic_replace_map = {}
-
         self._topic_replace_list = topic_replace_list
+        # Reset renamed topics.
+        self._renamed_topics.cache_clear()
 
         _log.info('Topic string replace list: {}'
                   .format(self._topic_replace_list))
@@ -577,6 +685,9 @@ class BaseHistorianAgent(Agent):
         self.gather_timing_data = gather_timing_data
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        self._backup_cache_profile = backup_cache_profile
+        self._backup_cache_pragmas = backup_cache_pragmas
+        self._backup_drain_mode = backup_drain_mode
         self._retry_period = retry_period
         self._submit_size_limit = submit_size_limit
         self._max_time_publishing = max_time_publishing
@@ -748,33 +859,20 @@ class BaseHistorianAgent(Agent):
         :param input_topic:
         :return:
         """
+        # Only if we have some topics to replace.
+        if not self._topic_replace_list:
+            return input_topic
+        return self._renamed_topics(input_topic)
+
+    def _rename_topic(self, input_topic):
         output_topic = input_topic
         input_topic_lower = input_topic.lower()
-        # Only if we have some topics to replace.
-        if self._topic_replace_list:
-            # if we have already cached the topic then return it.
-            if input_topic_lower in self._topic_replace_map:
-                output_topic = self._topic_replace_map[input_topic_lower]
-            else:
-                self._topic_replace_map[input_topic_lower] = input_topic
-                temptopics = {}
-                for x in self._topic_replace_list:
-                    if x['from'].lower() in input_topic_lower:
-                        # this allows multiple things to be replaced from
-                        # from a given topic.
-                        new_topic = temptopics.get(input_topic_lower,
-                                                   input_topic)
-                        # temptopics[input_topic] = new_topic.replace(
-                        #     x['from'], x['to'])
-
-                        temptopics[input_topic_lower] = re.compile(
-                            re.escape(x['from']), re.IGNORECASE).sub(x['to'],
-                            new_topic)
-
-                for k, v in temptopics.items():
-                    self._topic_replace_map[k] = v
-                output_topic = self._topic_replace_map[input_topic_lower]
-            _log.debug("Output topic after replacements {}".format(output_topic))
+        for x in self._topic_replace_list:
+            if x['from'].lower() in input_topic_lower:
+                # this allows multiple things to be replaced from
+                # from a given topic.
+                output_topic = re.compile(re.escape(x['from']), re.IGNORECASE).sub(x['to'], output_topic)
+        _log.debug("Output topic after replacements {}".format(output_topic))
         return output_topic
 
     def does_time_exceed_tolerance(self, topic, utc_timestamp):
@@ -879,6 +977,12 @@ class BaseHistorianAgent(Agent):
         if not ALL_REX.match(topic):
             return
 
+        if is_compact(headers):
+            message = self._decode_compact(peer, sender, bus, topic, headers, message)
+            if message is None:
+                return
+            headers = {k: v for k, v in headers.items() if k != headers_mod.CONTENT_TYPE}
+
         # Anon the topic if necessary.
         topic = self.get_renamed_topic(topic)
 
@@ -901,7 +1005,8 @@ class BaseHistorianAgent(Agent):
                                 # Only points in the point list will be added to the message payload
                                 if point in message[0]:
                                     msg[0][point] = message[0][point]
-                                    msg[1][point] = message[1][point]
+                                    if point in message[1]:
+                                        msg[1][point] = message[1][point]
                             else:
                                 # other devices publish (devices/campus/building/device/point)
                                 msg = None
@@ -920,6 +1025,55 @@ class BaseHistorianAgent(Agent):
             msg = message
         self._capture_data(peer, sender, bus, topic, headers, msg, device)
 
+    def _decode_compact(self, peer, sender, bus, topic, headers, message):
+        """Decode a compact device all message to the [values, meta] form.
+
+        Schemas the historian has not seen, e.g. because it started after the
+        driver sent it, are requested from the publishing agent in the
+        background. Messages using the schema are held until it arrives and
+        are captured then. Returns None if the message is held or dropped."""
+        try:
+            return self._compact_decoder.decode(message)
+        except UnknownSchemaError as e:
+            key = (sender, e.schema_id)
+            pending = self._compact_pending.get(key)
+            if pending is not None:
+                if len(pending) < COMPACT_PENDING_LIMIT:
+                    pending.append((peer, sender, bus, topic, headers, message))
+                else:
+                    _log.warning("Too many messages waiting for schema {}, dropping {}".format(e.schema_id, topic))
+                return None
+            retry_time = self._compact_failures.get(key)
+            if retry_time is not None and time.monotonic() < retry_time:
+                _log.debug("Schema {} of {} is not available, dropping message".format(e.schema_id, topic))
+                return None
+            self._compact_pending[key] = [(peer, sender, bus, topic, headers, message)]
+            self.core.spawn(self._fetch_compact_schema, sender, e.schema_id)
+            return None
+        except (KeyError, IndexError, TypeError) as e:
+            _log.error("Invalid compact message for {}: {}".format(topic, e))
+            return None
+
+    def _fetch_compact_schema(self, sender, schema_id):
+        """Request a compact schema from its publisher and capture the messages waiting for it."""
+        key = (sender, schema_id)
+        try:
+            schema = self.vip.rpc.call(sender, 'get_compact_schema', schema_id).get(timeout=10.0)
+            if schema:
+                self._compact_decoder.add_schema(schema_id, schema['points'], schema['meta'])
+        except Exception as e:
+            _log.error("Failed to get schema {} from {}: {}".format(schema_id, sender, e))
+            schema = None
+        pending = self._compact_pending.pop(key, [])
+        if not schema:
+            self._compact_failures[key] = time.monotonic() + COMPACT_SCHEMA_RETRY
+            _log.error("Schema {} is not available from {}, dropping {} messages".format(schema_id, sender,
+                                                                                       len(pending)))
+            return
+        self._compact_failures.pop(key, None)
+        for args in pending:
+            self._capture_device_data(*args)
+
     def _capture_analysis_data(self, peer, sender, bus, topic, headers,
                                message):
         """Capture analaysis data and submit it to be published by a historian.
@@ -950,7 +1104,12 @@ class BaseHistorianAgent(Agent):
                                        headers.get(headers_mod.DATE))
         timestamp = get_aware_utc_now()
         if timestamp_string is not None:
-            timestamp, my_tz = process_timestamp(timestamp_string, topic)
+            # Every device publishes a scrape with the same timestamp, parse each string once.
+            parsed = self._parse_timestamp(timestamp_string)
+            if parsed is None:
+                _log.error("message for {} bad timestamp string: {}".format(topic, timestamp_string))
+                return
+            timestamp = parsed[0]
             headers['time_error'] = self.does_time_exceed_tolerance(topic, timestamp)
 
         try:
@@ -993,12 +1152,24 @@ class BaseHistorianAgent(Agent):
         if self.gather_timing_data:
             add_timing_data_to_header(headers, self.core.agent_uuid or self.core.identity, "collected")
 
+        # All points of the message go on the queue as one batch that shares the source, timestamp and headers.
+        points = []
+        prefix = device + '/'
+        point_meta_cache = self._point_meta
         for key, value in values.items():
-            point_topic = device + '/' + key
+            point_topic = prefix + key
+            point_meta = meta.get(key)
+            if point_meta is None:
+                # Nothing seen since the historian started, the backup cache publishes the point with the
+                # metadata it stored for it.
+                point_meta = point_meta_cache.get(point_topic, {})
+            else:
+                point_meta_cache[point_topic] = point_meta
+            points.append((point_topic, value, point_meta))
+        if points:
             self._event_queue.put({'source': source,
-                                   'topic': point_topic,
-                                   'readings': [(timestamp, value)],
-                                   'meta': meta.get(key, {}),
+                                   'timestamp': timestamp,
+                                   'points': points,
                                    'headers': headers})
 
     def _capture_actuator_data(self, topic, headers, message, match):
@@ -1111,7 +1282,10 @@ class BaseHistorianAgent(Agent):
                 return
 
             backupdb = BackupDatabase(self, self._backup_storage_limit_gb,
-                                      self._backup_storage_report)
+                                      self._backup_storage_report,
+                                      cache_profile=self._backup_cache_profile,
+                                      cache_pragmas=self._backup_cache_pragmas,
+                                      drain_mode=self._backup_drain_mode)
             self._update_status({STATUS_KEY_CACHE_COUNT: backupdb.get_backlog_count()})
 
             # now that everything is setup we need to make sure that the topics
@@ -1352,7 +1526,9 @@ class BaseHistorianAgent(Agent):
         that the most recent value of
         the "meta" dictionary are the only values that are relevant. This is
         the way the cache
-        treats meta data.
+        treats meta data. The cache keeps the last meta data of every topic
+        across restarts, records of points published without meta data carry
+        the meta data stored for the topic.
 
         Once one or more records are published either
         :py:meth:`BaseHistorianAgent.report_all_handled` or
@@ -1447,7 +1623,8 @@ class BackupDatabase:
     """
 
     def __init__(self, owner, backup_storage_limit_gb, backup_storage_report,
-                 check_same_thread=True):
+                 check_same_thread=True, cache_profile=None, cache_pragmas=None,
+                 drain_mode=BACKUP_DRAIN_ORDERED):
         # The topic cache is only meant as a local lookup and should not be
         # accessed via the implemented historians.
         self._backup_cache = {}
@@ -1458,14 +1635,32 @@ class BackupDatabase:
         self._owner = weakref.ref(owner)
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        self._pragmas = resolve_backup_cache_pragmas(cache_profile, cache_pragmas)
+        if drain_mode not in BACKUP_DRAIN_MODES:
+            raise ValueError(f"drain_mode should be one of {BACKUP_DRAIN_MODES}. Got {drain_mode}")
+        self._drain_mode = drain_mode
+        # Stream drain mode: every row with an id up to this one has been published and removed.
+        self._drained_id = 0
+        # Stream drain mode: ids of the last batch, including duplicates, in id order.
+        self._batch_ids = []
         self._connection = None
         self._setupdb(check_same_thread)
         self._dupe_ids = []
         self._unique_ids = []
 
+    def _add_metadata_rows(self, metadata_rows, source, topic_id, meta):
+        meta_dict = self._meta_data[(source, topic_id)]
+        for name, value in meta.items():
+            current_meta_value = meta_dict.get(name)
+            if current_meta_value != value:
+                metadata_rows.append((source, topic_id, name, value))
+                meta_dict[name] = value
+
     def backup_new_data(self, new_publish_list, time_tolerance_check=False):
         """
-        :param new_publish_list: An iterable of records to cache to disk.
+        :param new_publish_list: An iterable of records to cache to disk. A
+            record holds either the readings of one topic or, under 'points',
+            (topic, value, meta) tuples that share the record's timestamp.
         :type new_publish_list: iterable
         :param time_tolerance_check: Boolean to know if time tolerance check is enabled.default =False
         :returns: True if records the cache has reached a full state.
@@ -1474,76 +1669,98 @@ class BackupDatabase:
         #_log.debug("Backing up unpublished values.")
         c = self._connection.cursor()
         self.time_error_records = False # will update at the end of the method
+        new_publish_list = [item for item in new_publish_list if item is not None]
+
+        # Topic ids are assigned in order of first appearance.
+        backup_cache = self._backup_cache
+        new_topics = {}
+        for item in new_publish_list:
+            points = item.get('points')
+            if points is None:
+                if item['topic'] not in backup_cache:
+                    new_topics[item['topic']] = None
+            else:
+                for topic, _, _ in points:
+                    if topic not in backup_cache:
+                        new_topics[topic] = None
+        self._add_new_topics(c, new_topics)
+
+        # All points of a device publish share the same timestamp and headers objects, so each of them is
+        # converted once per batch instead of once per reading.  The items keep the objects alive, which keeps
+        # their ids unique for the duration of the call.
+        adapt_timestamp = sqlite3.adapters.get((datetime, sqlite3.PrepareProtocol))
+        timestamp_strings = {}
+        header_strings = {}
+
+        metadata_rows = []
+        outstanding_rows = []
+        time_error_rows = []
         for item in new_publish_list:
-            if item is None:
-                continue
             source = item['source']
-            topic = item['topic']
-            meta = item.get('meta', {})
-            readings = item['readings']
             headers = item.get('headers', {})
+            header_string = _adapted(header_strings, headers, dumps)
+            points = item.get('points')
+            if points is not None:
+                # A device message batched by the capture path, one reading per point at the same timestamp.
+                timestamp = item['timestamp']
+                if timestamp is None:
+                    rows = outstanding_rows
+                    timestamp = get_aware_utc_now()
+                elif time_tolerance_check and headers.get("time_error"):
+                    _log.warning(f"Found data with timestamp {timestamp} that is out of configured tolerance ")
+                    rows = time_error_rows
+                else:
+                    rows = outstanding_rows
+                if adapt_timestamp is not None and isinstance(timestamp, datetime):
+                    timestamp = _adapted(timestamp_strings, timestamp, adapt_timestamp)
+                for topic, value, meta in points:
+                    topic_id = backup_cache[topic]
+                    if meta:
+                        self._add_metadata_rows(metadata_rows, source, topic_id, meta)
+                    rows.append((timestamp, source, topic_id, dumps(value), header_string))
+                continue
 
-            topic_id = self._backup_cache.get(topic)
-
-            if topic_id is None:
-                c.execute('''INSERT INTO topics values (?,?)''',
-                          (None, topic))
-                c.execute('''SELECT last_insert_rowid()''')
-                row = c.fetchone()
-                topic_id = row[0]
-                self._backup_cache[topic_id] = topic
-                self._backup_cache[topic] = topic_id
+            topic_id = backup_cache[item['topic']]
+            meta = item.get('meta', {})
+            readings = item['readings']
+            if adapt_timestamp is not None:
+                readings = [(_adapted(timestamp_strings, timestamp, adapt_timestamp)
+                             if isinstance(timestamp, datetime) else timestamp, value)
+                            for timestamp, value in readings]
 
-            meta_dict = self._meta_data[(source, topic_id)]
-            for name, value in meta.items():
-                current_meta_value = meta_dict.get(name)
-                if current_meta_value != value:
-                    c.execute('''INSERT OR REPLACE INTO metadata
-                                 values(?, ?, ?, ?)''',
-                              (source, topic_id, name, value))
-                    meta_dict[name] = value
+            self._add_metadata_rows(metadata_rows, source, topic_id, meta)
 
             # Check outside loop so that we do the check inside loop only if necessary
-            if time_tolerance_check:
+            if time_tolerance_check and headers.get("time_error"):
                 for timestamp, value in readings:
                     if timestamp is None:
-                        timestamp = get_aware_utc_now()
-                    elif headers["time_error"]:
+                        outstanding_rows.append((get_aware_utc_now(), source, topic_id, dumps(value), header_string))
+                    else:
                         _log.warning(f"Found data with timestamp {timestamp} that is out of configured tolerance ")
-                        c.execute(
-                            '''INSERT INTO time_error
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self.time_error_records = True
-                        continue  # continue to the next record. don't record in outstanding
-                    try:
-                        c.execute(
-                            '''INSERT INTO outstanding
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self._record_count += 1
-                    except sqlite3.IntegrityError as e:
-                        # In the case where we are upgrading an existing installed historian the
-                        # unique constraint may still exist on the outstanding database.
-                        # Ignore this case.
-                        _log.warning(f"sqlite3.Integrity error -- {e}")
-                        pass
+                        # don't record in outstanding
+                        time_error_rows.append((timestamp, source, topic_id, dumps(value), header_string))
             else:
-                for timestamp, value in readings:
-                    if timestamp is None:
-                        timestamp = get_aware_utc_now()
-                    try:
-                        c.execute(
-                            '''INSERT INTO outstanding
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self._record_count += 1
-                    except sqlite3.IntegrityError as e:
-                        # In the case where we are upgrading an existing installed historian the
-                        # unique constraint may still exist on the outstanding database.
-                        # Ignore this case.
-                        _log.warning(f"sqlite3.Integrity error -- {e}")
-                        pass
+                outstanding_rows.extend((get_aware_utc_now() if timestamp is None else timestamp,
+                                         source, topic_id, dumps(value), header_string)
+                                        for timestamp, value in readings)
+
+        if metadata_rows:
+            c.executemany('''INSERT OR REPLACE INTO metadata
+                             values(?, ?, ?, ?)''', metadata_rows)
+        if time_error_rows:
+            c.executemany('''INSERT INTO time_error
+                             values(NULL, ?, ?, ?, ?, ?)''', time_error_rows)
+            self.time_error_records = True
+        if outstanding_rows:
+            # In the case where we are upgrading an existing installed historian the
+            # unique constraint may still exist on the outstanding database.
+            # Those rows are skipped.
+            c.executemany('''INSERT OR IGNORE INTO outstanding
+                             values(NULL, ?, ?, ?, ?, ?)''', outstanding_rows)
+            inserted = max(c.rowcount, 0)
+            if inserted < len(outstanding_rows):
+                _log.warning(f"sqlite3.Integrity error -- skipped {len(outstanding_rows) - inserted} records")
+            self._record_count += inserted
 
         cache_full = False
         if self._backup_storage_limit_gb is not None:
@@ -1629,6 +1846,27 @@ class BackupDatabase:
                 self.time_error_records = True
         return cache_full
 
+    def _add_new_topics(self, c, topics):
+        """
+        Insert the given topics into the topics table in bulk and add their ids to the topic cache.
+
+        :param c: cursor of the open transaction
+        :param topics: topic names not yet in the cache
+        """
+        if not topics:
+            return
+        topics = list(topics)
+        c.executemany('''INSERT OR IGNORE INTO topics (topic_name) values (?)''',
+                      ((topic,) for topic in topics))
+        # Stay below the default SQLITE_MAX_VARIABLE_NUMBER of older sqlite versions.
+        for i in range(0, len(topics), 500):
+            chunk = topics[i:i + 500]
+            c.execute('''SELECT topic_id, topic_name FROM topics WHERE topic_name IN ({})'''.format(
+                ','.join('?' * len(chunk))), chunk)
+            for topic_id, topic in c.fetchall():
+                self._backup_cache[topic_id] = topic
+                self._backup_cache[topic] = topic_id
+
     def remove_successfully_published(self, successful_publishes,
                                       submit_size):
         """
@@ -1645,6 +1883,10 @@ class BackupDatabase:
 
         """
 
+        if self._drain_mode == BACKUP_DRAIN_STREAM:
+            self._remove_published_range(successful_publishes)
+            return
+
         c = self._connection.cursor()
         try:
             if None in successful_publishes:
@@ -1683,20 +1925,31 @@ class BackupDatabase:
         """
         # _log.debug("Getting oldest outstanding to publish.")
         c = self._connection.cursor()
-        c.execute('select * from outstanding order by ts limit ?', (size_limit,))
+        # Timestamps are read as text and converted once per distinct value, all points
+        # of a device publish share the same timestamp.
+        convert_timestamp = sqlite3.converters.get("TIMESTAMP")
+        columns = "id, {}, source, topic_id, value_string, header_string".format(
+            "ts" if convert_timestamp is None else "CAST(ts AS TEXT)")
+        if self._drain_mode == BACKUP_DRAIN_STREAM:
+            rows = self._next_stream_batch(c, columns, size_limit)
+        else:
+            c.execute(f'''SELECT {columns} FROM outstanding ORDER BY ts LIMIT ?''', (size_limit,))
+            rows = c
+        timestamps = {}
         results = []
         unique_records = set()
-        for row in c:
+        for row in rows:
             _id = row[0]
             timestamp = row[1]
+            if convert_timestamp is not None:
+                try:
+                    timestamp = timestamps[row[1]]
+                except KeyError:
+                    timestamp = timestamps[row[1]] = convert_timestamp(row[1].encode("utf-8"))
             source = row[2]
             topic_id = row[3]
-            value = loads(row[4])
-            headers = {} if row[5] is None else loads(row[5])
-            meta = self._meta_data[(source, topic_id)].copy()
-            topic = self._backup_cache[topic_id]
 
-            # check for duplicates before appending row to results
+            # check for duplicates before decoding the row
             if (topic_id, timestamp) in unique_records:
                 _log.debug(f"Found duplicate from cache: {row}")
                 self._dupe_ids.append(_id)
@@ -1707,10 +1960,10 @@ class BackupDatabase:
             results.append({'_id': _id,
                             'timestamp': timestamp.replace(tzinfo=pytz.UTC),
                             'source': source,
-                            'topic': topic,
-                            'value': value,
-                            'headers': headers,
-                            'meta': meta})
+                            'topic': self._backup_cache[topic_id],
+                            'value': loads(row[4]),
+                            'headers': {} if row[5] is None else loads(row[5]),
+                            'meta': self._meta_data[(source, topic_id)].copy()})
 
         c.close()
         # If we were backlogged at startup and our initial estimate was
@@ -1725,6 +1978,69 @@ class BackupDatabase:
 
         return results
 
+    def _next_stream_batch(self, c, columns, size_limit):
+        """
+        Read the next batch after the drained id in primary key order.
+        """
+        query = f'''SELECT {columns} FROM outstanding WHERE id > ? ORDER BY id LIMIT ?'''
+        c.execute(query, (self._drained_id, size_limit))
+        rows = c.fetchall()
+        if not rows and self._drained_id:
+            # Ids start over once the table has been emptied.
+            self._drained_id = 0
+            c.execute(query, (self._drained_id, size_limit))
+            rows = c.fetchall()
+        self._batch_ids = [row[0] for row in rows]
+        return rows
+
+    def _remove_published_range(self, successful_publishes):
+        """
+        Stream drain mode counterpart of :py:meth:`remove_successfully_published`.
+
+        Published rows of the last batch are deleted with one statement per run of
+        consecutive batch rows.  The cursor moves up to the first row that was not
+        published so that it is handed out again with the next batch.
+        """
+        if None in successful_publishes:
+            published = set(self._unique_ids)
+        else:
+            published = set(successful_publishes)
+
+        # Within a batch every existing row between two batch ids is part of the batch,
+        # so a run of published batch rows is a contiguous id range.
+        runs = []
+        run_start = None
+        removed = 0
+        first_unpublished = None
+        for index, _id in enumerate(self._batch_ids):
+            if _id in published:
+                removed += 1
+                if run_start is None:
+                    run_start = _id
+            else:
+                if first_unpublished is None:
+                    first_unpublished = _id
+                if run_start is not None:
+                    runs.append((run_start, self._batch_ids[index - 1]))
+                    run_start = None
+        if run_start is not None:
+            runs.append((run_start, self._batch_ids[-1]))
+
+        c = self._connection.cursor()
+        try:
+            c.executemany('''DELETE FROM outstanding WHERE id BETWEEN ? AND ?''', runs)
+            self._record_count = max(self._record_count - removed, 0)
+            if first_unpublished is not None:
+                self._drained_id = first_unpublished - 1
+            elif self._batch_ids:
+                self._drained_id = self._batch_ids[-1]
+        finally:
+            self._batch_ids = []
+            self._unique_ids.clear()
+            self._dupe_ids.clear()
+
+        self._connection.commit()
+
     def get_backlog_count(self):
         """
         Retrieve the current number of records in the cache.
@@ -1755,6 +2071,14 @@ class BackupDatabase:
             check_same_thread=check_same_thread)
 
         c = self._connection.cursor()
+        for name, value in self._pragmas.items():
+            c.execute(f"PRAGMA {name} = {value}")
+            if name == "journal_mode":
+                mode = c.fetchone()[0]
+                if mode.upper() != value:
+                    _log.warning(f"Backup DB journal mode is {mode}, requested {value}")
+        _log.debug(f"Backup DB settings: {self._pragmas}")
+
         if self._backup_storage_limit_gb is not None:
             c.execute('''PRAGMA page_size''')
             page_size = c.fetchone()[0]
@@ -1866,6 +2190,41 @@ class BackupDatabase:
         self._connection.commit()
 
 
+def _adapted(cache, obj, convert):
+    """Return convert(obj), memoized in cache by object identity."""
+    key = id(obj)
+    try:
+        return cache[key]
+    except KeyError:
+        cache[key] = result = convert(obj)
+        return result
+
+
+def _epoch_query_results(results):
+    """Convert the timestamp strings of query results to seconds since the epoch."""
+    values = results.get("values")
+    if not values:
+        return results
+    converted = {}
+
+    def to_epoch(time_stamp):
+        try:
+            return converted[time_stamp]
+        except KeyError:
+            dt = parse_timestamp_string(time_stamp)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=pytz.UTC)
+            converted[time_stamp] = result = dt.timestamp()
+            return result
+
+    if isinstance(values, dict):
+        results["values"] = {topic: [(to_epoch(ts), value) for ts, value in topic_values]
+                             for topic, topic_values in values.items()}
+    else:
+        results["values"] = [(to_epoch(ts), value) for ts, value in values]
+    return results
+
+
 # Code reimplemented from https://github.com/gilesbrown/gsqlite3
 def _using_threadpool(method):
     @wraps(method, ['__name__', '__doc__'])
@@ -1894,6 +2253,10 @@ class BaseQueryHistorianAgent(Agent):
     their data stores.
     """
 
+    # Values of the timestamp_format argument that query_historian handles itself.
+    # Other formats are converted from the default "iso" result.
+    native_timestamp_formats = ()
+
     def __init__(self, **kwargs):
         _log.debug('Constructor of BaseQueryHistorianAgent thread: {}'.format(
             threading.currentThread().getName()
@@ -2031,7 +2394,8 @@ class BaseQueryHistorianAgent(Agent):
 
     @RPC.export
     def query(self, topic=None, start=None, end=None, agg_type=None,
-              agg_period=None, skip=0, count=None, order="FIRST_TO_LAST"):
+              agg_period=None, skip=0, count=None, order="FIRST_TO_LAST",
+              timestamp_format="iso"):
         """RPC call to query an Historian for time series data.
 
         :param topic: Topic or topics to query for.
@@ -2050,9 +2414,12 @@ class BaseQueryHistorianAgent(Agent):
                          aggregation ( for example, sum, avg)
         :param agg_period: If this is a query for aggregate data, the time
                            period of aggregation
+        :param timestamp_format: "iso" (default) for timestamp strings, "epoch"
+                                 for seconds since the epoch as floats
         :type skip: int
         :type count: int
         :type order: str
+        :type timestamp_format: str
 
         :return: Results of the query
         :rtype: dict
@@ -2084,6 +2451,9 @@ class BaseQueryHistorianAgent(Agent):
         if topic is None:
             raise TypeError('"Topic" required')
 
+        if timestamp_format not in ("iso", "epoch"):
+            raise ValueError('timestamp_format should be either "iso" or "epoch"')
+
         if agg_type:
             if not agg_period:
                 raise TypeError("You should provide both aggregation type"
@@ -2115,8 +2485,15 @@ class BaseQueryHistorianAgent(Agent):
         if start:
             _log.debug("start={}".format(start))
 
-        results = self.query_historian(topic, start, end, agg_type,
-                                       agg_period, skip, count, order)
+        if timestamp_format in self.native_timestamp_formats:
+            results = self.query_historian(topic, start, end, agg_type,
+                                           agg_period, skip, count, order,
+                                           timestamp_format=timestamp_format)
+        else:
+            results = self.query_historian(topic, start, end, agg_type,
+                                           agg_period, skip, count, order)
+            if timestamp_format == "epoch":
+                results = _epoch_query_results(results)
         metadata = results.get("metadata", None)
         values = results.get("values", None)
         if values and metadata is None:
@@ -44,6 +44,7 @@ from volttron.platform import aip as aipmod
 from volttron.platform import jsonapi
 from volttron.platform.agent import utils
 
+from volttron.platform.messaging import topics
 from volttron.platform.messaging.health import Status, STATUS_BAD
 from volttron.platform.scheduling import periodic
 from volttron.platform.vip.agent import Agent as BaseAgent, Core, RPC
@@ -83,12 +84,16 @@ class ControlService(BaseAgent):
     ):
 
         tracker = kwargs.pop("tracker", None)
+        router_statistics = kwargs.pop("router_statistics", None)
+        router_stats_publish_interval = kwargs.pop("router_stats_publish_interval", 0)
         # Control config store not necessary right now
         kwargs["enable_store"] = False
         kwargs["enable_channel"] = True
         super(ControlService, self).__init__(*args, **kwargs)
         self._aip = aip
         self._tracker = tracker
+        self._router_statistics = router_statistics
+        self._router_stats_publish_interval = float(router_stats_publish_interval or 0)
         self.crashed_agents = {}
         self.agent_monitor_frequency = int(agent_monitor_frequency)
 
@@ -112,6 +117,8 @@ class ControlService(BaseAgent):
         self.vip.rpc.export(self._tracker.enable, "stats.enable")
         self.vip.rpc.export(self._tracker.disable, "stats.disable")
         self.vip.rpc.export(lambda: self._tracker.stats, "stats.get")
+        if self._router_statistics is not None:
+            self.vip.rpc.export(lambda: self._router_statistics.snapshot(advance=False), "stats.router")
 
     @Core.receiver("onstart")
     def onstart(self, sender, **kwargs):
@@ -121,6 +128,17 @@ class ControlService(BaseAgent):
         )
         self.core.schedule(periodic(self.agent_monitor_frequency),
                            self._monitor_agents)
+        if self._router_statistics is not None and self._router_stats_publish_interval > 0:
+            self.core.schedule(periodic(self._router_stats_publish_interval),
+                               self._publish_router_statistics)
+
+    def _publish_router_statistics(self):
+        """
+        Publish the router statistics of the last interval on the
+        platform/router/statistics topic.
+        """
+        self.vip.pubsub.publish("pubsub", topics.PLATFORM_ROUTER_STATISTICS,
+                                message=self._router_statistics.snapshot())
 
     def _monitor_agents(self):
         """
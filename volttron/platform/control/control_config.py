@@ -40,6 +40,14 @@ def add_config_to_store(opts):
     opts.connection.peer = CONFIGURATION_STORE
     call = opts.connection.call
 
+    if opts.bulk is not None:
+        add_configs_to_store(opts)
+        return
+
+    if opts.name is None:
+        _stderr.write("ERROR: must specify a configuration name\n")
+        return
+
     file_contents = opts.infile.read()
 
     call(
@@ -47,10 +55,55 @@ def add_config_to_store(opts):
         opts.identity,
         opts.name,
         file_contents,
-        config_type=opts.config_type,
+        config_type=opts.config_type or "json",
     )
 
 
+def _bulk_config_type(file_name, config_type):
+    if config_type is not None:
+        return config_type
+    ext = os.path.splitext(file_name)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    return "json"
+
+
+def add_configs_to_store(opts):
+    """Stores every file below the --bulk directory with a single call.
+
+    Configuration names are the file paths relative to the directory,
+    prefixed with the name argument when one is given.
+    """
+    call = opts.connection.call
+    directory = os.path.expanduser(opts.bulk)
+    if not os.path.isdir(directory):
+        _stderr.write("ERROR: {} is not a directory\n".format(opts.bulk))
+        return
+
+    configs = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for file_name in sorted(files):
+            if file_name.startswith("."):
+                continue
+            path = os.path.join(root, file_name)
+            config_name = os.path.relpath(path, directory).replace(os.sep, "/")
+            if opts.name:
+                config_name = opts.name.rstrip("/") + "/" + config_name
+            with open(path) as f:
+                configs[config_name] = {
+                    "data": f.read(),
+                    "type": _bulk_config_type(file_name, opts.config_type),
+                }
+
+    if not configs:
+        _stderr.write("ERROR: no configurations found in {}\n".format(opts.bulk))
+        return
+
+    call("set_configs", opts.identity, configs)
+    _stdout.write("Stored {} configurations\n".format(len(configs)))
+
+
 def delete_config_from_store(opts):
     opts.connection.peer = CONFIGURATION_STORE
     call = opts.connection.call
@@ -169,7 +222,10 @@ def add_config_store_parser(add_parser_fn):
     config_store_store.add_argument("identity",
                                     help="VIP IDENTITY of the store")
     config_store_store.add_argument(
-        "name", help="name used to reference the configuration by in the store"
+        "name",
+        nargs="?",
+        help="name used to reference the configuration by in the store "
+             "(prefix for the configuration names with --bulk)",
     )
     config_store_store.add_argument(
         "infile",
@@ -199,9 +255,16 @@ def add_config_store_parser(add_parser_fn):
         action="store_const",
         help="interpret the input file as csv",
     )
+    config_store_store.add_argument(
+        "--bulk",
+        metavar="DIRECTORY",
+        help="store every file below DIRECTORY in a single update, named by "
+             "its relative path. Files ending in .csv are stored as csv and "
+             "other files as json unless --raw, --json or --csv is given",
+    )
 
     config_store_store.set_defaults(func=add_config_to_store,
-                                    config_type="json")
+                                    config_type=None)
 
     config_store_edit = add_parser_fn(
         "edit",
@@ -436,9 +436,41 @@ def send_agent(opts):
         return uuid
 
 
+def _print_router_statistics(stats, limit):
+    """Print the busiest peers and subsystems and the histogram summaries of the router statistics."""
+    _stdout.write("Rates over the last {:.0f} seconds, latency and fan-out sampled 1 in {}\n".format(
+        stats["window"], stats["sample_interval"]))
+    fmt = "{:<40} {:>10} {:>12} {:>10} {:>12} {:>8} {:>12}\n"
+    for table in ("peers", "subsystems"):
+        rows = sorted(stats[table].items(),
+                      key=lambda item: item[1]["incoming_per_second"] + item[1]["outgoing_per_second"],
+                      reverse=True)
+        _stdout.write("\n")
+        _stdout.write(fmt.format(table.upper()[:-1], "in msg/s", "in bytes/s", "out msg/s", "out bytes/s",
+                                 "EAGAIN", "EHOSTUNREACH"))
+        for name, row in rows[:limit]:
+            _stdout.write(fmt.format(name or "(router)",
+                                     "{:.1f}".format(row["incoming_per_second"]),
+                                     "{:.0f}".format(row["incoming_bytes_per_second"]),
+                                     "{:.1f}".format(row["outgoing_per_second"]),
+                                     "{:.0f}".format(row["outgoing_bytes_per_second"]),
+                                     row["eagain"], row["ehostunreach"]))
+    for name, title in (("latency_us", "Routing latency (us)"), ("fanout", "Publish fan-out")):
+        summary = stats[name]
+        _stdout.write("\n{}: count {} min {} p50 {} p90 {} p99 {} max {}\n".format(
+            title, summary["count"], summary["min"], summary["p50"], summary["p90"], summary["p99"],
+            summary["max"]))
+
+
 def do_stats(opts):
     call = opts.connection.call
-    if opts.op == "status":
+    if opts.op == "router":
+        stats = call("stats.router")
+        if opts.json:
+            _stdout.write(f"{jsonapi.dumps(stats, indent=2)}\n")
+        else:
+            _print_router_statistics(stats, opts.limit)
+    elif opts.op == "status":
         _stdout.write("%sabled\n" % ("en" if call("stats.enabled") else "dis"))
     elif opts.op in ["dump", "pprint"]:
         stats = call("stats.get")
@@ -787,11 +819,16 @@ def main():
     send.set_defaults(func=send_agent)
 
     stats = add_parser("stats",
-                       help="manage router message statistics tracking")
+                       help="manage router message statistics tracking, "
+                            "'router' shows the always-on router statistics")
     op = stats.add_argument(
         "op",
-        choices=["status", "enable", "disable", "dump", "pprint"],
+        choices=["status", "enable", "disable", "dump", "pprint", "router"],
         nargs="?")
+    stats.add_argument("--limit",
+                       type=int,
+                       default=20,
+                       help="number of peers and subsystems shown by 'router'")
     stats.set_defaults(func=do_stats, op="status")
 
     # ==============================================================================
@@ -460,7 +460,7 @@ class DbDriver:
 
     @abstractmethod
     def query(self, topic_ids, id_name_map, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", timestamp_format="iso"):
         """
         Queries the raw historian data or aggregate data and returns the results of the query
         :param topic_ids: list of topic ids to query for.
@@ -473,11 +473,14 @@ class DbDriver:
         :param count: Limit results to this value. When the query is for multiple topics, count applies to individual
         topics. For example, a query on 2 topics with count=5 will return 5 records for each topic
         :param order: How to order the results, either "FIRST_TO_LAST" or "LAST_TO_FIRST"
+        :param timestamp_format: "iso" to return timestamps as strings in the format of
+        :py:func:`volttron.platform.agent.utils.format_timestamp`, "epoch" to return them as seconds since the epoch
         :type start: datetime
         :type end: datetime
         :type skip: int
         :type count: int
         :type order: str
+        :type timestamp_format: str
         :return: result of the query in the format:
         .. code-block:: python
 
@@ -543,3 +546,47 @@ class DbDriver:
         :return: a tuple of (aggregated value, count of records over which this aggregation was computed)
         """
         pass
+
+    def collect_aggregate_summary(self, topic_ids, start=None, end=None):
+        """
+        Collect the count, sum, minimum and maximum of the historian's data over a time slice. Summaries of adjacent
+        time slices can be combined into the summary of a longer slice. Drivers should override this with a single
+        query.
+        :param topic_ids: list of topic ids for which the summary should be computed.
+        :param start: start time for query (inclusive)
+        :param end:  end time for query (exclusive)
+        :return: a tuple of (count, sum, min, max). sum, min and max are None when count is 0
+        """
+        total, count = self.collect_aggregate(topic_ids, 'SUM', start, end)
+        if not count:
+            return 0, None, None, None
+        minimum, _ = self.collect_aggregate(topic_ids, 'MIN', start, end)
+        maximum, _ = self.collect_aggregate(topic_ids, 'MAX', start, end)
+        return count, total, minimum, maximum
+
+    def collect_aggregate_summaries(self, topic_ids, start=None, end=None):
+        """
+        Collect the (count, sum, min, max) summary of each topic over a time slice. Drivers should override this with
+        a single query grouped by topic id.
+        :param topic_ids: list of topic ids for which summaries should be computed.
+        :param start: start time for query (inclusive)
+        :param end:  end time for query (exclusive)
+        :return: dictionary of topic id to (count, sum, min, max). Topics without records may be left out
+        """
+        return {topic_id: self.collect_aggregate_summary([topic_id], start, end) for topic_id in topic_ids}
+
+    def insert_aggregates(self, rows):
+        """
+        Insert several aggregates with one statement per aggregate table and a single commit.
+        :param rows: list of (agg_topic_id, agg_type, period, ts, data, topic_ids) with the same meaning as the
+        arguments of insert_aggregate
+        :return: True if execution was successful, raises exception in case of connection failures
+        """
+        tables = {}
+        for agg_topic_id, agg_type, period, ts, data, topic_ids in rows:
+            tables.setdefault(agg_type + '_' + period, []).append((ts, agg_topic_id, data, str(topic_ids)))
+        for table_name, args in tables.items():
+            _log.debug("Inserting {} aggregates into table {}".format(len(args), table_name))
+            self.execute_many(self.insert_aggregate_stmt(table_name), args)
+        self.commit()
+        return True
@@ -174,7 +174,16 @@ class MySqlFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", timestamp_format="iso"):
+
+        if timestamp_format == "epoch":
+            def convert_timestamp(ts):
+                return ts.replace(tzinfo=pytz.UTC).timestamp()
+        elif timestamp_format == "iso":
+            def convert_timestamp(ts):
+                return utils.format_timestamp(ts.replace(tzinfo=pytz.UTC))
+        else:
+            raise ValueError("Unsupported timestamp format {}".format(timestamp_format))
 
         table_name = self.data_table
         value_col = 'value_string'
@@ -256,13 +265,11 @@ class MySqlFuncts(DbDriver):
                 if value_col == 'agg_value':
                     for _id, ts, value in cursor:
                         values[id_name_map[topic_id]].append(
-                            (utils.format_timestamp(ts.replace(tzinfo=pytz.UTC)),
-                             value))
+                            (convert_timestamp(ts), value))
                 else:
                     for _id, ts, value in cursor:
                         values[id_name_map[topic_id]].append(
-                            (utils.format_timestamp(ts.replace(tzinfo=pytz.UTC)),
-                             jsonapi.loads(value)))
+                            (convert_timestamp(ts), jsonapi.loads(value)))
 
             if cursor is not None:
                 cursor.close()
@@ -499,6 +506,47 @@ ON DUPLICATE KEY UPDATE value_string=VALUES(value_string);
         query = '''SELECT ''' \
                 + agg_type + '''(value_string), count(value_string) FROM ''' \
                 + self.data_table + ''' {where}'''
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        rows = self.select(real_query, args)
+        if rows:
+            return rows[0][0], rows[0][1]
+        else:
+            return 0, 0
+
+    def collect_aggregate_summary(self, topic_ids, start=None, end=None):
+        query = '''SELECT count(value_string), sum(value_string), ''' \
+                '''min(value_string), max(value_string) FROM ''' \
+                + self.data_table + ''' {where}'''
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        rows = self.select(real_query, args)
+        if rows and rows[0][0]:
+            return tuple(rows[0])
+        else:
+            return 0, None, None, None
+
+    def collect_aggregate_summaries(self, topic_ids, start=None, end=None):
+        query = '''SELECT topic_id, count(value_string), sum(value_string), ''' \
+                '''min(value_string), max(value_string) FROM ''' \
+                + self.data_table + ''' {where} GROUP BY topic_id'''
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        return {row[0]: tuple(row[1:]) for row in self.select(real_query, args)}
+
+    def _aggregate_where(self, topic_ids, start, end):
         where_clauses = ["WHERE topic_id = %s"]
         args = [topic_ids[0]]
         if len(topic_ids) > 1:
@@ -529,14 +577,4 @@ ON DUPLICATE KEY UPDATE value_string=VALUES(value_string);
                 end_str = end.isoformat()
                 args.append(end_str[:end_str.rfind('.')])
 
-        where_statement = ' AND '.join(where_clauses)
-
-        real_query = query.format(where=where_statement)
-        _log.debug("Real Query: " + real_query)
-        _log.debug("args: " + str(args))
-
-        rows = self.select(real_query, args)
-        if rows:
-            return rows[0][0], rows[0][1]
-        else:
-            return 0, 0
+        return ' AND '.join(where_clauses), args
@@ -212,7 +212,7 @@ class PostgreSqlFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order='FIRST_TO_LAST'):
+              order='FIRST_TO_LAST', timestamp_format='iso'):
         if agg_type and agg_period:
             table_name = agg_type + '_' + agg_period
             value_col = 'agg_value'
@@ -220,43 +220,59 @@ class PostgreSqlFuncts(DbDriver):
             table_name = self.data_table
             value_col = 'value_string'
 
-        topic_id = Literal(0)
-        query = [SQL(
-            '''SELECT to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.USOF:00'), ''' + value_col + ' \n'
-            'FROM {}\n'
-            'WHERE topic_id = {}'
-        ).format(Identifier(table_name), topic_id)]
+        if timestamp_format == 'epoch':
+            ts_col = 'EXTRACT(EPOCH FROM ts)::float8'
+        elif timestamp_format == 'iso':
+            ts_col = '''to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.USOF:00')'''
+        else:
+            raise ValueError('Unsupported timestamp format {}'.format(timestamp_format))
+
+        # All topics are read with a single statement, count and skip apply
+        # to every topic individually.
+        where = [SQL('topic_id = ANY({})').format(Literal(list(topic_ids)))]
         if start and start.tzinfo != pytz.UTC:
             start = start.astimezone(pytz.UTC)
         if end and end.tzinfo != pytz.UTC:
             end = end.astimezone(pytz.UTC)
         if start and start == end:
-            query.append(SQL(' AND ts = {}').format(Literal(start)))
+            where.append(SQL('ts = {}').format(Literal(start)))
         else:
             if start:
-                query.append(SQL(' AND ts >= {}').format(Literal(start)))
+                where.append(SQL('ts >= {}').format(Literal(start)))
             if end:
-                query.append(SQL(' AND ts < {}').format(Literal(end)))
-        query.append(SQL('ORDER BY ts {}'.format(
-            'DESC' if order == 'LAST_TO_FIRST' else 'ASC')))
+                where.append(SQL('ts < {}').format(Literal(end)))
+        where = SQL(' AND ').join(where)
+        ts_order = SQL('ts DESC' if order == 'LAST_TO_FIRST' else 'ts ASC')
+
         if skip or count:
-            query.append(SQL('LIMIT {} OFFSET {}').format(
-                Literal(None if not count or count < 0 else count),
-                Literal(None if not skip or skip < 0 else skip)))
-        query = SQL('\n').join(query)
-        values = {}
-        if value_col == 'agg_value':
-            for topic_id._wrapped in topic_ids:
-                name = id_name_map[topic_id.wrapped]
-                with self.select(query, fetch_all=False) as cursor:
-                    values[name] = [(ts, value)
-                                    for ts, value in cursor]
+            query = SQL(
+                'SELECT topic_id, ts_out, value FROM (\n'
+                '    SELECT topic_id, ' + ts_col + ' AS ts_out, ' + value_col + ' AS value,\n'
+                '    ROW_NUMBER() OVER (PARTITION BY topic_id ORDER BY {}) AS row_num\n'
+                '    FROM {}\n'
+                '    WHERE {}) AS ranked\n'
+                'WHERE row_num > {}{}\n'
+                'ORDER BY topic_id, row_num'
+            ).format(ts_order, Identifier(table_name), where,
+                     Literal(skip if skip and skip > 0 else 0),
+                     SQL(' AND row_num <= {}').format(Literal((skip if skip and skip > 0 else 0) + count))
+                     if count and count > 0 else SQL(''))
         else:
-            for topic_id._wrapped in topic_ids:
-                name = id_name_map[topic_id.wrapped]
-                with self.select(query, fetch_all=False) as cursor:
-                    values[name] = [(ts, jsonapi.loads(value))
-                                    for ts, value in cursor]
+            query = SQL(
+                'SELECT topic_id, ' + ts_col + ', ' + value_col + '\n'
+                'FROM {}\n'
+                'WHERE {}\n'
+                'ORDER BY topic_id, {}'
+            ).format(Identifier(table_name), where, ts_order)
+
+        values = {id_name_map[topic_id]: [] for topic_id in topic_ids}
+        with self.select(query, fetch_all=False) as cursor:
+            if value_col == 'agg_value':
+                for topic_id, ts, value in cursor:
+                    values[id_name_map[topic_id]].append((ts, value))
+            else:
+                for topic_id, ts, value in cursor:
+                    values[id_name_map[topic_id]].append((ts, jsonapi.loads(value)))
         return values
 
     def insert_topic(self, topic, **kwargs):
@@ -430,6 +446,31 @@ class PostgreSqlFuncts(DbDriver):
         query = [
             SQL('SELECT {}(CAST(value_string as float)), COUNT(value_string)'.format(
                 agg_type.upper())),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        rows = self.select(SQL('\n').join(query))
+        return rows[0] if rows else (0, 0)
+
+    def collect_aggregate_summary(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), MAX(CAST(value_string as float))'),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        rows = self.select(SQL('\n').join(query))
+        if rows and rows[0][0]:
+            return tuple(rows[0])
+        return 0, None, None, None
+
+    def collect_aggregate_summaries(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT topic_id, COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), MAX(CAST(value_string as float))'),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        query.append(SQL('GROUP BY topic_id'))
+        rows = self.select(SQL('\n').join(query))
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _aggregate_filter(self, topic_ids, start, end):
+        query = [
             SQL('FROM {}').format(Identifier(self.data_table)),
             SQL('WHERE topic_id in ({})').format(
                 SQL(', ').join(Literal(tid) for tid in topic_ids)),
@@ -438,5 +479,4 @@ class PostgreSqlFuncts(DbDriver):
             query.append(SQL(' AND ts >= {}').format(Literal(start)))
         if end is not None:
             query.append(SQL(' AND ts < {}').format(Literal(end)))
-        rows = self.select(SQL('\n').join(query))
-        return rows[0] if rows else (0, 0)
+        return query
@@ -145,14 +145,20 @@ class RedshiftFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order='FIRST_TO_LAST'):
+              order='FIRST_TO_LAST', timestamp_format='iso'):
         if agg_type and agg_period:
             table_name = agg_type + '_' + agg_period
         else:
             table_name = self.data_table
+        if timestamp_format == 'epoch':
+            ts_col = 'EXTRACT(EPOCH FROM ts)::float8'
+        elif timestamp_format == 'iso':
+            ts_col = '''to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.USOF:00')'''
+        else:
+            raise ValueError('Unsupported timestamp format {}'.format(timestamp_format))
         topic_id = Literal(0)
         query = [SQL(
-            '''SELECT DISTINCT to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.USOF:00'), '''
+            'SELECT DISTINCT ' + ts_col + ', '
             'value_string\n'
             'FROM {}\n'
             'WHERE topic_id = {}'
@@ -329,6 +335,31 @@ class RedshiftFuncts(DbDriver):
         query = [
             SQL('SELECT {}(CAST(value_string as float)), COUNT(value_string)'.format(
                 agg_type.upper())),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        rows = self.select(SQL('\n').join(query))
+        return rows[0] if rows else (0, 0)
+
+    def collect_aggregate_summary(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), MAX(CAST(value_string as float))'),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        rows = self.select(SQL('\n').join(query))
+        if rows and rows[0][0]:
+            return tuple(rows[0])
+        return 0, None, None, None
+
+    def collect_aggregate_summaries(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT topic_id, COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), MAX(CAST(value_string as float))'),
+        ] + self._aggregate_filter(topic_ids, start, end)
+        query.append(SQL('GROUP BY topic_id'))
+        rows = self.select(SQL('\n').join(query))
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _aggregate_filter(self, topic_ids, start, end):
+        query = [
             SQL('FROM {}').format(Identifier(self.data_table)),
             SQL('WHERE topic_id in ({})').format(
                 SQL(', ').join(Literal(tid) for tid in topic_ids)),
@@ -337,5 +368,4 @@ class RedshiftFuncts(DbDriver):
             query.append(SQL(' AND ts >= {}').format(Literal(start)))
         if end is not None:
             query.append(SQL(' AND ts < {}').format(Literal(end)))
-        rows = self.select(SQL('\n').join(query))
-        return rows[0] if rows else (0, 0)
+        return query
@@ -54,6 +54,9 @@ class SqlLiteFuncts(DbDriver):
     For method details please refer to base class
     :py:class:`volttron.platform.dbutils.basedb.DbDriver`
     """
+    # Topic ids per query statement, below the default SQLITE_MAX_VARIABLE_NUMBER of older sqlite versions.
+    MAX_QUERY_TOPICS = 500
+
     def __init__(self, connect_params, table_names):
         database = connect_params['database']
         thread_name = threading.currentThread().getName()
@@ -162,7 +165,7 @@ class SqlLiteFuncts(DbDriver):
         self.commit()
 
     def query(self, topic_ids, id_name_map, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", timestamp_format="iso"):
         """
         This function should return the results of a query in the form:
 
@@ -172,6 +175,9 @@ class SqlLiteFuncts(DbDriver):
              "metadata": {"key1": value1, "key2": value2, ...}}
 
         metadata is not required (The caller will normalize this to {} for you)
+
+        All topics are read with one statement per chunk of topic ids. count and skip apply to every topic
+        individually, which uses a window function if the sqlite library supports it.
         @param topic_ids: topic_ids to query data for
         @param id_name_map: dictionary containing topic_id:topic_name
         @param start:
@@ -181,6 +187,7 @@ class SqlLiteFuncts(DbDriver):
         @param skip:
         @param count:
         @param order:
+        @param timestamp_format: "iso" for timestamp strings, "epoch" for seconds since the epoch
         """
         table_name = self.data_table
         value_col = 'value_string'
@@ -188,15 +195,8 @@ class SqlLiteFuncts(DbDriver):
             table_name = agg_type + "_" + agg_period
             value_col = 'agg_value'
 
-        query = '''SELECT topic_id, ts, ''' + value_col + '''
-                   FROM ''' + table_name + '''
-                   {where}
-                   {order_by}
-                   {limit}
-                   {offset}'''
-
-        where_clauses = ["WHERE topic_id = ?"]
-        args = [topic_ids[0]]
+        where_clauses = []
+        args = []
 
         # base historian converts naive timestamps to UTC, but if the start and end had explicit timezone info then they
         # need to get converted to UTC since sqlite3 only store naive timestamp
@@ -216,51 +216,98 @@ class SqlLiteFuncts(DbDriver):
                 where_clauses.append("ts < ?")
                 args.append(end)
 
-        where_statement = ' AND '.join(where_clauses)
-
-        order_by = 'ORDER BY topic_id ASC, ts ASC'
-        if order == 'LAST_TO_FIRST':
-            order_by = ' ORDER BY topic_id DESC, ts DESC'
-
-        # can't have an offset without a limit
-        # -1 = no limit and allows the user to provide just an offset
-        if count is None:
+        ts_order = 'ts DESC' if order == 'LAST_TO_FIRST' else 'ts ASC'
+        # -1 = no limit
+        if count is None or count < 0:
             count = -1
-
-        limit_statement = 'LIMIT ?'
-        args.append(count)
-
-        offset_statement = ''
-        if skip > 0:
-            offset_statement = 'OFFSET ?'
-            args.append(skip)
-
-        real_query = query.format(where=where_statement,
-                                  limit=limit_statement,
-                                  offset=offset_statement,
-                                  order_by=order_by)
-        _log.debug("Real Query: " + real_query)
-        _log.debug("args: " + str(args))
+        per_topic_limit = count >= 0 or skip > 0
+
+        if not per_topic_limit:
+            # Timestamps are read as text and converted once per distinct value below.
+            query = \
+                f'''SELECT topic_id, CAST(ts AS TEXT), {value_col}
+                   FROM {table_name}
+                   WHERE {{topics}} {" AND ".join([""] + where_clauses)}
+                   ORDER BY topic_id, {ts_order}'''
+            limit_args = []
+            chunk_size = self.MAX_QUERY_TOPICS
+        elif sqlite3.sqlite_version_info >= (3, 25, 0):
+            query = \
+                f'''SELECT topic_id, ts_text, value FROM
+                   (SELECT topic_id, CAST(ts AS TEXT) AS ts_text, {value_col} AS value,
+                    ROW_NUMBER() OVER (PARTITION BY topic_id ORDER BY {ts_order}) AS row_num
+                    FROM {table_name}
+                    WHERE {{topics}} {" AND ".join([""] + where_clauses)})
+                   WHERE row_num > ? {"" if count < 0 else "AND row_num <= ?"}
+                   ORDER BY topic_id, row_num'''
+            limit_args = [skip] if count < 0 else [skip, skip + count]
+            chunk_size = self.MAX_QUERY_TOPICS
+        else:
+            # No window functions, limit every topic in its own query.
+            query = \
+                f'''SELECT topic_id, CAST(ts AS TEXT), {value_col}
+                   FROM {table_name}
+                   WHERE {{topics}} {" AND ".join([""] + where_clauses)}
+                   ORDER BY {ts_order}
+                   LIMIT ? OFFSET ?'''
+            limit_args = [count, skip]
+            chunk_size = 1
+
+        convert_timestamp = self._timestamp_converter(timestamp_format)
+        decode = (lambda value: value) if value_col == 'agg_value' else jsonapi.loads
 
         values = defaultdict(list)
-        start_t = datetime.utcnow()
         for topic_id in topic_ids:
-            args[0] = topic_id
             values[id_name_map[topic_id]] = []
-            cursor = self.select(real_query, args, fetch_all=False)
+        start_t = datetime.utcnow()
+        for i in range(0, len(topic_ids), chunk_size):
+            chunk = topic_ids[i:i + chunk_size]
+            real_query = query.format(topics="topic_id IN ({})".format(",".join("?" * len(chunk))))
+            real_args = list(chunk) + args + limit_args
+            _log.debug("Real Query: " + real_query)
+            _log.debug("args: " + str(real_args))
+            cursor = self.select(real_query, real_args, fetch_all=False)
             if cursor:
-                if value_col == 'agg_value':
-                    for _id, ts, value in cursor:
-                        values[id_name_map[topic_id]].append((utils.format_timestamp(ts), value))
-                    cursor.close()
-                else:
-                    for _id, ts, value in cursor:
-                        values[id_name_map[topic_id]].append((utils.format_timestamp(ts), jsonapi.loads(value)))
-                    cursor.close()
+                current_id = None
+                topic_values = None
+                for topic_id, ts, value in cursor:
+                    if topic_id != current_id:
+                        current_id = topic_id
+                        topic_values = values[id_name_map[topic_id]]
+                    topic_values.append((convert_timestamp(ts), decode(value)))
+                cursor.close()
 
         _log.debug("Time taken to load results from db:{}".format(datetime.utcnow()-start_t))
         return values
 
+    @staticmethod
+    def _timestamp_converter(timestamp_format):
+        """
+        Return a function converting stored timestamp strings to query results. Rows of different
+        topics mostly share the same timestamps, so every distinct string is converted once.
+        """
+        if timestamp_format == "epoch":
+            def convert(ts):
+                ts = utils.parse_timestamp_string(ts)
+                if ts.tzinfo is None:
+                    ts = ts.replace(tzinfo=pytz.UTC)
+                return ts.timestamp()
+        elif timestamp_format == "iso":
+            def convert(ts):
+                return utils.format_timestamp(utils.parse_timestamp_string(ts))
+        else:
+            raise ValueError(f"Unsupported timestamp format {timestamp_format}")
+
+        converted = {}
+
+        def cached(ts):
+            try:
+                return converted[ts]
+            except KeyError:
+                converted[ts] = result = convert(ts)
+                return result
+        return cached
+
     def manage_db_size(self, history_limit_timestamp, storage_limit_gb):
         """
         Manage database size.
@@ -499,6 +546,49 @@ class SqlLiteFuncts(DbDriver):
         query = '''SELECT ''' + agg_type + '''(value_string), count(value_string) FROM ''' + \
                 self.data_table + ''' {where}'''
 
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        results = self.select(real_query, args)
+        if results:
+            _log.debug("results got {}, {}".format(results[0][0], results[0][1]))
+            return results[0][0], results[0][1]
+        else:
+            return 0, 0
+
+    def collect_aggregate_summary(self, topic_ids, start=None, end=None):
+        query = '''SELECT count(value_string), sum(value_string), min(value_string), max(value_string) FROM ''' + \
+                self.data_table + ''' {where}'''
+
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        results = self.select(real_query, args)
+        if results and results[0][0]:
+            return tuple(results[0])
+        else:
+            return 0, None, None, None
+
+    def collect_aggregate_summaries(self, topic_ids, start=None, end=None):
+        query = '''SELECT topic_id, count(value_string), sum(value_string), min(value_string), ''' \
+                '''max(value_string) FROM ''' + self.data_table + ''' {where} GROUP BY topic_id'''
+
+        where_statement, args = self._aggregate_where(topic_ids, start, end)
+
+        real_query = query.format(where=where_statement)
+        _log.debug("Real Query: " + real_query)
+        _log.debug("args: " + str(args))
+
+        return {row[0]: tuple(row[1:]) for row in self.select(real_query, args)}
+
+    @staticmethod
+    def _aggregate_where(topic_ids, start, end):
         where_clauses = ["WHERE topic_id = ?"]
         args = [topic_ids[0]]
         if len(topic_ids) > 1:
@@ -528,18 +618,7 @@ class SqlLiteFuncts(DbDriver):
                 where_clauses.append("ts < ?")
                 args.append(end)
 
-        where_statement = ' AND '.join(where_clauses)
-
-        real_query = query.format(where=where_statement)
-        _log.debug("Real Query: " + real_query)
-        _log.debug("args: " + str(args))
-
-        results = self.select(real_query, args)
-        if results:
-            _log.debug("results got {}, {}".format(results[0][0], results[0][1]))
-            return results[0][0], results[0][1]
-        else:
-            return 0, 0
+        return ' AND '.join(where_clauses), args
 
     @staticmethod
     def get_tagging_query_from_ast(topic_tags_table, tup, tag_refs):
@@ -47,6 +47,7 @@ from volttron.platform.agent.utils import get_platform_instance_name, wait_for_v
     is_volttron_running, wait_for_volttron_shutdown, setup_logging, format_timestamp, get_aware_utc_now, \
     parse_json_config
 from volttron.utils import get_hostname
+from volttron.utils.persistance import JournaledPersistentDict
 from volttron.utils.prompt import prompt_response, y, n, y_or_n
 from . import get_home, get_services_core, set_home
 from volttron.platform.agent.utils import load_config as load_yml_or_json
@@ -1019,6 +1020,8 @@ def update_configs_in_store(args_dict):
 
             configs_updated = False
             agent_store_path = os.path.join(vhome, "configuration_store", vip_id+".store")
+            # Fold changes the configuration store journaled but did not compact yet into the store file.
+            JournaledPersistentDict(filename=agent_store_path, flag='c')
             if os.path.isfile(agent_store_path):
                 # load current store configs as python object for comparison
                 store_configs = read_agent_configs_from_store(agent_store_path)
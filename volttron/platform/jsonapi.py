@@ -22,15 +22,206 @@
 # ===----------------------------------------------------------------------===
 # }}}
 
-from json import dump, dumps, load, loads
+"""
+JSON encoding and decoding used throughout the platform.
 
+The functions mirror the standard library :py:mod:`json` module.  When a
+faster C backend (orjson or ujson) is installed it is used for decoding and
+for :py:func:`dumpb` calls without formatting options, which produce the
+bytes of VIP frames and web responses.  The backends separate items without
+spaces and write some floats differently, so their output decodes to the
+same values but is not the same text.  :py:func:`dumps` and
+:py:func:`dump` always use :py:mod:`json`, their text is persisted and
+hashed and must not depend on what is installed.  :py:func:`dumpb` only
+hands a value to the backend when it is built from dict (with str keys),
+list, tuple, str, int, finite float, bool and None alone, subclasses
+excluded.  Anything else (UUID, Enum, Decimal, dataclass, datetime and
+bytes objects, non-finite floats, non-string keys, ...) is encoded by
+:py:mod:`json`, which calls ``default`` for it or raises, so encoded
+values and errors are the same whichever backend is active.  The backend
+result is also dropped for non-ASCII text and integers beyond 64 bits.
+The one known difference is that orjson decodes integer literals beyond
+64 bits as floats.
 
-__all__ = ('dump', 'dumpb', 'dumps', 'load', 'loadb', 'loads')
+The backend is selected with the ``VOLTTRON_JSON_BACKEND`` environment
+variable (``auto``, ``orjson``, ``ujson`` or ``json``) or at runtime with
+:py:func:`set_backend`.
+"""
+
+import json
+import logging
+import os
+from json import JSONDecodeError
+
+__all__ = ('dump', 'dumpb', 'dumps', 'load', 'loadb', 'loads', 'JSONDecodeError',
+           'available_backends', 'get_backend', 'set_backend')
+
+_log = logging.getLogger(__name__)
+
+# Keyword arguments the fast backends honour, any other keyword goes to json.
+# `default` is never needed by the values handed to a backend.
+_FAST_KWARGS = frozenset(('default',))
+
+_SCALAR_TYPES = frozenset((str, int, bool, type(None)))
+_INF = float('inf')
+
+
+def _is_plain(obj):
+    """Return True if obj only holds values every backend encodes as json does."""
+    kind = type(obj)
+    if kind is dict:
+        for key in obj:
+            if type(key) is not str:
+                return False
+        return _are_plain(obj.values())
+    if kind is list or kind is tuple:
+        return _are_plain(obj)
+    if kind is float:
+        return -_INF < obj < _INF
+    return kind in _SCALAR_TYPES
+
+
+def _are_plain(values):
+    for value in values:
+        kind = type(value)
+        if kind in _SCALAR_TYPES:
+            continue
+        if kind is float:
+            if not -_INF < value < _INF:
+                return False
+        elif not _is_plain(value):
+            return False
+    return True
+
+
+class _OrjsonBackend:
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumpb(self, obj):
+        data = self._dumps(obj)
+        # orjson does not escape non-ASCII characters.
+        if not data.isascii():
+            return None
+        return data
+
+    def loads(self, s):
+        return self._loads(s)
+
+
+class _UjsonBackend:
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._dumps = ujson.dumps
+        self._loads = ujson.loads
+
+    def dumpb(self, obj):
+        return self._dumps(obj, ensure_ascii=True, escape_forward_slashes=False).encode('ascii')
+
+    def loads(self, s):
+        return self._loads(s)
+
+
+_BACKENDS = {'orjson': _OrjsonBackend, 'ujson': _UjsonBackend}
+_AUTO_ORDER = ('orjson', 'ujson')
+
+_backend = None
+
+
+def available_backends():
+    """Return the names of the backends that can be used in this environment."""
+    names = []
+    for name, backend_class in _BACKENDS.items():
+        try:
+            backend_class()
+        except ImportError:
+            continue
+        names.append(name)
+    names.append('json')
+    return names
+
+
+def get_backend():
+    """Return the name of the active backend."""
+    return 'json' if _backend is None else _backend.name
+
+
+def set_backend(name='auto'):
+    """
+    Select the JSON backend.
+
+    :param name: 'orjson', 'ujson', 'json' or 'auto' to use the fastest one installed.
+    :raises ValueError: for an unknown backend name.
+    :raises ImportError: if the requested backend is not installed.
+    """
+    global _backend
+    if name == 'json':
+        _backend = None
+    elif name == 'auto':
+        _backend = None
+        for candidate in _AUTO_ORDER:
+            try:
+                _backend = _BACKENDS[candidate]()
+            except ImportError:
+                continue
+            break
+    elif name in _BACKENDS:
+        _backend = _BACKENDS[name]()
+    else:
+        raise ValueError('unknown JSON backend: {}'.format(name))
+    return get_backend()
+
+
+def dumps(obj, **kwargs):
+    return json.dumps(obj, **kwargs)
 
 
 def dumpb(data, **kwargs):
-    return dumps(data, **kwargs).encode('utf-8')
+    if _backend is not None and kwargs.keys() <= _FAST_KWARGS:
+        try:
+            encoded = _backend.dumpb(data) if _is_plain(data) else None
+        except (TypeError, ValueError, OverflowError, RecursionError):
+            encoded = None
+        if encoded is not None:
+            return encoded
+    return json.dumps(data, **kwargs).encode('utf-8')
+
+
+def loads(s, **kwargs):
+    if _backend is not None and not kwargs:
+        try:
+            return _backend.loads(s)
+        except (TypeError, ValueError, OverflowError):
+            # Let json decide, it either accepts the input (NaN, huge numbers) or raises its own error.
+            pass
+    return json.loads(s, **kwargs)
 
 
 def loadb(s, **kwargs):
-    return loads(s.decode('utf-8'), **kwargs)
+    if _backend is not None and not kwargs:
+        try:
+            return _backend.loads(s)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return json.loads(s.decode('utf-8'), **kwargs)
+
+
+def dump(obj, fp, **kwargs):
+    json.dump(obj, fp, **kwargs)
+
+
+def load(fp, **kwargs):
+    return loads(fp.read(), **kwargs)
+
+
+try:
+    set_backend(os.environ.get('VOLTTRON_JSON_BACKEND', 'auto'))
+except (ImportError, ValueError) as e:
+    _log.warning('Falling back to the json module: {}'.format(e))
+    set_backend('json')
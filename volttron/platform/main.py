@@ -63,7 +63,7 @@ from volttron.platform.instance_setup import _update_config_file
 from volttron.platform.vip.healthservice import HealthService
 from volttron.platform.vip.servicepeer import ServicePeerNotifier
 from volttron.utils import get_random_key
-from volttron.utils.frame_serialization import deserialize_frames, serialize_frames
+from volttron.utils.frame_serialization import serialize_frames
 
 green.Context._instance = green.Context.shadow(
     zmq.Context.instance().underlying)
@@ -74,7 +74,7 @@ from volttron.platform.auth.auth_file import AuthFile
 from volttron.platform.control.control import ControlService
 from volttron.platform.vip.router import BaseRouter, ERROR, INCOMING, UNROUTABLE
 from volttron.platform.vip.socket import Address, decode_key, encode_key
-from volttron.platform.vip.tracking import Tracker
+from volttron.platform.vip.tracking import RouterStatistics, Tracker
 
 try:
     from .web import PlatformWebService
@@ -308,11 +308,15 @@ class Router(BaseRouter):
                  external_address_file='',
                  msgdebug=None,
                  agent_monitor_frequency=600,
-                 service_notifier=Optional[ServicePeerNotifier]):
+                 service_notifier=Optional[ServicePeerNotifier],
+                 opaque_routing=False,
+                 statistics=None):
 
         super(Router, self).__init__(context=context,
                                      default_user_id=default_user_id,
-                                     service_notifier=service_notifier)
+                                     service_notifier=service_notifier,
+                                     opaque_routing=opaque_routing,
+                                     statistics=statistics)
         self.local_address = Address(local_address)
         self._addr = addresses
         self.addresses = addresses = [Address(addr) for addr in set(addresses)]
@@ -387,6 +391,7 @@ class Router(BaseRouter):
 
         self.pubsub = PubSubService(self.socket, self._protected_topics,
                                     self._ext_routing)
+        self.pubsub.statistics = self.statistics
         self.ext_rpc = ExternalRPCService(self.socket, self._ext_routing)
         self._poller.register(sock, zmq.POLLIN)
         _log.debug("ZMQ version: {}".format(zmq.zmq_version()))
@@ -531,7 +536,7 @@ class Router(BaseRouter):
             if sock == self.socket:
                 if sockets[sock] == zmq.POLLIN:
                     frames = sock.recv_multipart(copy=False)
-                    self.route(deserialize_frames(frames))
+                    self.route(self.decode_frames(frames))
             elif sock in self._ext_routing._vip_sockets:
                 if sockets[sock] == zmq.POLLIN:
                     # _log.debug("From Ext Socket: ")
@@ -551,7 +556,7 @@ class Router(BaseRouter):
         # Expecting incoming frames to follow this VIP format:
         #   [SENDER, PROTO, USER_ID, MSG_ID, SUBSYS, ...]
         frames = socket.recv_multipart(copy=False)
-        self.route(deserialize_frames(frames))
+        self.route(self.decode_frames(frames))
         # for f in frames:
         #     _log.debug("PUBSUBSERVICE Frames: {}".format(bytes(f)))
         if len(frames) < 6:
@@ -877,6 +882,12 @@ def start_volttron_process(opts):
     # zmq.Context.instance().set(zmq.MAX_SOCKETS, 2046)
 
     tracker = Tracker()
+    try:
+        router_statistics = RouterStatistics(int(opts.router_stats_sample_interval))
+        router_stats_publish_interval = float(opts.router_stats_publish_interval)
+    except ValueError as e:
+        raise ValueError("router-stats-sample-interval and router-stats-publish-interval "
+                         "should be numbers. {}".format(e))
     protected_topics_file = os.path.join(opts.volttron_home,
                                          'protected_topics.json')
     _log.debug('protected topics file %s', protected_topics_file)
@@ -914,7 +925,9 @@ def start_volttron_process(opts):
                    protected_topics=protected_topics,
                    external_address_file=external_address_file,
                    msgdebug=opts.msgdebug,
-                   service_notifier=notifier).run()
+                   service_notifier=notifier,
+                   opaque_routing=opts.opaque_routing,
+                   statistics=router_statistics).run()
         except Exception:
             _log.exception('Unhandled exception in router loop')
             raise
@@ -987,6 +1000,8 @@ def start_volttron_process(opts):
                 address=address,
                 identity=CONTROL,
                 tracker=tracker,
+                router_statistics=router_statistics if opts.message_bus == 'zmq' else None,
+                router_stats_publish_interval=router_stats_publish_interval,
                 heartbeat_autostart=True,
                 enable_store=False,
                 enable_channel=True,
@@ -1439,6 +1454,20 @@ def main(argv=sys.argv):
     agents.add_argument('--msgdebug',
                         action='store_true',
                         help='Route all messages to an agent while debugging.')
+    agents.add_argument('--opaque-routing',
+                        action='store_true',
+                        help='Forward the payload of messages between agents without decoding it in the router.')
+    agents.add_argument(
+        '--router-stats-sample-interval',
+        default=10,
+        help='Record the routing latency and publish fan-out of one in this '
+        'many messages in the router statistics. Default=10')
+    agents.add_argument(
+        '--router-stats-publish-interval',
+        default=60,
+        help='How often the router statistics are published on the '
+        'platform/router/statistics topic. 0 disables publishing. '
+        'Units=seconds. Default=60')
     agents.add_argument(
         '--setup-mode',
         action='store_true',
@@ -1561,6 +1590,7 @@ def main(argv=sys.argv):
         resource_monitor=True,
         # mobility=True,
         msgdebug=None,
+        opaque_routing=False,
         setup_mode=False,
         # Type of underlying message bus to use - ZeroMQ or RabbitMQ
         message_bus='zmq',
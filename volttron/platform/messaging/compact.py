@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+'''Compact encoding of device "all" publishes.
+
+A JSON "all" message repeats every point name and the full metadata of the
+device on each scrape.  The compact form sends the point names and metadata
+once as a schema and otherwise only a vector of values in schema order:
+
+    {"schema": "3f2a...", "values": [72.5, true, 0]}
+
+The schema id is a hash of the point names and metadata, so it changes
+whenever the registry does.  The first message with a new schema, and any
+later message the encoder chooses, carries the schema itself in the
+"points" and "meta" fields.  A message holding only some of the points,
+e.g. from a device publishing on change, lists their schema positions in
+"index".  Compact messages are published with the COMPACT_CONTENT_TYPE
+Content-Type header.
+'''
+
+import hashlib
+from typing import Dict, List
+
+from volttron.platform import jsonapi
+from volttron.platform.messaging import headers as headers_mod
+
+__all__ = ['COMPACT_CONTENT_TYPE', 'UnknownSchemaError', 'CompactEncoder', 'CompactDecoder', 'is_compact',
+           'schema_id']
+
+COMPACT_CONTENT_TYPE = 'application/vnd.volttron.compact+json'
+
+
+class UnknownSchemaError(KeyError):
+    """
+    Raised when a compact message refers to a schema the decoder has not seen.
+    """
+
+    @property
+    def schema_id(self):
+        return self.args[0]
+
+
+def schema_id(points: List[str], meta: List[dict]) -> str:
+    return hashlib.sha1(jsonapi.dumpb([points, meta], sort_keys=True)).hexdigest()[:16]
+
+
+def is_compact(headers: dict) -> bool:
+    return headers.get(headers_mod.CONTENT_TYPE) == COMPACT_CONTENT_TYPE
+
+
+class CompactEncoder:
+    """
+    Encodes the "all" messages of one device.  The schema is rebuilt when the
+    encoder is handed a different metadata dictionary.
+    """
+
+    def __init__(self):
+        self._meta_data = None
+        self._positions = {}
+        self.schema_id = None
+        self.schema = None
+        self._schema_sent = False
+
+    def set_schema(self, meta_data: Dict[str, dict]):
+        points = list(meta_data)
+        meta = [meta_data[point] for point in points]
+        new_id = schema_id(points, meta)
+        self._meta_data = meta_data
+        if new_id != self.schema_id:
+            self.schema_id = new_id
+            self.schema = {'points': points, 'meta': meta}
+            self._positions = {point: position for position, point in enumerate(points)}
+            self._schema_sent = False
+
+    def encode(self, results: dict, meta_data: Dict[str, dict], include_schema: bool = False) -> dict:
+        """
+        Encode scrape results of the points in meta_data.  The schema is
+        included the first time it is used and when include_schema is true.
+        """
+        if meta_data is not self._meta_data:
+            self.set_schema(meta_data)
+        positions = self._positions
+        message = {'schema': self.schema_id}
+        if len(results) == len(positions) and all(point in results for point in positions):
+            message['values'] = [results[point] for point in positions]
+        else:
+            index = sorted(positions[point] for point in results if point in positions)
+            points = self.schema['points']
+            message['index'] = index
+            message['values'] = [results[points[position]] for position in index]
+        if include_schema or not self._schema_sent:
+            message.update(self.schema)
+            self._schema_sent = True
+        return message
+
+
+class CompactDecoder:
+    """
+    Decodes compact messages back to the [values, meta] form of a JSON "all"
+    message.  Schemas are learned from the messages that carry them or added
+    with add_schema.
+    """
+
+    def __init__(self):
+        self._schemas = {}
+
+    def __contains__(self, schema_id: str) -> bool:
+        return schema_id in self._schemas
+
+    def add_schema(self, schema_id: str, points: List[str], meta: List[dict]):
+        self._schemas[schema_id] = (points, meta)
+
+    def decode(self, message: dict) -> List[dict]:
+        sid = message['schema']
+        if 'points' in message:
+            self.add_schema(sid, message['points'], message['meta'])
+        try:
+            points, meta = self._schemas[sid]
+        except KeyError:
+            raise UnknownSchemaError(sid)
+        values = message['values']
+        index = message.get('index')
+        if index is None:
+            return [dict(zip(points, values)), dict(zip(points, meta))]
+        return [{points[position]: value for position, value in zip(index, values)},
+                {points[position]: meta[position] for position in index}]
@@ -28,6 +28,7 @@ import glob
 import os
 import os.path
 import errno
+import hashlib
 from csv import DictReader
 from io import StringIO
 import gevent
@@ -36,7 +37,7 @@ from deprecated import deprecated
 from volttron.platform import jsonapi
 from gevent.lock import Semaphore
 
-from volttron.utils.persistance import PersistentDict
+from volttron.utils.persistance import JournaledPersistentDict
 from volttron.platform.agent.utils import parse_json_config
 from volttron.platform.vip.agent import errors
 from volttron.platform.jsonrpc import RemoteError, MethodNotFound
@@ -99,6 +100,15 @@ def process_raw_config(config_string, config_type="raw"):
     raise ValueError("Unsupported configuration type.")
 
 
+def config_hash(config_type, raw_contents):
+    """Returns a hash of a stored configuration used by agents to validate
+    cached copies."""
+    digest = hashlib.sha256(config_type.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(raw_contents.encode("utf-8"))
+    return digest.hexdigest()
+
+
 class ConfigStoreService(Agent):
     def __init__(self, *args, **kwargs):
         super(ConfigStoreService, self).__init__(*args, **kwargs)
@@ -126,13 +136,17 @@ class ConfigStoreService(Agent):
             else:
                 _log.debug("Configuration directory already exists.")
 
-        config_store_iter = glob.iglob(os.path.join(self.store_path, "*" + store_ext))
+        # A store whose changes were not compacted yet may only exist as a journal.
+        journal_ext = store_ext + JournaledPersistentDict.JOURNAL_SUFFIX
+        store_paths = set(glob.iglob(os.path.join(self.store_path, "*" + store_ext)))
+        store_paths.update(path[:-len(JournaledPersistentDict.JOURNAL_SUFFIX)]
+                           for path in glob.iglob(os.path.join(self.store_path, "*" + journal_ext)))
 
-        for store_path in config_store_iter:
+        for store_path in sorted(store_paths):
             root, ext = os.path.splitext(store_path)
             agent_identity = os.path.basename(root)
             _log.debug("Processing store for agent {}".format(agent_identity))
-            store = PersistentDict(filename=store_path, flag='c', format='json')
+            store = JournaledPersistentDict(filename=store_path, flag='c')
             parsed_configs, name_map = process_store(agent_identity, store)
             self.store[agent_identity] = {"configs": parsed_configs,
                                           "store": store,
@@ -166,6 +180,36 @@ class ConfigStoreService(Agent):
         self._add_config_to_store(identity, config_name, raw_contents, contents, config_type,
                                   trigger_callback=trigger_callback, send_update=send_update)
 
+    @RPC.export
+    @RPC.allow('edit_config_store')
+    def set_configs(self, identity, configs, trigger_callback=True, send_update=True):
+        """
+        Store several configurations for an agent at once.
+
+        All configurations are parsed and checked before any of them are
+        stored, written to disk together and sent to the agent in a single
+        update so that the agent reconfigures once for the whole batch.
+
+        :param identity: VIP identity of the agent.
+        :param configs: Dictionary of configuration name to a dictionary with
+            the "data" (raw contents) and optional "type" (raw, json or csv,
+            defaults to raw) of the configuration.
+        :param trigger_callback: Trigger the agent's configuration callbacks.
+        :param send_update: Send the update to the agent.
+        """
+        entries = []
+        for config_name, config in configs.items():
+            raw_contents = config["data"]
+            config_type = config.get("type", "raw")
+            try:
+                contents = process_raw_config(raw_contents, config_type)
+            except ValueError as e:
+                raise ValueError("Invalid configuration {}: {}".format(config_name, e))
+            entries.append((config_name, raw_contents, contents, config_type))
+
+        self._add_configs_to_store(identity, entries, trigger_callback=trigger_callback,
+                                   send_update=send_update)
+
     @RPC.export
     @RPC.allow('edit_config_store')
     @deprecated(reason="Use delete_config")
@@ -334,7 +378,7 @@ class ConfigStoreService(Agent):
         if agent_store is None:
             # Initialize a new store.
             store_path = os.path.join(self.store_path, identity + store_ext)
-            store = PersistentDict(filename=store_path, flag='c', format='json')
+            store = JournaledPersistentDict(filename=store_path, flag='c')
             agent_store = {
                 "configs": {}, "store": store, "name_map": {},
                 "lock": Semaphore()
@@ -364,6 +408,73 @@ class ConfigStoreService(Agent):
         if not agent_disk_store:
             self.store.pop(identity, None)
 
+    @RPC.allow('edit_config_store')
+    @RPC.export
+    def initialize_config_index(self, identity):
+        """
+        Called by an Agent at startup instead of initialize_configs to load
+        configurations lazily. Pushes the name and content hash of every
+        configuration. The agent then requests the contents it does not have
+        cached with get_configs.
+        """
+        agent_store = self.store.get(identity)
+
+        if agent_store is None:
+            store_path = os.path.join(self.store_path, identity + store_ext)
+            store = JournaledPersistentDict(filename=store_path, flag='c')
+            agent_store = {
+                "configs": {}, "store": store, "name_map": {},
+                "lock": Semaphore()
+            }
+            self.store[identity] = agent_store
+
+        agent_disk_store = agent_store["store"]
+        agent_store_lock = agent_store["lock"]
+        if identity in self.vip.peerlist.peers_list:
+            with agent_store_lock:
+                index = {config_name: config_hash(config["type"], config["data"])
+                         for config_name, config in agent_disk_store.items()}
+                try:
+                    self.vip.rpc.call(identity, "config.initial_index",
+                                      index).get(timeout=UPDATE_TIMEOUT)
+                except errors.Unreachable:
+                    _log.debug("Agent {} not currently running. Configuration update not sent.".format(identity))
+                except RemoteError as e:
+                    _log.error("Agent {} failure when performing initial update: {}".format(identity, e))
+                except MethodNotFound as e:
+                    _log.error(
+                        "Agent {} failure when performing initial update: {}".format(identity, e))
+                except errors.VIPError as e:
+                    _log.error("VIP Error sending initial agent configuration: {}".format(e))
+
+        if not agent_disk_store:
+            self.store.pop(identity, None)
+
+    @RPC.export
+    def get_configs(self, identity, config_names):
+        """
+        Returns the parsed contents and content hash of several
+        configurations as a dictionary of name to {"hash", "contents"}.
+        Configurations that do not exist are left out.
+        """
+        agent_store = self.store.get(identity)
+        if agent_store is None:
+            return {}
+
+        agent_configs = agent_store["configs"]
+        agent_disk_store = agent_store["store"]
+        agent_name_map = agent_store["name_map"]
+
+        results = {}
+        for config_name in config_names:
+            real_config_name = agent_name_map.get(strip_config_name(config_name).lower())
+            if real_config_name is None:
+                continue
+            config = agent_disk_store[real_config_name]
+            results[config_name] = {"hash": config_hash(config["type"], config["data"]),
+                                    "contents": agent_configs[real_config_name]}
+        return results
+
     # Helper method to allow the local services to delete configs before message
     # bus in online.
     def delete(self, identity, config_name, trigger_callback=False, send_update=True):
@@ -428,6 +539,96 @@ class ConfigStoreService(Agent):
                                   trigger_callback=trigger_callback,
                                   send_update=send_update)
 
+    def _add_configs_to_store(self, identity, entries, trigger_callback=False,
+                              send_update=True):
+        """Adds a list of processed (config_name, raw, parsed, config_type)
+        entries to the store as a single change."""
+        if not entries:
+            return
+
+        agent_store = self.store.get(identity)
+
+        if agent_store is None:
+            #Initialize a new store.
+            store_path = os.path.join(self.store_path, identity + store_ext)
+            store = JournaledPersistentDict(filename=store_path, flag='c')
+            agent_store = {"configs": {}, "store": store, "name_map": {}, "lock": Semaphore()}
+            self.store[identity] = agent_store
+
+        agent_configs = agent_store["configs"]
+        agent_disk_store = agent_store["store"]
+        agent_store_lock = agent_store["lock"]
+        agent_name_map = agent_store["name_map"]
+
+        # Check the whole batch against the store as it will be once every
+        # entry is added, so links between new configurations are followed.
+        staged_configs = {name.lower(): value for name, value in agent_configs.items()}
+        batch = {}
+        for config_name, raw, parsed, config_type in entries:
+            config_name = strip_config_name(config_name)
+            staged_configs[config_name.lower()] = parsed
+            batch[config_name.lower()] = (config_name, raw, parsed, config_type)
+
+        for config_name, raw, parsed, config_type in batch.values():
+            if check_for_recursion(config_name, parsed, staged_configs):
+                raise ValueError("Recursive configuration references detected in {}.".format(config_name))
+
+        modified = format_timestamp(get_aware_utc_now())
+        changes = []
+        for config_name_lower, (config_name, raw, parsed, config_type) in batch.items():
+            action = "UPDATE"
+            if config_name_lower in agent_name_map:
+                old_config_name = agent_name_map[config_name_lower]
+                del agent_configs[old_config_name]
+            else:
+                action = "NEW"
+
+            agent_configs[config_name] = parsed
+            agent_name_map[config_name_lower] = config_name
+
+            agent_disk_store[config_name] = {"type": config_type,
+                                             "modified": modified,
+                                             "data": raw}
+            changes.append([action, config_name, parsed])
+
+        # One sync writes the whole batch to disk at once.
+        agent_disk_store.async_sync()
+
+        _log.debug("Agent {} stored {} configs.".format(identity, len(changes)))
+
+        if send_update and identity in self.vip.peerlist.peers_list:
+            with agent_store_lock:
+                try:
+                    self.vip.rpc.call(identity, "config.update_batch", changes,
+                                      trigger_callback=trigger_callback).get(timeout=UPDATE_TIMEOUT)
+                except errors.Unreachable:
+                    _log.debug("Agent {} not currently running. Configuration update not sent.".format(identity))
+                except RemoteError as e:
+                    _log.error("Agent {} failure when adding/updating configurations: {}".format(identity, e))
+                except MethodNotFound:
+                    # Agents built against an older platform only understand
+                    # single configuration updates.
+                    self._send_updates(identity, changes, trigger_callback)
+                except gevent.timeout.Timeout:
+                    _log.error("Config update to agent {} timed out after {} seconds".format(identity, UPDATE_TIMEOUT))
+                except Exception as e:
+                    _log.error("Unknown error sending update to agent identity {}.: {}".format(identity, e))
+
+    def _send_updates(self, identity, changes, trigger_callback):
+        """Sends changes to the agent one configuration at a time."""
+        for action, config_name, parsed in changes:
+            try:
+                self.vip.rpc.call(identity, "config.update", action, config_name, contents=parsed,
+                                  trigger_callback=trigger_callback).get(timeout=UPDATE_TIMEOUT)
+            except errors.Unreachable:
+                _log.debug("Agent {} not currently running. Configuration update not sent.".format(identity))
+                return
+            except (RemoteError, MethodNotFound) as e:
+                _log.error("Agent {} failure when adding/updating configuration {}: {}".format(identity, config_name, e))
+            except gevent.timeout.Timeout:
+                _log.error("Config update to agent {} timed out after {} seconds".format(identity, UPDATE_TIMEOUT))
+                return
+
     def _add_config_to_store(self, identity, config_name, raw, parsed,
                              config_type, trigger_callback=False,
                              send_update=True):
@@ -439,7 +640,7 @@ class ConfigStoreService(Agent):
         if agent_store is None:
             #Initialize a new store.
             store_path = os.path.join(self.store_path, identity+ store_ext)
-            store = PersistentDict(filename=store_path, flag='c', format='json')
+            store = JournaledPersistentDict(filename=store_path, flag='c')
             agent_store = {"configs": {}, "store": store, "name_map": {}, "lock": Semaphore()}
             self.store[identity] = agent_store
 
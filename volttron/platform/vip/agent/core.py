@@ -53,13 +53,14 @@ from volttron.platform.agent.utils import (get_fq_identity,
                                            load_platform_config)
 from volttron.platform.keystore import KnownHostsStore
 from volttron.platform.messaging.health import STATUS_BAD
+from volttron.utils.frame_serialization import JSON_CODEC
 from volttron.utils.rmq_config_params import RMQConfig
 from volttron.utils.rmq_mgmt import RabbitMQMgmt
 
 from .... import platform
 from .. import router
 from ..rmq_connection import RMQConnection
-from ..socket import Message
+from ..socket import Message, VIP_CODEC, negotiate_codec
 from ..zmq_connection import ZMQConnection
 from .decorators import annotate, annotations, dualmethod
 from .dispatch import Signal
@@ -614,7 +615,7 @@ class Core(BasicCore):
             message = Message(peer='',
                               subsystem='hello',
                               id=ident,
-                              args=['hello'])
+                              args=self._hello_args())
             self.connection.send_vip_object(message)
 
         def hello_response(sender, version='', router='', identity=''):
@@ -630,6 +631,9 @@ class Core(BasicCore):
 
         return connection_failed_check, hello, hello_response
 
+    def _hello_args(self):
+        return ['hello']
+
 
 class ZMQCore(Core):
     """
@@ -696,6 +700,13 @@ class ZMQCore(Core):
 
     connected = property(get_connected, set_connected)
 
+    def _hello_args(self):
+        # Offer the configured frame codec, routers without codec support ignore the extra argument.
+        codec = negotiate_codec([VIP_CODEC])
+        if codec == JSON_CODEC:
+            return ['hello']
+        return ['hello', dict(codecs=[codec])]
+
     def loop(self, running_event):
         # pre-setup
         # self.context.set(zmq.MAX_SOCKETS, 30690)
@@ -813,6 +824,9 @@ class ZMQCore(Core):
                         and len(message.args) > 3
                         and message.args[0] == 'welcome'):
                     version, server, identity = message.args[1:4]
+                    if len(message.args) > 4:
+                        # Router accepted the frame codec offered in hello
+                        sock.codec = negotiate_codec([message.args[4]])
                     self.connected = True
                     self.onconnected.send(self,
                                           version=version,
@@ -58,6 +58,7 @@ class Auth(SubsystemBase):
         self._core = weakref.ref(core)
         self._rpc = weakref.ref(rpc)
         self._user_to_capabilities = {}
+        self._capabilities_version = 0
         self._dirty = True
         self._csr_certs = dict()
         self.remote_certs_dir = None
@@ -112,6 +113,7 @@ class Auth(SubsystemBase):
                     .call(AUTH, "get_user_to_capabilities")
                     .get(timeout=10)
                 )
+                self._capabilities_version += 1
                 _log.debug("self. user to cap %s", self._user_to_capabilities)
             except RemoteError:
                 self._dirty = True
@@ -128,10 +130,22 @@ class Auth(SubsystemBase):
         self._fetch_capabilities()
         return self._user_to_capabilities.get(user_id, [])
 
+    def get_capabilities_version(self):
+        """
+        Gets a number that changes whenever the capabilities of the users
+        are replaced, so that decisions based on them can be cached.
+
+        :returns: capabilities version
+        :rtype: int
+        """
+        self._fetch_capabilities()
+        return self._capabilities_version
+
     def _update_capabilities(self, user_to_capabilities):
         identity = self._rpc().context.vip_message.peer
         if identity == AUTH:
             self._user_to_capabilities = user_to_capabilities
+            self._capabilities_version += 1
             self._dirty = True
 
     def get_rpc_exports(self):
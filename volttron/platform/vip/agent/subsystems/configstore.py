@@ -31,6 +31,7 @@ import inspect
 from .base import SubsystemBase
 from volttron.platform.storeutils import list_unique_links, check_for_config_link
 from volttron.platform.vip.agent import errors
+from volttron.platform.jsonrpc import MethodNotFound
 from volttron.platform.agent.known_identities import CONFIGURATION_STORE
 from volttron.platform import jsonapi
 from volttron.platform.agent.utils import is_auth_enabled
@@ -51,6 +52,10 @@ _log = logging.getLogger(__name__)
 
 VALID_ACTIONS = ("NEW", "UPDATE", "DELETE")
 
+# Number of configurations requested at a time when loading lazily.
+LAZY_LOAD_PAGE_SIZE = 100
+LAZY_LOAD_CACHE_FILE = "config_store_cache.json"
+
 
 class ConfigStore(SubsystemBase):
     def __init__(self, owner, core, rpc):
@@ -68,6 +73,12 @@ class ConfigStore(SubsystemBase):
         self._initialized = False
         self._initial_callbacks_called = False
 
+        self._lazy_load = False
+        self._page_size = LAZY_LOAD_PAGE_SIZE
+        self._cache_path = None
+        self._hashes = {}  # Content hash of each configuration from the platform.
+        self._pending = {}  # Configurations still to be fetched when loading lazily.
+
         self._process_callbacks_code_object = self._process_callbacks.__code__
         self.vip_identity = self._core().identity
 
@@ -78,10 +89,14 @@ class ConfigStore(SubsystemBase):
 
         def onsetup(sender, **kwargs):
             rpc.export(self._update_config, 'config.update')
+            rpc.export(self._update_configs, 'config.update_batch')
             rpc.export(self._initial_update, 'config.initial_update')
+            rpc.export(self._initial_index, 'config.initial_index')
             if is_auth_enabled():
                 rpc.allow('config.update', 'sync_agent_config')
+                rpc.allow('config.update_batch', 'sync_agent_config')
                 rpc.allow('config.initial_update', 'sync_agent_config')
+                rpc.allow('config.initial_index', 'sync_agent_config')
 
         core.onsetup.connect(onsetup, self)
         core.configuration.connect(self._onconfig, self)
@@ -89,7 +104,7 @@ class ConfigStore(SubsystemBase):
     def _onconfig(self, sender, **kwargs):
         if not self._initialized:
             try:
-                self._rpc().call(CONFIGURATION_STORE, "initialize_configs", self.vip_identity).get()
+                self._request_initial_configs()
             except errors.Unreachable as e:
                 _log.error("Connected platform does not support the Configuration Store feature.")
                 return
@@ -106,6 +121,83 @@ class ConfigStore(SubsystemBase):
         self._process_callbacks(affected_configs)
         self._initial_callbacks_called = True
 
+    def _request_initial_configs(self):
+        """Asks the platform to push the initial configuration state."""
+        if self._lazy_load:
+            try:
+                self._rpc().call(CONFIGURATION_STORE, "initialize_config_index", self.vip_identity).get()
+                self._fetch_pending()
+                return
+            except MethodNotFound:
+                _log.info("Platform does not support lazy configuration loading, requesting all configurations.")
+
+        self._rpc().call(CONFIGURATION_STORE, "initialize_configs", self.vip_identity).get()
+
+    def _initial_index(self, index):
+        """Called by the platform with the name and content hash of every
+        configuration when loading lazily. Configurations found in the local
+        cache with a matching hash are used as is, the rest are fetched by
+        _fetch_pending."""
+        cache = self._load_cache()
+        configs = {}
+        self._pending = {}
+        self._hashes = {}
+        for config_name, digest in index.items():
+            config_name_lower = config_name.lower()
+            self._hashes[config_name_lower] = digest
+            cached = cache.get(config_name_lower)
+            if cached is not None and cached.get("hash") == digest:
+                configs[config_name] = cached["contents"]
+            else:
+                self._pending[config_name_lower] = config_name
+
+        _log.debug("Initial configuration index: {} cached, {} to fetch".format(len(configs), len(self._pending)))
+
+        self._initial_update(configs)
+        self._name_map = {key.lower(): key for key in index}
+
+    def _fetch_pending(self):
+        """Fetches the configurations missing from the cache a page at a time."""
+        while self._pending:
+            names = list(self._pending.values())[:self._page_size]
+            results = self._rpc().call(CONFIGURATION_STORE, "get_configs", self.vip_identity, names).get()
+            for config_name in names:
+                config_name_lower = config_name.lower()
+                # Skip anything changed by an update since the index was sent.
+                if self._pending.pop(config_name_lower, None) is None:
+                    continue
+                entry = results.get(config_name)
+                if entry is None:
+                    continue
+                self._hashes[config_name_lower] = entry["hash"]
+                self._store[config_name_lower] = entry["contents"]
+                self._add_refs(config_name_lower, entry["contents"])
+
+        self._save_cache()
+
+    def _load_cache(self):
+        if self._cache_path is None or not os.path.exists(self._cache_path):
+            return {}
+        try:
+            with open(self._cache_path) as f:
+                return jsonapi.load(f)
+        except (OSError, ValueError) as e:
+            _log.warning("Ignoring unreadable configuration cache {}: {}".format(self._cache_path, e))
+            return {}
+
+    def _save_cache(self):
+        if self._cache_path is None:
+            return
+        cache = {config_name: {"hash": digest, "contents": self._store[config_name]}
+                 for config_name, digest in self._hashes.items() if config_name in self._store}
+        tmp_path = self._cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                jsonapi.dump(cache, f)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            _log.warning("Unable to write configuration cache {}: {}".format(self._cache_path, e))
+
     def _add_refs(self, config_name, contents):
         refs = list_unique_links(contents)
         self._ref_map[config_name] = refs
@@ -201,7 +293,60 @@ class ConfigStore(SubsystemBase):
 
         affected_configs = {}
 
-        # Update local store.
+        self._apply_update(action, config_name, contents, affected_configs)
+
+        if trigger_callback and self._initial_callbacks_called:
+            self._process_callbacks(affected_configs)
+
+        if action == "DELETE":
+            self._name_map.pop(config_name.lower(), None)
+
+        if action == "DELETE_ALL":
+            self._name_map.clear()
+
+    def _update_configs(self, changes, trigger_callback=False):
+        """Called by the platform to push out a batch of configuration changes.
+
+        Every change is applied to the local store before any callback is
+        triggered so that each affected configuration is processed once per
+        batch rather than once per change.
+
+        :param changes: List of [action, config_name, contents] entries in
+            the order they were made.
+        """
+        if not self._initialized:
+            return
+
+        affected_configs = {}
+        deleted = set()
+
+        for action, config_name, contents in changes:
+            if action not in VALID_ACTIONS:
+                _log.error("Ignoring unsupported configuration action {} for {}".format(action, config_name))
+                continue
+            self._apply_update(action, config_name, contents, affected_configs)
+            if action == "DELETE":
+                deleted.add(config_name.lower())
+
+        if trigger_callback and self._initial_callbacks_called:
+            self._process_callbacks(affected_configs)
+
+        for config_name_lower in deleted:
+            if config_name_lower not in self._store:
+                self._name_map.pop(config_name_lower, None)
+
+    def _apply_update(self, action, config_name, contents, affected_configs):
+        """Updates the local store and records the configurations affected by
+        the change in affected_configs."""
+        # The update supersedes any lazily fetched copy. Without a hash the
+        # configuration is left out of the cache and fetched after a restart.
+        if action == "DELETE_ALL":
+            self._pending.clear()
+            self._hashes.clear()
+        else:
+            self._pending.pop(config_name.lower(), None)
+            self._hashes.pop(config_name.lower(), None)
+
         if action == "DELETE":
             config_name_lower = config_name.lower()
             if config_name_lower in self._store:
@@ -236,15 +381,6 @@ class ConfigStore(SubsystemBase):
             self._update_refs(config_name_lower, self._store[config_name_lower])
             self._gather_affected(config_name_lower, affected_configs)
 
-        if trigger_callback and self._initial_callbacks_called:
-            self._process_callbacks(affected_configs)
-
-        if action == "DELETE":
-            del self._name_map[config_name_lower]
-
-        if action == "DELETE_ALL":
-            self._name_map.clear()
-
     def _process_callbacks(self, affected_configs):
         _log.debug("Processing callbacks for affected files: {}".format(affected_configs))
         all_map = self._default_name_map.copy()
@@ -288,7 +424,7 @@ class ConfigStore(SubsystemBase):
         # Handle case were we are called during "onstart".
         if not self._initialized:
             try:
-                self._rpc().call(CONFIGURATION_STORE, "initialize_configs", self.vip_identity).get()
+                self._request_initial_configs()
             except errors.Unreachable as e:
                 _log.error("Connected platform does not support the Configuration Store feature.")
             except errors.VIPError as e:
@@ -320,7 +456,7 @@ class ConfigStore(SubsystemBase):
         # may be a default configuration to grab.
         if not self._initialized:
             try:
-                self._rpc().call(CONFIGURATION_STORE, "initialize_configs", self.vip_identity).get()
+                self._request_initial_configs()
             except errors.Unreachable as e:
                 _log.error("Connected platform does not support the Configuration Store feature.")
             except errors.VIPError as e:
@@ -458,6 +594,43 @@ class ConfigStore(SubsystemBase):
         for action in actions:
             self._subscriptions[pattern][action].add(callback)
 
+    def set_lazy_load(self, enabled=True, page_size=LAZY_LOAD_PAGE_SIZE, cache_path=None):
+        """Load configurations on demand instead of in a single message at startup.
+
+        The platform sends only the name and content hash of each
+        configuration. Configurations that are not in the local cache with the
+        same hash are fetched page_size at a time. Fetched configurations are
+        written to cache_path so they do not have to be fetched again after a
+        restart. By default the cache is kept in the agent-data directory of
+        an installed agent and disabled otherwise.
+
+        Falls back to loading every configuration at once if the platform does
+        not support lazy loading.
+
+        May not be called after the onsetup phase of an agents lifetime. Will produce a runtime error if done so.
+
+        :param enabled: Enable lazy loading.
+        :param page_size: Number of configurations to request at a time.
+        :param cache_path: File to cache configurations in.
+        :type enabled: bool
+        :type page_size: int
+        :type cache_path: str
+        """
+        if self._initialized:
+            raise RuntimeError("Cannot change how configurations are loaded after onsetup.")
+
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        if cache_path is None:
+            agent_data_dir = os.path.join(os.getcwd(), os.path.basename(os.getcwd()) + ".agent-data")
+            if os.path.isdir(agent_data_dir):
+                cache_path = os.path.join(agent_data_dir, LAZY_LOAD_CACHE_FILE)
+
+        self._lazy_load = enabled
+        self._page_size = page_size
+        self._cache_path = cache_path
+
     def unsubscribe_all(self):
         """Remove all subscriptions."""
         self._subscriptions.clear()
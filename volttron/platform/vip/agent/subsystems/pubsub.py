@@ -25,6 +25,7 @@
 
 
 from base64 import b64encode, b64decode
+from functools import lru_cache
 import inspect
 import logging
 import random
@@ -35,6 +36,7 @@ import gevent
 from zmq import green as zmq
 from zmq import SNDMORE
 from volttron.platform import jsonapi
+from volttron.utils.prefix_trie import PrefixTrie
 from .base import SubsystemBase
 from ..decorators import annotate, annotations, dualmethod, spawn
 from ..errors import Unreachable
@@ -49,6 +51,9 @@ __all__ = ['PubSub']
 min_compatible_version = '3.0'
 max_compatible_version = ''
 
+# Number of (bus, topic) pairs whose resolved callbacks are memoized.
+DISPATCH_CACHE_SIZE = 65536
+
 # utils.setup_logging()
 _log = logging.getLogger(__name__)
 
@@ -83,6 +88,9 @@ class PubSub(SubsystemBase):
             return defaultdict(set)
 
         self._my_subscriptions = defaultdict(platform_subscriptions)
+        # Compiled from _my_subscriptions on demand, see _match_callbacks.
+        self._dispatch_index = None
+        self._resolve_callbacks = lru_cache(maxsize=DISPATCH_CACHE_SIZE)(self._match_callbacks)
         self.protected_topics = ProtectedPubSubTopics()
         core.register('pubsub', self._handle_subsystem, self._handle_error)
         self.vip_socket = None
@@ -133,21 +141,41 @@ class PubSub(SubsystemBase):
         """
         peer = 'pubsub'
 
-        handled = 0
-        for platform in self._my_subscriptions:
-            # _log.debug("SYNC: process callback subscriptions: {}".format(self._my_subscriptions[platform][bus]))
-            buses = self._my_subscriptions[platform]
-            if bus in buses:
-                subscriptions = buses[bus]
-                for prefix, callbacks in subscriptions.items():
-                    if topic.startswith(prefix):
-                        handled += 1
-                        for callback in callbacks:
-                            callback(peer, sender, bus, topic, headers, message)
-        if not handled:
+        callbacks = self._resolve_callbacks(bus, topic)
+        for callback in callbacks:
+            callback(peer, sender, bus, topic, headers, message)
+        if not callbacks:
             # No callbacks for topic; synchronize with sender
             self.synchronize()
 
+    def _match_callbacks(self, bus, topic):
+        """Resolve the callbacks subscribed to topic on bus. Results are memoized by _resolve_callbacks until the
+        subscriptions change.
+        param bus: bus
+        type bus: str
+        param topic: publishing topic
+        type topic: str
+        :returns: callbacks in dispatch order, a callback subscribed through several matching prefixes is repeated
+        :rtype: tuple
+        """
+        if self._dispatch_index is None:
+            index = defaultdict(PrefixTrie)
+            for platform, buses in self._my_subscriptions.items():
+                for subscription_bus, subscriptions in buses.items():
+                    for prefix, callbacks in subscriptions.items():
+                        for callback in callbacks:
+                            index[subscription_bus].add(prefix, (platform, callback))
+            self._dispatch_index = dict(index)
+        trie = self._dispatch_index.get(bus)
+        if trie is None:
+            return ()
+        return tuple(callback for prefix, entries in trie.iter_match(topic) for platform, callback in entries)
+
+    def _invalidate_dispatch(self):
+        """Discard the compiled subscription index and memoized callbacks after subscriptions change."""
+        self._dispatch_index = None
+        self._resolve_callbacks.cache_clear()
+
     def _viperror(self, sender, error, **kwargs):
         if isinstance(error, Unreachable):
             self._peer_drop(self, error.peer)
@@ -161,6 +189,7 @@ class PubSub(SubsystemBase):
         self._sync(peer, {})
 
     def _sync(self, peer, items):
+        self._invalidate_dispatch()
         items = {(bus, prefix) for bus, topics in items.items()
                  for prefix in topics}
         remove = []
@@ -182,6 +211,7 @@ class PubSub(SubsystemBase):
             self._add_peer_subscription(peer, bus, prefix)
 
     def _add_peer_subscription(self, peer, bus, prefix):
+        self._invalidate_dispatch()
         try:
             subscriptions = self._my_subscriptions[bus]
         except KeyError:
@@ -271,6 +301,7 @@ class PubSub(SubsystemBase):
         # _log.debug(f"Adding subscription prefix: {prefix} allplatforms: {all_platforms}")
         if not callable(callback):
             raise ValueError('callback %r is not callable' % (callback,))
+        self._invalidate_dispatch()
         try:
             if not all_platforms:
                 self._my_subscriptions['internal'][bus][prefix].add(callback)
@@ -342,6 +373,7 @@ class PubSub(SubsystemBase):
         :Return Values:
         List of prefixes
         """
+        self._invalidate_dispatch()
         topics = []
         bus_subscriptions = dict()
         if prefix is None:
@@ -65,6 +65,117 @@ def _isregex(obj):
     )
 
 
+class _ArgumentLocator:
+    """
+    Finds the value of a named argument of a call of method without
+    binding all of the arguments with inspect.getcallargs.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self._parameters = {}
+        try:
+            parameters = inspect.signature(method, follow_wrapped=False).parameters.values()
+        except (TypeError, ValueError):
+            parameters = ()
+        for index, parameter in enumerate(parameters):
+            positional = parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+            keyword = parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+            self._parameters[parameter.name] = (index if positional else None, keyword, parameter.default,
+                                                positional or keyword)
+
+    def __contains__(self, name):
+        return name in self._parameters
+
+    def get(self, name, args, kwargs):
+        index, keyword, default, simple = self._parameters[name]
+        if simple:
+            if index is not None and index < len(args):
+                return args[index]
+            if keyword and name in kwargs:
+                return kwargs[name]
+            if default is not inspect.Parameter.empty:
+                return default
+        # *args and **kwargs parameters or a missing argument, which
+        # getcallargs reports with a TypeError as before.
+        return inspect.getcallargs(self.method, *args, **kwargs)[name]
+
+
+class _ArgumentMatcher:
+    """
+    Checks one argument restriction of a capability, either a value or
+    a /regex/ the whole argument has to match.
+    """
+
+    __slots__ = ("locator", "user", "name", "value", "regex")
+
+    def __init__(self, locator, user, name, value):
+        self.locator = locator
+        self.user = user
+        self.name = name
+        self.value = value
+        self.regex = re.compile("^" + value[1:-1] + "$") if _isregex(value) else None
+
+    def check(self, args, kwargs):
+        name = self.name
+        argument = self.locator.get(name, args, kwargs)
+        if self.regex is not None:
+            if not self.regex.match(argument):
+                raise jsonrpc.exception_from_json(
+                    jsonrpc.UNAUTHORIZED,
+                    "User {} can call method {} only "
+                    "with {} matching pattern {} but "
+                    "called with {}={}".format(
+                        self.user, self.locator.method.__name__, name, self.value, name, argument
+                    ),
+                )
+        elif argument != self.value:
+            raise jsonrpc.exception_from_json(
+                jsonrpc.UNAUTHORIZED,
+                "User {} can call method {} only "
+                "with {}={} but called with "
+                "{}={}".format(
+                    self.user, self.locator.method.__name__, name, self.value, name, argument
+                ),
+            )
+
+
+def _authorize(method, locator, required_caps, user_capabilities, user):
+    """
+    Decides whether user may call method.
+
+    :returns: (message, matchers) where message is the reason the call
+              is refused, None if it is allowed, and matchers are the
+              argument restrictions every call has to pass.
+    """
+    if user_capabilities:
+        user_capabilities_names = set(user_capabilities.keys())
+    else:
+        user_capabilities_names = set()
+    if required_caps == {""}:
+        return None, ()
+    if not required_caps.issubset(user_capabilities_names):
+        return (
+            "method '{}' requires capabilities {}, but capability {} "
+            "was provided for user {}"
+        ).format(method.__name__, required_caps, user_capabilities, user), ()
+
+    matchers = []
+    for cap_name, param_dict in user_capabilities.items():
+        if param_dict and cap_name in required_caps:
+            # The user capability has argument restrictions, every call
+            # has to pass the requirement.
+            for name, value in param_dict.items():
+                if name not in locator:
+                    return (
+                        "User {} capability is not defined "
+                        "properly. method {} does not have "
+                        "a parameter {}".format(user, method.__name__, name)
+                    ), ()
+                matchers.append(_ArgumentMatcher(locator, user, name, value))
+    return None, tuple(matchers)
+
+
 class Dispatcher(jsonrpc.Dispatcher):
     def __init__(self, methods, local):
         super(Dispatcher, self).__init__()
@@ -285,7 +396,14 @@ class RPC(SubsystemBase):
         """
         Adds an authorization check to verify the calling agent has the
         required capabilities.
+
+        The decision for a user is made once and cached until the
+        capabilities known to the auth subsystem change. Argument
+        restrictions of the user's capabilities are compiled into
+        matchers with the decision.
         """
+        locator = _ArgumentLocator(method)
+        decisions = {}
 
         def checked_method(*args, **kwargs):
             user = str(self.context.vip_message.user)
@@ -293,87 +411,18 @@ class RPC(SubsystemBase):
                 # remove platform instance name. rmq user names are of the format <instance name>.<user>
                 user = user[user.index(".")+1:]
 
-            user_capabilites = self._owner.vip.auth.get_capabilities(user)
-            _log.debug("**user caps is: {}".format(user_capabilites))
-            if user_capabilites:
-                user_capabilities_names = set(user_capabilites.keys())
-            else:
-                user_capabilities_names = set()
-            if required_caps == {""}:
-                pass
-            elif not required_caps.issubset(user_capabilities_names):
-                msg = (
-                    "method '{}' requires capabilities {}, but capability {} "
-                    "was provided for user {}"
-                ).format(
-                    method.__name__,
-                    required_caps,
-                    user_capabilites,
-                    user
-                )
-                raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, msg)
-            else:
-                # Now check if args passed to method are the ones allowed.
-
-                for cap_name, param_dict in user_capabilites.items():
-                    if (
-                            param_dict
-                            and required_caps
-                            and cap_name in required_caps
-                    ):
-                        # if the method has required capabilities and
-                        # if the user capability has argument restrictions,
-                        # check if the args passed to method match the
-                        # requirement
-                        _log.debug("args = {} kwargs= {}".format(args, kwargs))
-                        args_dict = inspect.getcallargs(method, *args, **kwargs)
-                        _log.debug("dict = {}".format(args_dict))
-                        _log.debug(
-                            "name= %r parameters allowed=%r",
-                            cap_name,
-                            param_dict
-                        )
-                        for name, value in param_dict.items():
-                            _log.debug("name= {} value={}".format(name, value))
-                            if name not in args_dict:
-                                raise jsonrpc.exception_from_json(
-                                    jsonrpc.UNAUTHORIZED,
-                                    "User {} capability is not defined "
-                                    "properly. method {} does not have "
-                                    "a parameter {}".format(
-                                        user, method.__name__, name
-                                    ),
-                                )
-                            if _isregex(value):
-                                regex = re.compile("^" + value[1:-1] + "$")
-                                if not regex.match(args_dict[name]):
-                                    raise jsonrpc.exception_from_json(
-                                        jsonrpc.UNAUTHORIZED,
-                                        "User {} can call method {} only "
-                                        "with {} matching pattern {} but "
-                                        "called with {}={}".format(
-                                            user,
-                                            method.__name__,
-                                            name,
-                                            value,
-                                            name,
-                                            args_dict[name],
-                                        ),
-                                    )
-                            elif args_dict[name] != value:
-                                raise jsonrpc.exception_from_json(
-                                    jsonrpc.UNAUTHORIZED,
-                                    "User {} can call method {} only "
-                                    "with {}={} but called with "
-                                    "{}={}".format(
-                                        user,
-                                        method.__name__,
-                                        name,
-                                        value,
-                                        name,
-                                        args_dict[name],
-                                    ),
-                                )
+            auth = self._owner.vip.auth
+            version = auth.get_capabilities_version()
+            decision = decisions.get(user)
+            if decision is None or decision[0] != version:
+                decision = (version, _authorize(method, locator, required_caps,
+                                                auth.get_capabilities(user), user))
+                decisions[user] = decision
+            denied, matchers = decision[1]
+            if denied is not None:
+                raise jsonrpc.exception_from_json(jsonrpc.UNAUTHORIZED, denied)
+            for matcher in matchers:
+                matcher.check(args, kwargs)
 
             return method(*args, **kwargs)
 
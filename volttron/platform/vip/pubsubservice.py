@@ -37,6 +37,7 @@ from collections import defaultdict
 # Create a context common to the green and non-green zmq modules.
 from volttron.platform.agent.utils import get_platform_instance_name
 from volttron.utils.frame_serialization import serialize_frames
+from volttron.utils.prefix_trie import PrefixTrie
 
 green.Context._instance = green.Context.shadow(zmq.Context.instance().underlying)
 from .agent.subsystems.pubsub import ProtectedPubSubTopics
@@ -63,16 +64,22 @@ class PubSubService:
             return defaultdict(set)
 
         self._peer_subscriptions = defaultdict(platform_subscriptions)
+        # Prefix index of (platform, bus) -> subscribers mirroring
+        # _peer_subscriptions so publishes do not scan every prefix.
+        self._subscription_index = defaultdict(PrefixTrie)
         self._vip_sock = socket
         self._user_capabilities = {}
         self._protected_topics = ProtectedPubSubTopics()
         self._load_protected_topics(protected_topics)
         self._ext_subscriptions = defaultdict(set)
+        self._ext_subscription_index = PrefixTrie()
         self._ext_router = routing_service
         if self._ext_router is not None:
             self._ext_router.register('on_connect', self.external_platform_add)
             self._ext_router.register('on_disconnect', self.external_platform_drop)
         self._rabbitmq_agent = None
+        # RouterStatistics of the router, set by the router when it is used.
+        self.statistics = None
 
     def _add_peer_subscription(self, peer, bus, prefix, platform='internal'):
         """
@@ -85,6 +92,27 @@ class PubSubService:
         :type str
         """
         self._peer_subscriptions[platform][bus][prefix].add(peer)
+        self._subscription_index[(platform, bus)].add(prefix, peer)
+
+    def _remove_peer_subscription(self, peer, bus, prefix, platform='internal'):
+        """
+        Removes the subscription of the specified peer (subscriber), bus and prefix.
+        :param peer identity of the subscriber
+        :type peer str
+        :param bus bus.
+        :type str
+        :param prefix subscription prefix
+        :type str
+        :returns: True if no subscribers remain for the prefix
+        :rtype: boolean
+        """
+        subscribers = self._peer_subscriptions[platform][bus].get(prefix)
+        if subscribers is not None:
+            subscribers.discard(peer)
+        index = self._subscription_index.get((platform, bus))
+        if index is not None:
+            index.discard(prefix, peer)
+        return not subscribers
 
     def peer_drop(self, peer, **kwargs):
         """
@@ -111,8 +139,21 @@ class PubSubService:
     def external_platform_drop(self, instance_name):
         if instance_name in self._ext_subscriptions:
             self._logger.debug("PUBSUBSERVICE dropping external subscriptions for {}".format(instance_name))
+            self._set_external_subscriptions(instance_name, [])
             del self._ext_subscriptions[instance_name]
 
+    def _set_external_subscriptions(self, instance_name, prefixes):
+        """
+        Replace the subscription prefixes of an external platform, keeping the prefix index in sync.
+        :param instance_name: name of the external platform
+        :param prefixes: list of subscription prefixes
+        """
+        for prefix in self._ext_subscriptions.get(instance_name, ()):
+            self._ext_subscription_index.discard(prefix, instance_name)
+        for prefix in prefixes:
+            self._ext_subscription_index.add(prefix, instance_name)
+        self._ext_subscriptions[instance_name] = prefixes
+
     def _sync(self, peer, items):
         """
         Synchronize the subscriptions with calling agent (peer) when it gets newly connected. OR Unsubscribe from
@@ -135,11 +176,10 @@ class PubSubService:
                     try:
                         items.remove(item)
                     except KeyError:
-                        subscribers.discard(peer)
-                        if not subscribers:
+                        if self._remove_peer_subscription(peer, bus, prefix, platform):
                             remove.append(item)
                     else:
-                        subscribers.add(peer)
+                        self._add_peer_subscription(peer, bus, prefix, platform)
         for platform, bus, prefix in remove:
             subscriptions = self._peer_subscriptions[platform][bus]
             assert not subscriptions.pop(prefix)
@@ -248,18 +288,15 @@ class PubSubService:
                 subscriptions = self._peer_subscriptions[platform][bus]
                 if prefix is None:
                     remove = []
-                    for topic, subscribers in subscriptions.items():
-                        subscribers.discard(peer)
-                        if not subscribers:
+                    for topic in subscriptions:
+                        if self._remove_peer_subscription(peer, bus, topic, platform):
                             remove.append(topic)
                     for topic in remove:
                         del subscriptions[topic]
                 else:
                     for prefix in prefix if isinstance(prefix, list) else [prefix]:
-                        subscribers = subscriptions[prefix]
-                        subscribers.discard(peer)
-                        if not subscribers:
-                            del subscriptions[prefix]
+                        if self._remove_peer_subscription(peer, bus, prefix, platform):
+                            subscriptions.pop(prefix, None)
 
                 if platform == 'all' and self._ext_router is not None:
                     # Send updated subscription list to all connected platforms
@@ -388,6 +425,8 @@ class PubSubService:
         # Second: Try to send to external platform subscribers
         # external_count=0
         external_count = self._distribute_external(frames)
+        if self.statistics is not None:
+            self.statistics.published(internal_count + external_count)
         return internal_count + external_count
 
     def _distribute_internal(self, frames):
@@ -408,34 +447,23 @@ class PubSubService:
             self._logger.error("JSON decode error. Invalid character")
             return 0
 
-        all_subscriptions = dict()
-        subscriptions = dict()
-        subs = dict()
-        # Get subscriptions for all platforms
-        try:
-            all_subscriptions = self._peer_subscriptions['all'][bus]
-        except KeyError:
-            pass
-        try:
-            subscriptions = self._peer_subscriptions['internal'][bus]
-        except KeyError:
-            pass
-
-        subs.update(all_subscriptions)
-        subs.update(subscriptions)
         subscribers = set()
-        # Check for local subscribers
-        for prefix, subscription in subs.items():
-            if subscription and topic.startswith(prefix):
-                subscribers |= subscription
+        # Check for local subscribers of all platforms and internal subscriptions
+        for platform in ('all', 'internal'):
+            index = self._subscription_index.get((platform, bus))
+            if index:
+                subscribers |= index.match(topic)
 
         if subscribers:
             # self._logger.debug("PUBSUBSERVICE: found subscribers: {}".format(subscribers))
+            # Everything but the recipient frame is identical for all subscribers, so serialize it only once.
+            # zmq frames are reference counted, sending them again does not copy the payload.
+            shared = serialize_frames(frames[1:])
             for subscriber in subscribers:
                 frames[0] = subscriber
                 try:
                     # Send the message to the subscriber
-                    for sub in self._send(frames, publisher):
+                    for sub in self._send(frames, publisher, shared):
                         # Drop the subscriber if unreachable
                         self.peer_drop(sub)
                 except ZMQError:
@@ -452,12 +480,7 @@ class PubSubService:
         publisher, receiver, proto, user_id, msg_id, subsystem, op, topic, data = frames[0:9]
 
         success = False
-        external_subscribers = set()
-        topic = topic
-        for platform_id, subscriptions in self._ext_subscriptions.items():
-            for prefix in subscriptions:
-                if topic.startswith(prefix):
-                    external_subscribers.add(platform_id)
+        external_subscribers = self._ext_subscription_index.match(topic)
         # self._logger.debug("PUBSUBSERVICE External subscriptions {0}, {1}".format(topic, external_subscribers))
         if external_subscribers:
             frames[:] = []
@@ -491,7 +514,7 @@ class PubSubService:
                         raise
         return len(external_subscribers)
 
-    def _send(self, frames, publisher):
+    def _send(self, frames, publisher, serialized_tail=None):
         """
         Sends the message to the recipient. If the recipient is unreachable, it is dropped from list of peers (and
         associated subscriptions are removed. Any EAGAIN errors are reported back to the publisher.
@@ -499,6 +522,8 @@ class PubSubService:
         :type frames list
         :param publisher
         :type bytes
+        :param serialized_tail already serialized frames[1:], shared between the recipients of a publish
+        :type list of zmq.Frame
         :returns: List of dropped recipients, if any
         :rtype: list
 
@@ -515,9 +540,16 @@ class PubSubService:
             # Try sending the message to its recipient
             # Because we are sending directly on the socket we need
             # bytes
-            serialized = serialize_frames(frames)
+            if serialized_tail is None:
+                serialized = serialize_frames(frames)
+            else:
+                serialized = serialize_frames(frames[:1]) + serialized_tail
             self._vip_sock.send_multipart(serialized, flags=NOBLOCK, copy=False)
+            if self.statistics is not None:
+                self.statistics.outgoing(subscriber, frames[5], serialized)
         except ZMQError as exc:
+            if self.statistics is not None:
+                self.statistics.error(subscriber, frames[5], exc.errno)
             try:
                 errnum, errmsg = error = _ROUTE_ERRORS[exc.errno]
             except KeyError:
@@ -744,7 +776,7 @@ class PubSubService:
                         continue
                     prefixes = msg[instance_name]
                     # Store external subscription list for later use (during publish)
-                    self._ext_subscriptions[instance_name] = prefixes
+                    self._set_external_subscriptions(instance_name, prefixes)
                     self._logger.debug("PUBSUBSERVICE New external list from {0}: List: {1}".
                                        format(instance_name, self._ext_subscriptions))
                     if self._rabbitmq_agent:
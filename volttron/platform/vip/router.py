@@ -33,7 +33,9 @@ import zmq
 from zmq import Frame, NOBLOCK, ZMQError, EINVAL, EHOSTUNREACH
 
 from volttron.platform.vip.servicepeer import ServicePeerNotifier
-from volttron.utils.frame_serialization import serialize_frames
+from volttron.platform.vip.socket import negotiate_codec
+from volttron.utils.frame_serialization import (deserialize_envelope, deserialize_frames, is_msgpack_frame,
+                                                serialize_frames, ENVELOPE_SIZE, JSON_CODEC)
 
 __all__ = ['BaseRouter', 'OUTGOING', 'INCOMING', 'UNROUTABLE', 'ERROR']
 
@@ -75,20 +77,29 @@ class BaseRouter:
     _socket_class = zmq.Socket
     _poller_class = zmq.Poller
 
-    def __init__(self, context=None, default_user_id=None, service_notifier=Optional[ServicePeerNotifier]):
+    def __init__(self, context=None, default_user_id=None, service_notifier=Optional[ServicePeerNotifier],
+                 opaque_routing=False, statistics=None):
         '''Initialize the object instance.
 
         If context is None (the default), the zmq global context will be
-        used for socket creation.
+        used for socket creation. If opaque_routing is True, the payload
+        of messages between peers is forwarded without being decoded
+        (see decode_frames()). statistics is an optional
+        volttron.platform.vip.tracking.RouterStatistics instance updated
+        with every routed message.
         '''
         self.context = context or self._context_class.instance()
         self.default_user_id = default_user_id
         self.socket = None
         self._peers = set()
+        # Frame codecs negotiated in the hello exchange, peers not listed use JSON.
+        self._peer_codecs = {}
         self._poller = self._poller_class()
         self._ext_sockets = []
         self._socket_id_mapping = {}
         self._service_notifier = service_notifier
+        self._opaque_routing = opaque_routing
+        self.statistics = statistics
 
     def run(self):
         '''Main router loop.'''
@@ -141,6 +152,31 @@ class BaseRouter:
         '''Returns the underlying socket's poll method.'''
         return self.socket.poll
 
+    def decode_frames(self, frames):
+        '''Decode the frames of a message received on a router socket.
+
+        By default every frame is decoded. With opaque routing only the
+        envelope of a message between two peers is decoded and the
+        payload frames are routed on as the zmq.Frame objects that were
+        received. Messages addressed to the router itself are decoded in
+        full for the subsystems handled here. A MessagePack payload is
+        decoded as well if the recipient did not negotiate MessagePack,
+        so that it is encoded again with the codec of the recipient.
+        '''
+        if self.statistics is not None:
+            self.statistics.received(frames)
+        if not self._opaque_routing or len(frames) < ENVELOPE_SIZE:
+            return deserialize_frames(frames)
+        decoded = deserialize_envelope(frames)
+        sender, recipient = decoded[:2]
+        if not recipient:
+            return deserialize_frames(frames)
+        if (self._peer_codecs.get(sender, JSON_CODEC) != JSON_CODEC
+                and self._peer_codecs.get(recipient, JSON_CODEC) == JSON_CODEC
+                and any(is_msgpack_frame(frame) for frame in frames[ENVELOPE_SIZE:])):
+            decoded[ENVELOPE_SIZE:] = deserialize_frames(frames[ENVELOPE_SIZE:])
+        return decoded
+
     def handle_subsystem(self, frames, user_id):
         '''Handle additional subsystems and provide a response.
 
@@ -229,6 +265,7 @@ class BaseRouter:
             self._peers.remove(peer)
         except KeyError:
             return
+        self._peer_codecs.pop(peer, None)
         self._distribute(b'peerlist', b'drop', peer)
         self._drop_pubsub_peers(peer)
 
@@ -241,6 +278,18 @@ class BaseRouter:
         handle_subsystem() for processing. Messages destined for other
         entities are routed appropriately.
         '''
+        statistics = self.statistics
+        if statistics is None:
+            self._route(frames)
+            return
+        started = statistics.incoming(frames)
+        try:
+            self._route(frames)
+        finally:
+            if started is not None:
+                statistics.routed(started)
+
+    def _route(self, frames):
         socket = self.socket
         issue = self.issue
 
@@ -271,8 +320,21 @@ class BaseRouter:
             # Handle requests directed at the router
             name = subsystem
             if name == 'hello':
+                offer = frames[7] if len(frames) > 7 and isinstance(frames[7], dict) else None
                 frames = [sender, recipient, proto, user_id, msg_id,
                           'hello', 'welcome', '1.0', socket.identity, sender]
+                # The welcome is still sent with the previous codec, the peer switches once it receives the answer.
+                codec = negotiate_codec(offer.get('codecs')) if offer else JSON_CODEC
+                if offer is not None:
+                    frames.append(codec)
+                for peer in self._send(frames):
+                    self._drop_peer(peer)
+                if offer is not None:
+                    if codec == JSON_CODEC:
+                        self._peer_codecs.pop(sender, None)
+                    else:
+                        self._peer_codecs[sender] = codec
+                return
             elif name == 'ping':
                 frames[:7] = [
                     sender, recipient, proto, user_id, msg_id, 'ping', 'pong']
@@ -319,9 +381,11 @@ class BaseRouter:
         try:
             # Try sending the message to its recipient
             # This is a zmq socket so we need to serialize it before sending
-            serialized_frames = serialize_frames(frames)
+            serialized_frames = serialize_frames(frames, self._peer_codecs.get(recipient, JSON_CODEC))
             socket.send_multipart(serialized_frames, flags=NOBLOCK, copy=False)
             issue(OUTGOING, serialized_frames)
+            if self.statistics is not None:
+                self.statistics.outgoing(recipient, frames[5], serialized_frames)
         except ZMQError as exc:
             try:
                 errnum, errmsg = error = _ROUTE_ERRORS[exc.errno]
@@ -330,6 +394,8 @@ class BaseRouter:
             if error is None:
                 raise
             issue(ERROR, frames, error)
+            if self.statistics is not None:
+                self.statistics.error(recipient, frames[5], exc.errno)
             if exc.errno == EHOSTUNREACH:
                 drop.append(recipient)
             if exc.errno != EHOSTUNREACH or sender is not frames[0]:
@@ -337,7 +403,7 @@ class BaseRouter:
                 proto, user_id, msg_id, subsystem = frames[2:6]
                 frames = [sender, '', proto, user_id, msg_id,
                           'error', errnum, errmsg, recipient, subsystem]
-                serialized_frames = serialize_frames(frames)
+                serialized_frames = serialize_frames(frames, self._peer_codecs.get(sender, JSON_CODEC))
                 try:
                     socket.send_multipart(serialized_frames, flags=NOBLOCK, copy=False)
                     issue(OUTGOING, serialized_frames)
@@ -40,6 +40,7 @@ import base64
 import binascii
 from contextlib import contextmanager
 import logging
+import os
 import re
 import sys
 import urllib.request, urllib.parse, urllib.error
@@ -51,12 +52,17 @@ from zmq import (SNDMORE, RCVMORE, NOBLOCK, POLLOUT, DEALER, ROUTER,
 from zmq.error import Again
 from zmq.utils import z85
 
-from volttron.utils.frame_serialization import deserialize_frames, serialize_frames
+from volttron.utils.frame_serialization import (deserialize_frames, serialize_frames, JSON_CODEC,
+                                                SUPPORTED_CODECS)
 
-__all__ = ['Address', 'ProtocolError', 'Message', 'nonblocking']
+__all__ = ['Address', 'ProtocolError', 'Message', 'nonblocking', 'negotiate_codec', 'VIP_CODEC']
 
 BASE64_ENCODED_CURVE_KEY_LEN = 43
 
+# Frame codec a connecting peer offers the router in its hello message.  JSON is used until the router accepts the
+# offer, so older routers keep working.
+VIP_CODEC = os.environ.get('VOLTTRON_VIP_CODEC', JSON_CODEC)
+
 _log = logging.getLogger(__name__)
 
 
@@ -69,6 +75,14 @@ def nonblocking(sock):
     local.flags = flags
 
 
+def negotiate_codec(offered):
+    """Return the first codec of the offered list supported by this side, JSON if there is none."""
+    for codec in offered or ():
+        if codec in SUPPORTED_CODECS:
+            return codec
+    return JSON_CODEC
+
+
 def encode_key(key):
     '''Base64-encode and return a key in a URL-safe manner.'''
     # There is no easy way to test if key is already base64 encoded and ASCII decoded. This seems the best way.
@@ -286,8 +300,13 @@ class _Socket:
     A state machine is implemented by the send() and recv() methods to
     ensure the proper number, type, and ordering of frames. Protocol
     violations will raise ProtocolError exceptions.
+
+    List and dict frames are sent with the codec given by the codec
+    attribute, JSON unless another codec was negotiated with the router.
     """
 
+    codec = JSON_CODEC
+
     def __new__(cls, context=None, socket_type=DEALER, shadow=None):
         """Create and return a new Socket object.
 
@@ -398,7 +417,7 @@ class _Socket:
                 raise
 
     def send_multipart(self, msg_parts, flags=0, copy=True, track=False):
-        parts = serialize_frames(msg_parts)
+        parts = serialize_frames(msg_parts, self.codec)
         # _log.debug("Sending parts on multiparts: {}".format(parts))
         with self._sending(flags) as flags:
             super(_Socket, self).send_multipart(
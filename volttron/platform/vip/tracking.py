@@ -31,11 +31,14 @@
 
 
 
+import time
+from errno import EAGAIN, EHOSTUNREACH
+
 import gevent
 
 from .router import UNROUTABLE, ERROR, INCOMING
 
-__all__ = ['Tracker']
+__all__ = ['Tracker', 'Histogram', 'RouterStatistics']
 
 
 def pick(frames, index):
@@ -105,3 +108,232 @@ class Tracker:
         if self.enabled:
             self.enabled = False
             self.stats['end'] = gevent.get_hub().loop.now()
+
+
+class Histogram:
+    '''Counts of non-negative integers in fixed, logarithmic buckets.
+
+    As in an HDR histogram every power of two is split into the same
+    number of linear sub-buckets, so any value is recorded with a
+    relative error of at most 1/sub_buckets and recording costs a few
+    integer operations whatever the range of the values.
+    '''
+
+    def __init__(self, sub_bucket_bits=3):
+        self._bits = sub_bucket_bits
+        self._size = 1 << sub_bucket_bits
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def index(self, value):
+        '''Return the bucket index of value.'''
+        shift = value.bit_length() - self._bits - 1
+        if shift <= 0:
+            return value
+        return (shift + 1) * self._size + (value >> shift) - self._size
+
+    def lower_bound(self, index):
+        '''Return the smallest value counted in bucket index.'''
+        shift = index // self._size - 1
+        if shift <= 0:
+            return index
+        return (index % self._size + self._size) << shift
+
+    def record(self, value):
+        value = max(0, int(value))
+        index = self.index(value)
+        try:
+            self.counts[index] += 1
+        except KeyError:
+            self.counts[index] = 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent, buckets=None):
+        '''Return the highest value of the bucket holding the given percentile.'''
+        if buckets is None:
+            buckets = sorted(self.counts.items())
+        count = sum(n for _, n in buckets)
+        if not count:
+            return None
+        target = count * percent / 100.0
+        seen = 0
+        for index, n in buckets:
+            seen += n
+            if seen >= target:
+                return min(self.max, self.lower_bound(index + 1) - 1)
+        return self.max
+
+    def summary(self):
+        '''Return count, min, max, mean, percentiles and the non-empty buckets keyed by lower bound.'''
+        # Copied first, the router may record values while a summary is made.
+        buckets = sorted(list(self.counts.items()))
+        count, total = self.count, self.total
+        return {
+            'count': count,
+            'min': self.min,
+            'max': self.max,
+            'mean': total / count if count else None,
+            'p50': self.percentile(50, buckets),
+            'p90': self.percentile(90, buckets),
+            'p99': self.percentile(99, buckets),
+            'buckets': {self.lower_bound(index): n for index, n in buckets},
+        }
+
+
+# Positions of the counters kept for every peer and subsystem.
+_INCOMING, _INCOMING_BYTES, _OUTGOING, _OUTGOING_BYTES, _EAGAIN, _EHOSTUNREACH = range(6)
+_COUNTER_NAMES = ('incoming', 'incoming_bytes', 'outgoing', 'outgoing_bytes', 'eagain', 'ehostunreach')
+_RATE_NAMES = {_INCOMING: 'incoming_per_second', _INCOMING_BYTES: 'incoming_bytes_per_second',
+               _OUTGOING: 'outgoing_per_second', _OUTGOING_BYTES: 'outgoing_bytes_per_second'}
+
+
+def _new_counters():
+    return [0] * len(_COUNTER_NAMES)
+
+
+def _frames_size(frames):
+    '''Return the number of bytes of serialized frames.'''
+    return sum(map(len, frames))
+
+
+class RouterStatistics:
+    '''Message statistics collected by the router while it is running.
+
+    Unlike the Tracker it is always on.  Messages and bytes are counted
+    for every message, per peer and per subsystem, together with the
+    EAGAIN and EHOSTUNREACH errors of sends to a peer.  The routing
+    latency and the fan-out of publishes are recorded in histograms for
+    one of every sample_interval messages to keep the overhead low.
+
+    The router updates the counters from its own thread, snapshot() may
+    be called from another one.
+    '''
+
+    def __init__(self, sample_interval=10):
+        self.sample_interval = max(1, int(sample_interval))
+        self._countdown = self.sample_interval
+        self._fanout_countdown = self.sample_interval
+        self._received_bytes = 0
+        self.reset()
+
+    def reset(self):
+        '''Reset all counters and histograms.'''
+        self.start = time.time()
+        self.peers = {}
+        self.subsystems = {}
+        self.latency = Histogram()
+        self.fanout = Histogram()
+        self._window_start = time.monotonic()
+        self._window_peers = {}
+        self._window_subsystems = {}
+
+    def _counters(self, table, key):
+        try:
+            return table[key]
+        except KeyError:
+            counters = table[key] = _new_counters()
+            return counters
+
+    def received(self, frames):
+        '''Note the size of the serialized frames of the next routed message.'''
+        self._received_bytes = _frames_size(frames)
+
+    def incoming(self, frames):
+        '''Count a message received by the router.
+
+        Returns the start time of the message if its latency is sampled,
+        otherwise None.
+        '''
+        size = self._received_bytes
+        self._received_bytes = 0
+        sender = frames[0] if frames else ''
+        subsystem = frames[5] if len(frames) > 5 else ''
+        counters = self.peers.get(sender) or self._counters(self.peers, sender)
+        counters[_INCOMING] += 1
+        counters[_INCOMING_BYTES] += size
+        counters = self.subsystems.get(subsystem) or self._counters(self.subsystems, subsystem)
+        counters[_INCOMING] += 1
+        counters[_INCOMING_BYTES] += size
+        self._countdown -= 1
+        if self._countdown:
+            return None
+        self._countdown = self.sample_interval
+        return time.perf_counter()
+
+    def routed(self, started):
+        '''Record the latency of a sampled message in microseconds.'''
+        self.latency.record((time.perf_counter() - started) * 1e6)
+
+    def outgoing(self, recipient, subsystem, frames):
+        '''Count a message sent by the router.'''
+        size = _frames_size(frames)
+        counters = self.peers.get(recipient) or self._counters(self.peers, recipient)
+        counters[_OUTGOING] += 1
+        counters[_OUTGOING_BYTES] += size
+        counters = self.subsystems.get(subsystem) or self._counters(self.subsystems, subsystem)
+        counters[_OUTGOING] += 1
+        counters[_OUTGOING_BYTES] += size
+
+    def error(self, recipient, subsystem, errnum):
+        '''Count a send to recipient that failed with EAGAIN or EHOSTUNREACH.'''
+        if errnum == EAGAIN:
+            position = _EAGAIN
+        elif errnum == EHOSTUNREACH:
+            position = _EHOSTUNREACH
+        else:
+            return
+        self._counters(self.peers, recipient)[position] += 1
+        self._counters(self.subsystems, subsystem)[position] += 1
+
+    def published(self, subscribers):
+        '''Record the number of subscribers a publish was sent to.'''
+        self._fanout_countdown -= 1
+        if not self._fanout_countdown:
+            self._fanout_countdown = self.sample_interval
+            self.fanout.record(subscribers)
+
+    def _table(self, table, window, elapsed, advance):
+        result = {}
+        for key, counters in list(table.items()):
+            counters = list(counters)
+            previous = window.get(key) or _new_counters()
+            entry = dict(zip(_COUNTER_NAMES, counters))
+            for position, name in _RATE_NAMES.items():
+                entry[name] = (counters[position] - previous[position]) / elapsed
+            result[key] = entry
+            if advance:
+                window[key] = counters
+        return result
+
+    def snapshot(self, advance=True):
+        '''Return the counters, rates and histogram summaries.
+
+        Rates are averaged since the start of the current window, which
+        the next snapshot starts if advance is True.
+        '''
+        now = time.monotonic()
+        elapsed = max(now - self._window_start, 1e-9)
+        snapshot = {
+            'start': self.start,
+            'time': time.time(),
+            'window': elapsed,
+            'sample_interval': self.sample_interval,
+            'peers': self._table(self.peers, self._window_peers, elapsed, advance),
+            'subsystems': self._table(self.subsystems, self._window_subsystems, elapsed, advance),
+            'latency_us': self.latency.summary(),
+            'fanout': self.fanout.summary(),
+        }
+        if advance:
+            self._window_start = now
+        return snapshot
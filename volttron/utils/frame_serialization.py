@@ -30,12 +30,28 @@ import struct
 
 from volttron.platform import jsonapi
 
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
 _log = logging.getLogger(__name__)
 
 
 # python 3.8 formatting errors with utf-8 encoding.  The ISO-8859-1 is equivilent to latin-1
 ENCODE_FORMAT = 'ISO-8859-1'
 
+# Codecs available for list and dict frames.  A connection uses JSON unless MessagePack has been negotiated with
+# the router during the hello exchange (see volttron.platform.vip.socket).
+JSON_CODEC = 'json'
+MSGPACK_CODEC = 'msgpack'
+SUPPORTED_CODECS = (JSON_CODEC, MSGPACK_CODEC) if HAS_MSGPACK else (JSON_CODEC,)
+
+# Prefix of MessagePack encoded frames. 0xc1 is never used by MessagePack and cannot start a JSON document, so
+# frames are recognized whatever codec the receiving side negotiated.
+MSGPACK_MARKER = b'\xc1MP'
+
 
 def deserialize_frames(frames: List[Frame]) -> List:
     decoded = []
@@ -56,8 +72,15 @@ def deserialize_frames(frames: List[Frame]) -> List:
             if x == {}:
                 decoded.append(x)
                 continue
+            raw = x.bytes
+            if HAS_MSGPACK and raw[:3] == MSGPACK_MARKER:
+                try:
+                    decoded.append(msgpack.unpackb(raw[3:], raw=False, strict_map_key=False))
+                    continue
+                except ValueError as e:
+                    _log.error(f"MessagePack decode error: {e}")
             try:
-                d = x.bytes.decode(ENCODE_FORMAT)
+                d = raw.decode(ENCODE_FORMAT)
             except UnicodeDecodeError as e:
                 _log.error(f"Unicode decode error: {e}")
                 decoded.append(x)
@@ -69,13 +92,43 @@ def deserialize_frames(frames: List[Frame]) -> List:
     return decoded
 
 
-def serialize_frames(data: List[Any]) -> List[Frame]:
+# Number of frames of the VIP envelope as received by the router:
+#   [SENDER, RECIPIENT, PROTO, USER_ID, MSG_ID, SUBSYS, ...]
+ENVELOPE_SIZE = 6
+
+
+def deserialize_envelope(frames: List[Frame], size: int = ENVELOPE_SIZE) -> List:
+    """
+    Decode the first size frames to strings and keep the remaining payload frames as they were received, so that they
+    can be sent on without being decoded and encoded again.  Unlike deserialize_frames the envelope frames are never
+    parsed as JSON.
+    """
+    decoded = [x.bytes.decode(ENCODE_FORMAT) if isinstance(x, Frame) else x for x in frames[:size]]
+    decoded.extend(frames[size:])
+    return decoded
+
+
+def is_msgpack_frame(frame: Any) -> bool:
+    """
+    Return True if frame is a received frame holding a MessagePack encoded payload.
+    """
+    return isinstance(frame, Frame) and bytes(frame.buffer[:3]) == MSGPACK_MARKER
+
+
+def serialize_frames(data: List[Any], codec: str = JSON_CODEC) -> List[Frame]:
+    """
+    Serialize VIP frames.  Lists and dicts are encoded with the given codec, MessagePack payloads keep their
+    dict keys as is where JSON would convert them to strings.
+    """
     frames = []
 
     for x in data:
         try:
             if isinstance(x, list) or isinstance(x, dict):
-                frames.append(Frame(jsonapi.dumps(x).encode(ENCODE_FORMAT)))
+                if codec == MSGPACK_CODEC:
+                    frames.append(Frame(MSGPACK_MARKER + msgpack.packb(x, use_bin_type=True)))
+                else:
+                    frames.append(Frame(jsonapi.dumpb(x)))
             elif isinstance(x, Frame):
                 frames.append(x)
             elif isinstance(x, bytes):
@@ -130,6 +130,193 @@ class PersistentDict(dict):
         raise ValueError('File not in a supported format')
 
 
+_DELETED = object()
+
+
+class JournaledPersistentDict(PersistentDict):
+    """ JSON persistent dictionary that writes changes incrementally.
+
+    The file holds a snapshot of the dictionary.  sync appends the changes
+    made since the previous sync as one line to a journal next to it
+    (filename + '.journal') instead of rewriting the snapshot, so a sync
+    costs the size of the changes rather than the size of the dictionary.
+    The journal is folded into a new snapshot once it outgrows the snapshot
+    and when the dictionary is loaded.
+
+    Each journal line is written and synced with a single write.  A line
+    cut short by a crash is discarded when the journal is replayed, so a
+    sync is either fully applied or not at all.  Snapshots are replaced
+    atomically and the journal is removed afterwards; replaying a journal
+    that was already folded into the snapshot gives the same result.
+
+    """
+
+    JOURNAL_SUFFIX = '.journal'
+    # The journal is compacted once it is larger than the snapshot and at least this size.
+    COMPACT_MIN_BYTES = 1 << 20
+
+    def __init__(self, filename, flag='c', mode=None, *args, **kwds):
+        self._tracking = False
+        self._changes = {}
+        self._cleared = False
+        self.journal_filename = filename + self.JOURNAL_SUFFIX
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        # Writes happen in the caller, the worker thread of PersistentDict is not needed.
+        self.flag = flag
+        self.mode = mode
+        self.format = 'json'
+        self.filename = filename
+        if flag != 'n' and os.access(filename, os.R_OK):
+            with open(filename, 'r') as fileobj:
+                self._load(fileobj)
+        dict.__init__(self, *args, **kwds)
+        if flag != 'n':
+            try:
+                self._snapshot_bytes = os.path.getsize(filename)
+            except OSError:
+                pass
+            # Fold any journal into the snapshot, even one that only holds a
+            # cut short entry, so the next sync does not append to it.
+            if self._replay_journal() and flag != 'r':
+                self.compact()
+        self._tracking = True
+
+    def _replay_journal(self):
+        """ Apply the journal to the dictionary, returns False if there is no journal """
+        try:
+            fileobj = open(self.journal_filename, 'rb')
+        except FileNotFoundError:
+            return False
+        with fileobj:
+            for line in fileobj:
+                try:
+                    record = jsonapi.loads(line)
+                except ValueError:
+                    _log.warning("Discarding incomplete journal entry in {}".format(self.journal_filename))
+                    break
+                if record.get('clear'):
+                    dict.clear(self)
+                for key in record.get('delete', ()):
+                    dict.pop(self, key, None)
+                dict.update(self, record.get('set', {}))
+        return True
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if self._tracking:
+            self._changes[key] = value
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if self._tracking:
+            self._changes[key] = _DELETED
+
+    def pop(self, key, *default):
+        if self._tracking and key in self:
+            self._changes[key] = _DELETED
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        if self._tracking:
+            self._changes[key] = _DELETED
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwds):
+        for key, value in dict(*args, **kwds).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self._changes.clear()
+        self._cleared = True
+
+    def sync(self):
+        """ Append the changes since the last sync to the journal """
+        if self.flag == 'r':
+            return
+        if not self:
+            # If we are empty delete the store if it exists.
+            self._remove_files()
+            return
+        if not self._changes and not self._cleared:
+            return
+        record = {}
+        if self._cleared:
+            record['clear'] = True
+        deleted = [key for key, value in self._changes.items() if value is _DELETED]
+        if deleted:
+            record['delete'] = deleted
+        changed = {key: value for key, value in self._changes.items() if value is not _DELETED}
+        if changed:
+            record['set'] = changed
+        data = jsonapi.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with open(self.journal_filename, 'ab') as fileobj:
+            fileobj.write(data)
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+        if self.mode is not None and not self._journal_bytes:
+            os.chmod(self.journal_filename, self.mode)
+        self._journal_bytes += len(data)
+        self._changes.clear()
+        self._cleared = False
+        if self._journal_bytes > max(self.COMPACT_MIN_BYTES, self._snapshot_bytes):
+            self.compact()
+
+    def async_sync(self):
+        """Journal writes are small, sync in the caller to keep them in order with compaction."""
+        self.sync()
+
+    def compact(self):
+        """ Replace the snapshot with the current contents and remove the journal """
+        if self.flag == 'r':
+            return
+        if not self:
+            self._remove_files()
+            return
+        data = jsonapi.dumps(self, separators=(',', ':')).encode('utf-8')
+        tempname = self.filename + '.tmp'
+        with open(tempname, 'wb') as fileobj:
+            fileobj.write(data)
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+        os.replace(tempname, self.filename)  # atomic commit
+        if self.mode is not None:
+            os.chmod(self.filename, self.mode)
+        self._snapshot_bytes = len(data)
+        self._remove_journal()
+        self._changes.clear()
+        self._cleared = False
+
+    def close(self):
+        self.sync()
+        self.compact()
+
+    def _remove_journal(self):
+        try:
+            os.remove(self.journal_filename)
+        except FileNotFoundError:
+            pass
+        self._journal_bytes = 0
+
+    def _remove_files(self):
+        # The journal goes first, replaying it without the snapshot would restore part of the contents.
+        self._remove_journal()
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+        self._snapshot_bytes = 0
+        self._changes.clear()
+        self._cleared = False
+
+
 if __name__ == '__main__':
     import random
 
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+from typing import Any, Hashable, Iterator, Set, Tuple
+
+__all__ = ['PrefixTrie']
+
+
+class _Node:
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        self.values = None
+
+
+class PrefixTrie:
+    """
+    Index of values keyed by string prefix.
+
+    Pubsub subscriptions are plain string prefixes, a subscription to
+    ``devices/campus`` matches both ``devices/campus/building`` and
+    ``devices/campus2``, so the trie is keyed by character rather than by
+    topic segment.  Looking up every value whose prefix matches a topic
+    costs one dictionary lookup per character of the topic, independent of
+    the number of stored prefixes.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def add(self, prefix: str, value: Hashable) -> bool:
+        """
+        Associate value with prefix.
+
+        :returns: True if the value was not already stored for prefix.
+        """
+        node = self._root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+        if node.values is None:
+            node.values = set()
+        elif value in node.values:
+            return False
+        node.values.add(value)
+        self._count += 1
+        return True
+
+    def discard(self, prefix: str, value: Hashable) -> bool:
+        """
+        Remove value from prefix, pruning branches left empty.
+
+        :returns: True if the value was stored for prefix.
+        """
+        path = []
+        node = self._root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                return False
+            path.append((node, char))
+            node = child
+        if not node.values or value not in node.values:
+            return False
+        node.values.discard(value)
+        self._count -= 1
+        if not node.values:
+            node.values = None
+            while path and node.values is None and not node.children:
+                node, char = path.pop()
+                del node.children[char]
+        return True
+
+    def get(self, prefix: str) -> Set:
+        """
+        Return a copy of the values stored for exactly prefix.
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return set(node.values) if node.values else set()
+
+    def match(self, topic: str) -> Set:
+        """
+        Return the union of the values of every stored prefix of topic.
+        """
+        node = self._root
+        result = set(node.values) if node.values else set()
+        for char in topic:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.values:
+                result |= node.values
+        return result
+
+    def iter_match(self, topic: str) -> Iterator[Tuple[str, Set]]:
+        """
+        Iterate over (prefix, values) for every stored prefix of topic,
+        shortest prefix first.  The value sets must not be modified.
+        """
+        node = self._root
+        if node.values:
+            yield '', node.values
+        for index, char in enumerate(topic):
+            node = node.children.get(char)
+            if node is None:
+                return
+            if node.values:
+                yield topic[:index + 1], node.values
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over (prefix, value) pairs.
+        """
+        stack = [('', self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            if node.values:
+                for value in node.values:
+                    yield prefix, value
+            for char, child in node.children.items():
+                stack.append((prefix + char, child))
+
+    def clear(self):
+        self._root = _Node()
+        self._count = 0
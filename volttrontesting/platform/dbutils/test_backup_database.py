@@ -5,7 +5,9 @@ from gevent import subprocess
 from datetime import datetime
 from pytz import UTC
 
-from volttron.platform.agent.base_historian import BackupDatabase, BaseHistorian
+from volttron.platform.agent.base_historian import (BACKUP_CACHE_PROFILES, BACKUP_DRAIN_STREAM, BackupDatabase,
+                                                    BaseHistorian,
+                                                    resolve_backup_cache_pragmas)
 
 SIZE_LIMIT = 1000  # the default submit_size_limit for BaseHistorianAgents
 
@@ -183,6 +185,179 @@ def test_get_outstanding_to_publish_should_return_unique_records_on_multiple_tra
     assert backup_database.get_outstanding_to_publish(SIZE_LIMIT) == []
 
 
+def test_backup_new_data_should_store_batches_with_metadata_and_time_errors(backup_database):
+    publish_list = [
+        {
+            "source": "scrape",
+            "topic": "devices/campus/building/device/point1",
+            "meta": {"units": "F"},
+            "readings": [("2020-06-01 12:31:00", 1), ("2020-06-01 12:32:00", 2)],
+            "headers": {"time_error": False},
+        },
+        {
+            "source": "scrape",
+            "topic": "devices/campus/building/device/point2",
+            "meta": {"units": "kW"},
+            "readings": [("2020-06-01 12:31:00", 3.5)],
+            "headers": {"time_error": True},
+        },
+        None,
+    ]
+    backup_database.backup_new_data(publish_list, time_tolerance_check=True)
+
+    assert backup_database._record_count == 2
+    assert backup_database.time_error_records
+    assert len(get_all_data("time_error")) == 1
+    assert sorted(get_all_data("metadata")) == ["scrape|1|units|F", "scrape|2|units|kW"]
+
+    # A later batch reuses cached topic ids and only adds new topics.
+    publish_list[0]["readings"] = [("2020-06-01 12:33:00", 4)]
+    publish_list[1] = {
+        "source": "scrape",
+        "topic": "devices/campus/building/device/point3",
+        "readings": [("2020-06-01 12:33:00", 5)],
+        "headers": {"time_error": False},
+    }
+    backup_database.backup_new_data(publish_list, time_tolerance_check=True)
+
+    assert backup_database._record_count == 4
+    assert get_all_data("topics") == ["1|devices/campus/building/device/point1",
+                                      "2|devices/campus/building/device/point2",
+                                      "3|devices/campus/building/device/point3"]
+    records = backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [(r["topic"][-6:], r["value"], r["meta"]) for r in records] == [
+        ("point1", 1, {"units": "F"}),
+        ("point1", 2, {"units": "F"}),
+        ("point1", 4, {"units": "F"}),
+        ("point3", 5, {}),
+    ]
+
+
+def test_backup_new_data_should_store_point_batches(backup_database):
+    timestamp = datetime(2020, 6, 1, 12, 31, tzinfo=UTC)
+    publish_list = [
+        {
+            "source": "scrape",
+            "timestamp": timestamp,
+            "points": [("campus/building/device/point1", 1, {"units": "F"}),
+                       ("campus/building/device/point2", 2.5, {"units": "kW"})],
+            "headers": {},
+        },
+        {
+            "source": "scrape",
+            "timestamp": timestamp,
+            "points": [("campus/building/device/point1", 3, {}),
+                       ("campus/building/device/point3", 4, {})],
+            "headers": {"time_error": True},
+        },
+    ]
+    backup_database.backup_new_data(publish_list, time_tolerance_check=True)
+
+    assert backup_database._record_count == 2
+    assert len(get_all_data("time_error")) == 2
+    assert sorted(get_all_data("metadata")) == ["scrape|1|units|F", "scrape|2|units|kW"]
+    records = backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [(r["topic"], r["value"], r["meta"], r["timestamp"]) for r in records] == [
+        ("campus/building/device/point1", 1, {"units": "F"}, timestamp),
+        ("campus/building/device/point2", 2.5, {"units": "kW"}, timestamp),
+    ]
+
+
+def test_point_batches_without_metadata_should_publish_stored_metadata_after_restart(backup_database):
+    timestamp = datetime(2020, 6, 1, 12, 31, tzinfo=UTC)
+    backup_database.backup_new_data([
+        {
+            "source": "scrape",
+            "timestamp": timestamp,
+            "points": [("campus/building/device/point1", 1, {"units": "F"})],
+            "headers": {},
+        },
+    ])
+    backup_database.remove_successfully_published(
+        {r["_id"] for r in backup_database.get_outstanding_to_publish(SIZE_LIMIT)}, SIZE_LIMIT)
+    backup_database.close()
+
+    # A restarted historian no longer knows the metadata a driver publishing on change sent earlier.
+    restarted = BackupDatabase(BaseHistorian(), None, 0.9)
+    restarted.backup_new_data([
+        {
+            "source": "scrape",
+            "timestamp": timestamp,
+            "points": [("campus/building/device/point1", 2, {}),
+                       ("campus/building/device/point2", 3, {})],
+            "headers": {},
+        },
+    ])
+    records = restarted.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [(r["topic"], r["value"], r["meta"]) for r in records] == [
+        ("campus/building/device/point1", 2, {"units": "F"}),
+        ("campus/building/device/point2", 3, {}),
+    ]
+    restarted.close()
+
+
+def test_stream_drain_should_publish_everything_in_id_order(
+    stream_backup_database, new_publish_list_unique
+):
+    init_db(stream_backup_database, new_publish_list_unique)
+
+    drained = []
+    while True:
+        records = stream_backup_database.get_outstanding_to_publish(300)
+        if not records:
+            break
+        drained.extend(record["_id"] for record in records)
+        stream_backup_database.remove_successfully_published(set((None,)), 300)
+
+    assert drained == list(range(1, len(new_publish_list_unique) + 1))
+    assert get_all_data("outstanding") == []
+    assert stream_backup_database._record_count == 0
+
+
+def test_stream_drain_should_keep_duplicates_for_next_batch(
+    stream_backup_database, new_publish_list_dupes
+):
+    init_db_with_dupes(stream_backup_database, new_publish_list_dupes)
+
+    first = stream_backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    stream_backup_database.remove_successfully_published(set((None,)), SIZE_LIMIT)
+    assert [record["_id"] for record in first] == [1] + list(range(4, 1000))
+    assert get_all_data("outstanding") == [
+        "2|2020-06-01 12:30:59|dupesource|1|456|{}",
+        "3|2020-06-01 12:30:59|dupesource|1|789|{}",
+    ]
+
+    second = stream_backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [(record["_id"], record["value"]) for record in second] == [(2, 456)]
+
+
+def test_stream_drain_should_retry_unpublished_records(
+    stream_backup_database, new_publish_list_unique
+):
+    init_db(stream_backup_database, new_publish_list_unique)
+
+    records = stream_backup_database.get_outstanding_to_publish(10)
+    published = {record["_id"] for record in records} - {4, 5}
+    stream_backup_database.remove_successfully_published(published, 10)
+
+    assert stream_backup_database._record_count == len(new_publish_list_unique) - 8
+    retried = stream_backup_database.get_outstanding_to_publish(3)
+    assert [record["_id"] for record in retried] == [4, 5, 11]
+
+
+def test_stream_drain_should_restart_when_ids_start_over(
+    stream_backup_database, new_publish_list_unique
+):
+    init_db(stream_backup_database, new_publish_list_unique[:5])
+    stream_backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    stream_backup_database.remove_successfully_published(set((None,)), SIZE_LIMIT)
+
+    # The emptied table hands out ids from 1 again.
+    init_db(stream_backup_database, new_publish_list_unique[:2])
+    records = stream_backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [record["_id"] for record in records] == [1, 2]
+
+
 def init_db_with_dupes(backup_database, new_publish_list_dupes):
     backup_database.backup_new_data(new_publish_list_dupes)
 
@@ -245,6 +420,45 @@ def new_publish_list_dupes():
     return tuple(dupes)
 
 
+@pytest.mark.parametrize("profile", sorted(BACKUP_CACHE_PROFILES))
+def test_setupdb_should_apply_cache_profile(profile):
+    os.makedirs(agent_data_dir, exist_ok=True)
+    try:
+        db = BackupDatabase(BaseHistorian(), None, 0.9, cache_profile=profile)
+        expected = BACKUP_CACHE_PROFILES[profile]
+        c = db._connection.cursor()
+        c.execute("PRAGMA journal_mode")
+        assert c.fetchone()[0].upper() == expected["journal_mode"]
+        c.execute("PRAGMA synchronous")
+        assert c.fetchone()[0] == ("OFF", "NORMAL", "FULL", "EXTRA").index(expected["synchronous"])
+        c.execute("PRAGMA cache_size")
+        assert c.fetchone()[0] == expected["cache_size"]
+        db.close()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_db + suffix):
+                os.remove(cache_db + suffix)
+        os.rmdir(agent_data_dir)
+
+
+def test_resolve_backup_cache_pragmas_should_apply_overrides():
+    pragmas = resolve_backup_cache_pragmas("balanced", {"synchronous": "full", "mmap_size": "0"})
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["synchronous"] == "FULL"
+    assert pragmas["mmap_size"] == 0
+
+
+@pytest.mark.parametrize("profile, overrides", [
+    ("unknown", None),
+    ("safe", {"locking_mode": "EXCLUSIVE"}),
+    ("safe", {"journal_mode": "WAL; DROP TABLE outstanding"}),
+    ("safe", {"cache_size": "big"}),
+])
+def test_resolve_backup_cache_pragmas_should_reject_invalid_settings(profile, overrides):
+    with pytest.raises(ValueError):
+        resolve_backup_cache_pragmas(profile, overrides)
+
+
 @pytest.fixture()
 def backup_database():
     os.makedirs(agent_data_dir, exist_ok=True)
@@ -259,6 +473,17 @@ def backup_database():
         os.rmdir(agent_data_dir)
 
 
+@pytest.fixture()
+def stream_backup_database():
+    os.makedirs(agent_data_dir, exist_ok=True)
+    yield BackupDatabase(BaseHistorian(), None, 0.9, drain_mode=BACKUP_DRAIN_STREAM)
+
+    if os.path.exists(cache_db):
+        os.remove(cache_db)
+    if os.path.exists(agent_data_dir):
+        os.rmdir(agent_data_dir)
+
+
 def get_all_data(table):
     q = f"""SELECT * FROM {table}"""
     res = query_db(q)
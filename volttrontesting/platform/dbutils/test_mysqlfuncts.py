@@ -379,6 +379,33 @@ def test_collect_aggregate_should_return_aggregate_result(get_container_func):
     assert actual_aggregate == expected_aggregate
 
 
+def test_collect_aggregate_summary_should_return_summary(get_container_func):
+    container, sqlfuncts, connection_port, historian_version = get_container_func
+    query = f"""
+                REPLACE INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:30:59', 42, '2');
+                REPLACE INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:31:59', 43, '8')
+            """
+    seed_database(container, query)
+
+    assert sqlfuncts.collect_aggregate_summary([42, 43]) == (2, 10.0, '2', '8')
+    assert sqlfuncts.collect_aggregate_summary([44]) == (0, None, None, None)
+
+
+def test_collect_aggregate_summaries_should_return_summary_per_topic(get_container_func):
+    container, sqlfuncts, connection_port, historian_version = get_container_func
+    query = f"""
+                REPLACE INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:30:59', 42, '2');
+                REPLACE INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:31:59', 43, '8')
+            """
+    seed_database(container, query)
+
+    assert sqlfuncts.collect_aggregate_summaries([42, 43, 44]) == {42: (1, 2.0, '2', '2'), 43: (1, 8.0, '8', '8')}
+
+
 def test_collect_aggregate_should_raise_value_error(get_container_func):
     container, sqlfuncts, connection_port, historian_version = get_container_func
     with pytest.raises(ValueError):
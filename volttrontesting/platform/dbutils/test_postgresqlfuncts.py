@@ -522,6 +522,35 @@ def test_collect_aggregate_stmt_should_return_rows(setup_functs):
     assert actual_aggregate == expected_aggregate
 
 
+def test_collect_aggregate_summary_should_return_summary(setup_functs):
+    sqlfuncts, historian_version = setup_functs
+
+    query = f"""
+                INSERT INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:30:59', 42, '2');
+                INSERT INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:31:59', 43, '8')
+            """
+    seed_database(query)
+
+    assert sqlfuncts.collect_aggregate_summary([42, 43]) == (2, 10.0, 2.0, 8.0)
+    assert sqlfuncts.collect_aggregate_summary([44]) == (0, None, None, None)
+
+
+def test_collect_aggregate_summaries_should_return_summary_per_topic(setup_functs):
+    sqlfuncts, historian_version = setup_functs
+
+    query = f"""
+                INSERT INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:30:59', 42, '2');
+                INSERT INTO {DATA_TABLE}
+                VALUES ('2020-06-01 12:31:59', 43, '8')
+            """
+    seed_database(query)
+
+    assert sqlfuncts.collect_aggregate_summaries([42, 43, 44]) == {42: (1, 2.0, 2.0, 2.0), 43: (1, 8.0, 8.0, 8.0)}
+
+
 def test_collect_aggregate_stmt_should_raise_value_error(setup_functs):
     sqlfuncts, historian_version = setup_functs
 
@@ -77,6 +77,38 @@ def test_query(get_sqlitefuncts, topic_ids, id_name_map, expected_values):
     assert actual_results == expected_values
 
 
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+@pytest.mark.parametrize(
+    "kwargs, expected_values",
+    [
+        ({}, {"topic42": [("2020-06-01T12:30:58.000000", 1), ("2020-06-01T12:30:59.000000", 2)],
+              "topic43": [("2020-06-01T12:30:59.000000", 3)]}),
+        ({"count": 1}, {"topic42": [("2020-06-01T12:30:58.000000", 1)],
+                        "topic43": [("2020-06-01T12:30:59.000000", 3)]}),
+        ({"skip": 1}, {"topic42": [("2020-06-01T12:30:59.000000", 2)], "topic43": []}),
+        ({"count": 1, "order": "LAST_TO_FIRST"}, {"topic42": [("2020-06-01T12:30:59.000000", 2)],
+                                                  "topic43": [("2020-06-01T12:30:59.000000", 3)]}),
+        ({"timestamp_format": "epoch"}, {"topic42": [(1591014658.0, 1), (1591014659.0, 2)],
+                                         "topic43": [(1591014659.0, 3)]}),
+    ],
+)
+def test_query_should_apply_limits_per_topic(get_sqlitefuncts, kwargs, expected_values):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+
+    query = (
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:58',42,'1'); "
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:59',42,'2'); "
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:59',43,'3')"
+    )
+    query_db(query)
+
+    actual_results = sqlitefuncts.query([42, 43], {42: "topic42", 43: "topic43"}, **kwargs)
+
+    assert actual_results == expected_values
+    assert list(actual_results) == ["topic42", "topic43"]
+
+
 @pytest.mark.sqlitefuncts
 @pytest.mark.dbutils
 @pytest.mark.parametrize(
@@ -418,6 +450,52 @@ def test_collect_aggregate(get_sqlitefuncts):
     assert actual_aggregate == expected_aggregate
 
 
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_collect_aggregate_summary(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    query = (
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:30:59', 42, '2');"
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:31:59', 43, '8');"
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:32:59', 43, '5');"
+    )
+    query_db(query)
+
+    assert sqlitefuncts.collect_aggregate_summary([42, 43]) == (3, 15, '2', '8')
+    assert sqlitefuncts.collect_aggregate_summary([44]) == (0, None, None, None)
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_collect_aggregate_summaries(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    query = (
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:30:59', 42, '2');"
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:31:59', 43, '8');"
+        "INSERT OR REPLACE INTO data values('2020-06-01 12:32:59', 43, '5');"
+    )
+    query_db(query)
+
+    assert sqlitefuncts.collect_aggregate_summaries([42, 43, 44]) == {42: (1, 2, '2', '2'),
+                                                                      43: (2, 13, '5', '8')}
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_insert_aggregates(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    sqlitefuncts.create_aggregate_store("avg", "1h")
+    sqlitefuncts.create_aggregate_store("max", "1h")
+
+    assert sqlitefuncts.insert_aggregates([(1, "avg", "1h", "2020-06-01 12:00:00", 1.5, [42, 43]),
+                                           (2, "avg", "1h", "2020-06-01 12:00:00", 2.5, [44]),
+                                           (3, "max", "1h", "2020-06-01 12:00:00", 8.0, [42])])
+
+    assert get_all_data("avg_1h") == ["2020-06-01 12:00:00|1|1.5|[42, 43]",
+                                      "2020-06-01 12:00:00|2|2.5|[44]"]
+    assert get_all_data("max_1h") == ["2020-06-01 12:00:00|3|8.0|[42]"]
+
+
 def get_indexes(table):
     res = query_db(f"""PRAGMA index_list({table})""")
     return res.splitlines()
@@ -6,6 +6,7 @@ import mock
 
 from volttron.platform.agent import utils
 from volttron.platform.messaging import headers as header_mod
+from volttron.platform.messaging.compact import COMPACT_CONTENT_TYPE, CompactEncoder
 from volttron.platform.vip.agent import Agent
 from volttron.platform.agent.base_historian import BaseHistorianAgent, BaseQueryHistorianAgent, BackupDatabase
 from volttron.platform.vip.agent.results import AsyncResult
@@ -130,3 +131,118 @@ def test_cache_enable():
         # give a small amount of time so that the queue can get empty
         assert agent.has_published_items()
         assert len(agent.get_publish_list()) == 2
+
+
+def test_capture_data_reuses_last_metadata():
+    now = utils.format_timestamp(datetime.utcnow())
+    headers = {
+        header_mod.DATE: now,
+        header_mod.TIMESTAMP: now
+    }
+    meta = {"units": "F", "type": "float", "tz": ""}
+    agent = BaseHistorianAgent()
+    device = "testcampus/testbuilding/testdevice"
+    topic = "devices/" + device + "/all"
+    agent._capture_data(peer="foo", sender="test", bus="", topic=topic, headers=headers,
+                        message=[{"OutsideAirTemperature": 52.5}, {"OutsideAirTemperature": meta}], device=device)
+    # Drivers publishing on change leave out metadata that did not change.
+    agent._capture_data(peer="foo", sender="test", bus="", topic=topic, headers=headers,
+                        message=[{"OutsideAirTemperature": 53.0}, {}], device=device)
+
+    first = agent._event_queue.get_nowait()
+    second = agent._event_queue.get_nowait()
+    assert first["points"] == [(device + "/OutsideAirTemperature", 52.5, meta)]
+    assert second["points"] == [(device + "/OutsideAirTemperature", 53.0, meta)]
+
+
+def test_capture_device_data_decodes_compact_messages():
+    now = utils.format_timestamp(datetime.utcnow())
+    headers = {
+        header_mod.DATE: now,
+        header_mod.TIMESTAMP: now,
+        header_mod.CONTENT_TYPE: COMPACT_CONTENT_TYPE
+    }
+    meta = {"OutsideAirTemperature": {"units": "F", "type": "float", "tz": ""}}
+    encoder = CompactEncoder()
+    agent = BaseHistorianAgent()
+    topic = "devices/testcampus/testbuilding/testdevice/all"
+    agent._capture_device_data(peer="foo", sender="test", bus="", topic=topic, headers=headers,
+                               message=encoder.encode({"OutsideAirTemperature": 52.5}, meta))
+
+    record = agent._event_queue.get_nowait()
+    assert record["points"] == [("testcampus/testbuilding/testdevice/OutsideAirTemperature", 52.5,
+                                 meta["OutsideAirTemperature"])]
+    assert header_mod.CONTENT_TYPE not in record["headers"]
+
+
+def compact_agent_and_messages():
+    now = utils.format_timestamp(datetime.utcnow())
+    headers = {
+        header_mod.DATE: now,
+        header_mod.TIMESTAMP: now,
+        header_mod.CONTENT_TYPE: COMPACT_CONTENT_TYPE
+    }
+    meta = {"OutsideAirTemperature": {"units": "F", "type": "float", "tz": ""}}
+    encoder = CompactEncoder()
+    encoder.encode({"OutsideAirTemperature": 52.0}, meta)
+    # Messages after the first one refer to the schema by id only.
+    messages = [encoder.encode({"OutsideAirTemperature": value}, meta) for value in (52.5, 53.0)]
+    agent = BaseHistorianAgent()
+    agent.core = mock.MagicMock()
+    agent.vip = mock.MagicMock()
+    return agent, headers, messages, encoder.schema, encoder.schema_id
+
+
+def test_unknown_compact_schema_is_requested_without_blocking_capture():
+    agent, headers, messages, schema, schema_id = compact_agent_and_messages()
+    topic = "devices/testcampus/testbuilding/testdevice/all"
+    for message in messages:
+        agent._capture_device_data(peer="foo", sender="platform.driver", bus="", topic=topic,
+                                   headers=headers, message=message)
+
+    # Both messages wait for one schema request.
+    assert agent._event_queue.empty()
+    agent.core.spawn.assert_called_once_with(agent._fetch_compact_schema, "platform.driver", schema_id)
+
+    agent.vip.rpc.call.return_value.get.return_value = schema
+    agent._fetch_compact_schema("platform.driver", schema_id)
+
+    agent.vip.rpc.call.assert_called_once_with("platform.driver", "get_compact_schema", schema_id)
+    values = [agent._event_queue.get_nowait()["points"][0][1] for _ in messages]
+    assert values == [52.5, 53.0]
+
+
+def test_unavailable_compact_schema_is_not_requested_again_immediately():
+    agent, headers, messages, schema, schema_id = compact_agent_and_messages()
+    topic = "devices/testcampus/testbuilding/testdevice/all"
+    agent._capture_device_data(peer="foo", sender="platform.driver", bus="", topic=topic,
+                               headers=headers, message=messages[0])
+    agent.vip.rpc.call.return_value.get.return_value = None
+    agent._fetch_compact_schema("platform.driver", schema_id)
+
+    agent._capture_device_data(peer="foo", sender="platform.driver", bus="", topic=topic,
+                               headers=headers, message=messages[1])
+
+    assert agent._event_queue.empty()
+    assert agent.core.spawn.call_count == 1
+
+
+def test_capture_data_batches_points_and_renames_topics_once():
+    now = utils.format_timestamp(datetime.utcnow())
+    headers = {
+        header_mod.DATE: now,
+        header_mod.TIMESTAMP: now
+    }
+    agent = BaseHistorianAgent(topic_replace_list=[{"from": "testcampus", "to": "campus"}])
+    device = "testcampus/testbuilding/testdevice"
+    for _ in range(3):
+        agent._capture_device_data(peer="foo", sender="test", bus="", topic="devices/" + device + "/all",
+                                   headers=dict(headers),
+                                   message=[{"OutsideAirTemperature": 52.5, "MixedAirTemperature": 58.5}, {}])
+
+    records = [agent._event_queue.get_nowait() for _ in range(3)]
+    assert [topic for topic, _, _ in records[0]["points"]] == ["campus/testbuilding/testdevice/OutsideAirTemperature",
+                                                             "campus/testbuilding/testdevice/MixedAirTemperature"]
+    # The timestamp is parsed once and shared by every message carrying the same string.
+    assert records[0]["timestamp"] is records[2]["timestamp"]
+    assert agent._renamed_topics.cache_info().misses == 2
@@ -0,0 +1,92 @@
+from errno import EAGAIN
+
+from mock import Mock
+import pytest
+import zmq
+
+from volttron.platform.vip.router import BaseRouter
+from volttron.platform.vip.tracking import Histogram, RouterStatistics
+from volttron.utils.frame_serialization import serialize_frames
+
+
+@pytest.fixture
+def router():
+    router = BaseRouter(context=Mock(), service_notifier=None, statistics=RouterStatistics(sample_interval=1))
+    router.socket = Mock(identity='router')
+    return router
+
+
+def test_histogram_buckets_have_bounded_relative_error():
+    histogram = Histogram(sub_bucket_bits=3)
+    for value in range(0, 100000, 7):
+        index = histogram.index(value)
+        lower = histogram.lower_bound(index)
+
+import pytest
+
+from volttron.platform.messaging import headers as headers_mod
+from volttron.platform.messaging.compact import (COMPACT_CONTENT_TYPE, CompactDecoder, CompactEncoder,
+                                                 UnknownSchemaError, is_compact)
+
+META = {"temp": {"units": "degF", "type": "float", "tz": ""},
+        "fan": {"units": "On/Off", "type": "boolean", "tz": ""},
+        "speed": {"units": "%", "type": "integer", "tz": ""}}
+
+
+def test_round_trip_sends_schema_once():
+    encoder = CompactEncoder()
+    decoder = CompactDecoder()
+    results = {"temp": 70.5, "fan": True, "speed": 40}
+
+    first = encoder.encode(results, META)
+    second = encoder.encode(results, META)
+
+    assert first["points"] == ["temp", "fan", "speed"]
+    assert "points" not in second and "meta" not in second
+    assert second["values"] == [70.5, True, 40]
+    assert decoder.decode(first) == [results, META]
+    assert decoder.decode(second) == [results, META]
+
+
+def test_partial_results_are_indexed():
+    encoder = CompactEncoder()
+    decoder = CompactDecoder()
+    decoder.decode(encoder.encode({"temp": 70.5, "fan": True, "speed": 40}, META))
+
+    message = encoder.encode({"speed": 45, "temp": 71.0}, META)
+
+    assert message["index"] == [0, 2]
+    assert decoder.decode(message) == [{"temp": 71.0, "speed": 45},
+                                       {"temp": META["temp"], "speed": META["speed"]}]
+
+
+def test_schema_changes_with_metadata():
+    encoder = CompactEncoder()
+    encoder.encode({"temp": 70.5}, META)
+    old_id = encoder.schema_id
+
+    new_meta = dict(META, temp=dict(META["temp"], units="degC"))
+    message = encoder.encode({"temp": 21.0}, new_meta)
+
+    assert message["schema"] != old_id
+    assert message["meta"][0]["units"] == "degC"
+
+
+def test_unknown_schema():
+    encoder = CompactEncoder()
+    encoder.encode({"temp": 70.5}, META)
+    message = encoder.encode({"temp": 70.5}, META)
+    decoder = CompactDecoder()
+
+    with pytest.raises(UnknownSchemaError) as e:
+        decoder.decode(message)
+    assert e.value.schema_id == encoder.schema_id
+
+    decoder.add_schema(encoder.schema_id, **encoder.schema)
+    assert decoder.decode(message)[0] == {"temp": 70.5}
+
+
+def test_is_compact():
+    assert is_compact({headers_mod.CONTENT_TYPE: COMPACT_CONTENT_TYPE})
+    assert not is_compact({headers_mod.CONTENT_TYPE: headers_mod.CONTENT_TYPE.JSON})
+    assert not is_compact({})
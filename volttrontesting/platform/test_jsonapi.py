@@ -0,0 +1,120 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import io
+import json
+import math
+import uuid
+
+import pytest
+
+from volttron.platform import jsonapi
+
+
+@pytest.fixture(params=jsonapi.available_backends())
+def backend(request):
+    previous = jsonapi.get_backend()
+    jsonapi.set_backend(request.param)
+    yield request.param
+    jsonapi.set_backend(previous)
+
+
+def test_round_trip(backend):
+    data = {"topic": "devices/campus/building/all", "values": [1, 2.5, None, True, "x"],
+            "nested": {"big": 2 ** 70}}
+    assert jsonapi.get_backend() == backend
+    assert data == jsonapi.loads(jsonapi.dumps(data))
+    assert data == jsonapi.loadb(jsonapi.dumpb(data))
+
+
+def test_matches_json_module_semantics(backend):
+    # Non-ASCII text is escaped, NaN is kept and integer keys become strings as with json.
+    encoded = jsonapi.dumps({"unit": "°F", 1: float("nan")})
+    assert encoded.isascii()
+    decoded = jsonapi.loads(encoded)
+    assert decoded["unit"] == "°F"
+    assert math.isnan(decoded["1"])
+
+
+@pytest.mark.parametrize("payload", [
+    {"a": 1, "b": [1, 2]},
+    [{"OutsideAirTemperature": 52.5, "Damper": 1e16, "Status": None},
+     {"OutsideAirTemperature": {"units": "F", "tz": "US/Pacific", "type": "float"}}],
+    {"value": 0.1, "small": 1e-7, "big": 12345678901234567890, "flag": True, "path": "a/b"},
+    "devices/campus/building/all",
+])
+def test_text_is_identical_to_json_module(backend, payload):
+    # Text from dumps is persisted and hashed, it must not depend on the backend.
+    assert jsonapi.dumps(payload) == json.dumps(payload)
+    assert jsonapi.dumps(payload, separators=(',', ':')) == json.dumps(payload, separators=(',', ':'))
+    fp = io.StringIO()
+    jsonapi.dump(payload, fp)
+    assert fp.getvalue() == json.dumps(payload)
+    assert jsonapi.loadb(jsonapi.dumpb(payload)) == json.loads(json.dumps(payload))
+
+
+def test_datetime_and_bytes_handling(backend):
+    now = datetime.datetime(2023, 1, 1, 12, 0, 0)
+    with pytest.raises(TypeError):
+        jsonapi.dumps({"ts": now})
+    with pytest.raises(TypeError):
+        jsonapi.dumps({"raw": b"abc"})
+    assert '{"ts": "2023-01-01T12:00:00"}' == jsonapi.dumps({"ts": now}, default=datetime.datetime.isoformat,
+                                                           sort_keys=True)
+    assert {"ts": "2023-01-01T12:00:00"} == jsonapi.loads(jsonapi.dumps({"ts": now},
+                                                                        default=datetime.datetime.isoformat))
+
+
+class _Color(enum.Enum):
+    RED = 1
+
+
+@dataclasses.dataclass
+class _Point:
+    value: float = 1.5
+
+
+class _ToDict:
+    def toDict(self):
+        return {"value": 1}
+
+
+@pytest.mark.parametrize("value", [
+    uuid.UUID(int=1),
+    _Color.RED,
+    decimal.Decimal("1.5"),
+    _Point(),
+    _ToDict(),
+    [{"nested": uuid.UUID(int=1)}],
+])
+def test_dumpb_only_json_types(backend, value):
+    # Values json cannot encode natively fail or reach `default` whichever backend is active.
+    with pytest.raises(TypeError):
+        json.dumps(value)
+    with pytest.raises(TypeError):
+        jsonapi.dumpb(value)
+    with pytest.raises(TypeError):
+        jsonapi.dumpb({"result": value})
+    assert jsonapi.loadb(jsonapi.dumpb(value, default=repr)) == json.loads(json.dumps(value, default=repr))
+
+
+def test_dumpb_non_finite_and_null(backend):
+    for value in (float("nan"), float("inf"), float("-inf")):
+        assert jsonapi.dumpb({"value": value}) == json.dumps({"value": value}).encode("utf-8")
+    data = {"value": None, "text": "null", "values": [None, 1.5]}
+    encoded = jsonapi.dumpb(data)
+    assert jsonapi.loadb(encoded) == data
+    if backend != "json":
+        # None does not send the value back to json.
+        assert encoded == json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def test_decode_errors_are_json_errors(backend):
+    with pytest.raises(jsonapi.JSONDecodeError):
+        jsonapi.loads('{"bad": ')
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        jsonapi.set_backend("unknown")
@@ -0,0 +1,83 @@
+from mock import Mock
+
+import pytest
+
+from volttron.platform.vip.router import BaseRouter
+from volttron.utils.frame_serialization import (deserialize_frames, serialize_frames, HAS_MSGPACK, JSON_CODEC,
+                                                MSGPACK_CODEC, MSGPACK_MARKER)
+
+
+@pytest.fixture
+def router():
+    router = BaseRouter(context=Mock(), service_notifier=None)
+    router.socket = Mock(identity='router')
+    return router
+
+
+def _sent(router):
+    return router.socket.send_multipart.call_args[0][0]
+
+
+def test_hello_without_offer_keeps_json(router):
+    router.route(['agent', '', 'VIP1', '', 'id1', 'hello', 'hello'])
+    welcome = deserialize_frames(_sent(router))
+    assert ['hello', 'welcome'] == welcome[5:7]
+    assert ['router', 'agent'] == welcome[8:]
+    assert 'agent' not in router._peer_codecs
+
+
+@pytest.mark.skipif(not HAS_MSGPACK, reason="msgpack is not installed")
+def test_hello_negotiates_msgpack(router):
+    router.route(['agent', '', 'VIP1', '', 'id1', 'hello', 'hello', dict(codecs=['cbor', MSGPACK_CODEC])])
+    assert MSGPACK_CODEC == deserialize_frames(_sent(router))[-1]
+
+    router.route(['other', 'agent', 'VIP1', '', 'id2', 'rpc', dict(method='test')])
+    frames = _sent(router)
+    assert frames[6].bytes.startswith(MSGPACK_MARKER)
+    assert dict(method='test') == deserialize_frames(frames)[6]
+
+    router._drop_peer('agent')
+    assert 'agent' not in router._peer_codecs
+
+
+def test_hello_with_unknown_codec_falls_back_to_json(router):
+    router.route(['agent', '', 'VIP1', '', 'id1', 'hello', 'hello', dict(codecs=['cbor'])])
+    assert JSON_CODEC == deserialize_frames(_sent(router))[-1]
+    assert 'agent' not in router._peer_codecs
+
+
+@pytest.fixture
+def opaque_router():
+    router = BaseRouter(context=Mock(), service_notifier=None, opaque_routing=True)
+    router.socket = Mock(identity='router')
+    return router
+
+
+def test_opaque_routing_forwards_payload_frames(opaque_router):
+    received = serialize_frames(['other', 'agent', 'VIP1', '', 'id2', 'rpc', dict(method='test'), '123'])
+    frames = opaque_router.decode_frames(received)
+    assert ['other', 'agent', 'VIP1', '', 'id2', 'rpc'] == frames[:6]
+    assert frames[6] is received[6] and frames[7] is received[7]
+
+    opaque_router.route(frames)
+    sent = _sent(opaque_router)
+    assert sent[6] is received[6] and sent[7] is received[7]
+    assert ['agent', 'other', 'VIP1', 'other', 'id2', 'rpc', dict(method='test'), 123] == deserialize_frames(sent)
+
+
+def test_opaque_routing_decodes_router_subsystems(opaque_router):
+    received = serialize_frames(['agent', '', 'VIP1', '', 'id1', 'pubsub', dict(topic='devices')])
+    assert dict(topic='devices') == opaque_router.decode_frames(received)[6]
+
+
+@pytest.mark.skipif(not HAS_MSGPACK, reason="msgpack is not installed")
+def test_opaque_routing_transcodes_msgpack_for_json_peer(opaque_router):
+    opaque_router._peer_codecs['other'] = MSGPACK_CODEC
+    received = serialize_frames(['other', 'agent', 'VIP1', '', 'id2', 'rpc', dict(method='test')], MSGPACK_CODEC)
+    frames = opaque_router.decode_frames(received)
+    assert dict(method='test') == frames[6]
+
+    opaque_router.route(frames)
+    sent = _sent(opaque_router)
+    assert not sent[6].bytes.startswith(MSGPACK_MARKER)
+    assert dict(method='test') == deserialize_frames(sent)[6]
@@ -0,0 +1,77 @@
+from errno import EAGAIN
+
+from mock import Mock
+import pytest
+import zmq
+
+from volttron.platform.vip.router import BaseRouter
+from volttron.platform.vip.tracking import Histogram, RouterStatistics
+from volttron.utils.frame_serialization import serialize_frames
+
+
+@pytest.fixture
+def router():
+    router = BaseRouter(context=Mock(), service_notifier=None, statistics=RouterStatistics(sample_interval=1))
+    router.socket = Mock(identity='router')
+    return router
+
+
+def test_histogram_buckets_have_bounded_relative_error():
+    histogram = Histogram(sub_bucket_bits=3)
+    for value in range(0, 100000, 7):
+        index = histogram.index(value)
+        lower = histogram.lower_bound(index)
+        upper = histogram.lower_bound(index + 1)
+        assert lower <= value < upper
+        assert upper - lower <= max(1, lower / 8)
+
+
+def test_histogram_summary():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    summary = histogram.summary()
+    assert summary['count'] == 1000
+    assert summary['min'] == 1 and summary['max'] == 1000
+    assert summary['mean'] == 500.5
+    assert 500 <= summary['p50'] < 500 * 1.125
+    assert 990 <= summary['p99'] <= 1000
+    assert sum(summary['buckets'].values()) == 1000
+
+
+def test_router_counts_messages_per_peer_and_subsystem(router):
+    for _ in range(3):
+        received = serialize_frames(['agent', 'other', 'VIP1', '', 'id', 'RPC', dict(method='test')])
+        router.route(router.decode_frames(received))
+
+    snapshot = router.statistics.snapshot()
+    agent, other = snapshot['peers']['agent'], snapshot['peers']['other']
+    assert agent['incoming'] == 3
+    assert agent['incoming_bytes'] > 0
+    # The peerlist broadcast when the agent is first seen is sent to no one, the calls are sent to other.
+    assert other['outgoing'] == 3
+    assert other['outgoing_bytes'] > 0
+    assert snapshot['subsystems']['RPC']['incoming'] == 3
+    assert snapshot['latency_us']['count'] == 3
+    assert snapshot['peers']['agent']['incoming_per_second'] > 0
+
+    # The next window starts without messages.
+    assert router.statistics.snapshot()['peers']['agent']['incoming_per_second'] == 0
+
+
+def test_router_counts_send_errors(router):
+    router.socket.send_multipart.side_effect = zmq.ZMQError(EAGAIN)
+    router.route(['agent', 'other', 'VIP1', '', 'id', 'RPC', dict(method='test')])
+    snapshot = router.statistics.snapshot()
+    assert snapshot['peers']['other']['eagain'] == 1
+    assert snapshot['subsystems']['RPC']['eagain'] == 1
+
+
+def test_latency_and_fanout_are_sampled():
+    statistics = RouterStatistics(sample_interval=4)
+    started = [statistics.incoming(['agent', 'other', 'VIP1', '', 'id', 'RPC']) for _ in range(8)]
+    assert [s is not None for s in started] == [False, False, False, True] * 2
+    for _ in range(8):
+        statistics.published(5)
+    assert statistics.fanout.count == 2
+    assert statistics.snapshot()['peers']['agent']['incoming'] == 8
@@ -1,7 +1,10 @@
 import pytz
-from volttron.platform.agent.base_aggregate_historian import AggregateHistorian
+from volttron.platform.agent.base_aggregate_historian import (
+    AggregateHistorian, AggregateSummaryCache, combine_summaries,
+    summary_value)
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 
 @pytest.mark.aggregator
@@ -191,3 +194,160 @@ def test_compute_next_collection_time():
     assert next2 == datetime.strptime(
         '2016-04-30T01:15:23.123456',
         '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=pytz.utc)
+
+
+@pytest.mark.aggregator
+def test_summary_value():
+    summary = combine_summaries([(2, 10.0, 1.0, 9.0), (0, None, None, None),
+                                 (2, 6.0, 2.0, 4.0)])
+    assert summary == (4, 16.0, 1.0, 9.0)
+    assert summary_value(summary, 'avg') == 4.0
+    assert summary_value(summary, 'SUM') == 16.0
+    assert summary_value(summary, 'count') == 4
+    assert summary_value(summary, 'min') == 1.0
+    assert summary_value(summary, 'max') == 9.0
+    assert summary_value((0, None, None, None), 'count') == 0
+    assert summary_value((0, None, None, None), 'avg') is None
+
+
+@pytest.mark.aggregator
+def test_summary_cache_rolls_up_finer_slices():
+    """
+    A 15 minute slice is computed from the cached 1 minute slices and the
+    hour from the 15 minute slices without reading the raw data again.
+    """
+    start = datetime(2016, 3, 1, 1, 0, tzinfo=pytz.utc)
+    fetched = []
+
+    def fetch(topic_ids, slice_start, slice_end):
+        fetched.append((slice_start, slice_end))
+        minutes = int((slice_end - slice_start).total_seconds() // 60)
+        return minutes, float(minutes), 1.0, 1.0
+
+    cache = AggregateSummaryCache(fetch, timedelta(hours=2))
+    for minute in range(60):
+        cache.summarize([2, 1], start + timedelta(minutes=minute),
+                        start + timedelta(minutes=minute + 1))
+        if (minute + 1) % 15 == 0:
+            assert cache.summarize(
+                [1, 2], start + timedelta(minutes=minute - 14),
+                start + timedelta(minutes=minute + 1)) == (15, 15.0, 1.0, 1.0)
+    assert len(fetched) == 60
+
+    assert cache.summarize([1, 2], start, start + timedelta(hours=1)) == \
+        (60, 60.0, 1.0, 1.0)
+    assert len(fetched) == 60
+
+    # Only the part of a slice that was not summarized before is read.
+    assert cache.summarize([1, 2], start + timedelta(minutes=30),
+                           start + timedelta(minutes=90)) == \
+        (60, 60.0, 1.0, 1.0)
+    assert fetched[-1] == (start + timedelta(minutes=60),
+                           start + timedelta(minutes=90))
+    assert len(fetched) == 61
+
+    # Other topics have their own summaries.
+    cache.summarize([3], start, start + timedelta(minutes=15))
+    assert len(fetched) == 62
+
+
+def test_summary_cache_rereads_slices_within_watermark():
+    """
+    Slices read less than the watermark after their end are not reused, so
+    rows written late are included in coarser periods.
+    """
+    start = datetime(2016, 3, 1, 1, 0, tzinfo=pytz.utc)
+    rows = [start + timedelta(minutes=minute, seconds=30) for minute in range(30)]
+    fetched = []
+    now = [start]
+
+    def fetch(topic_ids, slice_start, slice_end):
+        fetched.append((slice_start, slice_end))
+        count = sum(1 for ts in rows if slice_start <= ts < slice_end)
+        return count, float(count), 1.0, 1.0
+
+    cache = AggregateSummaryCache(fetch, timedelta(hours=2),
+                                  watermark=timedelta(minutes=5),
+                                  now=lambda: now[0])
+    for minute in range(15):
+        now[0] = start + timedelta(minutes=minute + 1)
+        cache.summarize([1], start + timedelta(minutes=minute),
+                        start + timedelta(minutes=minute + 1))
+
+    # The 1 minute slices were read as soon as they ended. The 15 minute
+    # period reads the settled part and the last 5 minutes separately.
+    del fetched[:]
+    assert cache.summarize([1], start, now[0])[0] == 15
+    assert fetched == [(start, start + timedelta(minutes=10)),
+                       (start + timedelta(minutes=10),
+                        start + timedelta(minutes=15))]
+
+    # A row of minute 12 is written late, after the 15 minute period.
+    rows.append(start + timedelta(minutes=12, seconds=45))
+    now[0] = start + timedelta(hours=1)
+    del fetched[:]
+    assert cache.summarize([1], start, start + timedelta(minutes=30))[0] == 31
+    # The settled first 10 minutes are reused.
+    assert fetched == [(start + timedelta(minutes=10),
+                        start + timedelta(minutes=30))]
+
+
+class _BatchAggregateHistorian(AggregateHistorian):
+    """Aggregate historian without an agent that records data store calls."""
+
+    def __init__(self, agg_topic_id_map):
+        self.agg_topic_id_map = agg_topic_id_map
+        self._summary_cache = None
+        self._topic_pattern_cache = {}
+        self.core = SimpleNamespace(schedule=lambda *args: None)
+        self.summary_calls = []
+        self.aggregate_calls = []
+        self.inserted = []
+
+    def collect_aggregate_summaries(self, topic_ids, start_time, end_time):
+        self.summary_calls.append(topic_ids)
+        return {1: (2, 10.0, 4.0, 6.0), 2: (2, 2.0, 0.0, 2.0),
+                3: (1, 7.0, 7.0, 7.0)}
+
+    def collect_aggregate(self, topic_ids, agg_type, start_time, end_time):
+        self.aggregate_calls.append((topic_ids, agg_type))
+        return 1.5, 3
+
+    def insert_aggregates(self, rows):
+        self.inserted.append(rows)
+
+
+@pytest.mark.aggregator
+def test_collect_aggregate_data_batches_points():
+    """
+    Aggregations over the same time slice are computed from one summary
+    query and inserted together. Other aggregation types are queried on
+    their own.
+    """
+    historian = _BatchAggregateHistorian({('avg_1_2', 'avg', '1m'): 101,
+                                          ('max_2_3', 'max', '1m'): 102,
+                                          ('std_1', 'stddev', '1m'): 103,
+                                          ('count_3', 'count', '1m'): 104})
+    points = [
+        {'topic_ids': [1, 2], 'aggregation_topic_name': 'avg_1_2',
+         'aggregation_type': 'avg'},
+        {'topic_ids': [2, 3], 'aggregation_topic_name': 'max_2_3',
+         'aggregation_type': 'max'},
+        {'topic_ids': [1], 'aggregation_topic_name': 'std_1',
+         'aggregation_type': 'stddev'},
+        {'topic_ids': [3], 'aggregation_topic_name': 'count_3',
+         'aggregation_type': 'count', 'topic_names': ['t3'], 'min_count': 2},
+    ]
+    collection_time = datetime(2016, 3, 1, 1, 15, tzinfo=pytz.utc)
+
+    historian.collect_aggregate_data(collection_time, '1m', True, points)
+
+    assert historian.summary_calls == [[1, 2, 3]]
+    assert historian.aggregate_calls == [([1], 'stddev')]
+    end_time = datetime(2016, 3, 1, 1, 15, tzinfo=pytz.utc)
+    # count_3 has fewer records than min_count and is not inserted.
+    assert historian.inserted == [[
+        (101, 'avg', '1m', end_time, 3.0, [1, 2]),
+        (102, 'max', '1m', end_time, 7.0, [2, 3]),
+        (103, 'stddev', '1m', end_time, 1.5, [1]),
+    ]]
@@ -53,3 +53,64 @@ def test_returns_empty_list_when_subsystem_not_specified(pubsub_service):
     frames[6] = "not_pubsub"
     result = service.handle_subsystem(frames)
     assert [] == result
+
+
+def _subscribe(service, peer, prefix, bus='', all_platforms=False):
+    frames = [peer, '', 'VIP1', '', 'msg1', 'pubsub', 'subscribe',
+              dict(prefix=prefix, bus=bus, all_platforms=all_platforms)]
+    return service.handle_subsystem(frames)
+
+
+def _publish(service, publisher, topic, bus=''):
+    frames = [publisher, '', 'VIP1', '', 'msg2', 'pubsub', 'publish', topic,
+              dict(bus=bus, headers={}, message='value')]
+    return service.handle_subsystem(frames)[7]
+
+
+def test_publish_matches_subscribed_prefixes(pubsub_service):
+    parameters, service = pubsub_service
+
+    _subscribe(service, 'agent1', 'devices/campus/building1')
+    _subscribe(service, 'agent2', 'devices/campus')
+    _subscribe(service, 'agent3', 'analysis')
+    _subscribe(service, 'agent4', 'devices/campus/building1', bus='other')
+
+    assert 2 == _publish(service, 'pub', 'devices/campus/building1/all')
+    assert 1 == _publish(service, 'pub', 'devices/campus/building2/all')
+    assert 1 == _publish(service, 'pub', 'devices/campus2/all')
+    assert 0 == _publish(service, 'pub', 'record/campus')
+
+
+def test_unsubscribe_and_peer_drop_update_subscribers(pubsub_service):
+    parameters, service = pubsub_service
+
+    _subscribe(service, 'agent1', 'devices')
+    _subscribe(service, 'agent2', 'devices')
+    _subscribe(service, 'agent2', 'devices/campus')
+    assert 2 == _publish(service, 'pub', 'devices/campus/all')
+
+    frames = ['agent1', '', 'VIP1', '', 'msg3', 'pubsub', 'unsubscribe',
+              dict(prefix='devices', bus='')]
+    service.handle_subsystem(frames)
+    assert 1 == _publish(service, 'pub', 'devices/campus/all')
+
+    service.peer_drop('agent2')
+    assert 0 == _publish(service, 'pub', 'devices/campus/all')
+    assert not service._peer_subscriptions['internal']['']
+
+
+def test_publish_serializes_shared_frames_once(pubsub_service):
+    parameters, service = pubsub_service
+    socket = parameters['socket']
+
+    _subscribe(service, 'agent1', 'devices')
+    _subscribe(service, 'agent2', 'devices')
+    _subscribe(service, 'agent3', 'devices/campus')
+    socket.send_multipart.reset_mock()
+
+    assert 3 == _publish(service, 'pub', 'devices/campus/all')
+    sent = [call[0][0] for call in socket.send_multipart.call_args_list]
+    assert 3 == len(sent)
+    assert {'agent1', 'agent2', 'agent3'} == {frames[0].bytes.decode('utf-8') for frames in sent}
+    for frames in sent[1:]:
+        assert all(a is b for a, b in zip(frames[1:], sent[0][1:]))
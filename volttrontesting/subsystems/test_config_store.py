@@ -29,7 +29,7 @@ import gevent
 import pytest
 from volttron.platform.vip.agent import Agent
 from volttron.platform.agent.known_identities import CONFIGURATION_STORE
-from volttron.platform import jsonrpc
+from volttron.platform import jsonapi, jsonrpc
 
 class _config_test_agent(Agent):
     def __init__(self, **kwargs):
@@ -179,6 +179,60 @@ def test_delete_config(default_config_test_agent):
     assert second == ("config", "DELETE", None)
 
 
+@pytest.mark.config_store
+def test_set_configs(default_config_test_agent):
+    configs = {"config": {"data": """{"config2":"config://config2"}""", "type": "json"},
+               "config2": {"data": """{"value":2}""", "type": "json"},
+               "config3": {"data": "value\n3", "type": "csv"}}
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                           "config_test_agent", configs).get()
+
+    # Each configuration is processed once even though "config" references "config2".
+    results = default_config_test_agent.callback_results
+    assert len(results) == 3
+    assert results[0] == ("config", "NEW", {"config2": {"value": 2}})
+    assert ("config2", "NEW", {"value": 2}) in results
+    assert ("config3", "NEW", [{"value": "3"}]) in results
+
+    default_config_test_agent.reset_results()
+
+    configs = {"config2": {"data": """{"value":4}""", "type": "json"},
+               "config4": {"data": "raw_stuff"}}
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                           "config_test_agent", configs).get()
+
+    results = default_config_test_agent.callback_results
+    assert len(results) == 3
+    assert results[0] == ("config", "UPDATE", {"config2": {"value": 4}})
+    assert ("config2", "UPDATE", {"value": 4}) in results
+    assert ("config4", "NEW", "raw_stuff") in results
+
+    config_list = default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'list_configs',
+                                                         "config_test_agent").get()
+    assert config_list == ["config", "config2", "config3", "config4"]
+
+
+@pytest.mark.config_store
+def test_set_configs_invalid(default_config_test_agent):
+    configs = {"config": {"data": """{"config2":"config://config2"}""", "type": "json"},
+               "config2": {"data": """{"config":"config://config"}""", "type": "json"}}
+    with pytest.raises(jsonrpc.RemoteError):
+        default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                               "config_test_agent", configs).get()
+
+    configs = {"config": {"data": """{"value":1}""", "type": "json"},
+               "config2": {"data": "not json", "type": "json"}}
+    with pytest.raises(jsonrpc.RemoteError):
+        default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                               "config_test_agent", configs).get()
+
+    # Nothing from a rejected batch is stored.
+    assert default_config_test_agent.callback_results == []
+    config_list = default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'list_configs',
+                                                         "config_test_agent").get()
+    assert config_list == []
+
+
 @pytest.mark.config_store
 def test_manage_delete_config(default_config_test_agent):
     json_config = """{"value":1}"""
@@ -530,6 +584,51 @@ def test_agent_default_config(request, volttron_instance):
     assert result == ("config", "UPDATE", {"value": 2})
 
 
+@pytest.mark.config_store
+def test_agent_lazy_load(request, volttron_instance, config_test_agent, tmp_path):
+    agents = []
+    cache_path = str(tmp_path / "config_cache.json")
+
+    def cleanup():
+        config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'delete_store', 'test_lazy_agent').get()
+        for agent in agents:
+            agent.core.stop()
+
+    request.addfinalizer(cleanup)
+
+    configs = {"config": {"data": """{"config2":"config://config2"}""", "type": "json"},
+               "config2": {"data": """{"value":2}""", "type": "json"},
+               "config3": {"data": "value\n3", "type": "csv"}}
+    config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs', "test_lazy_agent", configs).get()
+
+    class test_lazy_agent(_config_test_agent):
+        def __init__(self, **kwargs):
+            super(test_lazy_agent, self).__init__(**kwargs)
+            self.vip.config.set_lazy_load(page_size=2, cache_path=cache_path)
+            self.setup_callback()
+
+    expected = [("config", "NEW", {"config2": {"value": 2}}),
+                ("config2", "NEW", {"value": 2}),
+                ("config3", "NEW", [{"value": "3"}])]
+
+    # The second agent starts from the cache written by the first.
+    for _ in range(2):
+        agent = volttron_instance.build_agent(identity='test_lazy_agent',
+                                              agent_class=test_lazy_agent,
+                                              enable_store=True)
+        agents.append(agent)
+        gevent.sleep(1.0)
+
+        assert sorted(agent.callback_results) == expected
+        agent.core.stop()
+        agents.remove(agent)
+
+    with open(cache_path) as f:
+        cache = jsonapi.load(f)
+    assert sorted(cache) == ["config", "config2", "config3"]
+    assert cache["config2"]["contents"] == {"value": 2}
+
+
 @pytest.mark.config_store
 def test_agent_sub_options(request, volttron_instance):
 
@@ -0,0 +1,47 @@
+from mock import MagicMock, Mock
+
+from volttron.platform.vip.agent.subsystems.pubsub import PubSub
+
+
+def _pubsub():
+    core = MagicMock()
+    pubsub = PubSub(core=core, rpc_subsys=Mock(), peerlist_subsys=Mock(), owner=Mock())
+    pubsub.synchronize = Mock()
+    return pubsub
+
+
+def test_process_callback_dispatches_matching_prefixes():
+    pubsub = _pubsub()
+    devices, building, other_bus = Mock(), Mock(), Mock()
+    pubsub._add_subscription('devices', devices)
+    pubsub._add_subscription('devices/campus/building', building, all_platforms=True)
+    pubsub._add_subscription('devices', other_bus, bus='other')
+
+    pubsub._process_callback('sender', '', 'devices/campus/building/all', {}, 'message')
+    devices.assert_called_once_with('pubsub', 'sender', '', 'devices/campus/building/all', {}, 'message')
+    building.assert_called_once()
+    other_bus.assert_not_called()
+    pubsub.synchronize.assert_not_called()
+
+    pubsub._process_callback('sender', '', 'analysis/all', {}, 'message')
+    pubsub.synchronize.assert_called_once()
+
+
+def test_dispatch_cache_invalidated_on_subscription_change():
+    pubsub = _pubsub()
+    first, second = Mock(), Mock()
+    pubsub._add_subscription('devices', first)
+    pubsub._process_callback('sender', '', 'devices/all', {}, 'message')
+    pubsub._process_callback('sender', '', 'devices/all', {}, 'message')
+    assert 2 == first.call_count
+    assert 1 == pubsub._resolve_callbacks.cache_info().hits
+
+    pubsub._add_subscription('devices/', second)
+    pubsub._process_callback('sender', '', 'devices/all', {}, 'message')
+    assert 3 == first.call_count
+    assert 1 == second.call_count
+
+    pubsub._drop_subscription('devices', first)
+    pubsub._process_callback('sender', '', 'devices/all', {}, 'message')
+    assert 3 == first.call_count
+    assert 2 == second.call_count
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+from mock import MagicMock, Mock
+import pytest
+
+from volttron.platform.agent.known_identities import AUTH
+from volttron.platform.jsonrpc import Error
+from volttron.platform.vip.agent.subsystems.auth import Auth
+from volttron.platform.vip.agent.subsystems.rpc import RPC
+
+
+def _checked(method, capabilities, user_to_capabilities):
+    auth = Auth(owner=Mock(), core=MagicMock(), rpc=MagicMock())
+    auth._user_to_capabilities = user_to_capabilities
+    auth._dirty = False
+    rpc = SimpleNamespace(context=SimpleNamespace(vip_message=SimpleNamespace(user='user', peer=AUTH)),
+                          _message_bus='zmq',
+                          _owner=SimpleNamespace(vip=SimpleNamespace(auth=auth)))
+    auth._rpc = lambda: rpc
+    return RPC._add_auth_check(rpc, method, set(capabilities)), auth
+
+
+def set_point(requester_id, topic, value, point=None, **kwargs):
+    return value
+
+
+def test_missing_capability_is_refused():
+    checked, _ = _checked(set_point, ['can_set'], {'user': {'other': None}})
+    with pytest.raises(Error):
+        checked('requester', 'campus/building/device/point', 1)
+
+
+def test_argument_restrictions():
+    checked, _ = _checked(set_point, ['can_set'], {'user': {'can_set': {'topic': '/campus/.*/point/'}}})
+    assert 1 == checked('requester', 'campus/building/point', 1)
+    assert 2 == checked('requester', topic='campus/floor/point', value=2)
+    with pytest.raises(Error):
+        checked('requester', 'campus/building/other', 1)
+
+    checked, _ = _checked(set_point, ['can_set'], {'user': {'can_set': {'point': None, 'requester_id': 'me'}}})
+    assert 3 == checked('me', 'topic', 3)
+    with pytest.raises(Error):
+        checked('me', 'topic', 3, point='heat')
+    with pytest.raises(Error):
+        checked('you', 'topic', 3)
+
+
+def test_restriction_of_unknown_parameter_is_refused():
+    checked, _ = _checked(set_point, ['can_set'], {'user': {'can_set': {'unknown': 1}}})
+    with pytest.raises(Error):
+        checked('requester', 'topic', 1)
+
+
+def test_decision_is_cached_until_capabilities_change():
+    checked, auth = _checked(set_point, ['can_set'], {'user': {'can_set': None}})
+    auth.get_capabilities = Mock(wraps=auth.get_capabilities)
+    assert 1 == checked('requester', 'topic', 1)
+    assert 2 == checked('requester', 'topic', 2)
+    assert 1 == auth.get_capabilities.call_count
+
+    auth._update_capabilities({'user': {}})
+    auth._dirty = False
+    with pytest.raises(Error):
+        checked('requester', 'topic', 1)
+    assert 2 == auth.get_capabilities.call_count
@@ -7,7 +7,7 @@ import pytest
 from pytz import UTC
 
 from volttrontesting.utils.utils import AgentMock
-from volttron.platform.agent.base_historian import BaseHistorianAgent, Agent
+from volttron.platform.agent.base_historian import BaseHistorianAgent, Agent, _epoch_query_results
 
 
 agent_data_dir = os.path.join(os.getcwd(), os.path.basename(os.getcwd()) + ".agent-data")
@@ -100,6 +100,20 @@ class BaseHistorianAgentTestWrapper(BaseHistorianAgent):
         self.last_to_publish_list = to_publish_list
 
 
+@pytest.mark.parametrize(
+    "results, expected",
+    [
+        ({}, {}),
+        ({"values": [("2020-06-01T12:30:59.000000+00:00", 1), ("2020-06-01T12:31:00.500000", 2)], "metadata": {}},
+         {"values": [(1591014659.0, 1), (1591014660.5, 2)], "metadata": {}}),
+        ({"values": {"a": [("2020-06-01T12:30:59.000000-01:00", 1)], "b": []}},
+         {"values": {"a": [(1591018259.0, 1)], "b": []}}),
+    ],
+)
+def test_epoch_query_results_should_convert_timestamps(results, expected):
+    assert _epoch_query_results(results) == expected
+
+
 @pytest.fixture()
 def base_historian_agent():
     base_historian = BaseHistorianAgentTestWrapper()
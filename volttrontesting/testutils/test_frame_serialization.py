@@ -1,5 +1,7 @@
+import pytest
 from zmq.sugar.frame import Frame
-from volttron.utils.frame_serialization import deserialize_frames, serialize_frames
+from volttron.utils.frame_serialization import (deserialize_envelope, deserialize_frames, serialize_frames,
+                                                HAS_MSGPACK, MSGPACK_CODEC, MSGPACK_MARKER)
 
 
 def test_can_deserialize_homogeneous_string():
@@ -32,3 +34,26 @@ def test_mixed_array():
 
     for r in range(len(original)):
         assert original[r] == after_deserialize[r], f"Element {r} is not the same."
+
+
+@pytest.mark.skipif(not HAS_MSGPACK, reason="msgpack is not installed")
+def test_msgpack_frames_round_trip():
+    original = ["alpha", dict(alpha=5, gamma="5.0", theta=5.0, nan=float('inf')), "gamma", ["from", "to", 'VIP1']]
+    frames = serialize_frames(original, MSGPACK_CODEC)
+    assert frames[1].bytes.startswith(MSGPACK_MARKER)
+    assert frames[0].bytes == b"alpha"
+
+    # Frames are recognized without knowing the codec of the sender.
+    assert original == deserialize_frames(frames)
+
+
+def test_deserialize_envelope_keeps_payload_frames():
+    original = ["from", "to", "VIP1", "", "42", "rpc", dict(alpha=5), "gamma"]
+    frames = serialize_frames(original)
+    decoded = deserialize_envelope(frames)
+
+    # Envelope frames are strings, even where they would parse as JSON.
+    assert ["from", "to", "VIP1", "", "42", "rpc"] == decoded[:6]
+    assert decoded[6] is frames[6] and decoded[7] is frames[7]
+    # Serializing the decoded frames again gives the frames that were received.
+    assert [f.bytes for f in frames] == [f.bytes for f in serialize_frames(decoded)]
@@ -0,0 +1,43 @@
+from volttron.utils.prefix_trie import PrefixTrie
+
+
+def test_match_returns_values_of_all_prefixes():
+    trie = PrefixTrie()
+    trie.add('devices', 'a')
+    trie.add('devices/campus', 'b')
+    trie.add('devices/campus/building', 'c')
+    trie.add('record', 'd')
+
+    assert {'a', 'b', 'c'} == trie.match('devices/campus/building/all')
+    assert {'a', 'b'} == trie.match('devices/campus2/all')
+    assert set() == trie.match('dev')
+    assert 4 == len(trie)
+
+
+def test_empty_prefix_matches_everything():
+    trie = PrefixTrie()
+    trie.add('', 'a')
+    assert {'a'} == trie.match('')
+    assert {'a'} == trie.match('any/topic')
+
+
+def test_add_and_discard_are_idempotent():
+    trie = PrefixTrie()
+    assert trie.add('devices', 'a')
+    assert not trie.add('devices', 'a')
+    assert trie.discard('devices', 'a')
+    assert not trie.discard('devices', 'a')
+    assert not trie.discard('unknown', 'a')
+    assert not trie
+    assert set() == trie.match('devices/all')
+
+
+def test_discard_keeps_longer_prefixes():
+    trie = PrefixTrie()
+    trie.add('devices', 'a')
+    trie.add('devices/campus', 'b')
+    trie.discard('devices', 'a')
+
+    assert {'b'} == trie.match('devices/campus/all')
+    assert {'b'} == trie.get('devices/campus')
+    assert [('devices/campus', 'b')] == list(trie.items())
@@ -0,0 +1,97 @@
+"""
+Test cases for the journaled persistent dictionary used by the configuration store
+"""
+import json
+import os
+
+from volttron.utils.persistance import JournaledPersistentDict
+
+
+def config(data):
+    return {"type": "json", "modified": "2023-01-01T00:00:00.000000+00:00", "data": data}
+
+
+def test_changes_are_journaled_and_replayed(tmp_path):
+    path = str(tmp_path / "agent.store")
+    store = JournaledPersistentDict(filename=path)
+    store["config"] = config('{"a": 1}')
+    store["devices/one"] = config('{"b": 2}')
+    store.sync()
+    store.pop("config")
+    store["devices/two"] = config('{"c": 3}')
+    store.sync()
+
+    # Nothing was compacted yet, the changes only exist in the journal.
+    assert not os.path.exists(path)
+    with open(path + JournaledPersistentDict.JOURNAL_SUFFIX) as f:
+        assert len(f.readlines()) == 2
+
+    reloaded = JournaledPersistentDict(filename=path)
+    assert reloaded == {"devices/one": config('{"b": 2}'), "devices/two": config('{"c": 3}')}
+    # Loading folds the journal into the store file.
+    assert not os.path.exists(path + JournaledPersistentDict.JOURNAL_SUFFIX)
+    with open(path) as f:
+        assert json.load(f) == reloaded
+
+
+def test_incomplete_journal_entry_is_discarded(tmp_path):
+    path = str(tmp_path / "agent.store")
+    store = JournaledPersistentDict(filename=path)
+    store["config"] = config('{"a": 1}')
+    store.sync()
+    store["config"] = config('{"a": 2}')
+    store.sync()
+
+    journal = path + JournaledPersistentDict.JOURNAL_SUFFIX
+    with open(journal, "rb") as f:
+        contents = f.read()
+    with open(journal, "wb") as f:
+        f.write(contents[:-10])
+
+    assert JournaledPersistentDict(filename=path) == {"config": config('{"a": 1}')}
+
+
+def test_incomplete_journal_entry_is_removed_on_load(tmp_path):
+    path = str(tmp_path / "agent.store")
+    journal = path + JournaledPersistentDict.JOURNAL_SUFFIX
+    with open(journal, "wb") as f:
+        f.write(b'{"set":{"x":')
+
+    store = JournaledPersistentDict(filename=path)
+    assert store == {}
+    assert not os.path.exists(journal)
+
+    store["config"] = config('{"a": 1}')
+    store.sync()
+
+    # The change is not appended to the cut short entry and survives a reload.
+    assert JournaledPersistentDict(filename=path) == {"config": config('{"a": 1}')}
+
+
+def test_journal_is_compacted_when_it_outgrows_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(JournaledPersistentDict, "COMPACT_MIN_BYTES", 1000)
+    path = str(tmp_path / "agent.store")
+    store = JournaledPersistentDict(filename=path)
+    for i in range(20):
+        store["devices/{}".format(i)] = config("x" * 100)
+        store.sync()
+
+    # The journal never grows past the size of the store file.
+    assert os.path.exists(path)
+    assert os.path.getsize(path + JournaledPersistentDict.JOURNAL_SUFFIX) <= max(1000, os.path.getsize(path))
+    assert JournaledPersistentDict(filename=path) == store
+
+
+def test_empty_store_removes_files(tmp_path):
+    path = str(tmp_path / "agent.store")
+    store = JournaledPersistentDict(filename=path)
+    store["config"] = config('{"a": 1}')
+    store.close()
+    assert os.path.exists(path)
+
+    store.clear()
+    store.sync()
+
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + JournaledPersistentDict.JOURNAL_SUFFIX)
+    assert JournaledPersistentDict(filename=path) == {}